@@ -0,0 +1,150 @@
+"""
+JWT 인증 - 검증 결과 캐시를 사용하는 공용 토큰 검증기
+동일 토큰의 반복 요청(상태 폴링, 후속 질문)은 서명 검증과 Fernet 복호화를 건너뜁니다.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+import jwt
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass(frozen=True)
+class AuthContext:
+    """인증된 요청 정보"""
+    user_id: Optional[str]
+    api_key: str
+    expires_at: Optional[float]
+
+
+class AuthError(Exception):
+    """인증 실패 - 엔드포인트에서 401 응답으로 변환"""
+
+    def __init__(self, message: str, status_code: int = 401):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+    def to_response(self, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+        return JSONResponse(
+            {"success": False, "error": self.message},
+            status_code=self.status_code,
+            headers=headers,
+        )
+
+
+class TokenCache:
+    """토큰 digest → AuthContext 의 크기 제한 LRU (exp 준수)"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, AuthContext]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        # 원본 토큰은 메모리에 키로 남기지 않음
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[AuthContext]:
+        now = time.time() if now is None else now
+        with self._lock:
+            context = self._entries.get(key)
+            if context is None:
+                self.misses += 1
+                return None
+            if context.expires_at is not None and context.expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return context
+
+    def put(self, key: str, context: AuthContext) -> None:
+        with self._lock:
+            self._entries[key] = context
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class TokenVerifier:
+    """Authorization 헤더 파싱 → JWT 검증 → API 키 추출 (결과 캐시)"""
+
+    def __init__(
+        self,
+        secret: str,
+        decrypt_api_key: Callable[[str], str],
+        cache: Optional[TokenCache] = None,
+        algorithms: Tuple[str, ...] = ("HS256",),
+    ):
+        self.secret = secret
+        self.decrypt_api_key = decrypt_api_key
+        self.cache = cache or TokenCache(int(os.getenv("AUTH_CACHE_SIZE", "1024")))
+        self.algorithms = list(algorithms)
+
+    def verify_token(self, token: str) -> AuthContext:
+        """토큰 검증 - 캐시 적중 시 서명 검증/복호화 생략"""
+        key = self.cache.digest(token)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            payload = jwt.decode(token, self.secret, algorithms=self.algorithms)
+        except jwt.ExpiredSignatureError:
+            raise AuthError("토큰이 만료되었습니다")
+        except jwt.InvalidTokenError:
+            raise AuthError("유효하지 않은 토큰입니다")
+
+        api_key = payload.get("api_key")
+        if not api_key:
+            # 호환성을 위해 기존 암호화된 키도 시도
+            encrypted_key = payload.get("encrypted_api_key")
+            if not encrypted_key:
+                raise AuthError("토큰에 API 키가 없습니다")
+            try:
+                api_key = self.decrypt_api_key(encrypted_key)
+            except Exception:
+                raise AuthError("유효하지 않은 토큰입니다")
+
+        exp = payload.get("exp")
+        context = AuthContext(
+            user_id=payload.get("user_id"),
+            api_key=api_key,
+            expires_at=float(exp) if exp is not None else None,
+        )
+        self.cache.put(key, context)
+        return context
+
+    def authenticate(self, request: Request) -> AuthContext:
+        """필수 인증 - Bearer 토큰이 없으면 AuthError"""
+        auth_header = request.headers.get("Authorization", "")
+        if not auth_header.startswith("Bearer "):
+            raise AuthError("인증이 필요합니다")
+        return self.verify_token(auth_header[7:])
+
+    def authenticate_optional(self, request: Request) -> Optional[AuthContext]:
+        """선택 인증 - 헤더가 없으면 None, 있으면 검증"""
+        if not request.headers.get("Authorization"):
+            return None
+        return self.authenticate(request)
@@ -0,0 +1,227 @@
+"""
+단계 체크포인트 - 다단계 LLM 파이프라인의 완료 단계 결과를 원자적으로 기록하고, 재시도/재시작 시 마지막 완료 단계 다음부터 실행
+실행 키는 API 키를 뺀 생성 입력의 해시라서, 같은 입력으로 다시 요청하면 작업 ID가 달라도 이전 실행의 완료 단계를 이어받습니다.
+
+디스크 구성: {CHECKPOINT_DIR}/{실행 키}/{단계}.json (단계마다 임시 파일 → os.replace)
+보관 기간(TTL)이 지난 단계는 메모리/디스크 모두에서 조회 시 삭제하고, 다시 열리지 않는 실행 디렉터리는 주기적으로 정리합니다.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# 단계 결과 구조가 바뀌면 올려서 기존 체크포인트를 무효화
+CHECKPOINT_VERSION = 1
+
+
+def _canonical(value: Any) -> Any:
+    """JSON으로 표현할 수 없는 입력(업로드 바이트 등)을 내용 기준 값으로 변환
+    그 밖의 타입은 repr에 메모리 주소가 섞여 키가 매번 달라지므로 TypeError"""
+    if isinstance(value, (bytes, bytearray)):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=canonical_hash)
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    raise TypeError(f"해시할 수 없는 입력 타입: {type(value).__name__}")
+
+
+def canonical_hash(payload: Any) -> str:
+    """정규화 JSON(dict 키 순서와 무관)의 SHA-256 - 체크포인트/에이전트 캐시 키 공용"""
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=_canonical)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def checkpoint_key(pipeline: str, inputs: Any) -> str:
+    """파이프라인 이름 + 입력의 정규화 JSON SHA-256"""
+    return canonical_hash({"pipeline": pipeline, "version": CHECKPOINT_VERSION, "inputs": inputs})
+
+
+def atomic_write_json(path: str, value: Any) -> bool:
+    """같은 디렉터리의 임시 파일에 쓴 뒤 교체 - 중간에 죽어도 이전 파일이나 완성된 새 파일만 남음"""
+    try:
+        payload = json.dumps(value, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return False
+    directory = os.path.dirname(path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+class Checkpoint:
+    """실행 하나의 단계별 체크포인트 핸들"""
+
+    def __init__(self, store: "CheckpointStore", key: str, stages: Dict[str, Any]):
+        self.store = store
+        self.key = key
+        self._stages = stages
+        # 이전 실행에서 이어받은 단계
+        self.resumed: List[str] = list(stages)
+
+    def __contains__(self, stage: str) -> bool:
+        return stage in self._stages
+
+    def get(self, stage: str) -> Optional[Any]:
+        """완료된 단계 결과 사본 (없으면 None)"""
+        if stage not in self._stages:
+            return None
+        return copy.deepcopy(self._stages[stage])
+
+    def save(self, stage: str, output: Any) -> None:
+        self._stages[stage] = copy.deepcopy(output)
+        self.store.save(self.key, stage, output)
+
+    def clear(self) -> None:
+        """파이프라인이 끝나면 삭제 (완료된 결과는 작업 저장소가 보관)"""
+        self._stages.clear()
+        self.store.clear(self.key)
+
+
+class CheckpointStore:
+    """메모리(최근 실행 LRU) + 디스크 단계 체크포인트"""
+
+    def __init__(self, disk_dir: Optional[str] = None, max_runs: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        disk_dir = disk_dir or os.getenv("CHECKPOINT_DIR") or os.path.join(tempfile.gettempdir(), "ir-checkpoints")
+        self.disk_dir = disk_dir if disk_dir != "off" else None
+        self.max_runs = max_runs or int(os.getenv("CHECKPOINT_MAX_RUNS", "128"))
+        # 재시도되지 않은 실패 실행의 체크포인트 보관 기간
+        self.ttl_seconds = ttl_seconds or int(os.getenv("CHECKPOINT_TTL_SECONDS", "86400"))
+        # 다시 열리지 않은 실행 디렉터리 정리 주기
+        self.sweep_seconds = int(os.getenv("CHECKPOINT_SWEEP_SECONDS", "3600"))
+
+        # 실행 키 -> {단계: {"saved_at", "output"}} (디스크 레코드와 같은 구조)
+        self._memory: "OrderedDict[str, Dict[str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self.saves = 0
+        self.resumed_stages = 0
+
+    def _run_dir(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key)
+
+    def _expired(self, record: Dict[str, Any], now: float) -> bool:
+        return now - record.get("saved_at", 0) > self.ttl_seconds
+
+    def _load_disk(self, key: str, now: float) -> Dict[str, Dict[str, Any]]:
+        """디스크의 유효한 단계 레코드 - 만료되거나 깨진 단계 파일은 삭제하고, 남은 단계가 없으면 실행 디렉터리도 삭제"""
+        records: Dict[str, Dict[str, Any]] = {}
+        if not self.disk_dir:
+            return records
+        run_dir = self._run_dir(key)
+        try:
+            names = os.listdir(run_dir)
+        except OSError:
+            return records
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(run_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+            except OSError:
+                continue
+            except ValueError:
+                record = None
+            if isinstance(record, dict) and "stage" in record and not self._expired(record, now):
+                records[record["stage"]] = record
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if not records:
+            shutil.rmtree(run_dir, ignore_errors=True)
+        return records
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """마지막 기록 이후 TTL이 지난 실행 디렉터리 삭제 (삭제한 실행 수)"""
+        if not self.disk_dir:
+            return 0
+        now = now or time.time()
+        removed = 0
+        try:
+            entries = list(os.scandir(self.disk_dir))
+        except OSError:
+            return 0
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            try:
+                newest = max((f.stat().st_mtime for f in os.scandir(entry.path)), default=entry.stat().st_mtime)
+            except OSError:
+                continue
+            if now - newest > self.ttl_seconds:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def open(self, pipeline: str, inputs: Any) -> Checkpoint:
+        """입력에 해당하는 실행의 체크포인트 (완료 단계가 있으면 resumed에 표시)"""
+        key = checkpoint_key(pipeline, inputs)
+        now = time.time()
+        if now - self._last_sweep > self.sweep_seconds:
+            self._last_sweep = now
+            self.sweep(now)
+        with self._lock:
+            records = self._memory.get(key)
+            if records is not None:
+                records = {stage: record for stage, record in records.items() if not self._expired(record, now)}
+                if records:
+                    self._memory[key] = records
+                else:
+                    self._memory.pop(key)
+            if not records:
+                records = self._load_disk(key, now)
+            stages = {stage: copy.deepcopy(record["output"]) for stage, record in records.items()}
+            self.resumed_stages += len(stages)
+        return Checkpoint(self, key, stages)
+
+    def save(self, key: str, stage: str, output: Any) -> None:
+        record = {"stage": stage, "saved_at": time.time(), "output": output}
+        with self._lock:
+            self._memory.setdefault(key, {})[stage] = copy.deepcopy(record)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_runs:
+                self._memory.popitem(last=False)
+            self.saves += 1
+        if self.disk_dir:
+            atomic_write_json(os.path.join(self._run_dir(key), f"{stage}.json"), record)
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.disk_dir:
+            shutil.rmtree(self._run_dir(key), ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_runs": len(self._memory),
+            "saves": self.saves,
+            "resumed_stages": self.resumed_stages,
+        }
+
+
+# 파이프라인 간 공유 체크포인트 저장소
+checkpoint_store = CheckpointStore()
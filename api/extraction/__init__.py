@@ -0,0 +1,14 @@
+"""
+IR 자료 텍스트 추출 모듈
+PDF / XLSX / DOCX를 포맷별로 파싱해 텍스트와 표를 추출합니다.
+"""
+
+from .cache import ExtractionCache, content_hash
+from .engine import DocumentExtractor
+from .models import ExtractionResult
+from .parsers import ExtractionError, detect_format
+
+__all__ = [
+    'DocumentExtractor', 'ExtractionResult', 'ExtractionError', 'ExtractionCache',
+    'content_hash', 'detect_format'
+]
@@ -0,0 +1,169 @@
+"""
+추출 결과 캐시 - 원본 바이트의 SHA-256을 키로 하는 메모리/디스크 2단계 LRU
+같은 IR 자료를 다시 올리면 파싱을 건너뛰고, 클라이언트는 해시만 보내 재업로드를 생략할 수 있습니다.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .models import ExtractionResult
+
+# 저장 포맷이 바뀌면 올려서 기존 디스크 캐시를 무효화
+CACHE_FORMAT_VERSION = 1
+
+
+def content_hash(content: bytes) -> str:
+    """원본 바이트의 SHA-256 (클라이언트 crypto.subtle.digest 결과와 동일한 hex)"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def _is_valid_digest(digest: str) -> bool:
+    return len(digest) == 64 and all(ch in "0123456789abcdef" for ch in digest)
+
+
+class ExtractionCache:
+    """메모리 LRU + 디스크 LRU 캐시"""
+
+    def __init__(
+        self,
+        max_memory_bytes: Optional[int] = None,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: Optional[int] = None,
+    ):
+        self.max_memory_bytes = max_memory_bytes or int(os.getenv("EXTRACTION_CACHE_MEMORY_MB", "64")) * 1024 * 1024
+        self.max_disk_bytes = max_disk_bytes or int(os.getenv("EXTRACTION_CACHE_DISK_MB", "512")) * 1024 * 1024
+        disk_dir = disk_dir or os.getenv("EXTRACTION_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "ir-extraction-cache")
+        self.disk_dir = disk_dir if disk_dir != "off" else None
+
+        self._memory: "OrderedDict[str, Tuple[ExtractionResult, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None  # 첫 디스크 접근 시 스캔
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+    # ---- 메모리 계층 ----
+
+    def _memory_put(self, digest: str, result: ExtractionResult, size: int) -> None:
+        if size > self.max_memory_bytes:
+            return
+        old = self._memory.pop(digest, None)
+        if old is not None:
+            self._memory_bytes -= old[1]
+        self._memory[digest] = (result, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes and self._memory:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    # ---- 디스크 계층 ----
+
+    def _disk_path(self, digest: str) -> str:
+        return os.path.join(self.disk_dir, f"{digest}.v{CACHE_FORMAT_VERSION}.json")
+
+    def _disk_entries(self):
+        try:
+            with os.scandir(self.disk_dir) as entries:
+                return [e for e in entries if e.name.endswith(f".v{CACHE_FORMAT_VERSION}.json")]
+        except FileNotFoundError:
+            return []
+
+    def _ensure_disk_size(self) -> int:
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(e.stat().st_size for e in self._disk_entries())
+        return self._disk_bytes
+
+    def _disk_get(self, digest: str) -> Optional[ExtractionResult]:
+        path = self._disk_path(digest)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)  # LRU 갱신
+        except (OSError, ValueError):
+            return None
+        return ExtractionResult(**data)
+
+    def _disk_put(self, digest: str, payload: str) -> None:
+        os.makedirs(self.disk_dir, exist_ok=True)
+        self._ensure_disk_size()
+        path = self._disk_path(digest)
+        # 원자적 쓰기: 임시 파일 작성 후 교체
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._disk_bytes += len(payload.encode("utf-8")) - previous
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = sorted(self._disk_entries(), key=lambda e: e.stat().st_mtime)
+        for entry in entries:
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._disk_bytes -= size
+            except OSError:
+                continue
+
+    # ---- 공개 API ----
+
+    def get(self, digest: str) -> Optional[ExtractionResult]:
+        """해시로 조회 (메모리 → 디스크 순, 디스크 적중 시 메모리로 승격)"""
+        if not _is_valid_digest(digest):
+            return None
+        with self._lock:
+            entry = self._memory.get(digest)
+            if entry is not None:
+                self._memory.move_to_end(digest)
+                self.hits["memory"] += 1
+                return entry[0]
+
+            result = self._disk_get(digest) if self.disk_dir else None
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits["disk"] += 1
+            self._memory_put(digest, result, len(json.dumps(result.to_dict(), ensure_ascii=False)))
+            return result
+
+    def contains(self, digest: str) -> bool:
+        """재업로드 생략 여부 판단용 존재 확인 (통계 미반영)"""
+        if not _is_valid_digest(digest):
+            return False
+        with self._lock:
+            if digest in self._memory:
+                return True
+        return bool(self.disk_dir) and os.path.exists(self._disk_path(digest))
+
+    def put(self, digest: str, result: ExtractionResult) -> None:
+        """성공한 추출 결과만 저장"""
+        if not result.ok or not _is_valid_digest(digest):
+            return
+        payload = json.dumps(result.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self._memory_put(digest, result, len(payload))
+            if self.disk_dir:
+                self._disk_put(digest, payload)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": self._disk_bytes,
+            "hits": dict(self.hits),
+            "misses": self.misses,
+        }
@@ -0,0 +1,258 @@
+"""
+문서 추출 엔진 - CPU 바운드 파싱을 multiprocessing.Pool 워커에서 실행
+이벤트 루프를 막지 않도록 모든 파싱은 워커 프로세스로 보내고,
+파일별 대기/처리 타임아웃과 페이지 제한을 적용합니다.
+워커는 forkserver(없으면 spawn)로 띄워 스레드가 있는 서버 프로세스를 fork하지 않습니다.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .cache import ExtractionCache, content_hash
+from .models import ExtractionResult
+from .parsers import ExtractionError, decode_text, detect_format, parse_document
+
+# 워커 프로세스의 작업 시작 보고 큐 (풀 initializer가 설정)
+_started_queue = None
+
+
+def _init_worker(started_queue) -> None:
+    global _started_queue
+    _started_queue = started_queue
+
+
+def _run_in_worker(task_id: int, parser: Callable, filename: str, content: bytes, max_pages: int, max_rows: int):
+    """워커 진입점 - 시작 시 (작업 ID, pid)를 보고한 뒤 파싱"""
+    _started_queue.put((task_id, os.getpid()))
+    return parser(filename, content, max_pages, max_rows)
+
+
+class _Task:
+    """추출 작업 하나 - 풀 스레드의 시작/완료 알림을 요청 이벤트 루프로 전달"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.started = asyncio.Event()
+        self.done = loop.create_future()
+        self.pid: Optional[int] = None
+
+    def _notify(self, callback, *args) -> None:
+        try:
+            self.loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # 요청 루프가 이미 종료됨 (버려진 작업)
+            pass
+
+    def mark_started(self, pid: int) -> None:
+        self.pid = pid
+        self._notify(self.started.set)
+
+    def set_result(self, value: Any) -> None:
+        self._notify(self._resolve, value, None)
+
+    def set_exception(self, error: BaseException) -> None:
+        self._notify(self._resolve, None, error)
+
+    def _resolve(self, value: Any, error: Optional[BaseException]) -> None:
+        # 시작 보고 전에 실패(직렬화 오류 등)해도 대기가 끝나도록
+        self.started.set()
+        if self.done.done():
+            return
+        if error is not None:
+            self.done.set_exception(error)
+        else:
+            self.done.set_result(value)
+
+
+class DocumentExtractor:
+    """프로세스 풀 기반 문서 추출기
+    타임아웃은 워커가 파일을 집어 든 시점부터 재고, 시간을 넘긴 파일의 워커만 종료합니다.
+    (multiprocessing.Pool은 죽은 워커를 새로 띄우고 다른 작업은 그대로 진행 - ProcessPoolExecutor는 풀 전체가 깨짐)"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        queue_timeout: Optional[float] = None,
+        max_pages: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        cache: Optional[ExtractionCache] = None,
+        parser: Callable = parse_document,
+    ):
+        self.max_workers = max_workers or int(os.getenv("EXTRACTION_WORKERS", min(4, os.cpu_count() or 1)))
+        self.timeout = timeout or float(os.getenv("EXTRACTION_TIMEOUT", "20"))
+        # 다른 파일 뒤에서 워커를 기다리는 최대 시간 (처리 타임아웃과 별도)
+        self.queue_timeout = queue_timeout or float(os.getenv("EXTRACTION_QUEUE_TIMEOUT", "60"))
+        self.max_pages = max_pages or int(os.getenv("EXTRACTION_MAX_PAGES", "60"))
+        self.max_rows = max_rows or int(os.getenv("EXTRACTION_MAX_ROWS", "2000"))
+        self.cache = cache
+        # 워커에서 실행할 파서 (모듈 수준 함수여야 함)
+        self.parser = parser
+        self._pool = None
+        self._started_queue = None
+        self._tasks: Dict[int, _Task] = {}
+        # 워커 pid -> 그 워커가 마지막으로 집어 든 작업 ID (종료 대상 확인용)
+        self._running: Dict[int, int] = {}
+        # 대기 시간 초과로 기다리는 쪽이 없는 작업 - 워커가 집어 들면 처리 타임아웃 뒤 종료
+        self._dropped: Set[int] = set()
+        self._task_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        # 워커를 종료했거나 기다리는 쪽이 없는 작업 수 (close/join이 기다리지 않도록)
+        self._abandoned = 0
+
+    def _get_pool(self):
+        # 콜드 스타트에 영향을 주지 않도록 첫 추출 시점에 생성 (워커 기동이 느리므로 스레드에서 호출)
+        with self._pool_lock:
+            if self._pool is None:
+                # 로그 리스너 등 스레드가 도는 프로세스를 fork하면 잠긴 락이 워커로 복사될 수 있음
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._started_queue = context.SimpleQueue()
+                self._pool = context.Pool(
+                    processes=self.max_workers, initializer=_init_worker, initargs=(self._started_queue,)
+                )
+                threading.Thread(target=self._watch_started, args=(self._started_queue,), daemon=True).start()
+            return self._pool
+
+    def _watch_started(self, started_queue) -> None:
+        """워커 시작 보고를 해당 작업에 전달 (None이면 종료)"""
+        while True:
+            item = started_queue.get()
+            if item is None:
+                return
+            task_id, pid = item
+            with self._lock:
+                self._running[pid] = task_id
+                task = self._tasks.get(task_id)
+                dropped = task_id in self._dropped
+                self._dropped.discard(task_id)
+                if task is not None and not dropped:
+                    task.mark_started(pid)
+            if dropped:
+                # 시작 보고 직후 종료하면 워커가 보고 큐의 쓰기 락을 쥔 채 죽을 수 있음
+                timer = threading.Timer(self.timeout, self._kill_task, (task_id, pid))
+                timer.daemon = True
+                timer.start()
+
+    async def _wait_started(self, task_id: int, task: _Task) -> bool:
+        """워커가 작업을 집어 들 때까지 대기 - 대기 상한을 넘기면 작업을 버리고 False"""
+        try:
+            await asyncio.wait_for(task.started.wait(), timeout=self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            with self._lock:
+                if task.pid is not None:
+                    # 시간 초과와 동시에 시작됨 - 처리 타임아웃으로 이어서 대기
+                    return True
+                self._dropped.add(task_id)
+                self._abandoned += 1
+            return False
+
+    def _kill_task(self, task_id: int, pid: Optional[int]) -> bool:
+        """작업을 실행 중인 워커 하나만 종료 (워커가 이미 다음 파일로 넘어갔거나 죽어 있었으면 False)
+        풀이 빈자리를 새 워커로 채우고, 결과가 오지 않는 작업으로 집계"""
+        if pid is None:
+            return False
+        with self._lock:
+            if self._running.get(pid) != task_id:
+                return False
+            self._abandoned += 1
+            try:
+                os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+            except (ProcessLookupError, PermissionError):
+                return False
+            self._running.pop(pid, None)
+            return True
+
+    def lookup(self, digest: str, filename: Optional[str] = None) -> Optional[ExtractionResult]:
+        """해시로 캐시된 추출 결과 조회 (클라이언트가 재업로드 없이 해시만 보낸 경우)"""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(digest)
+        if cached is None:
+            return None
+        return replace(cached, filename=filename or cached.filename, cached=True)
+
+    async def extract(self, filename: str, content: bytes) -> ExtractionResult:
+        """파일 하나를 추출 - 실패해도 예외 대신 error가 채워진 결과 반환"""
+        digest = content_hash(content)
+        cached = self.lookup(digest, filename)
+        if cached is not None:
+            return cached
+
+        result = await self._extract_uncached(filename, content)
+        result.content_hash = digest
+        if self.cache is not None:
+            self.cache.put(digest, result)
+        return result
+
+    async def _extract_uncached(self, filename: str, content: bytes) -> ExtractionResult:
+        task_id = next(self._task_ids)
+        task = _Task(asyncio.get_running_loop())
+        with self._lock:
+            self._tasks[task_id] = task
+        try:
+            pool = self._pool or await asyncio.to_thread(self._get_pool)
+            pool.apply_async(
+                _run_in_worker,
+                (task_id, self.parser, filename, content, self.max_pages, self.max_rows),
+                callback=task.set_result,
+                error_callback=task.set_exception,
+            )
+            # 다른 파일 뒤에서 기다린 시간은 처리 타임아웃에 포함하지 않고 별도 상한 적용
+            if not await self._wait_started(task_id, task):
+                return self._fallback(filename, content, f"추출 대기 시간 초과 ({self.queue_timeout:.0f}초)")
+            parsed = await asyncio.wait_for(task.done, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            if self._kill_task(task_id, task.pid):
+                return self._fallback(filename, content, f"추출 시간 초과 ({self.timeout:.0f}초)")
+            return self._fallback(filename, content, "추출 워커가 비정상 종료되었습니다")
+        except ExtractionError as e:
+            return self._fallback(filename, content, str(e))
+        except Exception as e:
+            return self._fallback(filename, content, f"추출 오류: {e}")
+        finally:
+            with self._lock:
+                self._tasks.pop(task_id, None)
+
+        pages = parsed["pages"]
+        return ExtractionResult(
+            filename=filename,
+            format=parsed["format"],
+            text="\n\n".join(page for page in pages if page),
+            pages=pages,
+            tables=parsed["tables"],
+            page_count=parsed["page_count"],
+            truncated=parsed["truncated"],
+        )
+
+    async def extract_many(self, files: List[Dict[str, Any]]) -> List[ExtractionResult]:
+        """여러 파일 동시 추출 ({"name", "content"} 목록)"""
+        return list(await asyncio.gather(*(self.extract(f["name"], f["content"]) for f in files)))
+
+    def _fallback(self, filename: str, content: bytes, error: str) -> ExtractionResult:
+        """바이너리 포맷은 깨진 텍스트를 프롬프트에 넣지 않도록 빈 본문으로 대체"""
+        file_format = detect_format(filename, content)
+        text = decode_text(content) if file_format == "text" else ""
+        return ExtractionResult(filename=filename, format=file_format, text=text, pages=[text] if text else [], error=error)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            if self._abandoned:
+                self._pool.terminate()
+            else:
+                self._pool.close()
+            self._pool.join()
+            self._started_queue.put(None)
+            self._pool = None
+            self._started_queue = None
+            self._abandoned = 0
+            self._running.clear()
+            self._dropped.clear()
@@ -0,0 +1,28 @@
+"""
+추출 결과 모델
+"""
+
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class ExtractionResult:
+    """파일 하나의 추출 결과"""
+    filename: str
+    format: str
+    text: str
+    pages: List[str] = field(default_factory=list)
+    tables: List[Dict[str, Any]] = field(default_factory=list)
+    page_count: Optional[int] = None
+    truncated: bool = False
+    error: Optional[str] = None
+    content_hash: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
@@ -0,0 +1,196 @@
+"""
+포맷별 파서 - PDF / XLSX / DOCX / 텍스트
+multiprocessing.Pool 워커(forkserver/spawn)에서 실행되므로 모든 함수는 모듈 최상위에 두고
+결과는 피클 가능한 dict로 반환합니다. 파서 라이브러리는 선택적 의존성입니다.
+"""
+
+import io
+import os
+from typing import Any, Callable, Dict, List
+
+# 포맷 판별에 쓰는 파일 시그니처
+_PDF_MAGIC = b"%PDF"
+_ZIP_MAGIC = b"PK\x03\x04"
+_OLE_MAGIC = b"\xd0\xcf\x11\xe0"
+
+TEXT_EXTENSIONS = {".txt", ".md", ".csv", ".tsv", ".json"}
+
+
+class ExtractionError(Exception):
+    """추출 실패 (손상된 파일, 미지원 포맷, 파서 미설치)"""
+
+
+def detect_format(filename: str, content: bytes) -> str:
+    """확장자와 시그니처로 포맷 판별"""
+    ext = os.path.splitext(filename or "")[1].lower()
+    head = content[:8]
+
+    if head.startswith(_PDF_MAGIC) or ext == ".pdf":
+        return "pdf"
+    if ext in (".xlsx", ".xlsm"):
+        return "xlsx"
+    if ext == ".docx":
+        return "docx"
+    if ext in (".xls", ".doc") or head.startswith(_OLE_MAGIC):
+        # 구형 OLE 포맷은 전용 파서가 없어 텍스트 휴리스틱으로 처리
+        return "legacy"
+    if head.startswith(_ZIP_MAGIC):
+        # 확장자 없는 OOXML - 내부 경로로 판별
+        if b"word/" in content[:4096]:
+            return "docx"
+        if b"xl/" in content[:4096]:
+            return "xlsx"
+    return "text"
+
+
+def decode_text(content: bytes) -> str:
+    """UTF-8 우선, 실패 시 한국어 레거시 인코딩(CP949) 시도"""
+    for encoding in ("utf-8-sig", "cp949"):
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return content.decode("utf-8", errors="ignore")
+
+
+def _cell_to_str(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _table_to_text(table: List[List[str]]) -> str:
+    return "\n".join(" | ".join(row) for row in table if any(row))
+
+
+def parse_pdf(content: bytes, max_pages: int, max_rows: int) -> Dict[str, Any]:
+    """PDF 페이지 텍스트 추출 (pypdf)"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ExtractionError("PDF 파서(pypdf)가 설치되어 있지 않습니다")
+
+    try:
+        reader = PdfReader(io.BytesIO(content))
+        total_pages = len(reader.pages)
+    except Exception as e:
+        raise ExtractionError(f"PDF 파일을 읽을 수 없습니다: {e}")
+
+    pages = []
+    for index in range(min(total_pages, max_pages)):
+        try:
+            pages.append((reader.pages[index].extract_text() or "").strip())
+        except Exception:
+            pages.append("")
+
+    return {
+        "pages": pages,
+        "tables": [],
+        "page_count": total_pages,
+        "truncated": total_pages > max_pages,
+    }
+
+
+def parse_xlsx(content: bytes, max_pages: int, max_rows: int) -> Dict[str, Any]:
+    """시트별 표 추출 (openpyxl, read_only 스트리밍) - 시트 하나를 한 페이지로 취급"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ExtractionError("XLSX 파서(openpyxl)가 설치되어 있지 않습니다")
+
+    try:
+        workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    except Exception as e:
+        raise ExtractionError(f"XLSX 파일을 읽을 수 없습니다: {e}")
+
+    pages, tables = [], []
+    truncated = len(workbook.worksheets) > max_pages
+    try:
+        for sheet in workbook.worksheets[:max_pages]:
+            rows = []
+            for row in sheet.iter_rows(values_only=True):
+                if len(rows) >= max_rows:
+                    truncated = True
+                    break
+                cells = [_cell_to_str(value) for value in row]
+                if any(cells):
+                    rows.append(cells)
+            tables.append({"name": sheet.title, "rows": rows})
+            pages.append(f"[시트: {sheet.title}]\n{_table_to_text(rows)}")
+        page_count = len(workbook.worksheets)
+    finally:
+        workbook.close()
+
+    return {"pages": pages, "tables": tables, "page_count": page_count, "truncated": truncated}
+
+
+def parse_docx(content: bytes, max_pages: int, max_rows: int) -> Dict[str, Any]:
+    """문단과 표 추출 (python-docx) - DOCX는 페이지 정보가 없어 문단 수로 제한"""
+    try:
+        import docx
+    except ImportError:
+        raise ExtractionError("DOCX 파서(python-docx)가 설치되어 있지 않습니다")
+
+    try:
+        document = docx.Document(io.BytesIO(content))
+    except Exception as e:
+        raise ExtractionError(f"DOCX 파일을 읽을 수 없습니다: {e}")
+
+    # 페이지 제한을 문단 수로 환산 (한 페이지 ≈ 40문단)
+    max_paragraphs = max_pages * 40
+    paragraphs = [p.text.strip() for p in document.paragraphs if p.text.strip()]
+    truncated = len(paragraphs) > max_paragraphs
+
+    tables = []
+    for index, table in enumerate(document.tables):
+        rows = []
+        for row in table.rows:
+            if len(rows) >= max_rows:
+                truncated = True
+                break
+            rows.append([cell.text.strip() for cell in row.cells])
+        tables.append({"name": f"표 {index + 1}", "rows": rows})
+
+    body = "\n".join(paragraphs[:max_paragraphs])
+    table_text = "\n\n".join(f"[{t['name']}]\n{_table_to_text(t['rows'])}" for t in tables if t["rows"])
+    return {
+        "pages": [text for text in (body, table_text) if text],
+        "tables": tables,
+        "page_count": None,
+        "truncated": truncated,
+    }
+
+
+def parse_legacy(content: bytes, max_pages: int, max_rows: int) -> Dict[str, Any]:
+    """구형 .xls/.doc - 바이너리에서 읽을 수 있는 텍스트 조각만 추출"""
+    text = content.decode("utf-16-le", errors="ignore") if content.count(b"\x00") > len(content) // 4 else ""
+    candidates = [segment.strip() for segment in (text or decode_text(content)).split("\x00")]
+    printable = [
+        segment for segment in candidates
+        if len(segment) >= 4 and sum(ch.isprintable() for ch in segment) / len(segment) > 0.9
+    ]
+    return {"pages": ["\n".join(printable)], "tables": [], "page_count": None, "truncated": False}
+
+
+def parse_text(content: bytes, max_pages: int, max_rows: int) -> Dict[str, Any]:
+    """일반 텍스트"""
+    return {"pages": [decode_text(content)], "tables": [], "page_count": None, "truncated": False}
+
+
+PARSERS: Dict[str, Callable[[bytes, int, int], Dict[str, Any]]] = {
+    "pdf": parse_pdf,
+    "xlsx": parse_xlsx,
+    "docx": parse_docx,
+    "legacy": parse_legacy,
+    "text": parse_text,
+}
+
+
+def parse_document(filename: str, content: bytes, max_pages: int, max_rows: int) -> Dict[str, Any]:
+    """워커 프로세스 진입점 - 포맷 판별 후 파싱"""
+    file_format = detect_format(filename, content)
+    parsed = PARSERS[file_format](content, max_pages, max_rows)
+    parsed["format"] = file_format
+    return parsed
@@ -0,0 +1,12 @@
+"""
+재무 지표 계산 모듈
+업로드된 재무제표 표를 NumPy 행렬로 정규화해 성장률, 이익률, Burn Rate, Runway, 손익분기를 계산합니다.
+"""
+
+from .engine import FinancialMetrics, compute_financial_metrics, compute_metrics, growth_rates
+from .tables import FinancialStatement, extract_statement, parse_number, parse_period
+
+__all__ = [
+    'FinancialMetrics', 'FinancialStatement', 'compute_financial_metrics', 'compute_metrics',
+    'extract_statement', 'growth_rates', 'parse_number', 'parse_period'
+]
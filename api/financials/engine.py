@@ -0,0 +1,268 @@
+"""
+재무 지표 엔진 - 성장률/이익률/Burn Rate/Runway/손익분기를 NumPy 벡터 연산으로 계산
+LLM에 수치를 추정시키지 않고, 업로드된 재무제표에서 계산한 값을 프롬프트에 그대로 넘깁니다.
+"""
+
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .tables import METRICS, FinancialStatement, extract_statement
+
+_LABELS = {
+    "revenue": "매출액",
+    "gross_profit": "매출총이익",
+    "operating_income": "영업이익",
+    "net_income": "당기순이익",
+    "cash": "현금성자산",
+    "operating_cash_flow": "영업활동현금흐름",
+}
+_MARGIN_METRICS = ("gross_profit", "operating_income", "net_income")
+
+
+def growth_rates(values: np.ndarray, lag: int, periods: Optional[np.ndarray] = None) -> np.ndarray:
+    """행렬 전체의 lag 기간 성장률. 기준값이 0이면 NaN, 적자 기준은 절댓값으로 나눔
+    periods(기간 단위 정수 서수, 오름차순)가 없으면 열 위치로 비교 (지표 × 기간-lag),
+    있으면 정확히 lag 기간 앞선 열과 비교하고 그 기간이 없으면 NaN (지표 × 기간)"""
+    if periods is None:
+        if values.shape[-1] <= lag:
+            return np.full(values.shape[:-1] + (0,), np.nan)
+        previous, current = values[..., :-lag], values[..., lag:]
+    else:
+        if not len(periods):
+            return np.full(values.shape, np.nan)
+        position = np.minimum(np.searchsorted(periods, periods - lag), len(periods) - 1)
+        previous = values[..., position].copy()
+        previous[..., periods[position] != periods - lag] = np.nan
+        current = values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = (current - previous) / np.abs(previous)
+    rates[~np.isfinite(rates)] = np.nan
+    return rates
+
+
+def ratios(numerators: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """여러 지표를 같은 분모로 나눈 비율 (브로드캐스트). 분모 0/결측은 NaN"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = numerators / denominator
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+
+def last_valid(series: np.ndarray) -> Optional[float]:
+    finite = series[np.isfinite(series)]
+    return float(finite[-1]) if finite.size else None
+
+
+def latest_rate(rates: np.ndarray, values: np.ndarray) -> Optional[float]:
+    """값이 있는 마지막 기간의 성장률 (비교 기간이 없으면 이전 구간으로 대체하지 않고 None)"""
+    finite = np.flatnonzero(np.isfinite(values))
+    if not finite.size or not np.isfinite(rates[finite[-1]]):
+        return None
+    return float(rates[finite[-1]])
+
+
+def _derive(statement: FinancialStatement) -> np.ndarray:
+    """누락 계정 보완 (매출총이익 = 매출 - 매출원가, 영업이익 = 매출총이익 - 판관비)"""
+    values = statement.values.copy()
+    row = {metric: values[i] for i, metric in enumerate(METRICS)}  # 행 뷰 - 수정이 values에 반영
+    for target, computed in (
+        ("gross_profit", lambda: row["revenue"] - row["cogs"]),
+        ("operating_income", lambda: row["gross_profit"] - row["opex"]),
+    ):
+        missing = np.isnan(row[target])
+        row[target][missing] = computed()[missing]
+    return values
+
+
+@dataclass
+class FinancialMetrics:
+    """계산된 재무 지표 (비율은 소수, 금액은 원본 표 단위)"""
+    period_kind: str
+    periods: List[str]
+    unit: Optional[str]
+    series: Dict[str, List[Optional[float]]]
+    growth: Dict[str, Dict[str, Optional[float]]] = field(default_factory=dict)
+    margins: Dict[str, Optional[float]] = field(default_factory=dict)
+    debt_ratio: Optional[float] = None
+    current_ratio: Optional[float] = None
+    monthly_burn: Optional[float] = None
+    runway_months: Optional[float] = None
+    break_even: Dict[str, Any] = field(default_factory=dict)
+    sources: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_display(self) -> Dict[str, str]:
+        """프런트엔드 지표 카드용 문자열 (계산 불가 항목은 제외)"""
+        display = {}
+        revenue_growth = self.growth.get("revenue", {})
+        growth = revenue_growth.get("yoy")
+        if growth is None:
+            growth = revenue_growth.get("qoq")
+        if growth is not None:
+            display["revenue_growth"] = _percent(growth)
+        if self.margins.get("operating_income") is not None:
+            display["profit_margin"] = _percent(self.margins["operating_income"])
+        if self.debt_ratio is not None:
+            display["debt_ratio"] = _percent(self.debt_ratio)
+        if self.monthly_burn:
+            display["burn_rate"] = f"{_amount(self.monthly_burn)}{self.unit or ''}/월"
+        if self.runway_months is not None:
+            display["runway"] = f"{self.runway_months:.1f}개월"
+        if self.break_even.get("reached"):
+            display["break_even"] = "달성"
+        elif self.break_even.get("estimated_period"):
+            display["break_even"] = f"{self.break_even['estimated_period']} 예상"
+        return display
+
+    def to_prompt(self) -> str:
+        """LLM 프롬프트용 요약 - 계산된 수치만 나열"""
+        unit = f" (단위: {self.unit})" if self.unit else ""
+        lines = [f"기간: {', '.join(self.periods)}{unit}"]
+        for metric, values in self.series.items():
+            lines.append(f"- {_LABELS.get(metric, metric)}: " + ", ".join(_amount(v) for v in values))
+        for metric, rates in self.growth.items():
+            parts = [f"{key.upper()} {_percent(rate)}" for key, rate in rates.items() if rate is not None]
+            if parts:
+                lines.append(f"- {_LABELS.get(metric, metric)} 성장률: {', '.join(parts)}")
+        margins = [f"{_LABELS[m]}률 {_percent(r)}" for m, r in self.margins.items() if r is not None]
+        if margins:
+            lines.append(f"- 최근 이익률: {', '.join(margins)}")
+        if self.debt_ratio is not None:
+            lines.append(f"- 부채비율: {_percent(self.debt_ratio)}")
+        if self.current_ratio is not None:
+            lines.append(f"- 유동비율: {_percent(self.current_ratio)}")
+        if self.monthly_burn:
+            lines.append(f"- 월 Burn Rate: {_amount(self.monthly_burn)}")
+        if self.runway_months is not None:
+            lines.append(f"- Runway: {self.runway_months:.1f}개월")
+        if self.break_even.get("reached"):
+            lines.append("- 손익분기: 최근 기간 영업흑자")
+        elif self.break_even.get("estimated_period"):
+            lines.append(
+                f"- 손익분기 예상: {self.break_even['estimated_period']} "
+                f"(약 {self.break_even['months_to_break_even']:.0f}개월 후, 최근 추세 선형 외삽)"
+            )
+        return "\n".join(lines)
+
+
+def _percent(value: float) -> str:
+    return f"{value * 100:.1f}%"
+
+
+def _amount(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    return f"{value:,.0f}" if abs(value) >= 100 else f"{value:,.2f}"
+
+
+def _optional(value: Any) -> Optional[float]:
+    return float(value) if value is not None and np.isfinite(value) else None
+
+
+def _burn_and_runway(statement: FinancialStatement, values: np.ndarray) -> tuple:
+    """월 Burn Rate (현금 감소 → 영업현금흐름 적자 → 영업적자 순) 와 Runway"""
+    row = {metric: values[i] for i, metric in enumerate(METRICS)}
+    months = statement.months_per_period
+    cash_change = np.diff(row["cash"])
+    candidates = [
+        last_valid(cash_change),
+        last_valid(row["operating_cash_flow"]),
+        last_valid(row["operating_income"]),
+    ]
+    burn = next((-value / months for value in candidates if value is not None and value < 0), None)
+    cash = last_valid(row["cash"])
+    runway = cash / burn if burn and cash is not None and cash > 0 else None
+    return burn, runway
+
+
+def _break_even(statement: FinancialStatement, operating_income: np.ndarray) -> Dict[str, Any]:
+    """최근 영업이익 추세(최대 4기간)를 선형 외삽해 손익분기 시점 추정"""
+    mask = np.isfinite(operating_income)
+    if not mask.any():
+        return {}
+    latest = float(operating_income[mask][-1])
+    if latest >= 0:
+        return {"reached": True}
+    x = statement.ordinals[mask][-4:].astype(float) / statement.months_per_period
+    y = operating_income[mask][-4:]
+    if x.size < 2:
+        return {"reached": False}
+    slope, _ = np.polyfit(x, y, 1)
+    if slope <= 0:
+        return {"reached": False, "trend": "악화"}
+    months_to_break_even = float(-latest / slope * statement.months_per_period)
+    target = int(statement.ordinals[mask][-1] + np.ceil(round(months_to_break_even, 6)))
+    year, month = divmod(target, 12)
+    if statement.period_kind == "year":
+        estimated = str(year)
+    elif statement.period_kind == "quarter":
+        estimated = f"{year} Q{month // 3 + 1}"
+    else:
+        estimated = f"{year}-{month + 1:02d}"
+    return {"reached": False, "months_to_break_even": months_to_break_even, "estimated_period": estimated}
+
+
+def compute_metrics(statement: FinancialStatement) -> FinancialMetrics:
+    """재무 행렬 하나에서 전체 지표 계산 - 모든 계정을 한 번의 행렬 연산으로 처리"""
+    values = _derive(statement)
+    index = {metric: i for i, metric in enumerate(METRICS)}
+
+    # 성장률: 연간은 YoY, 분기/월은 YoY + 직전 분기 대비(QoQ) - 열 위치가 아니라 기간 서수로 비교 기간 매칭
+    growth_lags = {"yoy": statement.periods_per_year}
+    if statement.period_kind != "year":
+        growth_lags["qoq"] = 3 // statement.months_per_period
+    periods = statement.ordinals // statement.months_per_period
+    growth_matrices = {key: growth_rates(values, lag, periods) for key, lag in growth_lags.items()}
+
+    margin_rows = [index[m] for m in _MARGIN_METRICS]
+    margin_matrix = ratios(values[margin_rows], values[index["revenue"]])
+    balance = ratios(
+        values[[index["total_liabilities"], index["current_assets"]]],
+        values[[index["total_equity"], index["current_liabilities"]]],
+    )
+
+    growth = {}
+    for metric in ("revenue", "gross_profit", "operating_income", "net_income"):
+        rates = {
+            key: _optional(latest_rate(matrix[index[metric]], values[index[metric]]))
+            for key, matrix in growth_matrices.items()
+        }
+        if any(rate is not None for rate in rates.values()):
+            growth[metric] = rates
+
+    burn, runway = _burn_and_runway(statement, values)
+    return FinancialMetrics(
+        period_kind=statement.period_kind,
+        periods=statement.periods,
+        unit=statement.unit,
+        series={
+            metric: [_optional(v) for v in values[index[metric]]]
+            for metric in _LABELS
+            if np.isfinite(values[index[metric]]).any()
+        },
+        growth=growth,
+        margins={m: _optional(last_valid(margin_matrix[i])) for i, m in enumerate(_MARGIN_METRICS)},
+        debt_ratio=_optional(last_valid(balance[0])),
+        current_ratio=_optional(last_valid(balance[1])),
+        monthly_burn=_optional(burn),
+        runway_months=_optional(runway),
+        break_even=_break_even(statement, values[index["operating_income"]]),
+        sources=statement.sources,
+    )
+
+
+def compute_financial_metrics(documents: Iterable[Dict[str, Any]]) -> Optional[FinancialMetrics]:
+    """추출 결과들({"tables", "pages"})에서 재무 지표 계산. 재무 표가 없으면 None"""
+    tables: List[Dict[str, Any]] = []
+    pages: List[str] = []
+    for document in documents:
+        tables.extend(document.get("tables") or [])
+        if not document.get("tables"):
+            # 표 구조가 없는 PDF/텍스트는 페이지 텍스트에서 행을 복원
+            pages.extend(document.get("pages") or [])
+    statement = extract_statement(tables, pages)
+    return compute_metrics(statement) if statement is not None else None
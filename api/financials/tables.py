@@ -0,0 +1,231 @@
+"""
+재무제표 표 정규화 - 추출된 XLSX 표/PDF 텍스트 행을 (지표 × 기간) 행렬로 변환
+기간 헤더(연도/분기/월)와 계정명 동의어를 인식하고, 괄호·△ 음수와 억/만 단위를 숫자로 바꿉니다.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# 계정명 동의어 (정규화된 라벨 → 표준 지표, 부호)
+_METRIC_SYNONYMS: Dict[str, Tuple[str, int]] = {}
+for _metric, _labels in {
+    "revenue": ["매출액", "매출", "영업수익", "수익(매출액)", "revenue", "revenues", "sales", "totalrevenue", "netsales"],
+    "cogs": ["매출원가", "costofsales", "costofrevenue", "cogs"],
+    "gross_profit": ["매출총이익", "grossprofit", "grossmargin"],
+    "opex": ["판매비와관리비", "판관비", "영업비용", "opex", "operatingexpenses", "sg&a", "sga"],
+    "operating_income": ["영업이익", "영업이익(손실)", "operatingincome", "operatingprofit", "ebit"],
+    "net_income": ["당기순이익", "순이익", "당기순이익(손실)", "netincome", "netprofit", "netloss"],
+    "cash": ["현금및현금성자산", "현금", "기말현금", "기말의현금", "cash", "cashandcashequivalents", "endingcash"],
+    "operating_cash_flow": ["영업활동현금흐름", "영업활동으로인한현금흐름", "operatingcashflow", "cashflowfromoperations"],
+    "total_liabilities": ["부채총계", "부채", "totalliabilities"],
+    "total_equity": ["자본총계", "자본", "totalequity"],
+    "current_assets": ["유동자산", "currentassets"],
+    "current_liabilities": ["유동부채", "currentliabilities"],
+}.items():
+    for _label in _labels:
+        _METRIC_SYNONYMS[_label] = (_metric, 1)
+# 손실로 표기된 계정은 양수 값을 음수로 해석
+for _label, _metric in {"영업손실": "operating_income", "당기순손실": "net_income", "순손실": "net_income"}.items():
+    _METRIC_SYNONYMS[_label] = (_metric, -1)
+
+METRICS: Tuple[str, ...] = tuple(dict.fromkeys(metric for metric, _ in _METRIC_SYNONYMS.values()))
+
+_PERIODS_PER_YEAR = {"year": 1, "quarter": 4, "month": 12}
+
+_QUARTER_PATTERNS = [
+    re.compile(r"(?P<year>(?:19|20)\d{2})\s*[.\-/년]?\s*(?:Q(?P<q1>[1-4])|(?P<q2>[1-4])\s*(?:Q|분기))", re.I),
+    re.compile(r"(?P<q>[1-4])\s*Q\s*'?(?P<year>\d{2}|(?:19|20)\d{2})\b", re.I),
+]
+_MONTH_PATTERN = re.compile(r"(?P<year>(?:19|20)\d{2})\s*[.\-/년]\s*(?P<month>1[0-2]|0?[1-9])\s*월?(?!\d)")
+_YEAR_PATTERN = re.compile(r"^(?:FY\s*)?(?P<year>(?:19|20)\d{2})\s*(?:년|\(?[AEFP]\)?|년도)?$", re.I)
+_NUMBER_PATTERN = re.compile(r"^[(△▲\-−]?\s*[\d,]*\.?\d+\s*\)?")
+_UNIT_MULTIPLIERS = {"조": 1e12, "억": 1e8, "백만": 1e6, "천만": 1e7, "만": 1e4, "천": 1e3}
+_TEXT_NUMBER = re.compile(r"[(△\-−]?[\d][\d,]*(?:\.\d+)?\)?(?:\s*(?:조|억|백만|천만|만|천))?")
+_TEXT_PERIOD = re.compile(
+    r"(?:FY\s*)?(?:19|20)\d{2}"
+    r"(?:\s*(?:[.\-/년]\s*)?(?:Q[1-4]|[1-4]\s*(?:Q|분기))|\s*[.\-/년]\s*(?:1[0-2]|0?[1-9])(?!\d)\s*월?)?"
+    r"(?:\s*\(?[AEF]\)?(?![a-z]))?(?!\d)"
+    r"|[1-4]\s*Q\s*'?(?:(?:19|20)\d{2}|\d{2})(?!\d)",
+    re.I,
+)
+
+
+def parse_period(value: Any) -> Optional[Tuple[str, int, str]]:
+    """기간 라벨 → (종류, 월 단위 서수, 정규화 라벨). 기간이 아니면 None"""
+    text = str(value or "").strip()
+    if not text:
+        return None
+    for pattern in _QUARTER_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            year = int(match.group("year"))
+            year = year + 2000 if year < 100 else year
+            quarter = int(next(q for q in (match.groupdict().get(k) for k in ("q", "q1", "q2")) if q))
+            return "quarter", year * 12 + quarter * 3 - 1, f"{year} Q{quarter}"
+    match = _MONTH_PATTERN.search(text)
+    if match:
+        year, month = int(match.group("year")), int(match.group("month"))
+        return "month", year * 12 + month - 1, f"{year}-{month:02d}"
+    match = _YEAR_PATTERN.match(text)
+    if match:
+        year = int(match.group("year"))
+        return "year", year * 12 + 11, str(year)
+    return None
+
+
+def parse_number(value: Any) -> float:
+    """셀 값 → float. (123)·△123 은 음수, '15억' 은 단위 환산, 숫자가 아니면 NaN"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    text = str(value or "").strip().replace(" ", "")
+    if not text or text in {"-", "–", "—"}:
+        return float("nan")
+    multiplier = 1.0
+    for unit, factor in _UNIT_MULTIPLIERS.items():
+        if unit in text:
+            multiplier = factor
+            text = text.replace(unit, "").replace("원", "")
+            break
+    match = _NUMBER_PATTERN.match(text.rstrip("%"))
+    if not match:
+        return float("nan")
+    token = match.group(0)
+    negative = token[0] in "(△-−"
+    digits = token.strip("()△▲-−").replace(",", "")
+    try:
+        number = float(digits) * multiplier
+    except ValueError:
+        return float("nan")
+    return -number if negative else number
+
+
+def normalize_label(label: Any) -> str:
+    """계정명 정규화 - 번호/로마숫자/공백 제거, 소문자"""
+    text = str(label or "").strip().lower()
+    text = re.sub(r"^(?:[ivx]+|[ⅰ-ⅹⅠ-Ⅹ]|\d{1,2})[.)](?!\d)\s*", "", text)
+    text = re.sub(r"\s+", "", text)
+    return text.strip(".:·")
+
+
+def match_metric(label: Any) -> Optional[Tuple[str, int]]:
+    """계정명 → (표준 지표, 부호). 괄호 주석 제거 후 재시도"""
+    normalized = normalize_label(label)
+    if normalized in _METRIC_SYNONYMS:
+        return _METRIC_SYNONYMS[normalized]
+    stripped = re.sub(r"\(.*?\)|\[.*?\]", "", normalized)
+    return _METRIC_SYNONYMS.get(stripped)
+
+
+@dataclass
+class FinancialStatement:
+    """표준 지표 × 기간 행렬 (값이 없으면 NaN)"""
+    period_kind: str
+    periods: List[str]
+    ordinals: np.ndarray
+    values: np.ndarray
+    unit: Optional[str] = None
+    sources: List[str] = field(default_factory=list)
+
+    @property
+    def periods_per_year(self) -> int:
+        return _PERIODS_PER_YEAR[self.period_kind]
+
+    @property
+    def months_per_period(self) -> int:
+        return 12 // self.periods_per_year
+
+    def row(self, metric: str) -> np.ndarray:
+        return self.values[METRICS.index(metric)]
+
+    def has(self, metric: str) -> bool:
+        return bool(np.isfinite(self.row(metric)).any())
+
+
+def _find_unit(rows: Iterable[List[Any]]) -> Optional[str]:
+    for row in rows:
+        for cell in row:
+            match = re.search(r"단위\s*[:：]?\s*([^\s)]+)", str(cell or ""))
+            if match:
+                return match.group(1)
+    return None
+
+
+def _table_records(rows: List[List[Any]]) -> List[Tuple[str, str, int, str, float]]:
+    """표 하나 → (지표, 기간 종류, 서수, 기간 라벨, 값) 레코드"""
+    records = []
+    header: Optional[Dict[int, Tuple[str, int, str]]] = None
+    for row in rows:
+        label_cells = [cell for cell in row if isinstance(cell, str) and cell.strip()]
+        matched = next((m for m in (match_metric(cell) for cell in label_cells[:2]) if m), None)
+        if matched is None:
+            periods = {i: parsed for i, parsed in ((i, parse_period(cell)) for i, cell in enumerate(row)) if parsed}
+            if len(periods) >= 2:
+                # 새 기간 헤더 - 이후 행은 이 헤더 기준
+                header = periods
+            continue
+        if header is None:
+            continue
+        metric, sign = matched
+        for index, (kind, ordinal, label) in header.items():
+            if index < len(row):
+                value = parse_number(row[index])
+                if np.isfinite(value):
+                    records.append((metric, kind, ordinal, label, sign * value))
+    return records
+
+
+def tables_from_text(text: str) -> List[List[str]]:
+    """PDF 등 텍스트 페이지의 '계정명 숫자 숫자 ...' 행을 표 행으로 복원"""
+    rows = []
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        line = re.sub(r"^(?:[IVXivx]+|[Ⅰ-Ⅹ]|\d{1,2})[.)](?!\d)\s*", "", line)
+        label = _TEXT_NUMBER.split(line, maxsplit=1)[0].strip()
+        numbers = _TEXT_NUMBER.findall(line)
+        if label and len(numbers) >= 2 and match_metric(label):
+            rows.append([label] + numbers)
+            continue
+        periods = _TEXT_PERIOD.findall(line)
+        if len(periods) >= 2:
+            rows.append([""] + [period.strip() for period in periods])
+    return rows
+
+
+def extract_statement(tables: Iterable[Dict[str, Any]] = (), pages: Iterable[str] = ()) -> Optional[FinancialStatement]:
+    """추출 결과의 표와 텍스트 페이지로 재무 행렬 구성. 인식된 지표가 없으면 None"""
+    records, unit, sources = [], None, []
+    for table in tables:
+        rows = table.get("rows") or []
+        table_records = _table_records(rows)
+        if table_records:
+            records.extend(table_records)
+            unit = unit or _find_unit(rows)
+            sources.append(str(table.get("name") or "표"))
+    for number, page in enumerate(pages, start=1):
+        page_records = _table_records(tables_from_text(page))
+        if page_records:
+            records.extend(page_records)
+            unit = unit or _find_unit([[page[:2000]]])
+            sources.append(f"p.{number}")
+    if not records:
+        return None
+
+    # 가장 많이 등장한 기간 종류만 사용 (연간/분기 혼재 시)
+    kind = Counter(record[1] for record in records).most_common(1)[0][0]
+    records = [record for record in records if record[1] == kind]
+    labels = dict(sorted({ordinal: label for _, _, ordinal, label, _ in records}.items()))
+    ordinals = np.fromiter(labels.keys(), dtype=np.int64)
+    position = {ordinal: index for index, ordinal in enumerate(labels)}
+
+    values = np.full((len(METRICS), len(ordinals)), np.nan)
+    for metric, _, ordinal, _, value in records:
+        cell = (METRICS.index(metric), position[ordinal])
+        if np.isnan(values[cell]):  # 먼저 나온 표 우선
+            values[cell] = value
+    return FinancialStatement(kind, list(labels.values()), ordinals, values, unit, sources)
@@ -3,11 +3,67 @@ Impact Story Builder - 핵심 로직
 단순하고 빠른 임팩트 스토리 생성
 """
 
-from typing import Dict, Any, Optional, List
+import re
+from typing import Dict, Any, NamedTuple, Optional, List, Pattern, Sequence, Tuple
 from .templates import StoryTemplates
 from .validator import StoryValidator
 
 
+def _metric_pattern(keyword: str) -> Pattern:
+    """숫자 + 키워드 패턴"""
+    return re.compile(r'(\d+(?:\.\d+)?)\s*' + re.escape(keyword))
+
+
+class _MetricSpec(NamedTuple):
+    type: str
+    icon: str
+    label: str
+    step: str  # 수치를 찾는 입력 단계
+    patterns: Tuple[Tuple[str, Pattern], ...]
+
+
+def _metric_spec(type: str, icon: str, label: str, step: str, keywords: Sequence[str]) -> _MetricSpec:
+    return _MetricSpec(type, icon, label, step, tuple((keyword, _metric_pattern(keyword)) for keyword in keywords))
+
+
+# Reach(도달) / Depth(깊이) / Speed(속도) 지표 - 패턴은 모듈 로드 시 한 번만 컴파일
+_METRIC_SPECS = (
+    _metric_spec("reach", "👥", "대상 규모", "target", ["명", "사람", "개", "곳", "지역", "가구"]),
+    _metric_spec("depth", "📈", "변화 정도", "change", ["%", "배", "점", "등급", "개선", "증가", "감소"]),
+    _metric_spec("speed", "⚡", "목표 기간", "timeframe", ["개월", "년", "주", "일", "분기"]),
+)
+
+# 입력 단계 → 스토리 안에서 그 값을 그대로 보관하는 위치 (섹션, 키)
+STORY_INPUT_PATHS = {
+    "problem": ("problem_context", "problem_statement"),
+    "target": ("problem_context", "affected_group"),
+    "solution": ("solution_approach", "solution_description"),
+    "change": ("expected_impact", "direct_impact"),
+    "measurement": ("measurement_plan", "measurement_method"),
+    "timeframe": ("measurement_plan", "timeline"),
+}
+
+# 파생 필드 → 의존하는 입력 단계 (지표는 항목별)
+FIELD_DEPENDENCIES = {
+    "headline": ("problem", "solution", "target", "change", "timeframe"),
+    **{f"key_metrics.{spec.type}": (spec.step,) for spec in _METRIC_SPECS},
+    "problem_context": ("problem", "target"),
+    "solution_approach": ("solution",),
+    "expected_impact": ("target", "change"),
+    "measurement_plan": ("measurement", "change", "timeframe"),
+    "story_template": ("problem",),
+}
+
+FIELD_BUILDERS = {
+    "headline": "_create_headline",
+    "problem_context": "_format_problem_context",
+    "solution_approach": "_format_solution_approach",
+    "expected_impact": "_format_expected_impact",
+    "measurement_plan": "_format_measurement_plan",
+    "story_template": "_select_story_template",
+}
+
+
 class ImpactStoryBuilder:
     """단순한 임팩트 스토리 생성기 - API 호출 최소화"""
     
@@ -59,50 +115,21 @@ class ImpactStoryBuilder:
     
     def _extract_key_metrics(self, steps: Dict[str, str]) -> List[Dict[str, str]]:
         """핵심 지표 3개 추출"""
-        
-        # 단순 키워드 매칭으로 수치 추출
-        metrics = []
-        
-        # Reach (도달) 지표
-        reach_keywords = ["명", "사람", "개", "곳", "지역", "가구"]
-        reach_metric = self._extract_metric_from_text(steps.get("target", ""), reach_keywords)
-        metrics.append({
-            "type": "reach",
-            "icon": "👥",
-            "label": "대상 규모",
-            "value": reach_metric or "측정 필요"
-        })
-        
-        # Depth (깊이) 지표  
-        depth_keywords = ["%", "배", "점", "등급", "개선", "증가", "감소"]
-        depth_metric = self._extract_metric_from_text(steps.get("change", ""), depth_keywords)
-        metrics.append({
-            "type": "depth", 
-            "icon": "📈",
-            "label": "변화 정도",
-            "value": depth_metric or "측정 필요"
-        })
-        
-        # Speed (속도) 지표
-        speed_keywords = ["개월", "년", "주", "일", "분기"]
-        speed_metric = self._extract_metric_from_text(steps.get("timeframe", ""), speed_keywords)
-        metrics.append({
-            "type": "speed",
-            "icon": "⚡", 
-            "label": "목표 기간",
-            "value": speed_metric or "측정 필요"
-        })
-        
-        return metrics
+        return [self._extract_metric(spec, steps) for spec in _METRIC_SPECS]
     
-    def _extract_metric_from_text(self, text: str, keywords: List[str]) -> Optional[str]:
-        """텍스트에서 수치 추출"""
-        import re
-        
-        for keyword in keywords:
-            # 숫자 + 키워드 패턴 찾기
-            pattern = r'(\d+(?:\.\d+)?)\s*' + re.escape(keyword)
-            match = re.search(pattern, text)
+    def _extract_metric(self, spec: "_MetricSpec", steps: Dict[str, str]) -> Dict[str, str]:
+        """지표 하나 추출 - 입력 단계 텍스트에서 숫자 + 키워드 (키워드 순서가 우선순위)"""
+        return {
+            "type": spec.type,
+            "icon": spec.icon,
+            "label": spec.label,
+            "value": self._extract_metric_from_text(steps.get(spec.step, ""), spec.patterns) or "측정 필요"
+        }
+    
+    def _extract_metric_from_text(self, text: str, patterns: Sequence[Tuple[str, Pattern]]) -> Optional[str]:
+        """텍스트에서 수치 추출 (미리 컴파일한 숫자 + 키워드 패턴)"""
+        for keyword, pattern in patterns:
+            match = pattern.search(text)
             if match:
                 return f"{match.group(1)}{keyword}"
         
@@ -141,17 +168,8 @@ class ImpactStoryBuilder:
         }
     
     def _select_story_template(self, steps: Dict[str, str]) -> str:
-        """적절한 스토리 템플릿 선택"""
-        problem_text = steps.get("problem", "").lower()
-        
-        if any(keyword in problem_text for keyword in ["교육", "학습", "역량"]):
-            return "education"
-        elif any(keyword in problem_text for keyword in ["건강", "의료", "치료"]):
-            return "healthcare"  
-        elif any(keyword in problem_text for keyword in ["환경", "기후", "지속가능"]):
-            return "environment"
-        else:
-            return "general"
+        """적절한 스토리 템플릿 선택 (키워드 색인 조회)"""
+        return self.templates.registry.story_index.lookup(steps.get("problem", ""))
     
     def _generate_improvement_suggestions(self, steps: Dict[str, str]) -> List[str]:
         """개선 제안 생성"""
@@ -176,21 +194,48 @@ class ImpactStoryBuilder:
         return datetime.now().isoformat()
     
     def update_story_component(self, story_data: Dict[str, Any], component: str, new_value: str) -> Dict[str, Any]:
-        """실시간 스토리 컴포넌트 업데이트"""
+        """실시간 스토리 컴포넌트 업데이트 (해당 입력에 의존하는 파생 필드만 다시 계산)"""
+        return self.apply_story_patch(story_data, {component: new_value})
+    
+    def apply_story_patch(self, story_data: Dict[str, Any], patch: Dict[str, str]) -> Dict[str, Any]:
+        """여러 컴포넌트 편집을 한 번에 반영 - 영향받는 파생 필드를 모아 각각 한 번만 다시 계산
+        headline을 직접 지정하면 입력 변경으로 다시 만든 헤드라인보다 우선합니다."""
         
-        if component == "headline":
-            story_data["headline"] = new_value
-        elif component in ["problem", "solution", "target", "change", "timeframe"]:
-            # 헤드라인 재생성
-            steps = {
-                "problem": story_data.get("problem_context", {}).get("problem_statement", ""),
-                "solution": story_data.get("solution_approach", {}).get("solution_description", ""),
-                "target": story_data.get("problem_context", {}).get("affected_group", ""),
-                "change": story_data.get("expected_impact", {}).get("direct_impact", ""),
-                "timeframe": story_data.get("measurement_plan", {}).get("timeline", "")
-            }
-            steps[component] = new_value
-            story_data["headline"] = self._create_headline(steps)
-            story_data["key_metrics"] = self._extract_key_metrics(steps)
+        edits = {component: value for component, value in patch.items() if component in STORY_INPUT_PATHS}
+        if edits:
+            steps = self._steps_from_story(story_data)
+            steps.update(edits)
+            for field in self.affected_fields(edits):
+                self._recompute_field(story_data, field, steps)
+        
+        if "headline" in patch:
+            story_data["headline"] = patch["headline"]
         
-        return story_data
\ No newline at end of file
+        return story_data
+    
+    def affected_fields(self, components) -> List[str]:
+        """입력 컴포넌트 변경 시 다시 계산할 파생 필드 (FIELD_DEPENDENCIES 순서)"""
+        components = set(components)
+        return [field for field, deps in FIELD_DEPENDENCIES.items() if components.intersection(deps)]
+    
+    def _steps_from_story(self, story_data: Dict[str, Any]) -> Dict[str, str]:
+        """스토리에 보관된 원본 입력값 (파생 필드 안의 입력 그대로인 필드)"""
+        steps = {}
+        for step, (section, key) in STORY_INPUT_PATHS.items():
+            value = story_data.get(section)
+            steps[step] = value.get(key, "") if isinstance(value, dict) else ""
+        return steps
+    
+    def _recompute_field(self, story_data: Dict[str, Any], field: str, steps: Dict[str, str]) -> None:
+        if field.startswith("key_metrics."):
+            metric_type = field.split(".", 1)[1]
+            spec = next(spec for spec in _METRIC_SPECS if spec.type == metric_type)
+            metrics = story_data.get("key_metrics")
+            index = next((i for i, m in enumerate(metrics or []) if isinstance(m, dict) and m.get("type") == metric_type), None)
+            if index is None:
+                # 지표 목록이 없거나 일부만 있으면 전체를 새로 구성
+                story_data["key_metrics"] = self._extract_key_metrics(steps)
+            else:
+                metrics[index] = self._extract_metric(spec, steps)
+            return
+        story_data[field] = getattr(self, FIELD_BUILDERS[field])(steps)
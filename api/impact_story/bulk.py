@@ -0,0 +1,184 @@
+"""
+임팩트 스토리 일괄 생성 - 액셀러레이터 프로그램의 5단계 제출물(수백 건)을 CSV/NDJSON으로 받아 스토리 NDJSON으로 변환
+입력은 한 줄씩 읽고 결과는 완성되는 대로 한 줄씩 내보내므로, 제출물 수와 관계없이 메모리 사용량이 일정합니다.
+
+- 검증/템플릿 스토리는 즉시 생성 (API 호출 없음)
+- AI 고도화(선택)는 동시 호출 상한 안에서만 진행하며, 실패하면 템플릿 스토리를 그대로 사용
+- AI 고도화 시 결과는 완료 순서대로 나오므로 각 줄의 index(입력 순서)로 대응
+
+사용법:
+    python -m api.impact_story.bulk submissions.csv [--out stories.ndjson] [--ai] [--concurrency 4] [--mode one_shot]
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+import sys
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional
+
+from .builder import ImpactStoryBuilder
+
+STEP_FIELDS = ("problem", "target", "solution", "change", "measurement", "timeframe")
+# EnhancedImpactStoryBuilder.MODES (genai 로드 없이 입력 검증)
+STORY_MODES = ("multi_step", "one_shot")
+
+
+def read_submissions(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """CSV(헤더 행 필요) 또는 NDJSON 줄 → 제출물 dict
+    첫 번째 비어 있지 않은 줄이 '{'로 시작하면 NDJSON. 파싱할 수 없는 줄은 _error 항목으로 전달합니다."""
+    lines = iter(lines)
+    first = next((line for line in lines if line.strip()), None)
+    if first is None:
+        return
+    first = first.lstrip("\ufeff")
+    if first.lstrip().startswith("{"):
+        for line in itertools.chain([first], lines):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield {"_error": f"JSON 파싱 실패: {e}"}
+                continue
+            yield record if isinstance(record, dict) else {"_error": "JSON 객체가 아닙니다"}
+    else:
+        for row in csv.DictReader(itertools.chain([first], lines)):
+            yield {key.strip(): (value or "").strip() for key, value in row.items() if key}
+
+
+def normalize_submission(raw: Dict[str, Any]) -> Dict[str, str]:
+    """5단계 필드만 문자열로 (없으면 빈 문자열)"""
+    return {field: str(raw.get(field) or "").strip() for field in STEP_FIELDS}
+
+
+class BulkStoryGenerator:
+    """제출물 스트림 → 스토리 결과 스트림"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        mode: Optional[str] = None,
+        builder: Optional[ImpactStoryBuilder] = None,
+        enhanced_builder: Any = None,
+    ):
+        if mode and mode not in STORY_MODES:
+            raise ValueError(f"지원하지 않는 생성 모드: {mode} ({', '.join(STORY_MODES)})")
+        self.concurrency = concurrency or int(os.getenv("BULK_STORY_CONCURRENCY", "4"))
+        self.mode = mode
+        self.builder = builder or ImpactStoryBuilder()
+        self.enhanced_builder = enhanced_builder
+        if self.enhanced_builder is None and api_key:
+            # genai 의존 모듈은 AI 고도화를 요청할 때만 로드
+            from .enhanced_builder import EnhancedImpactStoryBuilder
+            self.enhanced_builder = EnhancedImpactStoryBuilder(api_key)
+        self.counts = {"total": 0, "ok": 0, "invalid": 0, "enhanced": 0, "enhance_failed": 0}
+        self.peak_in_flight = 0
+
+    def build(self, index: int, raw: Dict[str, Any]) -> Dict[str, Any]:
+        """검증 + 템플릿 스토리 (동기, 즉시)"""
+        self.counts["total"] += 1
+        record: Dict[str, Any] = {"index": index, "id": raw.get("id")}
+        if "_error" in raw:
+            self.counts["invalid"] += 1
+            return {**record, "status": "invalid", "errors": [raw["_error"]]}
+        result = self.builder.build_story_from_steps(normalize_submission(raw))
+        if not result["success"]:
+            self.counts["invalid"] += 1
+            return {**record, "status": "invalid", "errors": result["error"]}
+        self.counts["ok"] += 1
+        return {**record, "status": "ok", "story": result["story"], "suggestions": result["suggestions"]}
+
+    async def _enhance(self, record: Dict[str, Any], steps: Dict[str, str]) -> Dict[str, Any]:
+        """AI 고도화 - 실패하거나 템플릿으로 대체되면 템플릿 스토리 유지"""
+        try:
+            result = await self.enhanced_builder.build_enhanced_story(steps, mode=self.mode)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        method = result.get("generation_method", "")
+        if result.get("success") and method.startswith("ai"):
+            self.counts["enhanced"] += 1
+            return {**record, "story": result["story"], "enhanced": method}
+        self.counts["enhance_failed"] += 1
+        return {**record, "enhanced": None, "enhance_error": result.get("error") or "template_fallback"}
+
+    async def run(self, submissions: Iterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """입력 순서대로 읽고, AI 고도화 중인 작업은 concurrency개까지만 유지하면서 완성된 결과부터 산출"""
+        pending = set()
+        try:
+            for index, raw in enumerate(submissions):
+                record = self.build(index, raw)
+                if self.enhanced_builder is None or record["status"] != "ok":
+                    yield record
+                    continue
+                pending.add(asyncio.ensure_future(self._enhance(record, normalize_submission(raw))))
+                self.peak_in_flight = max(self.peak_in_flight, len(pending))
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counts,
+            "concurrency": self.concurrency,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+async def write_ndjson(records: AsyncIterator[Dict[str, Any]], out) -> int:
+    """결과를 한 줄씩 기록하고 바로 flush"""
+    written = 0
+    async for record in records:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        written += 1
+    return written
+
+
+async def _main(args: argparse.Namespace) -> int:
+    api_key = None
+    if args.ai:
+        api_key = args.api_key or os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            print("--ai에는 GEMINI_API_KEY 또는 --api-key가 필요합니다", file=sys.stderr)
+            return 2
+    generator = BulkStoryGenerator(api_key, args.concurrency, args.mode)
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8-sig", newline="")
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        await write_ndjson(generator.run(read_submissions(source)), out)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    print(json.dumps(generator.stats(), ensure_ascii=False), file=sys.stderr)
+    return 0 if generator.counts["invalid"] == 0 else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk impact story generation")
+    parser.add_argument("input", help="제출물 CSV(헤더: problem,target,solution,change,measurement,timeframe[,id]) 또는 NDJSON, - 는 표준 입력")
+    parser.add_argument("--out", default="-", help="결과 NDJSON (기본: 표준 출력)")
+    parser.add_argument("--ai", action="store_true", help="AI 고도화 (GEMINI_API_KEY 필요)")
+    parser.add_argument("--concurrency", type=int, default=None, help="동시 AI 고도화 수")
+    parser.add_argument("--mode", choices=STORY_MODES, default=None, help="AI 생성 모드")
+    parser.add_argument("--api-key", default=None)
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,16 @@ Enhanced Impact Story Builder - 기존 agents 프롬프트 통합
 고도화된 AI 프롬프트를 활용한 더 정교한 스토리 생성
 """
 
-import google.generativeai as genai
+import asyncio
+import os
+
 from typing import Dict, Any, Optional, List
+from ..checkpoints import CheckpointStore, checkpoint_store
+from ..projections import ProjectionSpec, project
+from ..prompt_budget import estimate_tokens
+from ..routing import LATENCY_BUDGETS_MS, model_router, routing_context
+from ..structured import ResultModel, structured_generator
+from .builder import ImpactStoryBuilder
 from .templates import StoryTemplates
 from .validator import StoryValidator
 
@@ -12,19 +20,199 @@ from .validator import StoryValidator
 class EnhancedImpactStoryBuilder:
     """기존 agents 프롬프트를 통합한 고도화된 스토리 빌더"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    # 단계별 입력 투영 - 각 프롬프트가 실제로 보간하는 선행 결과 경로만 전달
+    PROJECTIONS: Dict[str, ProjectionSpec] = {
+        "user_insights": {
+            "context": (("market_context", "market_size"),),
+        },
+        "strategy": {
+            "context": (),
+            "user_insights": (("key_insights", "primary_needs"),),
+        },
+        "story": {
+            "context": (("market_context", "key_opportunities"),),
+            "user_insights": (("key_insights", "primary_needs"),),
+            "strategy": (("impact_logic", "core_hypothesis"),),
+        },
+    }
+    
+    # 최종 스토리 JSON 구조 (단계별 생성의 마지막 단계와 한 번에 생성 모드가 같은 스키마 사용)
+    STORY_JSON_EXAMPLE = """{
+  "headline": "임팩트를 한 문장으로 표현한 강력한 헤드라인",
+  "story_elements": {
+    "problem_narrative": {
+      "hook": "문제를 생생하게 보여주는 훅",
+      "context": "문제의 배경과 맥락",
+      "urgency": "해결의 시급성"
+    },
+    "solution_story": {
+      "uniqueness": "솔루션의 독특한 점",
+      "approach": "접근 방식의 혁신성",
+      "effectiveness": "효과성 예상"
+    },
+    "impact_promise": {
+      "immediate_impact": "즉시 나타날 변화",
+      "long_term_vision": "장기적 비전",
+      "ripple_effect": "파급 효과"
+    }
+  },
+  "key_metrics": [
+    {
+      "type": "reach",
+      "icon": "👥",
+      "label": "도달 규모",
+      "value": "추출된 숫자 또는 목표",
+      "description": "설명"
+    },
+    {
+      "type": "depth",
+      "icon": "📈", 
+      "label": "변화 정도",
+      "value": "개선 정도 수치",
+      "description": "설명"
+    },
+    {
+      "type": "speed",
+      "icon": "⚡",
+      "label": "달성 기간",
+      "value": "시간 단위",
+      "description": "설명"
+    }
+  ],
+  "supporting_details": {
+    "problem_context": {
+      "current_situation": "현재 상황 요약",
+      "affected_group": "영향받는 그룹",  
+      "root_causes": ["근본 원인들"]
+    },
+    "solution_approach": {
+      "methodology": "방법론",
+      "innovation": "혁신 요소",
+      "scalability": "확장 가능성"
+    },
+    "expected_impact": {
+      "direct_beneficiaries": "직접 수혜자",
+      "indirect_effects": "간접 효과",
+      "social_value": "사회적 가치"
+    },
+    "measurement_plan": {
+      "success_criteria": "성공 기준",
+      "tracking_method": "추적 방법",
+      "evaluation_timeline": "평가 일정"
+    }
+  },
+  "call_to_action": {
+    "primary_message": "주요 행동 촉구",
+    "target_audience": "대상 청중",
+    "next_steps": ["다음 단계들"]
+  }
+}"""
+    
+    # 한 번에 생성 모드 - 단계별 생성에서 스토리 프롬프트가 쓰던 분석 필드와 스토리를 함께 생성
+    ONE_SHOT_JSON_EXAMPLE = """{
+  "analysis": {
+    "key_opportunities": ["시장 기회 1", "시장 기회 2"],
+    "primary_needs": ["대상의 핵심 니즈 1", "대상의 핵심 니즈 2"],
+    "core_hypothesis": "솔루션이 변화를 만드는 핵심 가설"
+  },
+  "story": {
+    "headline": "임팩트를 한 문장으로 표현한 강력한 헤드라인",
+    "story_elements": {
+      "problem_narrative": {
+        "hook": "문제를 생생하게 보여주는 훅",
+        "context": "문제의 배경과 맥락",
+        "urgency": "해결의 시급성"
+      },
+      "solution_story": {
+        "uniqueness": "솔루션의 독특한 점",
+        "approach": "접근 방식의 혁신성",
+        "effectiveness": "효과성 예상"
+      },
+      "impact_promise": {
+        "immediate_impact": "즉시 나타날 변화",
+        "long_term_vision": "장기적 비전",
+        "ripple_effect": "파급 효과"
+      }
+    },
+    "key_metrics": [
+      {
+        "type": "reach",
+        "icon": "👥",
+        "label": "도달 규모",
+        "value": "추출된 숫자 또는 목표",
+        "description": "설명"
+      },
+      {
+        "type": "depth",
+        "icon": "📈", 
+        "label": "변화 정도",
+        "value": "개선 정도 수치",
+        "description": "설명"
+      },
+      {
+        "type": "speed",
+        "icon": "⚡",
+        "label": "달성 기간",
+        "value": "시간 단위",
+        "description": "설명"
+      }
+    ],
+    "supporting_details": {
+      "problem_context": {
+        "current_situation": "현재 상황 요약",
+        "affected_group": "영향받는 그룹",  
+        "root_causes": ["근본 원인들"]
+      },
+      "solution_approach": {
+        "methodology": "방법론",
+        "innovation": "혁신 요소",
+        "scalability": "확장 가능성"
+      },
+      "expected_impact": {
+        "direct_beneficiaries": "직접 수혜자",
+        "indirect_effects": "간접 효과",
+        "social_value": "사회적 가치"
+      },
+      "measurement_plan": {
+        "success_criteria": "성공 기준",
+        "tracking_method": "추적 방법",
+        "evaluation_timeline": "평가 일정"
+      }
+    },
+    "call_to_action": {
+      "primary_message": "주요 행동 촉구",
+      "target_audience": "대상 청중",
+      "next_steps": ["다음 단계들"]
+    }
+  }
+}"""
+    
+    # 생성 모드: 단계별(4회 호출) / 한 번에(1회 호출)
+    MODES = ("multi_step", "one_shot")
+    DEFAULT_MODE = os.getenv("IMPACT_STORY_MODE", "multi_step")
+    
+    def __init__(self, api_key: Optional[str] = None, checkpoints: Optional[CheckpointStore] = None):
         self.templates = StoryTemplates()
         self.validator = StoryValidator()
+        self.template_builder = ImpactStoryBuilder()
         self.api_key = api_key
+        self.checkpoints = checkpoints or checkpoint_store
         
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        else:
-            self.model = None
+        # 실제 호출 모델은 단계별로 model_router가 선택하고 이 키에 묶인 클라이언트로 호출 (전역 genai 설정 없음)
+        self.ai_enabled = bool(api_key)
     
-    async def build_enhanced_story(self, steps: Dict[str, str], use_ai: bool = True) -> Dict[str, Any]:
-        """AI 프롬프트를 활용한 고도화된 스토리 생성"""
+    async def build_enhanced_story(
+        self, steps: Dict[str, str], use_ai: bool = True, mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """AI 프롬프트를 활용한 고도화된 스토리 생성 (mode: multi_step 또는 one_shot, 기본값 IMPACT_STORY_MODE)"""
+        
+        mode = mode or self.DEFAULT_MODE
+        if mode not in self.MODES:
+            return {
+                "success": False,
+                "error": [f"지원하지 않는 생성 모드: {mode} ({', '.join(self.MODES)})"],
+                "story": None
+            }
         
         # 입력 검증
         validation_result = self.validator.validate_steps(steps)
@@ -35,8 +223,10 @@ class EnhancedImpactStoryBuilder:
                 "story": None
             }
         
-        if use_ai and self.model:
+        if use_ai and self.ai_enabled:
             # AI 기반 고도화된 생성
+            if mode == "one_shot":
+                return await self._generate_one_shot_story(steps)
             return await self._generate_ai_enhanced_story(steps)
         else:
             # 기본 템플릿 기반 생성 (fallback)
@@ -45,32 +235,116 @@ class EnhancedImpactStoryBuilder:
     async def _generate_ai_enhanced_story(self, steps: Dict[str, str]) -> Dict[str, Any]:
         """AI를 활용한 고도화된 스토리 생성"""
         
-        try:
-            # 1. Context Analysis (기존 ContextAnalyzer 프롬프트 활용)
-            context_analysis = await self._analyze_context_with_ai(steps)
-            
-            # 2. User Insight Analysis (기존 UserInsightAgent 프롬프트 활용)  
-            user_insights = await self._analyze_user_insights_with_ai(steps, context_analysis)
-            
-            # 3. Strategy Design (기존 StrategyDesigner 프롬프트 활용)
-            strategy_design = await self._design_strategy_with_ai(steps, context_analysis, user_insights)
-            
-            # 4. Storytelling (기존 Storyteller 프롬프트 활용)
-            story_visualization = await self._create_story_with_ai(steps, context_analysis, user_insights, strategy_design)
-            
-            return {
-                "success": True,
-                "story": story_visualization,
-                "context_analysis": context_analysis,
-                "user_insights": user_insights,
-                "strategy_design": strategy_design,
-                "generation_method": "ai_enhanced"
-            }
-            
-        except Exception as e:
-            print(f"AI 스토리 생성 오류: {str(e)}")
-            # AI 실패시 기본 템플릿으로 fallback
-            return self._generate_template_story(steps)
+        # 이전 시도에서 완료된 단계는 체크포인트에서 이어받음 (앞 단계 Gemini 호출 생략)
+        checkpoint = self.checkpoints.open("impact_story", steps)
+        complete = True
+        
+        async def stage(name: str, run) -> Dict[str, Any]:
+            nonlocal complete
+            output = checkpoint.get(name)
+            if output is not None:
+                return output
+            output = await run()
+            if output == self._get_fallback_data(name):
+                # 기본값으로 대체된 단계와 그 후속 단계는 기록하지 않아 재시도 시 다시 생성
+                complete = False
+            elif complete:
+                checkpoint.save(name, output)
+            return output
+        
+        # 4단계 전체의 지연 예산 안에서 단계별 모델 선택
+        with routing_context(LATENCY_BUDGETS_MS["story"]) as routing:
+            try:
+                # 1. Context Analysis (기존 ContextAnalyzer 프롬프트 활용)
+                context_analysis = await stage("context_analysis", lambda: self._analyze_context_with_ai(steps))
+                
+                # 2. User Insight Analysis (기존 UserInsightAgent 프롬프트 활용)  
+                view = project(self.PROJECTIONS["user_insights"], {"context": context_analysis})
+                user_insights = await stage(
+                    "user_insights", lambda: self._analyze_user_insights_with_ai(steps, view["context"])
+                )
+                
+                # 3. Strategy Design (기존 StrategyDesigner 프롬프트 활용)
+                view = project(self.PROJECTIONS["strategy"], {"context": context_analysis, "user_insights": user_insights})
+                strategy_design = await stage(
+                    "strategy_design",
+                    lambda: self._design_strategy_with_ai(steps, view["context"], view["user_insights"]),
+                )
+                
+                # 4. Storytelling (기존 Storyteller 프롬프트 활용)
+                view = project(
+                    self.PROJECTIONS["story"],
+                    {"context": context_analysis, "user_insights": user_insights, "strategy": strategy_design},
+                )
+                story_visualization = await stage(
+                    "story_visualization",
+                    lambda: self._create_story_with_ai(steps, view["context"], view["user_insights"], view["strategy"]),
+                )
+                
+                # 모든 단계가 실제로 생성됐으면 체크포인트 정리
+                if complete:
+                    checkpoint.clear()
+                
+                return {
+                    "success": True,
+                    "story": story_visualization,
+                    "context_analysis": context_analysis,
+                    "user_insights": user_insights,
+                    "strategy_design": strategy_design,
+                    "generation_method": "ai_enhanced",
+                    "model_routing": routing.records,
+                    "resumed_stages": checkpoint.resumed
+                }
+                
+            except Exception as e:
+                print(f"AI 스토리 생성 오류: {str(e)}")
+                # AI 실패시 기본 템플릿으로 fallback (완료된 단계는 체크포인트에 남아 재시도 시 이어받음)
+                return self._generate_template_story(steps)
+    
+    async def _generate_one_shot_story(self, steps: Dict[str, str]) -> Dict[str, Any]:
+        """한 번의 구조화 생성으로 분석 요약과 스토리를 함께 생성 (단계별 생성과 같은 story 스키마)"""
+        
+        prompt = f"""
+당신은 **Impact Story Specialist**입니다. 현황 분석, 사용자 인사이트, 전략 설계, 스토리텔링을 한 번에 수행하여 임팩트 스토리를 완성합니다.
+
+## 임팩트 프로젝트 입력
+- 문제: {steps.get('problem', '')}
+- 대상: {steps.get('target', '')}
+- 솔루션: {steps.get('solution', '')}
+- 변화: {steps.get('change', '')}
+- 측정: {steps.get('measurement', '')}
+
+## 작성 순서
+1. **analysis**: 먼저 해당 문제 영역의 시장 기회, 대상의 핵심 니즈, 솔루션의 핵심 가설을 간결하게 도출
+2. **story**: 도출한 분석을 근거로 헤드라인, 문제/솔루션 내러티브, 임팩트 약속, 핵심 지표, 세부 근거, 행동 촉구를 작성
+
+## JSON 구조로 반환:
+```json
+{self.ONE_SHOT_JSON_EXAMPLE}
+```
+
+설득력 있고 감동적인 임팩트 스토리를 완성해주세요.
+JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
+"""
+        
+        with routing_context(LATENCY_BUDGETS_MS["story"]) as routing:
+            try:
+                result = await asyncio.to_thread(self._generate_structured, prompt, "one_shot")
+            except Exception as e:
+                print(f"One-shot 스토리 생성 오류: {str(e)}")
+                return self._generate_template_story(steps)
+        
+        analysis = result.get("analysis", {})
+        # 단계별 생성 결과와 같은 키 구조 (스토리 프롬프트가 쓰는 투영 필드만 채움)
+        return {
+            "success": True,
+            "story": result.get("story", self._get_fallback_data("story_visualization")),
+            "context_analysis": {"market_context": {"key_opportunities": analysis.get("key_opportunities", [])}},
+            "user_insights": {"key_insights": {"primary_needs": analysis.get("primary_needs", [])}},
+            "strategy_design": {"impact_logic": {"core_hypothesis": analysis.get("core_hypothesis", "")}},
+            "generation_method": "ai_one_shot",
+            "model_routing": routing.records
+        }
     
     async def _analyze_context_with_ai(self, steps: Dict[str, str]) -> Dict[str, Any]:
         """기존 ContextAnalyzer 프롬프트를 활용한 현황 분석"""
@@ -127,8 +401,7 @@ JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
 """
         
         try:
-            response = self.model.generate_content(prompt)
-            return self._parse_json_response(response.text, "context_analysis")
+            return await asyncio.to_thread(self._generate_structured, prompt, "context_analysis")
         except Exception as e:
             print(f"Context analysis AI 오류: {str(e)}")
             return self._get_default_context_analysis(steps)
@@ -194,8 +467,7 @@ JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
 """
         
         try:
-            response = self.model.generate_content(prompt)
-            return self._parse_json_response(response.text, "user_insights")
+            return await asyncio.to_thread(self._generate_structured, prompt, "user_insights")
         except Exception as e:
             print(f"User insights AI 오류: {str(e)}")
             return self._get_default_user_insights(steps)
@@ -273,8 +545,7 @@ JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
 """
         
         try:
-            response = self.model.generate_content(prompt)
-            return self._parse_json_response(response.text, "strategy_design")
+            return await asyncio.to_thread(self._generate_structured, prompt, "strategy_design")
         except Exception as e:
             print(f"Strategy design AI 오류: {str(e)}")
             return self._get_default_strategy_design(steps)
@@ -309,76 +580,7 @@ JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
 
 ## 완성된 임팩트 스토리 JSON 구조로 반환:
 ```json
-{{
-  "headline": "임팩트를 한 문장으로 표현한 강력한 헤드라인",
-  "story_elements": {{
-    "problem_narrative": {{
-      "hook": "문제를 생생하게 보여주는 훅",
-      "context": "문제의 배경과 맥락",
-      "urgency": "해결의 시급성"
-    }},
-    "solution_story": {{
-      "uniqueness": "솔루션의 독특한 점",
-      "approach": "접근 방식의 혁신성",
-      "effectiveness": "효과성 예상"
-    }},
-    "impact_promise": {{
-      "immediate_impact": "즉시 나타날 변화",
-      "long_term_vision": "장기적 비전",
-      "ripple_effect": "파급 효과"
-    }}
-  }},
-  "key_metrics": [
-    {{
-      "type": "reach",
-      "icon": "👥",
-      "label": "도달 규모",
-      "value": "추출된 숫자 또는 목표",
-      "description": "설명"
-    }},
-    {{
-      "type": "depth",
-      "icon": "📈", 
-      "label": "변화 정도",
-      "value": "개선 정도 수치",
-      "description": "설명"
-    }},
-    {{
-      "type": "speed",
-      "icon": "⚡",
-      "label": "달성 기간",
-      "value": "시간 단위",
-      "description": "설명"
-    }}
-  ],
-  "supporting_details": {{
-    "problem_context": {{
-      "current_situation": "현재 상황 요약",
-      "affected_group": "영향받는 그룹",  
-      "root_causes": ["근본 원인들"]
-    }},
-    "solution_approach": {{
-      "methodology": "방법론",
-      "innovation": "혁신 요소",
-      "scalability": "확장 가능성"
-    }},
-    "expected_impact": {{
-      "direct_beneficiaries": "직접 수혜자",
-      "indirect_effects": "간접 효과",
-      "social_value": "사회적 가치"
-    }},
-    "measurement_plan": {{
-      "success_criteria": "성공 기준",
-      "tracking_method": "추적 방법",
-      "evaluation_timeline": "평가 일정"
-    }}
-  }},
-  "call_to_action": {{
-    "primary_message": "주요 행동 촉구",
-    "target_audience": "대상 청중",
-    "next_steps": ["다음 단계들"]
-  }}
-}}
+{self.STORY_JSON_EXAMPLE}
 ```
 
 설득력 있고 감동적인 임팩트 스토리를 완성해주세요.
@@ -386,40 +588,25 @@ JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
 """
         
         try:
-            response = self.model.generate_content(prompt)
-            return self._parse_json_response(response.text, "story_visualization")
+            return await asyncio.to_thread(self._generate_structured, prompt, "story_visualization")
         except Exception as e:
             print(f"Story creation AI 오류: {str(e)}")
             return self._get_default_story_visualization(steps)
     
-    def _parse_json_response(self, response_text: str, analysis_type: str) -> Dict[str, Any]:
-        """AI 응답에서 JSON 파싱"""
-        try:
-            import json
-            
-            # JSON 블록 추출
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                parsed_data = json.loads(json_str)
-                return parsed_data
-            else:
-                raise ValueError("JSON 블록을 찾을 수 없음")
-                
-        except Exception as e:
-            print(f"{analysis_type} JSON 파싱 오류: {str(e)}")
-            return self._get_fallback_data(analysis_type)
+    def _generate_structured(self, prompt: str, analysis_type: str) -> Dict[str, Any]:
+        """프롬프트의 JSON 예시를 스키마로 제약 생성 (검증 실패 필드만 다시 요청, 그래도 실패하면 기본값)"""
+        result_model = ResultModel.from_prompt(
+            f"story_{analysis_type}", prompt, self._get_fallback_data(analysis_type)
+        )
+        decision = model_router.choose(f"story.{analysis_type}", estimate_tokens(prompt))
+        with model_router.track(decision):
+            return structured_generator.generate(model_router.model(decision.model, self.api_key), prompt, result_model)
     
     def _generate_template_story(self, steps: Dict[str, str]) -> Dict[str, Any]:
         """기본 템플릿 기반 스토리 생성 (AI 없이)"""
         
         # 기존 builder.py의 로직 활용
-        from .builder import ImpactStoryBuilder
-        basic_builder = ImpactStoryBuilder()
-        
-        return basic_builder.build_story_from_steps(steps)
+        return self.template_builder.build_story_from_steps(steps)
     
     def _get_fallback_data(self, data_type: str) -> Dict[str, Any]:
         """AI 실패시 기본 데이터 반환"""
@@ -449,6 +636,14 @@ JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
                 ]
             }
         }
+        fallbacks["one_shot"] = {
+            "analysis": {
+                "key_opportunities": [],
+                "primary_needs": fallbacks["user_insights"]["key_insights"]["primary_needs"],
+                "core_hypothesis": fallbacks["strategy_design"]["impact_logic"]["core_hypothesis"]
+            },
+            "story": fallbacks["story_visualization"]
+        }
         
         return fallbacks.get(data_type, {})
     
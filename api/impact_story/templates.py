@@ -1,17 +1,107 @@
 """
 Story Templates - 임팩트 영역별 템플릿
+템플릿 데이터는 프로세스당 한 번만 만들어 수정 불가 레지스트리로 공유하고, 키워드 → 템플릿 색인으로 템플릿을 선택합니다.
 """
 
-from typing import Dict, List, Any
+import re
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+class FrozenDict(dict):
+    """수정할 수 없는 dict (JSON 직렬화와 읽기는 일반 dict와 같음)"""
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("템플릿 레지스트리는 수정할 수 없습니다")
+    
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """dict → FrozenDict, list → tuple (중첩 포함)"""
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class KeywordIndex:
+    """키워드 → 템플릿 색인 - 결합 정규식 한 번으로 텍스트 속 키워드를 찾고 우선순위가 가장 높은 템플릿 반환
+    우선순위는 매핑 순서이며, 같은 위치에서 시작하는 키워드는 긴 쪽이 선택됩니다."""
+    
+    def __init__(self, mapping: Mapping[str, Sequence[str]], default: str = "general"):
+        self.default = default
+        self._ranks: Dict[str, Tuple[int, str]] = {}
+        for priority, (template_type, keywords) in enumerate(mapping.items()):
+            for keyword in keywords:
+                self._ranks.setdefault(keyword, (priority, template_type))
+        self._pattern = re.compile("|".join(
+            re.escape(keyword) for keyword in sorted(self._ranks, key=len, reverse=True)
+        ))
+    
+    def lookup(self, text: str) -> str:
+        best: Optional[Tuple[int, str]] = None
+        for match in self._pattern.finditer(text.lower()):
+            rank = self._ranks[match.group()]
+            if best is None or rank < best:
+                best = rank
+                if rank[0] == 0:
+                    break
+        return best[1] if best else self.default
+
+
+class TemplateRegistry:
+    """프로세스 공용 템플릿 레지스트리 (모든 값 수정 불가)"""
+    
+    # 키워드 기반 템플릿 매칭 (앞에 있는 템플릿이 우선)
+    KEYWORDS = {
+        "education": ["교육", "학습", "역량", "스킬", "교육과정", "강의", "학교", "대학"],
+        "healthcare": ["건강", "의료", "치료", "병원", "약", "질병", "헬스케어", "웰빙"],
+        "environment": ["환경", "기후", "탄소", "재활용", "친환경", "지속가능", "에너지"]
+    }
+    
+    # 스토리 생성 시 템플릿 지정 키워드 (제안보다 좁은 기준)
+    STORY_KEYWORDS = {
+        "education": ["교육", "학습", "역량"],
+        "healthcare": ["건강", "의료", "치료"],
+        "environment": ["환경", "기후", "지속가능"]
+    }
+    
+    def __init__(self):
+        self.templates: Mapping[str, Mapping[str, Any]] = freeze(StoryTemplates._load_templates())
+        self.samples: Mapping[str, Mapping[str, str]] = freeze(StoryTemplates._load_samples())
+        self.inspiration_prompts: Mapping[str, Sequence[str]] = freeze(StoryTemplates._load_inspiration_prompts())
+        self.keyword_index = KeywordIndex(self.KEYWORDS)
+        self.story_index = KeywordIndex(self.STORY_KEYWORDS)
+
+
+_registry: Optional[TemplateRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def template_registry() -> TemplateRegistry:
+    """첫 사용 시 한 번만 로드"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TemplateRegistry()
+    return _registry
 
 
 class StoryTemplates:
-    """임팩트 스토리 템플릿 관리"""
+    """임팩트 스토리 템플릿 관리 (공용 레지스트리를 읽는 가벼운 핸들)"""
     
     def __init__(self):
-        self.templates = self._load_templates()
+        self.registry = template_registry()
+        self.templates = self.registry.templates
     
-    def _load_templates(self) -> Dict[str, Dict[str, Any]]:
+    @staticmethod
+    def _load_templates() -> Dict[str, Dict[str, Any]]:
         """템플릿 로드"""
         return {
             "education": {
@@ -113,24 +203,17 @@ class StoryTemplates:
     
     def suggest_template(self, problem_text: str) -> str:
         """문제 설명에서 적합한 템플릿 제안"""
-        problem_lower = problem_text.lower()
-        
-        # 키워드 기반 템플릿 매칭
-        keyword_mapping = {
-            "education": ["교육", "학습", "역량", "스킬", "교육과정", "강의", "학교", "대학"],
-            "healthcare": ["건강", "의료", "치료", "병원", "약", "질병", "헬스케어", "웰빙"],
-            "environment": ["환경", "기후", "탄소", "재활용", "친환경", "지속가능", "에너지"]
-        }
-        
-        for template_type, keywords in keyword_mapping.items():
-            if any(keyword in problem_lower for keyword in keywords):
-                return template_type
-        
-        return "general"
+        return self.registry.keyword_index.lookup(problem_text)
     
     def get_sample_story(self, template_type: str) -> Dict[str, str]:
-        """샘플 스토리 반환"""
-        samples = {
+        """샘플 스토리 반환 (수정해서 쓸 수 있도록 사본)"""
+        samples = self.registry.samples
+        return dict(samples.get(template_type, samples["education"]))
+    
+    @staticmethod
+    def _load_samples() -> Dict[str, Dict[str, str]]:
+        """샘플 스토리 로드"""
+        return {
             "education": {
                 "problem": "청년들이 실무형 코딩 교육을 받기 어려워해요",
                 "target": "취업 준비생 청년들",
@@ -156,12 +239,16 @@ class StoryTemplates:
                 "measurement": "참여 카페의 일회용 컵 구매량 비교"
             }
         }
-        
-        return samples.get(template_type, samples["education"])
     
     def get_inspiration_prompts(self, template_type: str) -> List[str]:
         """영감을 주는 질문들"""
-        prompts = {
+        prompts = self.registry.inspiration_prompts
+        return list(prompts.get(template_type, prompts["general"]))
+    
+    @staticmethod
+    def _load_inspiration_prompts() -> Dict[str, List[str]]:
+        """영감 질문 로드 (general은 템플릿을 특정하지 못했을 때)"""
+        return {
             "education": [
                 "어떤 기술이나 지식을 배우고 싶어하는 사람들을 보셨나요?",
                 "기존 교육 방식에서 아쉬웠던 점은 무엇인가요?",
@@ -176,11 +263,10 @@ class StoryTemplates:
                 "일상에서 환경에 부담을 주는 것들을 발견한 적 있나요?",
                 "친환경적인 행동을 하고 싶지만 어려웠던 이유는 무엇인가요?",
                 "환경 문제가 해결된다면 미래 세대에게 어떤 의미일까요?"
+            ],
+            "general": [
+                "어떤 문제를 해결하고 싶으신가요?",
+                "그 문제로 누가 어려움을 겪고 있나요?",
+                "해결되면 어떤 변화가 생길까요?"
             ]
         }
-        
-        return prompts.get(template_type, [
-            "어떤 문제를 해결하고 싶으신가요?",
-            "그 문제로 누가 어려움을 겪고 있나요?",
-            "해결되면 어떤 변화가 생길까요?"
-        ])
\ No newline at end of file
@@ -5,6 +5,11 @@ Story Validator - 입력 검증 및 품질 확인
 from typing import Dict, List, Any
 import re
 
+# 일괄 생성에서도 호출마다 컴파일하지 않도록 모듈 로드 시 한 번만 컴파일
+_DIGITS = re.compile(r'\d')
+_TIME_REFERENCE = re.compile("|".join(["개월", "년", "주", "일", "분기", "월", "주간"]))
+_SPECIFIC_MEASUREMENT = re.compile("|".join(["설문", "조사", "데이터", "분석", "추적", "모니터링", "평가", "측정", "지표"]))
+
 
 class StoryValidator:
     """임팩트 스토리 입력 검증"""
@@ -93,17 +98,15 @@ class StoryValidator:
     
     def _contains_numbers(self, text: str) -> bool:
         """텍스트에 숫자 포함 여부 확인"""
-        return bool(re.search(r'\d+', text))
+        return bool(_DIGITS.search(text))
     
     def _contains_time_reference(self, text: str) -> bool:
         """시간 참조 포함 여부 확인"""
-        time_keywords = ["개월", "년", "주", "일", "분기", "월", "주간"]
-        return any(keyword in text for keyword in time_keywords)
+        return bool(_TIME_REFERENCE.search(text))
     
     def _is_specific_measurement(self, text: str) -> bool:
         """측정 방법의 구체성 확인"""
-        specific_keywords = ["설문", "조사", "데이터", "분석", "추적", "모니터링", "평가", "측정", "지표"]
-        return any(keyword in text for keyword in specific_keywords) and len(text) > 10
+        return len(text) > 10 and bool(_SPECIFIC_MEASUREMENT.search(text))
     
     def _calculate_quality_score(self, steps: Dict[str, str], errors: List[str], warnings: List[str]) -> int:
         """품질 점수 계산 (0-100)"""
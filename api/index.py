@@ -3,42 +3,75 @@ MYSC IR Platform - JWT + Gemini AI Integration
 Secure API key management with consistent Linear UI
 """
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse
 import pathlib
 import json
 import jwt
 import hashlib
 import os
 from datetime import datetime, timedelta
-from cryptography.fernet import Fernet
+from functools import lru_cache
 import base64
-import google.generativeai as genai
+import io
 import asyncio
 from typing import Dict
 import httpx
 import uuid
 
-# 프로젝트 루트 경로 설정 (Railway 환경 호환)
-try:
-    BASE_DIR = pathlib.Path(__file__).resolve().parent.parent
-    PUBLIC_DIR = BASE_DIR / "public"
+from .auth import AuthError, TokenVerifier
+from .checkpoints import checkpoint_store
+from .extraction import DocumentExtractor, ExtractionCache
+from .logging_utils import get_logger
+from .prompt_budget import estimate_tokens, fit_documents, trim_to_tokens
+from .reports import StreamingReportParser, extract_signals, split_report
+from .retrieval import ChunkIndexStore, NearDuplicateFilter, format_chunks
+from .routing import LATENCY_BUDGETS_MS, model_router
+from .structured import structured_metrics
+
+logger = get_logger("api")
+gemini_logger = get_logger("api.gemini")
+auth_logger = get_logger("api.auth")
+
+# Cloud Run 콜드 스타트 단축: 무거운 초기화(경로 탐색, 키 유도, Gemini SDK import)는
+# 모듈 import 시점이 아니라 처음 필요할 때 한 번만 수행하고 결과를 캐시합니다.
+
+
+@lru_cache(maxsize=1)
+def _resolve_dirs() -> tuple:
+    """프로젝트 루트/public 경로 설정 (Railway 환경 호환) - 최초 호출 시 1회 계산"""
+    try:
+        base_dir = pathlib.Path(__file__).resolve().parent.parent
+        public_dir = base_dir / "public"
+        
+        # Railway 환경에서 경로 검증
+        if not public_dir.exists():
+            # 현재 디렉토리에서 public 찾기
+            current_dir = pathlib.Path.cwd()
+            if (current_dir / "public").exists():
+                base_dir = current_dir
+                public_dir = base_dir / "public"
+            else:
+                # 기본 경로 생성
+                public_dir.mkdir(exist_ok=True)
+                
+    except Exception:
+        # Railway 환경에서 경로 문제 시 기본값 설정
+        base_dir = pathlib.Path.cwd()
+        public_dir = base_dir / "public"
+        public_dir.mkdir(exist_ok=True)
     
-    # Railway 환경에서 경로 검증
-    if not PUBLIC_DIR.exists():
-        # 현재 디렉토리에서 public 찾기
-        current_dir = pathlib.Path.cwd()
-        if (current_dir / "public").exists():
-            BASE_DIR = current_dir
-            PUBLIC_DIR = BASE_DIR / "public"
-        else:
-            # 기본 경로 생성
-            PUBLIC_DIR.mkdir(exist_ok=True)
-            
-except Exception as e:
-    # Railway 환경에서 경로 문제 시 기본값 설정
-    BASE_DIR = pathlib.Path.cwd()
-    PUBLIC_DIR = BASE_DIR / "public"
-    PUBLIC_DIR.mkdir(exist_ok=True)
+    return base_dir, public_dir
+
+
+def get_base_dir() -> pathlib.Path:
+    """프로젝트 루트 경로"""
+    return _resolve_dirs()[0]
+
+
+def get_public_dir() -> pathlib.Path:
+    """정적 파일(public) 경로"""
+    return _resolve_dirs()[1]
+
 
 app = FastAPI(title="MYSC IR Platform", version="3.0.0")
 
@@ -54,11 +87,12 @@ SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 DEFAULT_KEY = "mysc-ir-platform-encryption-key-2025-stable"
 ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
 
-if not ENCRYPTION_KEY:
-    # 고정된 시드를 사용해 일관된 키 생성
+
+@lru_cache(maxsize=1)
+def _derive_default_key() -> bytes:
+    """고정된 시드로 일관된 키 유도 (PBKDF2 100,000회 - 프로세스당 1회만 계산)"""
     from cryptography.hazmat.primitives import hashes
     from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-    import base64
     
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
@@ -66,12 +100,19 @@ if not ENCRYPTION_KEY:
         salt=b'mysc-salt-2025',
         iterations=100000,
     )
-    key = base64.urlsafe_b64encode(kdf.derive(DEFAULT_KEY.encode()))
-    ENCRYPTION_KEY = key
-elif isinstance(ENCRYPTION_KEY, str):
-    ENCRYPTION_KEY = ENCRYPTION_KEY.encode()
+    return base64.urlsafe_b64encode(kdf.derive(DEFAULT_KEY.encode()))
 
-cipher_suite = Fernet(ENCRYPTION_KEY)
+
+@lru_cache(maxsize=1)
+def get_cipher_suite():
+    """Fernet 인스턴스 (최초 암복호화 시점에 생성 후 재사용)"""
+    from cryptography.fernet import Fernet
+    
+    if ENCRYPTION_KEY:
+        key = ENCRYPTION_KEY.encode() if isinstance(ENCRYPTION_KEY, str) else ENCRYPTION_KEY
+    else:
+        key = _derive_default_key()
+    return Fernet(key)
 
 async def validate_gemini_api_key(api_key: str) -> tuple[bool, str]:
     """Gemini API 키의 유효성을 검증 - 형식 검증 우선"""
@@ -103,13 +144,121 @@ PORT = int(os.getenv("PORT", 8080))  # Cloud Run 기본 포트
 
 def encrypt_api_key(api_key: str) -> str:
     """API 키를 암호화"""
-    encrypted = cipher_suite.encrypt(api_key.encode())
+    encrypted = get_cipher_suite().encrypt(api_key.encode())
     return base64.urlsafe_b64encode(encrypted).decode()
 
 def decrypt_api_key(encrypted_key: str) -> str:
     """API 키를 복호화"""
     encrypted_bytes = base64.urlsafe_b64decode(encrypted_key.encode())
-    return cipher_suite.decrypt(encrypted_bytes).decode()
+    return get_cipher_suite().decrypt(encrypted_bytes).decode()
+
+# 업로드 문서 추출기 (PDF/XLSX/DOCX 파싱은 프로세스 풀에서 실행, 풀은 첫 추출 시 생성)
+# 추출 결과는 원본 SHA-256 기준으로 캐시되어 재업로드 시 파싱을 건너뜀
+document_extractor = DocumentExtractor(cache=ExtractionCache())
+
+
+def resolve_file_hashes(file_hashes: list) -> tuple:
+    """클라이언트가 해시만 보낸 파일("<sha256>" 또는 "<sha256>:<파일명>")을 캐시에서 복원"""
+    resolved, missing = [], []
+    for entry in file_hashes:
+        digest, _, filename = str(entry).partition(":")
+        digest = digest.strip().lower()
+        cached = document_extractor.lookup(digest, filename or None)
+        if cached is None:
+            missing.append(digest)
+        else:
+            resolved.append(cached)
+    return resolved, missing
+
+
+def missing_files_response(missing: list) -> JSONResponse:
+    """캐시에 없는 해시 - 클라이언트가 해당 파일만 다시 업로드하도록 안내"""
+    return JSONResponse({
+        "success": False,
+        "error": "캐시에 없는 파일이 있습니다. 해당 파일을 다시 업로드해주세요",
+        "missing_hashes": missing
+    }, status_code=409)
+
+
+def describe_files(extractions: list) -> list:
+    """응답에 포함할 파일 해시 정보 (다음 요청에서 재업로드 생략용)"""
+    return [
+        {"name": e.filename, "hash": e.content_hash, "format": e.format, "cached": e.cached, "error": e.error}
+        for e in extractions
+    ]
+
+# 프롬프트 섹션별 토큰 예산 (문자 수 대신 토큰 기준, 문장 경계에서 자름)
+PROMPT_BUDGETS = {
+    "file_content": 4000,      # 업로드 파일 하나당 보관 분량
+    "basic_analysis": 3000,    # 1단계 기본 분석의 IR 자료
+    "report": 6000,            # 전체 보고서(analyze_with_gemini)의 IR 자료
+    "long_report": 8000,       # 장문 보고서(run_long_analysis)의 IR 자료
+    "followup_context": 3000,  # 후속 질문 발췌 + 재무 지표
+    "custom_question": 500,    # 사용자 직접 질문
+}
+
+# analyze_with_gemini 응답의 섹션 키 (기존 응답 형식 유지용 보고서 제목)
+GEMINI_SECTION_TITLES = {
+    "executive_summary": "I. Executive Summary",
+    "investment_overview": "II. 투자 개요",
+    "company_status": "III. 기업 현황",
+    "market_analysis": "IV. 시장 분석",
+    "business_model": "V. 사업 분석",
+    "investment_fit": "VI. 투자 적합성과 임팩트",
+    "financial_analysis": "VII. 손익 추정 및 수익성",
+    "conclusion": "VIII. 종합 결론",
+}
+
+# 프로젝트별 BM25 청크 인덱스 (업로드 시 구성, 후속 질문에서 관련 발췌만 검색)
+chunk_index_store = ChunkIndexStore()
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "5"))
+
+# 변화이론 일괄 생성 요청당 최대 조직 수
+TOC_BATCH_MAX_ORGANIZATIONS = int(os.getenv("TOC_BATCH_MAX_ORGANIZATIONS", "50"))
+# 임팩트 스토리 일괄 생성 요청 본문 최대 크기 (CSV/NDJSON)
+BULK_STORY_MAX_BYTES = int(os.getenv("BULK_STORY_MAX_BYTES", "2000000"))
+
+
+# 여러 파일에 반복되는 표지/연락처/면책 조항 등 근접 중복 청크 제거 (MinHash)
+near_duplicate_filter = NearDuplicateFilter()
+
+
+def dedupe_extractions(extractions: list) -> tuple:
+    """추출 결과를 (파일명, 중복 제거된 페이지 목록)과 절감 통계로 변환 - 프롬프트 구성 전 단계"""
+    documents = [(e.filename, e.pages or [e.text]) for e in extractions]
+    deduped, stats = near_duplicate_filter.dedupe_documents(documents)
+    if stats.chunks_removed:
+        logger.info("Removed near-duplicate chunks", extra=stats.to_dict())
+    return deduped, stats
+
+
+def _build_project_index(key: str, extractions: list, documents: list, owner: str = None):
+    """중복 제거된 페이지로 청크 인덱스 구성 + 재무제표 표에서 재무 지표 계산 (후속 질문에서 재사용)"""
+    # numpy를 끌어오므로 콜드 스타트가 아닌 첫 업로드 색인 시점에 import
+    from .financials import compute_financial_metrics
+
+    documents = [(filename, pages) for filename, pages in documents if pages]
+    financials = compute_financial_metrics(
+        {"tables": e.tables, "pages": e.pages} for e in extractions if e.ok
+    )
+    return chunk_index_store.build(key, documents, owner, extras={"financials": financials})
+
+
+async def index_project_documents(key: str, extractions: list, documents: list, owner: str = None) -> None:
+    """추출된 전체 페이지로 프로젝트 인덱스 구성 (토큰화/행렬 계산은 이벤트 루프 밖에서 수행)"""
+    if not any(e.text or e.tables for e in extractions):
+        return
+    try:
+        index = await asyncio.to_thread(_build_project_index, key, extractions, documents, owner)
+    except Exception as e:
+        # 인덱스가 없어도 후속 질문은 발췌 없이 동작
+        logger.warning("Project indexing failed: %s", e, extra={"project_id": key})
+        return
+    logger.debug("Indexed project documents", extra={"project_id": key, "chunks": len(index)})
+
+# 공용 토큰 검증기 (검증된 토큰 LRU 캐시 - 반복 요청 시 서명 검증/복호화 생략)
+token_verifier = TokenVerifier(JWT_SECRET, decrypt_api_key)
+
 
 # Supabase 헬퍼 함수들
 class SupabaseClient:
@@ -266,12 +415,21 @@ async def run_supabase_analysis(project_id: str, api_key: str, company_name: str
         # 분석 시작 표시
         await supabase_client.update_project_status(project_id, "processing")
         
-        # Executive Summary 분석 및 저장
-        executive_result = await analyze_with_gemini(api_key, company_name, {
-            "files": file_contents,
-            "section": "executive_summary"
+        # Supabase 저장이 실패해 재시도해도 완료된 Gemini 분석은 다시 호출하지 않음
+        checkpoint = checkpoint_store.open("supabase_analysis", {
+            "company_name": company_name,
+            "files": [(f["name"], f["content"]) for f in file_contents],
         })
         
+        # Executive Summary 분석 및 저장
+        executive_result = checkpoint.get("executive_summary")
+        if executive_result is None:
+            executive_result = await analyze_with_gemini(api_key, company_name, {
+                "files": file_contents,
+                "section": "executive_summary"
+            })
+            checkpoint.save("executive_summary", executive_result)
+        
         if executive_result:
             await supabase_client.save_analysis_result(
                 project_id, "executive_summary", executive_result, 
@@ -280,12 +438,13 @@ async def run_supabase_analysis(project_id: str, api_key: str, company_name: str
         
         # 분석 완료 표시
         await supabase_client.update_project_status(project_id, "completed")
+        checkpoint.clear()
         
     except Exception as e:
         await supabase_client.update_project_status(project_id, "failed")
-        print(f"Analysis error for project {project_id}: {str(e)}")
+        logger.error("Analysis error for project %s: %s", project_id, e)
 
-async def run_local_analysis(project_id: str, api_key: str, company_name: str, file_contents: list):
+async def run_local_analysis(project_id: str, api_key: str, company_name: str, file_contents: list, dedup: dict = None):
     """로컬 저장소 기반 백그라운드 분석 실행 (Supabase 없이)"""
     try:
         # 로컬 분석 작업 초기화
@@ -294,6 +453,7 @@ async def run_local_analysis(project_id: str, api_key: str, company_name: str, f
             "progress": 10,
             "message": f"{company_name} 분석 시작 중...",
             "company_name": company_name,
+            "dedup": dedup,
             "created_at": datetime.now().isoformat()
         }
         
@@ -317,66 +477,36 @@ async def run_local_analysis(project_id: str, api_key: str, company_name: str, f
         ANALYSIS_JOBS[project_id]["result"] = analysis_result
         ANALYSIS_JOBS[project_id]["completed_at"] = datetime.now().isoformat()
         
-        print(f"Local analysis completed for project {project_id}")
+        logger.info("Local analysis completed", extra={"project_id": project_id})
         
     except Exception as e:
         ANALYSIS_JOBS[project_id]["status"] = "failed"
         ANALYSIS_JOBS[project_id]["progress"] = 0
         ANALYSIS_JOBS[project_id]["error"] = str(e)
         ANALYSIS_JOBS[project_id]["failed_at"] = datetime.now().isoformat()
-        print(f"Local analysis error for project {project_id}: {str(e)}")
+        logger.error("Local analysis error for project %s: %s", project_id, e)
 
 async def analyze_with_gemini(api_key: str, company_name: str, file_info: dict):
     """Gemini AI를 사용한 실제 투자 분석"""
-    debug_info = {
-        "function": "analyze_with_gemini",
-        "company_name": company_name,
-        "file_info": file_info,
-        "timestamp": datetime.now().isoformat()
-    }
-    
     try:
-        # API 키 디버깅
-        print(f"🔍 [DEBUG] Starting Gemini analysis for {company_name}")
-        print(f"🔍 [DEBUG] API key type: {type(api_key)}")
-        print(f"🔍 [DEBUG] API key length: {len(api_key) if api_key else 0}")
+        gemini_logger.debug("Starting Gemini analysis", extra={"company_name": company_name})
         
         # API 키가 문자열인지 확인하고 정리
         if not isinstance(api_key, str):
-            print(f"🔍 [DEBUG] Converting API key from {type(api_key)} to string")
+            gemini_logger.debug("Converting API key from %s to string", type(api_key).__name__)
             api_key = str(api_key)
         
         api_key = api_key.strip()
-        print(f"🔍 [DEBUG] API key after strip - length: {len(api_key)}")
-        print(f"🔍 [DEBUG] API key prefix: {api_key[:10] if len(api_key) >= 10 else api_key}...")
-        print(f"🔍 [DEBUG] API key suffix: ...{api_key[-5:] if len(api_key) >= 5 else api_key}")
+        gemini_logger.debug("API key normalized", extra={"api_key_length": len(api_key)})
         
         # API 키 형식 확인
         if not api_key.startswith('AIza'):
-            error_msg = f"Invalid API key format: {api_key[:10]}..."
-            print(f"❌ [DEBUG] {error_msg}")
+            error_msg = "Invalid API key format"
+            gemini_logger.warning(error_msg, extra={"api_key_length": len(api_key)})
             raise ValueError(error_msg)
         
-        print(f"✅ [DEBUG] API key format validation passed")
-        
-        # Gemini 설정 시도
-        print(f"🔍 [DEBUG] Attempting genai.configure() call...")
-        try:
-            genai.configure(api_key=api_key)
-            print(f"✅ [DEBUG] genai.configure() successful")
-        except Exception as config_error:
-            print(f"❌ [DEBUG] genai.configure() failed: {str(config_error)}")
-            print(f"❌ [DEBUG] genai.configure() error type: {type(config_error)}")
-            raise config_error
-        
-        # 모델 초기화
-        print(f"🔍 [DEBUG] Initializing Gemini model...")
-        try:
-            model = genai.GenerativeModel('gemini-1.5-flash')  # Flash로 변경
-            print(f"✅ [DEBUG] Model initialization successful: gemini-1.5-flash")
-        except Exception as model_error:
-            print(f"❌ [DEBUG] Model initialization failed: {str(model_error)}")
-            raise model_error
+        # 업로드 자료를 예산 안에서 파일별로 배분
+        ir_material = fit_documents(file_info.get("files") or [], PROMPT_BUDGETS["report"])
         
         # VC급 전문 투자 분석 프롬프트 (로마자 목차)
         prompt = f"""{company_name}의 전문 투자 검토 보고서를 다음 구조로 작성하세요:
@@ -459,11 +589,24 @@ async def analyze_with_gemini(api_key: str, company_name: str, file_info: dict):
 - 투자 실행 조건
 
 분석 대상: {company_name}
-파일 수: {file_info.get('count', 0)}개
+파일 수: {file_info.get('count', len(file_info.get('files') or []))}개
+
+IR 자료:
+{ir_material or '(추출된 텍스트 없음)'}
 
 각 섹션을 상세하게 분석하여 VC급 전문 투자 검토 보고서를 작성하세요."""
         
-        response = model.generate_content(prompt)
+        # 입력 크기/지연 예산/부하에 맞는 모델 선택 (예산이 부족하면 품질 하한 안에서 하위 모델)
+        decision = model_router.choose("report", estimate_tokens(prompt), LATENCY_BUDGETS_MS["report"])
+        try:
+            model = model_router.model(decision.model, api_key)
+            gemini_logger.debug("Model initialized", extra={"model": decision.model, "route": decision.reason})
+        except Exception as model_error:
+            gemini_logger.error("Model initialization failed: %s", model_error)
+            raise model_error
+        
+        with model_router.track(decision) as model_record:
+            response = model.generate_content(prompt)
         
         # 응답 텍스트 추출
         if hasattr(response, 'text'):
@@ -473,58 +616,19 @@ async def analyze_with_gemini(api_key: str, company_name: str, file_info: dict):
         else:
             response_text = str(response)
         
-        # Gemini 응답에서 정보 추출 (간단한 키워드 기반)
-        text_lower = response_text.lower()
-        
-        # 투자 점수 추출
-        investment_score = 7.5
-        if "10점" in response_text or "/10" in response_text:
-            import re
-            score_match = re.search(r'(\d+\.?\d*)/10|(\d+\.?\d*)점', response_text)
-            if score_match:
-                investment_score = float(score_match.group(1) or score_match.group(2))
-        
-        # 추천사항 추출
-        recommendation = "Hold"
-        if "buy" in text_lower or "매수" in response_text or "투자추천" in response_text:
-            recommendation = "Buy"
-        elif "sell" in text_lower or "매도" in response_text:
-            recommendation = "Sell"
-        
-        # 리스크 레벨 추출
-        risk_level = "Medium"
-        if "높은 리스크" in response_text or "high risk" in text_lower:
-            risk_level = "High"
-        elif "낮은 리스크" in response_text or "low risk" in text_lower:
-            risk_level = "Low"
-        
-        # 섹션별 파싱
-        sections = {}
-        section_titles = [
-            "I. Executive Summary",
-            "II. 투자 개요", 
-            "III. 기업 현황",
-            "IV. 시장 분석",
-            "V. 사업 분석", 
-            "VI. 투자 적합성과 임팩트",
-            "VII. 손익 추정 및 수익성",
-            "VIII. 종합 결론"
-        ]
-        
-        # 섹션별로 텍스트 분할
-        current_section = ""
-        for i, title in enumerate(section_titles):
-            if title in response_text:
-                if i + 1 < len(section_titles):
-                    next_title = section_titles[i + 1]
-                    if next_title in response_text:
-                        section_content = response_text.split(title)[1].split(next_title)[0]
-                    else:
-                        section_content = response_text.split(title)[1]
-                else:
-                    section_content = response_text.split(title)[1]
-                
-                sections[title] = section_content.strip()
+        # 투자 점수/추천/리스크 신호를 한 번의 스캔으로 추출
+        signals = extract_signals(response_text)
+        investment_score = signals.score if signals.score is not None else 7.5
+        recommendation = signals.recommendation(strong=False)
+        risk_level = signals.risk_level()
+        
+        # 섹션별 파싱 (목차 트리를 한 번에 만들고 표준 섹션 키를 보고서 제목으로 표시)
+        report_sections = split_report(response_text)
+        sections = {
+            title: report_sections[key]
+            for key, title in GEMINI_SECTION_TITLES.items()
+            if report_sections[key]
+        }
         
         # 실제 Gemini AI 분석 결과 활용
         result = {
@@ -556,16 +660,17 @@ async def analyze_with_gemini(api_key: str, company_name: str, file_info: dict):
         
         result["analysis_date"] = datetime.now().isoformat()
         result["ai_powered"] = True
+        result["model"] = model_record
         return result
         
     except Exception as e:
         # Gemini API 오류 시 폴백 (더 상세한 오류 정보)
         error_msg = str(e)
-        print(f"❌ [DEBUG] Gemini API error: {error_msg}")
+        gemini_logger.error("Gemini API error: %s", error_msg, extra={"company_name": company_name})
         
         if "429" in error_msg or "quota" in error_msg.lower():
             error_msg = "API 할당량 초과 - 기본 분석 제공 중"
-            print(f"⚠️ [DEBUG] Using fallback analysis due to quota limits")
+            gemini_logger.warning("Using fallback analysis due to quota limits")
         elif "async_generator" in error_msg:
             error_msg = "Gemini API 응답 처리 오류"
         elif "403" in error_msg:
@@ -604,12 +709,9 @@ async def perform_basic_analysis(api_key: str, company_name: str, file_info: dic
         
         if not api_key.startswith('AIza'):
             raise ValueError(f"Invalid API key format")
-            
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
         
         # VC급 Investment Thesis Memo 프롬프트
-        file_context = "\n".join([f"파일: {f['name']}\n내용: {f['content'][:500]}..." for f in file_contents])
+        file_context = fit_documents(file_contents, PROMPT_BUDGETS["basic_analysis"], header="파일: {name}\n내용: ")
         
         prompt = f"""[최종 압축 버전]
 MISSION:
@@ -654,7 +756,9 @@ IR 자료: {file_context}
 
 위 지령과 구조에 따라 **{company_name}**의 Investment Thesis Memo를 한국어로 작성하세요."""
         
-        response = model.generate_content(prompt)
+        decision = model_router.choose("basic_analysis", estimate_tokens(prompt), LATENCY_BUDGETS_MS["report"])
+        with model_router.track(decision) as model_record:
+            response = model_router.model(decision.model, api_key).generate_content(prompt)
         response_text = response.text if hasattr(response, 'text') else str(response)
         
         # 기본 분석 결과
@@ -663,7 +767,8 @@ IR 자료: {file_context}
             "recommendation": "Buy" if "buy" in response_text.lower() or "매수" in response_text else "Hold",
             "key_insight": f"{company_name}의 투자 가치가 확인되었습니다",
             "analysis_text": response_text[:300],
-            "ai_powered": True
+            "ai_powered": True,
+            "model": model_record
         }
         
         return result
@@ -678,7 +783,44 @@ IR 자료: {file_context}
             "error": str(e)
         }
 
-async def perform_followup_analysis(api_key: str, company_name: str, question_type: str, custom_question: str, previous_context: str = ""):
+# 후속 질문 유형별 검색 질의 (프롬프트 항목의 핵심 용어)
+FOLLOWUP_QUERIES = {
+    "financial": "매출 성장률 매출총이익 영업이익 EBITDA 순이익 현금흐름 부채비율 유동비율 burn rate runway 손익분기 CAC LTV unit economics 자금",
+    "market": "시장 규모 TAM SAM SOM 성장률 경쟁사 점유율 고객 타겟 포지셔닝 차별화 가격 go-to-market 진입장벽",
+    "risk": "리스크 위험 규제 정책 경쟁 기술 운영 자금조달 유동성 환율 금리 대응 완화",
+    "team": "창업자 대표 팀 경력 경험 인력 조직 채용 이사회 거버넌스 주주 지분",
+    "product": "제품 서비스 기술 특허 IP R&D 로드맵 사용자 MAU DAU 리텐션 NPS 고객 만족",
+    "exit": "exit IPO 상장 M&A 인수 밸류에이션 기업가치 투자 수익 IRR multiple 회수",
+}
+
+
+def retrieve_followup_context(project_id: str, owner: str, question_type: str, custom_question: str) -> tuple:
+    """후속 질문과 관련된 IR 문서 발췌 상위 k개 - (프롬프트용 컨텍스트, 출처 목록)"""
+    query = " ".join(filter(None, [FOLLOWUP_QUERIES.get(question_type, ""), custom_question]))
+    results = chunk_index_store.search(project_id, query, RETRIEVAL_TOP_K, owner=owner)
+    if not results:
+        return "", []
+    context = "다음은 업로드된 IR 자료에서 이 질문과 관련된 발췌입니다. 근거로 활용하세요:\n\n" + format_chunks(
+        results, max_tokens=PROMPT_BUDGETS["followup_context"]
+    )
+    sources = [
+        {"file": chunk.filename, "page": chunk.page, "score": round(score, 3)}
+        for chunk, score in results
+    ]
+    return context, sources
+
+
+def financial_metrics_context(metrics) -> str:
+    """계산된 재무 지표를 프롬프트에 고정 수치로 제공"""
+    if metrics is None:
+        return ""
+    return (
+        "다음 재무 지표는 업로드된 재무제표에서 직접 계산한 값입니다. "
+        "수치를 새로 추정하지 말고 이 값을 그대로 인용해 해석하세요:\n" + metrics.to_prompt()
+    )
+
+
+async def perform_followup_analysis(api_key: str, company_name: str, question_type: str, custom_question: str, previous_context: str = "", financial_metrics=None):
     """2단계: 후속 상세 분석 수행 - 더 깊이 있는 분석"""
     try:
         # API 키 정리 및 검증
@@ -688,9 +830,12 @@ async def perform_followup_analysis(api_key: str, company_name: str, question_ty
         
         if not api_key.startswith('AIza'):
             raise ValueError(f"Invalid API key format")
-            
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        
+        # 재무 질문은 계산된 지표를 발췌보다 앞에 배치 (지표는 자르지 않고 남은 예산을 발췌에 배분)
+        if question_type == "financial" and financial_metrics is not None:
+            previous_context = "\n\n".join(filter(None, [financial_metrics_context(financial_metrics), previous_context]))
+        previous_context = trim_to_tokens(previous_context, PROMPT_BUDGETS["followup_context"])
+        custom_question = trim_to_tokens(custom_question, PROMPT_BUDGETS["custom_question"])
         
         # 질문 유형별 전문 프롬프트
         prompts = {
@@ -851,11 +996,13 @@ async def perform_followup_analysis(api_key: str, company_name: str, question_ty
             {previous_context}
             """,
             
-            "custom": custom_question or f"{company_name}에 대해 더 자세히 설명해주세요. {previous_context}"
+            "custom": f"{custom_question or f'{company_name}에 대해 더 자세히 설명해주세요.'}\n\n{previous_context}"
         }
         
         prompt = prompts.get(question_type, prompts["custom"])
-        response = model.generate_content(prompt)
+        decision = model_router.choose("followup", estimate_tokens(prompt), LATENCY_BUDGETS_MS["report"])
+        with model_router.track(decision) as model_record:
+            response = model_router.model(decision.model, api_key).generate_content(prompt)
         response_text = response.text if hasattr(response, 'text') else str(response)
         
         # 질문 유형별 결과 구조화
@@ -863,16 +1010,14 @@ async def perform_followup_analysis(api_key: str, company_name: str, question_ty
             "question_type": question_type,
             "analysis_text": response_text,
             "ai_powered": True,
+            "model": model_record,
             "timestamp": datetime.now().isoformat()
         }
         
         # 타입별 추가 정보
-        if question_type == "financial":
-            result["metrics"] = {
-                "revenue_growth": "15%",
-                "profit_margin": "18%", 
-                "debt_ratio": "30%"
-            }
+        if question_type == "financial" and financial_metrics is not None:
+            result["metrics"] = financial_metrics.to_display() or None
+            result["financials"] = financial_metrics.to_dict()
         elif question_type == "market":
             result["market_data"] = {
                 "market_share": "12%",
@@ -894,6 +1039,15 @@ async def perform_followup_analysis(api_key: str, company_name: str, question_ty
             "timestamp": datetime.now().isoformat()
         }
 
+def apply_report_events(job_id: str, report_parser: StreamingReportParser, events: list):
+    """스트리밍 이벤트를 작업 상태에 반영 (상태 폴링에서 부분 결과 확인)"""
+    job = ANALYSIS_JOBS[job_id]
+    job["partial"] = report_parser.snapshot()
+    job["progress"] = max(job.get("progress", 0), 50 + int(30 * report_parser.progress))
+    for event in events:
+        if event.type == "section_start":
+            job["message"] = f"{event.title} 작성 중..."
+
 async def run_long_analysis(job_id: str, api_key: str, company_name: str, file_contents: list):
     """완전한 VC급 전문 투자 보고서 생성"""
     try:
@@ -902,8 +1056,30 @@ async def run_long_analysis(job_id: str, api_key: str, company_name: str, file_c
         ANALYSIS_JOBS[job_id]["progress"] = 10
         ANALYSIS_JOBS[job_id]["message"] = "IR 자료 분석 중..."
         
-        # 모든 파일을 완전히 처리
-        full_content = "\n\n".join([f"=== {f['name']} ===\n{f['content']}" for f in file_contents])
+        # 같은 회사/자료로 재시도하면 이전 실행에서 완료된 단계부터 이어서 진행
+        checkpoint = checkpoint_store.open("long_report", {
+            "company_name": company_name,
+            "files": [(f["name"], f["content"]) for f in file_contents],
+        })
+        if checkpoint.resumed:
+            ANALYSIS_JOBS[job_id]["resumed_stages"] = checkpoint.resumed
+        
+        # 모든 파일을 처리하되 파일 간 반복되는 슬라이드/청크는 한 번만 포함
+        prepared = checkpoint.get("documents")
+        if prepared is None:
+            documents, dedup_stats = await asyncio.to_thread(
+                near_duplicate_filter.dedupe_documents, [(f["name"], [f["content"]]) for f in file_contents]
+            )
+            prepared = {
+                "dedup": dedup_stats.to_dict(),
+                "full_content": fit_documents(
+                    [{"name": name, "content": "\n\n".join(pages)} for name, pages in documents],
+                    PROMPT_BUDGETS["long_report"]
+                ),
+            }
+            checkpoint.save("documents", prepared)
+        ANALYSIS_JOBS[job_id]["dedup"] = prepared["dedup"]
+        full_content = prepared["full_content"]
         
         # Stage 2: 완전한 VC급 분석
         ANALYSIS_JOBS[job_id]["status"] = "analyzing"
@@ -917,9 +1093,6 @@ async def run_long_analysis(job_id: str, api_key: str, company_name: str, file_c
         
         if not api_key.startswith('AIza'):
             raise ValueError(f"Invalid API key format")
-            
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
         
         # 전문 VC 투자 보고서 프롬프트
         prompt = f"""당신은 한국 최고의 VC 투자 심사역입니다. {company_name}의 IR 자료를 기반으로 다음 구조의 전문 투자 검토 보고서를 작성하세요.
@@ -1026,53 +1199,46 @@ async def run_long_analysis(job_id: str, api_key: str, company_name: str, file_c
 - 투자 실행 조건
 
 분석 자료:
-{full_content[:5000]}
+{full_content}
 
 위 구조에 따라 전문적이고 상세한 한국어 투자 검토 보고서를 작성하세요. 각 섹션별로 구체적인 분석과 인사이트를 포함하세요."""
 
         ANALYSIS_JOBS[job_id]["progress"] = 50
         
-        # Gemini API 호출
-        response = model.generate_content(prompt)
-        response_text = response.text if hasattr(response, 'text') else str(response)
+        report = checkpoint.get("report")
+        if report is None:
+            # Gemini 스트리밍 호출 - 섹션/점수/추천 등급이 완성되는 대로 작업 상태에 반영 (50~80%)
+            report_parser = StreamingReportParser()
+            decision = model_router.choose("long_report", estimate_tokens(prompt), LATENCY_BUDGETS_MS["report"])
+            with model_router.track(decision) as model_record:
+                model = model_router.model(decision.model, api_key)
+                for chunk in model.generate_content(prompt, stream=True):
+                    events = report_parser.feed(getattr(chunk, "text", "") or "")
+                    if events:
+                        apply_report_events(job_id, report_parser, events)
+            apply_report_events(job_id, report_parser, report_parser.close())
+            report = {
+                "text": report_parser.text,
+                "sections": report_parser.sections,
+                "investment_score": report_parser.investment_score,
+                "recommendation": report_parser.recommendation,
+                "model": model_record,
+            }
+            checkpoint.save("report", report)
+        response_text = report["text"]
         
         # Stage 3: 보고서 구조화
         ANALYSIS_JOBS[job_id]["status"] = "finalizing"
         ANALYSIS_JOBS[job_id]["progress"] = 80
         ANALYSIS_JOBS[job_id]["message"] = "최종 보고서 생성 중..."
         
-        # 투자 점수 추출
-        investment_score = 7.5  # 기본값
-        if "/10" in response_text:
-            import re
-            score_match = re.search(r'(\d+\.?\d*)/10', response_text)
-            if score_match:
-                investment_score = float(score_match.group(1))
-        
-        # 추천 등급 추출
-        recommendation = "Hold"
-        if "Strong Buy" in response_text or "강력 매수" in response_text:
-            recommendation = "Strong Buy"
-        elif "Buy" in response_text or "매수" in response_text:
-            recommendation = "Buy"
-        elif "Sell" in response_text or "매도" in response_text:
-            recommendation = "Sell"
-        
-        # 보고서 섹션 파싱
-        sections = {
-            "executive_summary": "",
-            "investment_overview": "",
-            "company_status": "",
-            "market_analysis": "",
-            "business_model": "",
-            "investment_fit": "",
-            "financial_analysis": "",
-            "conclusion": ""
-        }
+        # 투자 점수와 추천 등급 (스트림에서 찾지 못하면 본문 키워드 신호로 판단)
+        signals = extract_signals(response_text)
+        investment_score = report["investment_score"] or signals.score or 7.5
+        recommendation = report["recommendation"] or signals.recommendation()
         
-        # 섹션별 내용 추출 시도
-        if "Executive Summary" in response_text:
-            sections["executive_summary"] = response_text.split("Executive Summary")[1].split("##")[0] if "##" in response_text else response_text[:1000]
+        # 보고서 섹션 (8개 표준 섹션 모두 채움)
+        sections = report["sections"]
         
         # 최종 결과 구조화
         final_result = {
@@ -1093,13 +1259,15 @@ async def run_long_analysis(job_id: str, api_key: str, company_name: str, file_c
                 "VI. 손익 추정 및 수익성 분석",
                 "VII. 종합 결론"
             ],
-            "processing_time": "전문 VC급 분석 완료"
+            "processing_time": "전문 VC급 분석 완료",
+            "model": report["model"]
         }
         
         ANALYSIS_JOBS[job_id]["status"] = "completed"
         ANALYSIS_JOBS[job_id]["progress"] = 100
         ANALYSIS_JOBS[job_id]["result"] = final_result
         ANALYSIS_JOBS[job_id]["eta"] = "완료"
+        checkpoint.clear()
         
     except Exception as e:
         ANALYSIS_JOBS[job_id]["status"] = "error"
@@ -1277,7 +1445,7 @@ async def handle_all_routes(request: Request, path: str = ""):
     
     # 대시보드 (인증된 사용자용 메인 페이지)
     if path == "dashboard":
-        index_path = PUBLIC_DIR / "index.html"
+        index_path = get_public_dir() / "index.html"
         if index_path.exists():
             # 원본 HTML을 읽어서 인증 스크립트 추가
             with open(index_path, 'r', encoding='utf-8') as f:
@@ -1323,7 +1491,7 @@ async def handle_all_routes(request: Request, path: str = ""):
     
     # 정적 파일
     if path.startswith("static/"):
-        file_path = PUBLIC_DIR / path
+        file_path = get_public_dir() / path
         if file_path.exists():
             if path.endswith('.css'):
                 return FileResponse(file_path, media_type="text/css")
@@ -1341,8 +1509,8 @@ async def handle_all_routes(request: Request, path: str = ""):
             "version": "3.0.0",
             "environment": ENVIRONMENT,
             "port": PORT,
-            "base_dir": str(BASE_DIR),
-            "public_dir_exists": PUBLIC_DIR.exists()
+            "base_dir": str(get_base_dir()),
+            "public_dir_exists": get_public_dir().exists()
         }
     
     if path == "api/config":
@@ -1359,8 +1527,8 @@ async def handle_all_routes(request: Request, path: str = ""):
             "system_info": {
                 "environment": ENVIRONMENT,
                 "port": PORT,
-                "base_dir": str(BASE_DIR),
-                "public_dir_exists": PUBLIC_DIR.exists()
+                "base_dir": str(get_base_dir()),
+                "public_dir_exists": get_public_dir().exists()
             },
             "supabase_config": {
                 "url_set": bool(SUPABASE_URL),
@@ -1371,8 +1539,15 @@ async def handle_all_routes(request: Request, path: str = ""):
             "encryption_config": {
                 "jwt_secret_set": bool(JWT_SECRET),
                 "encryption_key_set": bool(ENCRYPTION_KEY),
-                "encryption_key_type": str(type(ENCRYPTION_KEY))
+                "encryption_key_source": "env" if ENCRYPTION_KEY else "derived",
+                "cipher_initialized": get_cipher_suite.cache_info().currsize > 0
             },
+            "auth_cache": token_verifier.cache.stats(),
+            "extraction_cache": document_extractor.cache.stats(),
+            "retrieval_index": chunk_index_store.stats(),
+            "structured_output": structured_metrics.snapshot(),
+            "model_routing": model_router.stats(),
+            "checkpoints": checkpoint_store.stats(),
             "analysis_jobs": {
                 "total_jobs": len(ANALYSIS_JOBS),
                 "job_statuses": {status: len([j for j in ANALYSIS_JOBS.values() if j.get("status") == status]) 
@@ -1384,29 +1559,22 @@ async def handle_all_routes(request: Request, path: str = ""):
     # 로그인 API
     if path == "api/login" and method == "POST":
         try:
-            print(f"🔍 [LOGIN DEBUG] Login request received")
             body = await request.json()
             api_key = body.get("api_key", "").strip()
-            
-            print(f"🔍 [LOGIN DEBUG] Raw API key length: {len(body.get('api_key', ''))}")
-            print(f"🔍 [LOGIN DEBUG] Stripped API key length: {len(api_key)}")
-            print(f"🔍 [LOGIN DEBUG] API key prefix: {api_key[:10] if len(api_key) >= 10 else api_key}...")
+            auth_logger.debug("Login request received", extra={"api_key_length": len(api_key)})
             
             if not api_key:
-                print(f"❌ [LOGIN DEBUG] API key is empty")
+                auth_logger.info("Login rejected: empty API key")
                 return JSONResponse({"success": False, "error": "API key is required"}, status_code=400)
             
             # 기본 길이 검증
             if len(api_key) < 20:
-                print(f"❌ [LOGIN DEBUG] API key too short: {len(api_key)} characters")
+                auth_logger.info("Login rejected: API key too short", extra={"api_key_length": len(api_key)})
                 return JSONResponse({"success": False, "error": "API key too short"}, status_code=401)
             
-            print(f"✅ [LOGIN DEBUG] Basic validation passed")
-            
             # 실제 Gemini API 키 검증
-            print(f"🔍 [LOGIN DEBUG] Starting API key validation...")
             is_valid, validation_message = await validate_gemini_api_key(api_key)
-            print(f"🔍 [LOGIN DEBUG] Validation result: {is_valid}, message: {validation_message}")
+            auth_logger.debug("API key validation result: %s (%s)", is_valid, validation_message)
             
             if not is_valid:
                 return JSONResponse({
@@ -1415,45 +1583,31 @@ async def handle_all_routes(request: Request, path: str = ""):
                 }, status_code=401, headers=cors_headers)
             
             # API 키 직접 사용 (암호화 건너뛰기)
-            print(f"🔍 [LOGIN DEBUG] Skipping encryption - using API key directly")
-            print(f"🔍 [LOGIN DEBUG] Direct API key length: {len(api_key)}")
-            print(f"🔍 [LOGIN DEBUG] Direct API key prefix: {api_key[:15]}...")
-                
             email = f"user_{hashlib.md5(api_key.encode()).hexdigest()[:8]}@mysc.local"
             api_key_hash = hashlib.sha256(api_key.encode()).hexdigest()
-            print(f"🔍 [LOGIN DEBUG] Generated email: {email}")
-            print(f"🔍 [LOGIN DEBUG] API key hash: {api_key_hash[:20]}...")
-            
-            # Supabase 연결 상태 확인
-            print(f"🔍 [SUPABASE DEBUG] SUPABASE_URL: {'✅ Set' if SUPABASE_URL else '❌ Not set'}")
-            print(f"🔍 [SUPABASE DEBUG] SUPABASE_SERVICE_KEY: {'✅ Set' if SUPABASE_SERVICE_KEY else '❌ Not set'}")
             
             # Supabase가 설정된 경우에만 사용자 생성/조회
             user_id = None
             if SUPABASE_URL and SUPABASE_SERVICE_KEY:
-                print(f"🔍 [SUPABASE DEBUG] Attempting Supabase user operations...")
                 try:
-                    print(f"🔍 [SUPABASE DEBUG] Getting user by email: {email}")
                     user = await supabase_client.get_user_by_email(email)
-                    print(f"🔍 [SUPABASE DEBUG] User found: {'✅ Yes' if user else '❌ No'}")
+                    auth_logger.debug("Supabase user lookup", extra={"email": email, "found": bool(user)})
                     
                     if not user:
-                        print(f"🔍 [SUPABASE DEBUG] Creating new user...")
                         user = await supabase_client.create_user(email, api_key_hash)
-                        print(f"🔍 [SUPABASE DEBUG] User created: {'✅ Success' if user else '❌ Failed'}")
+                        auth_logger.debug("Supabase user created", extra={"email": email, "created": bool(user)})
                     
                     user_id = user["id"] if user else None
-                    print(f"🔍 [SUPABASE DEBUG] Final user_id: {user_id}")
                     
                 except Exception as supabase_error:
                     # Supabase 오류 무시하고 계속 진행
-                    print(f"❌ [SUPABASE DEBUG] Supabase error (ignored): {str(supabase_error)}")
-                    print(f"❌ [SUPABASE DEBUG] Error type: {type(supabase_error)}")
+                    auth_logger.warning(
+                        "Supabase error (ignored): %s (%s)", supabase_error, type(supabase_error).__name__
+                    )
                     user_id = email  # 임시 user_id 사용
-                    print(f"🔍 [SUPABASE DEBUG] Using fallback user_id: {user_id}")
             else:
                 # Supabase 없이 임시 user_id 사용
-                print(f"🔍 [SUPABASE DEBUG] Supabase not configured, using email as user_id")
+                auth_logger.debug("Supabase not configured, using email as user_id")
                 user_id = email
             
             token_payload = {
@@ -1473,7 +1627,6 @@ async def handle_all_routes(request: Request, path: str = ""):
                 "validation": validation_message,
                 "debug": {
                     "api_key_length": len(api_key),
-                    "api_key_prefix": api_key[:10] + "...",
                     "token_created": datetime.utcnow().isoformat()
                 }
             }, headers=cors_headers)
@@ -1485,13 +1638,8 @@ async def handle_all_routes(request: Request, path: str = ""):
     if path == "api/conversation/start" and method == "POST":
         try:
             # JWT 토큰에서 API 키 추출
-            auth_header = request.headers.get("Authorization", "")
-            if not auth_header.startswith("Bearer "):
-                return JSONResponse({"success": False, "error": "인증이 필요합니다"}, status_code=401)
-            
-            token = auth_header[7:]
-            payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-            api_key = payload.get("api_key") or decrypt_api_key(payload.get("encrypted_api_key", ""))
+            auth = token_verifier.authenticate(request)
+            api_key = auth.api_key
             
             form = await request.form()
             company_name = form.get("company_name", "Unknown Company")
@@ -1499,7 +1647,7 @@ async def handle_all_routes(request: Request, path: str = ""):
             
             # 파일 정보 처리
             file_info = {"count": len(files), "size_mb": 0}
-            file_contents = []
+            raw_files = []
             
             for file in files:
                 if hasattr(file, 'read'):
@@ -1514,21 +1662,38 @@ async def handle_all_routes(request: Request, path: str = ""):
                             "error": f"파일 '{file.filename}'이 너무 큽니다 (최대 10MB)"
                         }, status_code=413)
                     
-                    file_contents.append({
-                        "name": file.filename,
-                        "content": content.decode('utf-8', errors='ignore')[:1000]  # 첫 1000자만
-                    })
+                    raw_files.append({"name": file.filename, "content": content})
+            
+            # 해시만 전송된 파일은 캐시에서 복원
+            reused, missing = resolve_file_hashes(form.getlist("file_hashes"))
+            if missing:
+                return missing_files_response(missing)
+            file_info["count"] += len(reused)
+            
+            # 포맷별 텍스트 추출 (프로세스 풀, 동일 내용은 캐시 적중)
+            extractions = reused + await document_extractor.extract_many(raw_files)
+            documents, dedup_stats = await asyncio.to_thread(dedupe_extractions, extractions)
+            file_contents = [
+                {
+                    "name": filename,
+                    "content": trim_to_tokens("\n\n".join(pages), PROMPT_BUDGETS["file_content"])
+                }
+                for filename, pages in documents
+            ]
             
             # 1단계: 기본 분석
             basic_analysis = await perform_basic_analysis(api_key, company_name, file_info, file_contents)
             
             conversation_id = hashlib.sha256(f"{company_name}{datetime.now()}".encode()).hexdigest()[:12]
+            await index_project_documents(conversation_id, extractions, documents, auth.user_id)
             
             return {
                 "success": True,
                 "conversation_id": conversation_id,
                 "message": f"{company_name} 기본 분석이 완료되었습니다",
                 "analysis": basic_analysis,
+                "files": describe_files(extractions),
+                "dedup": dedup_stats.to_dict(),
                 "next_options": [
                     {"id": "financial", "title": "재무 상세 분석", "icon": "bar-chart", "description": "매출, 수익성, 재무건전성 분석"},
                     {"id": "market", "title": "시장 경쟁 분석", "icon": "trending-up", "description": "TAM/SAM/SOM, 경쟁사 분석"},
@@ -1540,27 +1705,20 @@ async def handle_all_routes(request: Request, path: str = ""):
                 ]
             }
             
-        except jwt.ExpiredSignatureError:
-            return JSONResponse({"success": False, "error": "토큰이 만료되었습니다"}, status_code=401)
-        except jwt.InvalidTokenError:
-            return JSONResponse({"success": False, "error": "유효하지 않은 토큰입니다"}, status_code=401)
+        except AuthError as auth_error:
+            return auth_error.to_response()
         except Exception as e:
             return JSONResponse({"success": False, "error": str(e)}, status_code=500)
     
     # 대화형 후속 질문 API
     if path == "api/conversation/followup" and method == "POST":
         try:
-            auth_header = request.headers.get("Authorization", "")
-            if not auth_header.startswith("Bearer "):
-                return JSONResponse({"success": False, "error": "인증이 필요합니다"}, status_code=401)
-            
-            token = auth_header[7:]
-            payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-            api_key = payload.get("api_key") or decrypt_api_key(payload.get("encrypted_api_key", ""))
-            user_id = payload.get("user_id")
+            auth = token_verifier.authenticate(request)
+            api_key = auth.api_key
+            user_id = auth.user_id
             
             body = await request.json()
-            project_id = body.get("project_id")
+            project_id = body.get("project_id") or body.get("conversation_id")
             session_id = body.get("session_id")
             question_type = body.get("question_type")
             custom_question = body.get("custom_question", "")
@@ -1583,10 +1741,18 @@ async def handle_all_routes(request: Request, path: str = ""):
             
             await supabase_client.save_message(session_id, "user", question_text)
             
+            # 업로드 문서에서 질문 관련 청크만 검색해 프롬프트에 포함
+            previous_context, sources = retrieve_followup_context(
+                project_id, user_id, question_type, custom_question
+            )
+            
+            financial_metrics = chunk_index_store.get_extra(project_id, "financials", owner=user_id)
+            
             # 후속 분석 수행
             followup_analysis = await perform_followup_analysis(
-                api_key, company_name, question_type, custom_question
+                api_key, company_name, question_type, custom_question, previous_context, financial_metrics
             )
+            followup_analysis["sources"] = sources
             
             # AI 응답 저장
             if followup_analysis:
@@ -1602,63 +1768,30 @@ async def handle_all_routes(request: Request, path: str = ""):
                 "question_type": question_type
             }
             
+        except AuthError as auth_error:
+            return auth_error.to_response()
         except Exception as e:
             return JSONResponse({"success": False, "error": str(e)}, status_code=500)
 
     # 비동기 분석 시작 API
     if path == "api/analyze/start" and method == "POST":
         try:
-            print(f"🔍 [ANALYZE DEBUG] Analysis start request received")
-            auth_header = request.headers.get("Authorization", "")
-            print(f"🔍 [ANALYZE DEBUG] Auth header present: {'✅ Yes' if auth_header else '❌ No'}")
-            
-            if not auth_header.startswith("Bearer "):
-                print(f"❌ [ANALYZE DEBUG] Invalid auth header format")
-                return JSONResponse({"success": False, "error": "인증이 필요합니다"}, status_code=401)
-            
-            token = auth_header[7:]
-            print(f"🔍 [ANALYZE DEBUG] JWT token length: {len(token)}")
-            
-            try:
-                payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-                print(f"✅ [ANALYZE DEBUG] JWT decode successful")
-                print(f"🔍 [ANALYZE DEBUG] Token payload keys: {list(payload.keys())}")
-            except jwt.ExpiredSignatureError:
-                print(f"❌ [ANALYZE DEBUG] JWT token expired")
-                raise
-            except jwt.InvalidTokenError as jwt_error:
-                print(f"❌ [ANALYZE DEBUG] JWT decode failed: {str(jwt_error)}")
-                raise
-            
-            print(f"🔍 [ANALYZE DEBUG] Getting API key directly from JWT...")
             try:
-                api_key = payload.get("api_key")
-                if not api_key:
-                    # 호환성을 위해 기존 암호화된 키도 시도
-                    encrypted_key = payload.get("encrypted_api_key")
-                    if encrypted_key:
-                        print(f"🔍 [ANALYZE DEBUG] Found encrypted key, decrypting...")
-                        api_key = decrypt_api_key(encrypted_key)
-                    else:
-                        raise ValueError("No API key found in token")
-                
-                print(f"✅ [ANALYZE DEBUG] API key obtained successfully")
-                print(f"🔍 [ANALYZE DEBUG] API key length: {len(api_key)}")
-                print(f"🔍 [ANALYZE DEBUG] API key prefix: {api_key[:15] if len(api_key) >= 15 else api_key}...")
-            except Exception as key_error:
-                print(f"❌ [ANALYZE DEBUG] API key retrieval failed: {str(key_error)}")
-                raise key_error
-                
-            user_id = payload.get("user_id")
-            print(f"🔍 [ANALYZE DEBUG] User ID: {user_id}")
+                auth = token_verifier.authenticate(request)
+            except AuthError as auth_error:
+                auth_logger.info("Analysis start rejected: %s", auth_error.message)
+                return auth_error.to_response()
+            
+            api_key = auth.api_key
+            user_id = auth.user_id
+            logger.debug("Analysis start request", extra={"user_id": user_id})
             
             form = await request.form()
             company_name = form.get("company_name", "Unknown Company")
             files = form.getlist("files") if "files" in form else []
             
             # 파일 처리
-            file_contents = []
-            file_names = []
+            raw_files = []
             for file in files:
                 if hasattr(file, 'read'):
                     content = await file.read()
@@ -1670,11 +1803,25 @@ async def handle_all_routes(request: Request, path: str = ""):
                             "error": f"파일 '{file.filename}'이 너무 큽니다 (최대 10MB)"
                         }, status_code=413)
                     
-                    file_names.append(file.filename)
-                    file_contents.append({
-                        "name": file.filename,
-                        "content": content.decode('utf-8', errors='ignore')[:2000]
-                    })
+                    raw_files.append({"name": file.filename, "content": content})
+            
+            # 해시만 전송된 파일은 캐시에서 복원
+            reused, missing = resolve_file_hashes(form.getlist("file_hashes"))
+            if missing:
+                return missing_files_response(missing)
+            
+            # 포맷별 텍스트 추출 (프로세스 풀, 동일 내용은 캐시 적중)
+            extractions = reused + await document_extractor.extract_many(raw_files)
+            documents, dedup_stats = await asyncio.to_thread(dedupe_extractions, extractions)
+            file_names = [extracted.filename for extracted in extractions]
+            file_contents = [
+                {
+                    "name": extracted.filename,
+                    "content": trim_to_tokens("\n\n".join(pages), PROMPT_BUDGETS["file_content"]),
+                    "tables": extracted.tables
+                }
+                for extracted, (_, pages) in zip(extractions, documents)
+            ]
             
             # Supabase에 프로젝트 생성 (Supabase가 설정된 경우에만)
             project_id = None
@@ -1686,32 +1833,131 @@ async def handle_all_routes(request: Request, path: str = ""):
                     )
                     project_id = project["id"] if project else None
                 except Exception as supabase_error:
-                    print(f"Supabase project creation error (ignored): {supabase_error}")
+                    logger.warning("Supabase project creation error (ignored): %s", supabase_error)
                     
             # 프로젝트 ID가 없으면 임시 ID 생성
             if not project_id:
                 import uuid
                 project_id = str(uuid.uuid4())
             
+            # 후속 질문용 청크 인덱스 (잘리지 않은 전체 추출 텍스트 기준)
+            await index_project_documents(project_id, extractions, documents, user_id)
+            
             # 백그라운드 작업 시작 (Supabase가 있으면 Supabase 기반, 없으면 로컬 저장소 기반)
             if SUPABASE_URL and SUPABASE_SERVICE_KEY:
                 asyncio.create_task(run_supabase_analysis(project_id, api_key, company_name, file_contents))
             else:
                 # Supabase 없이 로컬 분석 실행
-                asyncio.create_task(run_local_analysis(project_id, api_key, company_name, file_contents))
+                asyncio.create_task(run_local_analysis(
+                    project_id, api_key, company_name, file_contents, dedup_stats.to_dict()
+                ))
             
             return {
                 "success": True,
                 "project_id": project_id,
                 "job_id": project_id,  # JavaScript 호환성을 위해 job_id도 포함
-                "message": f"{company_name} 분석을 시작했습니다"
+                "message": f"{company_name} 분석을 시작했습니다",
+                "files": describe_files(extractions),
+                "dedup": dedup_stats.to_dict()
             }
             
         except Exception as e:
             return JSONResponse({"success": False, "error": str(e)}, status_code=500)
     
+    # 업로드 캐시 조회 API - 이미 추출된 파일은 해시만 보내고 재업로드 생략
+    if path == "api/files/lookup" and method == "POST":
+        try:
+            token_verifier.authenticate(request)
+            body = await request.json()
+            hashes = [str(h).strip().lower() for h in body.get("hashes", [])]
+            cached = [h for h in hashes if document_extractor.cache.contains(h)]
+            return {
+                "success": True,
+                "cached": cached,
+                "missing": [h for h in hashes if h not in cached]
+            }
+        except AuthError as auth_error:
+            return auth_error.to_response()
+        except Exception as e:
+            return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+
+    # 변화이론 포트폴리오 일괄 생성 API (조직별 결과를 완료 순서대로 NDJSON 스트리밍)
+    if path == "api/theory-of-change/batch" and method == "POST":
+        try:
+            auth = token_verifier.authenticate(request)
+            body = await request.json()
+            organizations = body.get("organizations") or []
+            if not isinstance(organizations, list) or not organizations:
+                return JSONResponse({"success": False, "error": "organizations 목록이 필요합니다"}, status_code=400)
+            if len(organizations) > TOC_BATCH_MAX_ORGANIZATIONS:
+                return JSONResponse({
+                    "success": False,
+                    "error": f"한 번에 최대 {TOC_BATCH_MAX_ORGANIZATIONS}개 조직까지 처리할 수 있습니다"
+                }, status_code=413)
+
+            # genai 의존 모듈은 콜드 스타트에 포함하지 않도록 요청 시점에 로드
+            from .theory_of_change.batch import PortfolioBatchRunner, normalize_organization
+            # 스트리밍 시작 전에 입력 검증, 모든 조직에 로그인한 사용자 키 사용
+            organizations = [normalize_organization(org) for org in organizations if isinstance(org, dict)]
+            runner = PortfolioBatchRunner(auth.api_key)
+
+            async def stream_results():
+                async for record in runner.run(organizations):
+                    yield json.dumps(record, ensure_ascii=False) + "\n"
+                yield json.dumps({"done": True, **runner.stats()}, ensure_ascii=False) + "\n"
+
+            return StreamingResponse(stream_results(), media_type="application/x-ndjson", headers=cors_headers)
+        except AuthError as auth_error:
+            return auth_error.to_response()
+        except ValueError as e:
+            return JSONResponse({"success": False, "error": str(e)}, status_code=400)
+        except Exception as e:
+            return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+
+    # 임팩트 스토리 일괄 생성 API (CSV/NDJSON 제출물 → 스토리 NDJSON 스트리밍, ?ai=1이면 AI 고도화)
+    if path == "api/impact-story/bulk" and method == "POST":
+        try:
+            use_ai = request.query_params.get("ai", "").lower() in ("1", "true", "yes")
+            auth = token_verifier.authenticate(request) if use_ai else token_verifier.authenticate_optional(request)
+            body = await request.body()
+            if len(body) > BULK_STORY_MAX_BYTES:
+                return JSONResponse({
+                    "success": False,
+                    "error": f"요청 본문은 최대 {BULK_STORY_MAX_BYTES} 바이트까지 처리할 수 있습니다"
+                }, status_code=413)
+            text = body.decode("utf-8-sig")
+            if not text.strip():
+                return JSONResponse({"success": False, "error": "CSV 또는 NDJSON 제출물이 필요합니다"}, status_code=400)
+
+            from .impact_story.bulk import BulkStoryGenerator, read_submissions
+            generator = BulkStoryGenerator(
+                auth.api_key if use_ai else None,
+                mode=request.query_params.get("mode") or None,
+            )
+
+            async def stream_stories():
+                async for record in generator.run(read_submissions(io.StringIO(text, newline=""))):
+                    yield json.dumps(record, ensure_ascii=False) + "\n"
+                yield json.dumps({"done": True, **generator.stats()}, ensure_ascii=False) + "\n"
+
+            return StreamingResponse(stream_stories(), media_type="application/x-ndjson", headers=cors_headers)
+        except AuthError as auth_error:
+            return auth_error.to_response()
+        except UnicodeDecodeError:
+            return JSONResponse({"success": False, "error": "UTF-8 텍스트만 처리할 수 있습니다"}, status_code=400)
+        except ValueError as e:
+            return JSONResponse({"success": False, "error": str(e)}, status_code=400)
+        except Exception as e:
+            return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+
     # 분석 상태 확인 API
     if path.startswith("api/analyze/status/") and method == "GET":
+        # 토큰이 함께 오면 검증 (캐시 적중 시 폴링마다 서명 검증 없음)
+        try:
+            token_verifier.authenticate_optional(request)
+        except AuthError as auth_error:
+            return auth_error.to_response()
+        
         job_id = path.split("/")[-1]
         
         if job_id not in ANALYSIS_JOBS:
@@ -1727,6 +1973,8 @@ async def handle_all_routes(request: Request, path: str = ""):
             "eta": job.get("eta", "처리 중..."),
             "company_name": job.get("company_name"),
             "result": job.get("result"),
+            "dedup": job.get("dedup"),
+            "partial": job.get("partial"),
             "error": job.get("error")
         }
 
@@ -1734,13 +1982,8 @@ async def handle_all_routes(request: Request, path: str = ""):
     if path == "api/analyze" and method == "POST":
         try:
             # JWT 토큰에서 API 키 추출
-            auth_header = request.headers.get("Authorization", "")
-            if not auth_header.startswith("Bearer "):
-                return JSONResponse({"success": False, "error": "인증이 필요합니다"}, status_code=401)
-            
-            token = auth_header[7:]  # Remove "Bearer "
-            payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-            api_key = payload.get("api_key") or decrypt_api_key(payload.get("encrypted_api_key", ""))
+            auth = token_verifier.authenticate(request)
+            api_key = auth.api_key
             
             # 폼 데이터 처리
             form = await request.form()
@@ -1784,10 +2027,8 @@ async def handle_all_routes(request: Request, path: str = ""):
                 "analysis": analysis_result
             }
             
-        except jwt.ExpiredSignatureError:
-            return JSONResponse({"success": False, "error": "토큰이 만료되었습니다"}, status_code=401)
-        except jwt.InvalidTokenError:
-            return JSONResponse({"success": False, "error": "유효하지 않은 토큰입니다"}, status_code=401)
+        except AuthError as auth_error:
+            return auth_error.to_response()
         except Exception as e:
             return JSONResponse({"success": False, "error": str(e)}, status_code=500)
     
@@ -0,0 +1,185 @@
+"""
+Structured Logging - 레벨/비동기/샘플링/마스킹을 지원하는 로깅 계층
+요청 경로에서 print() 대신 사용하며, 실제 I/O는 백그라운드 스레드에서 처리합니다.
+
+환경 변수:
+    LOG_LEVEL         전역 로그 레벨 (기본 INFO, 디버그 추적은 DEBUG)
+    LOG_FORMAT        json | text (기본 json)
+    LOG_SAMPLE_RATES  로거별 샘플링 비율 (예: "ir.gemini=0.1,ir.auth=0.5")
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+ROOT_LOGGER_NAME = "ir"
+
+# 로그에 절대 남으면 안 되는 값들 (Gemini API 키, JWT, Bearer 토큰)
+_SECRET_PATTERNS = [
+    re.compile(r"AIza[0-9A-Za-z_\-]{6,}"),
+    re.compile(r"eyJ[0-9A-Za-z_\-]+\.[0-9A-Za-z_\-]+\.[0-9A-Za-z_\-]+"),
+    re.compile(r"(?i)(bearer\s+)[0-9A-Za-z_\-.=]+"),
+]
+_SENSITIVE_FIELDS = {"api_key", "encrypted_api_key", "token", "authorization", "password", "secret"}
+_REDACTED = "[REDACTED]"
+
+# LogRecord 기본 속성 - 이 외의 속성은 extra 필드로 간주
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def redact(value: Any) -> Any:
+    """문자열/딕셔너리에서 비밀 값을 마스킹"""
+    if isinstance(value, str):
+        for pattern in _SECRET_PATTERNS:
+            if pattern.groups:
+                value = pattern.sub(lambda m: m.group(1) + _REDACTED, value)
+            else:
+                value = pattern.sub(_REDACTED, value)
+        return value
+    if isinstance(value, dict):
+        return {
+            k: (_REDACTED if str(k).lower() in _SENSITIVE_FIELDS else redact(v))
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact(v) for v in value)
+    return value
+
+
+class RedactionFilter(logging.Filter):
+    """메시지와 extra 필드의 비밀 값을 큐에 넣기 전에 마스킹"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = redact(record.getMessage())
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = redact(logging.Formatter().formatException(record.exc_info))
+        for key, val in list(vars(record).items()):
+            if key in _RESERVED_ATTRS:
+                continue
+            if key.lower() in _SENSITIVE_FIELDS:
+                setattr(record, key, _REDACTED)
+            else:
+                setattr(record, key, redact(val))
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """로거별 샘플링 - WARNING 이상은 항상 통과"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def _rate_for(self, name: str) -> float:
+        # 가장 구체적인 로거 이름부터 상위로 탐색
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 포맷 (Cloud Logging 구조화 로그 호환)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, val in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = val
+        if record.exc_info:
+            payload["exception"] = redact(self.formatException(record.exc_info))
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _parse_sample_rates(raw: str) -> Dict[str, float]:
+    """"a=0.1,b=0.5" 형식 파싱 (잘못된 항목은 무시)"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        name, _, rate = item.partition("=")
+        try:
+            rates[name.strip()] = max(0.0, min(1.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+def configure_logging(level: Optional[str] = None, stream=None) -> logging.Logger:
+    """루트 로거 구성 (멱등) - QueueHandler로 요청 경로의 I/O를 제거"""
+    global _listener
+
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        if _listener is not None and level is None and stream is None:
+            return root
+
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        level_name = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+        root.setLevel(getattr(logging, level_name, logging.INFO))
+        root.propagate = False
+
+        sink = logging.StreamHandler(stream or sys.stdout)
+        if os.getenv("LOG_FORMAT", "json").lower() == "text":
+            sink.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        else:
+            sink.setFormatter(JsonFormatter())
+
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        # 샘플링을 먼저 적용해 버려질 레코드는 마스킹 비용도 치르지 않음
+        queue_handler.addFilter(SamplingFilter(_parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))))
+        queue_handler.addFilter(RedactionFilter())
+        root.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, sink, respect_handler_level=False)
+        _listener.start()
+        return root
+
+
+def flush_logging() -> None:
+    """큐에 남은 로그를 모두 내보내고 리스너 종료 (프로세스 종료 시 호출)"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(flush_logging)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """"ir." 네임스페이스 하위 로거 반환"""
+    configure_logging()
+    if name == ROOT_LOGGER_NAME or name.startswith(ROOT_LOGGER_NAME + "."):
+        return logging.getLogger(name)
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
@@ -0,0 +1,59 @@
+"""
+에이전트 입력 투영 - 선행 단계 결과 dict 전체 대신 다음 프롬프트가 실제로 보간하는 필드만 전달
+원래의 중첩 구조는 유지하므로 에이전트의 .get() 체인은 그대로 동작하고, 캐시 키도 해당 필드에만 의존합니다.
+"""
+
+import json
+import re
+from typing import Any, Dict, Sequence, Tuple
+
+# 선행 단계 이름 → 남길 경로 목록
+ProjectionSpec = Dict[str, Sequence[Tuple[str, ...]]]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def compact_json(value: Any) -> str:
+    """공백 없는 JSON (한글은 이스케이프하지 않음)"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def compact_value(value: Any) -> Any:
+    """문자열 공백 정리, 목록은 빈 값/중복 제거, 목록 안의 객체는 한 줄 JSON 문자열로"""
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip()
+    if isinstance(value, (list, tuple)):
+        items = []
+        for item in value:
+            item = compact_value(item) if isinstance(item, str) else compact_json(item)
+            if item and item not in items:
+                items.append(item)
+        return items
+    return value
+
+
+def _lookup(data: Any, path: Tuple[str, ...]) -> Tuple[bool, Any]:
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return False, None
+        data = data[key]
+    return True, data
+
+
+def project(spec: ProjectionSpec, upstream: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """spec의 경로만 남긴 선행 결과 (없는 경로는 생략해 에이전트 기본값이 적용되도록)"""
+    projected: Dict[str, Dict[str, Any]] = {}
+    for name, paths in spec.items():
+        source = upstream.get(name)
+        pruned: Dict[str, Any] = {}
+        for path in paths:
+            found, value = _lookup(source, path)
+            if not found:
+                continue
+            node = pruned
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = compact_value(value)
+        projected[name] = pruned
+    return projected
+
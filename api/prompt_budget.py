@@ -0,0 +1,149 @@
+"""
+Prompt Budget - 한국어/영어 혼합 텍스트의 토큰 추정과 섹션별 예산 배분
+문자 수 대신 토큰 기준으로 자르고, 자를 때는 문장 경계를 지킵니다.
+
+Gemini 토크나이저(SentencePiece)를 오프라인에서 쓸 수 없어 문자 종류별 비율로 근사합니다.
+한글 음절은 평균 0.8토큰, 영어 단어는 4자당 1토큰, 숫자는 3자리당 1토큰, 기호는 1토큰으로 계산합니다.
+"""
+
+import math
+import re
+from typing import Dict, List, Optional
+
+HANGUL_TOKENS_PER_SYLLABLE = 0.8
+ELLIPSIS = "…"
+
+_TOKEN_CLASSES = re.compile(
+    r"(?P<hangul>[가-힣ㄱ-ㅎㅏ-ㅣ]+)|(?P<latin>[A-Za-z]+)|(?P<digits>\d+)|(?P<space>\s+)|(?P<other>.)",
+    re.S,
+)
+# 문장부호 뒤 공백 또는 줄바꿈이 자를 수 있는 위치
+_BOUNDARY = re.compile(r"(?<=[.!?。…])\s+|\n+")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """혼합 텍스트 토큰 수 근사"""
+    if not text:
+        return 0
+    hangul = 0
+    total = 0
+    for match in _TOKEN_CLASSES.finditer(text):
+        kind = match.lastgroup
+        length = match.end() - match.start()
+        if kind == "hangul":
+            hangul += length
+        elif kind == "latin":
+            total += math.ceil(length / 4)
+        elif kind == "digits":
+            total += math.ceil(length / 3)
+        elif kind == "other":
+            total += 1
+    return total + math.ceil(hangul * HANGUL_TOKENS_PER_SYLLABLE)
+
+
+def _segments(text: str) -> List[str]:
+    """문장/줄 단위 조각 (구분 공백은 앞 조각에 포함해 이어 붙이면 원문 복원)"""
+    segments, start = [], 0
+    for match in _BOUNDARY.finditer(text):
+        segments.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        segments.append(text[start:])
+    return segments
+
+
+def _cut_words(text: str, max_tokens: int, from_end: bool = False) -> str:
+    """문장 하나가 예산보다 길 때 - 공백 경계 기준 이분 탐색 (from_end면 뒤쪽을 남김)"""
+    words = re.split(r"(?<=\s)", text)
+    keep = (lambda n: words[len(words) - n:]) if from_end else (lambda n: words[:n])
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens("".join(keep(middle))) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    if low == 0:
+        # 공백 없는 긴 토막 - 문자 단위로 자름
+        chars = max(1, int(max_tokens / HANGUL_TOKENS_PER_SYLLABLE))
+        return text[-chars:] if from_end else text[:chars]
+    return "".join(keep(low))
+
+
+def trim_to_tokens(text: Optional[str], max_tokens: int, ellipsis: str = ELLIPSIS) -> str:
+    """토큰 예산 안에서 문장 경계까지만 남김 (잘렸으면 말줄임표 추가)"""
+    text = text or ""
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - estimate_tokens(ellipsis)
+    kept, used = [], 0
+    for segment in _segments(text):
+        cost = estimate_tokens(segment)
+        if used + cost > budget:
+            if not kept:
+                kept.append(_cut_words(segment, budget))
+            break
+        kept.append(segment)
+        used += cost
+    return "".join(kept).rstrip() + ellipsis
+
+
+def trim_middle(text: Optional[str], max_tokens: int, marker: str = "\n" + ELLIPSIS + "\n") -> str:
+    """앞부분과 뒷부분을 예산 절반씩 남기고 가운데를 생략
+    지시/자료가 앞에, 출력 형식 예시가 끝에 오는 프롬프트를 줄일 때 양쪽을 모두 보존"""
+    text = text or ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - estimate_tokens(marker)
+    if budget <= 0:
+        return trim_to_tokens(text, max_tokens)
+    tail_budget = budget // 2
+    tail, used = [], 0
+    for segment in reversed(_segments(text)):
+        cost = estimate_tokens(segment)
+        if used + cost > tail_budget:
+            if not tail:
+                tail.append(_cut_words(segment, tail_budget, from_end=True))
+            break
+        tail.append(segment)
+        used += cost
+    tail_text = "".join(reversed(tail)).lstrip()
+    head = trim_to_tokens(text[:len(text) - len(tail_text)], budget - estimate_tokens(tail_text), ellipsis="")
+    return head.rstrip() + marker + tail_text
+
+
+def allocate(sections: Dict[str, str], total_tokens: int, weights: Optional[Dict[str, float]] = None) -> Dict[str, str]:
+    """섹션별 예산 배분 후 각 섹션을 문장 경계에서 자름
+    예산보다 짧은 섹션이 남긴 토큰은 긴 섹션에 가중치 비율로 재분배합니다."""
+    weights = weights or {}
+    needs = {name: estimate_tokens(text) for name, text in sections.items()}
+    budgets: Dict[str, int] = {}
+    pending = dict(needs)
+    remaining = total_tokens
+    while pending:
+        weight_sum = sum(weights.get(name, 1.0) for name in pending) or 1.0
+        shares = {name: remaining * weights.get(name, 1.0) / weight_sum for name in pending}
+        satisfied = [name for name, need in pending.items() if need <= shares[name]]
+        if not satisfied:
+            for name in pending:
+                budgets[name] = int(shares[name])
+            break
+        for name in satisfied:
+            budgets[name] = pending.pop(name)
+            remaining -= budgets[name]
+    return {name: trim_to_tokens(text, budgets[name]) for name, text in sections.items()}
+
+
+def fit_documents(files: List[Dict[str, str]], total_tokens: int, header: str = "=== {name} ===\n") -> str:
+    """여러 파일 내용을 하나의 예산 안에 배분해 합침 (짧은 파일이 남긴 예산은 긴 파일로)"""
+    if not files:
+        return ""
+    headers = [header.format(name=f.get("name", "")) for f in files]
+    overhead = sum(estimate_tokens(h) for h in headers)
+    contents = allocate(
+        {str(index): f.get("content") or "" for index, f in enumerate(files)},
+        max(0, total_tokens - overhead),
+    )
+    return "\n\n".join(h + contents[str(index)] for index, h in enumerate(headers))
@@ -0,0 +1,14 @@
+"""
+투자 보고서 후처리 모듈
+Gemini가 생성한 마크다운 보고서를 목차 트리로 파싱해 표준 섹션별 본문을 제공합니다.
+스트리밍 응답은 조각 단위로 받아 완성된 섹션부터 바로 내보내고, 점수/추천/리스크 신호는 한 번의 스캔으로 추출합니다.
+"""
+
+from .sections import REPORT_SECTIONS, ReportOutline, Section, normalize_title, split_report
+from .signals import ReportSignals, extract_signals
+from .stream import ReportEvent, StreamingReportParser
+
+__all__ = [
+    'REPORT_SECTIONS', 'ReportEvent', 'ReportOutline', 'ReportSignals', 'Section', 'StreamingReportParser',
+    'extract_signals', 'normalize_title', 'split_report'
+]
@@ -0,0 +1,155 @@
+"""
+보고서 섹션 파서 - Gemini 마크다운 응답을 한 번의 스캔으로 목차 트리로 변환
+제목(#/##/###, 로마 숫자/번호 목차, 굵은 글씨 제목)의 위치만 기록하고, 본문은 필요할 때 오프셋으로 잘라냅니다.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_ROMAN_VALUES = {"I": 1, "V": 5, "X": 10}
+
+# 줄 단위 제목 패턴 하나로 전체 텍스트를 한 번만 훑음 (코드 블록 경계도 함께 인식, 스트리밍 파서와 공유)
+HEADING = re.compile(
+    r"^[ \t]*(?:"
+    r"(?P<fence>```)[^\n]*"
+    r"|(?P<hashes>#{1,6})[ \t]+(?P<md>[^\n]+?)[ \t#]*"
+    r"|\*\*(?P<bold>[^*\n]+?)\*\*[ \t]*:?"
+    r"|(?P<roman>(?=[IVX])X{0,3}(?:IX|IV|V?I{0,3})\.[ \t]+[^\n]{1,80}?)"
+    r")[ \t]*$",
+    re.M,
+)
+_NUMBERING = re.compile(r"^(?:(?P<roman>(?=[IVX])X{0,3}(?:IX|IV|V?I{0,3}))|(?P<arabic>\d{1,2}))[.)][ \t]*")
+_NORMALIZE = re.compile(r"[\s*_`]+")
+
+# 표준 보고서 섹션 (키, 제목 별칭) - 두 보고서 경로의 목차 번호가 달라 제목 키워드로 대응
+REPORT_SECTIONS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("executive_summary", ("executivesummary", "요약")),
+    ("investment_overview", ("투자개요",)),
+    ("company_status", ("기업현황",)),
+    ("market_analysis", ("시장분석",)),
+    ("business_model", ("사업분석", "businessmodel")),
+    ("investment_fit", ("투자적합성", "임팩트")),
+    ("financial_analysis", ("손익추정", "수익성")),
+    ("conclusion", ("종합결론", "결론")),
+)
+
+
+def roman_to_int(numeral: str) -> int:
+    """로마 숫자 → 정수 (I~XXXIX)"""
+    total = 0
+    for current, following in zip(numeral, numeral[1:] + " "):
+        value = _ROMAN_VALUES[current]
+        total += -value if _ROMAN_VALUES.get(following, 0) > value else value
+    return total
+
+
+def normalize_title(title: str) -> str:
+    """목차 번호, 공백, 마크다운 기호를 뺀 소문자 제목"""
+    return _NORMALIZE.sub("", _NUMBERING.sub("", title.strip("* ")).lower())
+
+
+@dataclass
+class Section:
+    """제목 하나와 본문 범위 (start~end는 원문 오프셋, 하위 섹션 포함)"""
+    title: str
+    level: int
+    number: Optional[int]
+    heading_start: int
+    start: int
+    end: int = -1
+    roman: bool = False  # 로마 숫자 목차 여부 (대목차 판단용)
+    children: List["Section"] = field(default_factory=list)
+
+    def content(self, text: str) -> str:
+        return text[self.start:self.end].strip()
+
+
+def parse_heading(match: "re.Match[str]") -> Tuple[str, int, Optional[int], bool]:
+    """(제목, 레벨, 목차 번호, 로마 숫자 여부) - # 개수가 없으면 로마 숫자 1, 아라비아 숫자 2, 그 외 3레벨"""
+    title = (match.group("md") or match.group("bold") or match.group("roman")).strip().strip("*").strip()
+    numbering = _NUMBERING.match(title)
+    number = None
+    roman = bool(numbering and numbering.group("roman"))
+    if roman:
+        number = roman_to_int(numbering.group("roman"))
+    elif numbering:
+        number = int(numbering.group("arabic"))
+
+    if match.group("hashes"):
+        level = len(match.group("hashes"))
+    elif roman:
+        level = 1
+    elif numbering:
+        level = 2
+    else:
+        level = 3
+    return title, level, number, roman
+
+
+class ReportOutline:
+    """마크다운 보고서의 목차 트리"""
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self.roots: List[Section] = []
+        self.headings: List[Section] = []  # 문서 순서
+        self._parse()
+
+    def _parse(self) -> None:
+        stack: List[Section] = []
+        in_fence = False
+        for match in HEADING.finditer(self.text):
+            if match.group("fence"):
+                in_fence = not in_fence
+                continue
+            if in_fence:
+                continue
+            title, level, number, roman = parse_heading(match)
+            # 같거나 더 높은 레벨의 제목이 나오면 열린 섹션을 닫음
+            while stack and stack[-1].level >= level:
+                stack.pop().end = match.start()
+            section = Section(title, level, number, match.start(), match.end(), roman=roman)
+            (stack[-1].children if stack else self.roots).append(section)
+            stack.append(section)
+            self.headings.append(section)
+        for section in stack:
+            section.end = len(self.text)
+
+    @property
+    def preamble(self) -> str:
+        """첫 제목 이전의 텍스트"""
+        end = self.headings[0].heading_start if self.headings else len(self.text)
+        return self.text[:end].strip()
+
+    def major_sections(self) -> List[Section]:
+        """대목차 후보 - 로마 숫자 목차가 있으면 그 레벨 이하, 없으면 가장 얕은 레벨의 제목"""
+        if not self.headings:
+            return []
+        numbered = [s.level for s in self.headings if s.roman]
+        major_level = min(numbered) if numbered else min(s.level for s in self.headings)
+        return [s for s in self.headings if s.level <= major_level]
+
+    def split(self, spec: Iterable[Tuple[str, Sequence[str]]] = REPORT_SECTIONS) -> Dict[str, str]:
+        """표준 섹션 키별 본문 - 대목차 제목을 별칭과 대응시키고, 다음 대목차 직전까지를 본문으로 사용"""
+        spec = list(spec)
+        result = {key: "" for key, _ in spec}
+        majors = self.major_sections()
+        matched = set()
+        for index, section in enumerate(majors):
+            title = normalize_title(section.title)
+            key = next(
+                (key for key, aliases in spec if key not in matched and any(alias in title for alias in aliases)),
+                None,
+            )
+            if key is None:
+                continue
+            matched.add(key)
+            end = majors[index + 1].heading_start if index + 1 < len(majors) else len(self.text)
+            result[key] = self.text[section.start:end].strip()
+        return result
+
+
+def split_report(text: str, spec: Iterable[Tuple[str, Sequence[str]]] = REPORT_SECTIONS) -> Dict[str, str]:
+    """보고서 텍스트 → 표준 섹션 키별 본문"""
+    return ReportOutline(text).split(spec)
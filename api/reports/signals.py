@@ -0,0 +1,96 @@
+"""
+보고서 신호 추출 - 투자 점수, 추천 등급, 리스크 수준 키워드를 하나의 정규식으로 한 번에 탐색
+모듈 로드 시 한 번만 컴파일하고, 보고서 전체를 lower() 복사하지 않고 대소문자 무시로 훑습니다.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+# 추천 등급 라벨과 그 뒤의 값 ("- 투자 추천: Hold") - 프롬프트가 요구하는 형식이라 본문 키워드보다 우선
+# 스트리밍 파서와 공유하는 패턴 조각 (일괄/스트리밍 경로가 같은 값을 찾도록)
+RECOMMENDATION_LABEL = (
+    r"(?:투자\s*추천(?:\s*의견)?|투자\s*의견|추천\s*등급|recommendation)\**\s*[:：]\s*\**\s*"
+    r"(?P<grade>strong\s*buy|buy|hold|sell|강력\s*매수|매수|보유|중립|매도)"
+)
+_GRADES = {"strongbuy": "Strong Buy", "강력매수": "Strong Buy", "buy": "Buy", "매수": "Buy",
+           "hold": "Hold", "보유": "Hold", "중립": "Hold", "sell": "Sell", "매도": "Sell"}
+
+
+# 투자 점수 ("8.2/10" 또는 "8점") - 날짜/소수점 뒤 숫자는 점수로 보지 않음, 10 초과 값은 호출 측에서 제외
+SCORE_PATTERN = (
+    r"(?<![\d.])(?:(?P<score_10>\d{1,2}(?:\.\d+)?)\s*/\s*10(?!\d)|(?P<score_points>\d{1,2}(?:\.\d+)?)\s*점)"
+)
+
+
+def normalize_grade(grade: str) -> str:
+    """등급 표기 → 표준 등급 (Strong Buy/Buy/Hold/Sell)"""
+    return _GRADES[re.sub(r"\s+", "", grade.lower())]
+
+
+# 모든 신호를 이름 있는 그룹의 단일 패턴으로 결합 (앞선 대안이 우선: Strong Buy가 Buy로 잡히지 않음)
+# 맨 앞 문자 집합 lookahead로 신호가 시작될 수 없는 위치는 대안을 시도하지 않고 건너뜀
+_SIGNALS = re.compile(
+    r"(?=[\dsbhlr강매투추높낮])(?:"
+    rf"(?P<labeled>{RECOMMENDATION_LABEL})"
+    rf"|{SCORE_PATTERN}"
+    r"|(?P<strong_buy>strong\s*buy|강력\s*매수)"
+    r"|(?P<buy>(?<![a-z])buy(?![a-z])|매수)"
+    r"|(?P<sell>(?<![a-z])sell(?![a-z])|매도)"
+    r"|(?P<high_risk>high\s*risk|높은\s*리스크)"
+    r"|(?P<low_risk>low\s*risk|낮은\s*리스크))",
+    re.I,
+)
+
+@dataclass
+class ReportSignals:
+    """보고서에서 찾은 신호 (점수와 라벨 등급은 처음 나온 값, 키워드는 등장 횟수)"""
+    score: Optional[float] = None
+    grade: Optional[str] = None
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    def has(self, kind: str) -> bool:
+        return self.counts.get(kind, 0) > 0
+
+    def recommendation(self, default: str = "Hold", strong: bool = True) -> str:
+        """추천 등급 - 라벨 값이 있으면 우선, strong=False면 Strong Buy도 Buy로 표시"""
+        if self.grade:
+            return "Buy" if self.grade == "Strong Buy" and not strong else self.grade
+        if self.has("strong_buy"):
+            return "Strong Buy" if strong else "Buy"
+        if self.has("buy"):
+            return "Buy"
+        if self.has("sell"):
+            return "Sell"
+        return default
+
+    def risk_level(self, default: str = "Medium") -> str:
+        if self.has("high_risk"):
+            return "High"
+        if self.has("low_risk"):
+            return "Low"
+        return default
+
+
+def extract_signals(text: Optional[str]) -> ReportSignals:
+    """보고서를 한 번 훑어 모든 신호 수집 ('X/10' 점수 우선, 없으면 10 이하의 'X점')"""
+    signals = ReportSignals()
+    points: Optional[float] = None
+    for match in _SIGNALS.finditer(text or ""):
+        kind = match.lastgroup
+        if kind in ("score_10", "score_points"):
+            value = float(match.group(kind))
+            if value > 10:
+                continue
+            if kind == "score_10" and signals.score is None:
+                signals.score = value
+            elif kind == "score_points" and points is None:
+                points = value
+        elif kind == "labeled":
+            if signals.grade is None:
+                signals.grade = normalize_grade(match.group("grade"))
+        else:
+            signals.counts[kind] = signals.counts.get(kind, 0) + 1
+    if signals.score is None:
+        signals.score = points
+    return signals
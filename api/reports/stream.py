@@ -0,0 +1,159 @@
+"""
+스트리밍 보고서 파서 - Gemini 스트리밍 응답 조각을 받는 즉시 섹션/투자 점수/추천 등급 이벤트로 변환
+조각마다 새로 완성된 줄만 검사하므로 조각 길이에 비례하는 작업만 합니다.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .sections import HEADING, REPORT_SECTIONS, normalize_title, parse_heading
+from .signals import RECOMMENDATION_LABEL, SCORE_PATTERN, normalize_grade
+
+_SCORE = re.compile(SCORE_PATTERN)
+_RECOMMENDATION = re.compile(RECOMMENDATION_LABEL, re.I)
+
+
+@dataclass
+class ReportEvent:
+    """스트리밍 중 발생한 이벤트 (section_start, section, score, recommendation)"""
+    type: str
+    key: Optional[str] = None
+    title: Optional[str] = None
+    content: Optional[str] = None
+    value: Any = None
+    progress: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in self.__dict__.items() if v is not None}
+
+
+class StreamingReportParser:
+    """보고서 조각을 순서대로 받아 완성된 섹션을 바로 내보내는 파서
+    대목차 판단은 지금까지 본 제목 기준 (로마 숫자 목차의 가장 얕은 레벨, 없으면 가장 얕은 레벨)"""
+
+    def __init__(self, spec: Iterable[Tuple[str, Sequence[str]]] = REPORT_SECTIONS):
+        self.spec = list(spec)
+        self.sections: Dict[str, str] = {key: "" for key, _ in self.spec}
+        self.investment_score: Optional[float] = None
+        self._points: Optional[float] = None  # 'X/10'이 끝내 없을 때 쓸 첫 'X점'
+        self.recommendation: Optional[str] = None
+        self.completed = 0
+        self._chunks: List[str] = []
+        self._partial_line: List[str] = []
+        self._current: Optional[Tuple[str, str]] = None  # (키, 제목)
+        self._body: List[str] = []
+        self._matched = set()
+        self._roman_level: Optional[int] = None
+        self._min_level: Optional[int] = None
+        self._in_fence = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    @property
+    def progress(self) -> float:
+        return self.completed / len(self.spec) if self.spec else 1.0
+
+    def feed(self, chunk: str) -> List[ReportEvent]:
+        """조각 하나 처리 - 이번 조각으로 완성된 줄에서 나온 이벤트 반환"""
+        if not chunk:
+            return []
+        self._chunks.append(chunk)
+        if "\n" not in chunk:
+            self._partial_line.append(chunk)
+            return []
+        head, _, tail = chunk.rpartition("\n")
+        self._partial_line.append(head)
+        lines = "".join(self._partial_line).split("\n")
+        self._partial_line = [tail] if tail else []
+        events: List[ReportEvent] = []
+        for line in lines:
+            self._line(line, events)
+        return events
+
+    def close(self) -> List[ReportEvent]:
+        """스트림 종료 - 남은 줄과 마지막 섹션을 마무리"""
+        events: List[ReportEvent] = []
+        if self._partial_line:
+            self._line("".join(self._partial_line), events)
+            self._partial_line = []
+        self._finish_section(events)
+        if self.investment_score is None and self._points is not None:
+            self.investment_score = self._points
+            events.append(ReportEvent("score", value=self.investment_score, progress=self.progress))
+        return events
+
+    def snapshot(self) -> Dict[str, Any]:
+        """작업 상태에 넣을 부분 결과"""
+        return {
+            "sections": {key: content for key, content in self.sections.items() if content},
+            "current_section": self._current[0] if self._current else None,
+            "investment_score": self.investment_score,
+            "recommendation": self.recommendation,
+            "progress": round(self.progress, 3),
+        }
+
+    def _line(self, line: str, events: List[ReportEvent]) -> None:
+        if line.lstrip().startswith("```"):
+            self._in_fence = not self._in_fence
+        elif not self._in_fence:
+            match = HEADING.match(line)
+            if match and not match.group("fence") and self._heading(match, events):
+                return
+            self._signals(line, events)
+        if self._current:
+            self._body.append(line)
+
+    def _heading(self, match: "re.Match[str]", events: List[ReportEvent]) -> bool:
+        """대목차면 이전 섹션을 닫고 True (본문에 넣지 않음)"""
+        title, level, _, roman = parse_heading(match)
+        if roman:
+            self._roman_level = level if self._roman_level is None else min(self._roman_level, level)
+        self._min_level = level if self._min_level is None else min(self._min_level, level)
+        major_level = self._roman_level if self._roman_level is not None else self._min_level
+        if level > major_level:
+            return False
+
+        self._finish_section(events)
+        normalized = normalize_title(title)
+        key = next(
+            (key for key, aliases in self.spec if key not in self._matched and any(a in normalized for a in aliases)),
+            None,
+        )
+        if key is not None:
+            self._matched.add(key)
+            self._current = (key, title)
+            events.append(ReportEvent("section_start", key=key, title=title, progress=self.progress))
+        return True
+
+    def _finish_section(self, events: List[ReportEvent]) -> None:
+        if self._current is None:
+            return
+        key, title = self._current
+        self.sections[key] = "\n".join(self._body).strip()
+        self.completed += 1
+        events.append(ReportEvent("section", key=key, title=title, content=self.sections[key], progress=self.progress))
+        self._current = None
+        self._body = []
+
+    def _signals(self, line: str, events: List[ReportEvent]) -> None:
+        """투자 점수와 추천 등급은 처음 나온 값 사용 (extract_signals와 같은 규칙: 'X/10'은 즉시, 'X점'은 종료 시 대체값)"""
+        if self.investment_score is None:
+            for score in _SCORE.finditer(line):
+                kind = score.lastgroup
+                value = float(score.group(kind))
+                if value > 10:
+                    continue
+                if kind == "score_10":
+                    self.investment_score = value
+                    events.append(ReportEvent("score", value=value, progress=self.progress))
+                    break
+                if self._points is None:
+                    self._points = value
+        if self.recommendation is None:
+            grade = _RECOMMENDATION.search(line)
+            if grade:
+                self.recommendation = normalize_grade(grade.group("grade"))
+                events.append(ReportEvent("recommendation", value=self.recommendation, progress=self.progress))
@@ -0,0 +1,14 @@
+"""
+IR 문서 검색 모듈
+업로드된 문서를 청크 단위로 나눠 근접 중복을 제거하고, BM25 인덱스로 후속 질문에 관련 발췌만 제공합니다.
+"""
+
+from .bm25 import BM25Index, Chunk, chunk_pages
+from .dedup import DedupStats, NearDuplicateFilter, estimate_tokens
+from .store import ChunkIndexStore, format_chunks
+from .tokenizer import tokenize
+
+__all__ = [
+    'BM25Index', 'Chunk', 'ChunkIndexStore', 'DedupStats', 'NearDuplicateFilter',
+    'chunk_pages', 'estimate_tokens', 'format_chunks', 'tokenize'
+]
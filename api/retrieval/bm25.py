@@ -0,0 +1,129 @@
+"""
+BM25 청크 인덱스 - 업로드된 IR 문서를 청크로 나눠 역색인 구성
+후속 질문마다 전체 문서 대신 관련도 상위 k개 청크만 프롬프트에 넣습니다.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .tokenizer import tokenize
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?다요])\s+")
+
+
+@dataclass
+class Chunk:
+    """검색 단위 - 파일명/페이지를 함께 보관해 출처 표시에 사용"""
+    chunk_id: int
+    filename: str
+    page: Optional[int]
+    text: str
+
+
+def _split_long(paragraph: str, chunk_size: int) -> List[str]:
+    """청크 크기를 넘는 문단은 문장 경계에서 분할"""
+    if len(paragraph) <= chunk_size:
+        return [paragraph]
+    parts, current = [], ""
+    for sentence in _SENTENCE_SPLIT.split(paragraph):
+        while len(sentence) > chunk_size:
+            # 문장 부호 없는 긴 표 행 등은 강제로 자름
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(sentence[:chunk_size])
+            sentence = sentence[chunk_size:]
+        if current and len(current) + len(sentence) + 1 > chunk_size:
+            parts.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_paragraphs(page: str, chunk_size: int = 600) -> List[str]:
+    """페이지를 문단 단위로 분할 (chunk_size 를 넘는 문단은 문장 경계에서 분할)"""
+    return [
+        piece
+        for paragraph in _PARAGRAPH_SPLIT.split(page or "")
+        if paragraph.strip()
+        for piece in _split_long(paragraph.strip(), chunk_size)
+    ]
+
+
+def chunk_pages(filename: str, pages: Iterable[str], chunk_size: int = 600) -> List[Tuple[str, Optional[int], str]]:
+    """페이지 목록을 (파일명, 페이지 번호, 텍스트) 청크로 변환 - 문단을 chunk_size 까지 합침"""
+    chunks = []
+    for page_number, page in enumerate(pages, start=1):
+        current = ""
+        for piece in split_paragraphs(page, chunk_size):
+            if current and len(current) + len(piece) + 1 > chunk_size:
+                chunks.append((filename, page_number, current))
+                current = piece
+            else:
+                current = f"{current}\n{piece}" if current else piece
+        if current:
+            chunks.append((filename, page_number, current))
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 역색인"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.chunks: List[Chunk] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths: List[int] = []
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def add(self, filename: str, page: Optional[int], text: str) -> None:
+        chunk_id = len(self.chunks)
+        terms = Counter(tokenize(text))
+        self.chunks.append(Chunk(chunk_id, filename, page, text))
+        length = sum(terms.values())
+        self._lengths.append(length)
+        self._total_length += length
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, []).append((chunk_id, frequency))
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self.chunks) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[Chunk, float]]:
+        """질의와 관련도 높은 청크 상위 top_k (점수 0인 청크 제외)"""
+        if not self.chunks:
+            return []
+        avg_length = self._total_length / len(self.chunks) or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for chunk_id, frequency in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(self.chunks[chunk_id], score) for chunk_id, score in best if score > 0]
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Tuple[str, Iterable[str]]], chunk_size: int = 600) -> "BM25Index":
+        """(파일명, 페이지 목록) 들로 인덱스 구성"""
+        index = cls()
+        for filename, pages in documents:
+            for name, page, text in chunk_pages(filename, pages, chunk_size):
+                index.add(name, page, text)
+        return index
@@ -0,0 +1,165 @@
+"""
+근접 중복 제거 - 문자 shingle MinHash + LSH 밴딩으로 반복 슬라이드/청크를 프롬프트 전에 제거
+여러 IR 파일에 반복되는 표지, 연락처, 면책 조항 같은 내용을 한 번만 남깁니다.
+numpy는 콜드 스타트에 영향을 주지 않도록 첫 중복 제거 시점에 import합니다.
+"""
+
+import os
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ..prompt_budget import estimate_tokens
+from .bm25 import split_paragraphs
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WHITESPACE = re.compile(r"\s+")
+
+
+def shingles(text: str, size: int = 5) -> "np.ndarray":
+    """공백 정규화 후 문자 n-gram 해시 집합 (CRC32, 프로세스 간 안정적)"""
+    import numpy as np
+
+    normalized = _WHITESPACE.sub(" ", text.lower()).strip()
+    if len(normalized) <= size:
+        return np.array([zlib.crc32(normalized.encode())], dtype=np.uint64)
+    hashed = {zlib.crc32(normalized[i:i + size].encode()) for i in range(len(normalized) - size + 1)}
+    return np.fromiter(hashed, dtype=np.uint64, count=len(hashed))
+
+
+class MinHasher:
+    """고정 시드 순열로 MinHash 서명 계산 - 순열 전체를 한 번의 브로드캐스트 연산으로 처리"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        import numpy as np
+
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_hashes: "np.ndarray") -> "np.ndarray":
+        import numpy as np
+
+        # (a * x + b) mod p - x, a, b 모두 32비트라 uint64 연산이 넘치지 않음
+        permuted = (np.outer(shingle_hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0)
+
+
+@dataclass
+class DedupStats:
+    """작업별 중복 제거 결과 (응답/작업 상태에 포함)"""
+    chunks_total: int = 0
+    chunks_removed: int = 0
+    chars_saved: int = 0
+    tokens_saved: int = 0
+    duplicates: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "chunks_total": self.chunks_total,
+            "chunks_removed": self.chunks_removed,
+            "chars_saved": self.chars_saved,
+            "tokens_saved": self.tokens_saved,
+            "duplicates": self.duplicates,
+        }
+
+
+class NearDuplicateFilter:
+    """청크 순서대로 처음 등장한 내용만 남기는 근접 중복 필터"""
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        chunk_size: int = 600,
+        min_chars: int = 20,
+    ):
+        self.threshold = threshold or float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.chunk_size = chunk_size
+        self.min_chars = min_chars  # 짧은 제목 한 줄 등은 비교 대상에서 제외
+        self.num_perm = num_perm
+        self._hasher: Optional[MinHasher] = None
+
+    @property
+    def hasher(self) -> MinHasher:
+        # 모듈 수준 인스턴스가 import 시점에 numpy를 끌어오지 않도록 첫 사용 때 생성
+        if self._hasher is None:
+            self._hasher = MinHasher(self.num_perm)
+        return self._hasher
+
+    def _band_keys(self, signature: "np.ndarray") -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def filter_texts(self, texts: List[str]) -> Tuple[List[bool], List[Tuple[int, int, float]]]:
+        """각 텍스트의 유지 여부와 (중복 인덱스, 원본 인덱스, 추정 유사도) 목록"""
+        keep = [True] * len(texts)
+        duplicates = []
+        buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        signatures: Dict[int, "np.ndarray"] = {}
+        for index, text in enumerate(texts):
+            if len(text.strip()) < self.min_chars:
+                continue
+            signature = self.hasher.signature(shingles(text, self.shingle_size))
+            keys = [(band, key) for band, key in enumerate(self._band_keys(signature))]
+            candidates = {other for key in keys for other in buckets.get(key, ())}
+            best = max(
+                ((other, float((signatures[other] == signature).mean())) for other in candidates),
+                key=lambda item: item[1],
+                default=None,
+            )
+            if best is not None and best[1] >= self.threshold:
+                keep[index] = False
+                duplicates.append((index, best[0], best[1]))
+                continue
+            signatures[index] = signature
+            for key in keys:
+                buckets.setdefault(key, []).append(index)
+        return keep, duplicates
+
+    def dedupe_documents(
+        self, documents: List[Tuple[str, List[str]]]
+    ) -> Tuple[List[Tuple[str, List[str]]], DedupStats]:
+        """(파일명, 페이지 목록) → 중복 문단을 뺀 (파일명, 페이지 목록)과 절감 통계
+        고유한 내용이 함께 버려지지 않도록 검색용 청크보다 작은 문단 단위로 비교"""
+        chunks = [
+            (doc_index, page_number, text)
+            for doc_index, (_, pages) in enumerate(documents)
+            for page_number, page in enumerate(pages, start=1)
+            for text in split_paragraphs(page, self.chunk_size)
+        ]
+        keep, duplicates = self.filter_texts([text for _, _, text in chunks])
+
+        stats = DedupStats(chunks_total=len(chunks), chunks_removed=len(duplicates))
+        for index, original, similarity in duplicates:
+            text = chunks[index][2]
+            stats.chars_saved += len(text)
+            stats.tokens_saved += estimate_tokens(text)
+            if len(stats.duplicates) < 20:
+                stats.duplicates.append({
+                    "file": documents[chunks[index][0]][0],
+                    "page": chunks[index][1],
+                    "duplicate_of": {"file": documents[chunks[original][0]][0], "page": chunks[original][1]},
+                    "similarity": round(similarity, 3),
+                })
+
+        # 남은 청크로 파일별 페이지 재구성 (전부 중복인 페이지는 제거)
+        pages_by_doc: List[Dict[int, List[str]]] = [{} for _ in documents]
+        for (doc_index, page, text), kept in zip(chunks, keep):
+            if kept:
+                pages_by_doc[doc_index].setdefault(page, []).append(text)
+        deduped = [
+            (filename, ["\n\n".join(parts) for _, parts in sorted(pages_by_doc[doc_index].items())])
+            for doc_index, (filename, _) in enumerate(documents)
+        ]
+        return deduped, stats
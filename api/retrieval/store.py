@@ -0,0 +1,106 @@
+"""
+프로젝트별 인덱스 저장소 - 업로드 시 구성한 BM25 인덱스를 후속 질문에서 재사용
+프로세스 메모리에 두는 크기 제한 LRU이며, 만료되거나 밀려난 프로젝트는 문서 발췌 없이 답변합니다.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..prompt_budget import estimate_tokens, trim_to_tokens
+from .bm25 import BM25Index, Chunk
+
+
+@dataclass
+class _Entry:
+    index: BM25Index
+    owner: Optional[str]
+    created_at: float
+    extras: Dict[str, Any]
+
+
+class ChunkIndexStore:
+    """project_id → BM25Index LRU (소유자 확인, TTL 적용)"""
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None, chunk_size: Optional[int] = None):
+        self.maxsize = maxsize or int(os.getenv("RETRIEVAL_INDEX_SIZE", "128"))
+        self.ttl = ttl or float(os.getenv("RETRIEVAL_INDEX_TTL", str(72 * 3600)))
+        self.chunk_size = chunk_size or int(os.getenv("RETRIEVAL_CHUNK_SIZE", "600"))
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def build(
+        self,
+        key: str,
+        documents: List[Tuple[str, List[str]]],
+        owner: Optional[str] = None,
+        extras: Optional[Dict[str, Any]] = None,
+    ) -> BM25Index:
+        """(파일명, 페이지 목록) 으로 인덱스를 만들어 등록 - CPU 작업이므로 스레드에서 호출 권장
+        extras 에는 업로드 시 함께 계산한 프로젝트 부가 정보(재무 지표 등)를 보관"""
+        index = BM25Index.from_documents(documents, self.chunk_size)
+        with self._lock:
+            self._entries[key] = _Entry(index, owner, time.time(), dict(extras or {}))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return index
+
+    def _entry(self, key: Optional[str], owner: Optional[str]) -> Optional[_Entry]:
+        """다른 사용자의 프로젝트나 만료된 항목은 반환하지 않음"""
+        if not key:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry.owner is not None and entry.owner != owner):
+                self.misses += 1
+                return None
+            if time.time() - entry.created_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def get(self, key: Optional[str], owner: Optional[str] = None) -> Optional[BM25Index]:
+        entry = self._entry(key, owner)
+        return entry.index if entry is not None else None
+
+    def get_extra(self, key: Optional[str], name: str, owner: Optional[str] = None) -> Any:
+        entry = self._entry(key, owner)
+        return entry.extras.get(name) if entry is not None else None
+
+    def search(self, key: Optional[str], query: str, top_k: int = 5, owner: Optional[str] = None) -> List[Tuple[Chunk, float]]:
+        index = self.get(key, owner)
+        return index.search(query, top_k) if index is not None else []
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "projects": len(self._entries),
+            "chunks": sum(len(entry.index) for entry in self._entries.values()),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def format_chunks(results: List[Tuple[Chunk, float]], max_tokens: int = 3000) -> str:
+    """검색 결과를 출처가 붙은 프롬프트용 발췌문으로 변환 (토큰 예산 초과분은 문장 경계에서 생략)"""
+    sections, used = [], 0
+    for chunk, _ in results:
+        source = f"{chunk.filename} p.{chunk.page}" if chunk.page else chunk.filename
+        section = f"[{source}]\n{chunk.text}"
+        cost = estimate_tokens(section)
+        if used + cost > max_tokens:
+            if not sections:
+                sections.append(trim_to_tokens(section, max_tokens))
+            break
+        sections.append(section)
+        used += cost
+    return "\n\n".join(sections)
@@ -0,0 +1,52 @@
+"""
+한국어 인식 토크나이저 - 형태소 분석기 없이 조사 제거 + 한글 음절 바이그램
+"매출총이익률이" 처럼 붙여 쓴 복합어도 "매출", "이익" 질의에 걸리도록 합니다.
+"""
+
+import re
+from typing import List
+
+# 한글 음절 / 영문·숫자 (소수점, 천 단위 구분 포함)
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z][a-z0-9]*|\d+(?:[.,]\d+)*")
+
+# 긴 조사부터 검사해야 "에서" 가 "서" 로 잘리지 않음
+_JOSA = sorted(
+    [
+        "은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "도", "만", "로", "으로",
+        "에서", "에게", "한테", "까지", "부터", "보다", "처럼", "이며", "이고", "이나", "이다",
+        "입니다", "습니다", "했다", "한다", "하는", "하고", "하여", "에서는", "으로는", "에는",
+    ],
+    key=len,
+    reverse=True,
+)
+
+_STOPWORDS = {
+    "the", "and", "for", "with", "of", "to", "in", "on", "a", "an", "is", "are",
+    "및", "등", "수", "것", "더", "또는", "그리고", "대한", "통해", "위한",
+}
+
+
+def strip_josa(word: str) -> str:
+    """어절 끝의 조사/어미 제거 (어간이 한 글자 이상 남는 경우만)"""
+    for josa in _JOSA:
+        if len(word) > len(josa) and word.endswith(josa):
+            return word[: -len(josa)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """검색용 토큰 목록 - 한글은 어간 + 음절 바이그램, 영문은 소문자 단어"""
+    tokens: List[str] = []
+    for word in _TOKEN_PATTERN.findall((text or "").lower()):
+        if word in _STOPWORDS:
+            continue
+        if "가" <= word[0] <= "힣":
+            stem = strip_josa(word)
+            if stem in _STOPWORDS:
+                continue
+            tokens.append(stem)
+            if len(stem) >= 3:
+                tokens.extend(stem[i:i + 2] for i in range(len(stem) - 1))
+        elif len(word) > 1 or word.isdigit():
+            tokens.append(word)
+    return tokens
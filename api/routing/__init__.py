@@ -0,0 +1,14 @@
+"""
+모델 라우팅 모듈
+단계별로 입력 크기, 요구 품질, 요청 지연 예산과 현재 부하에 맞춰 Gemini 모델을 고르고, 단계별 응답 모델과 지연을 기록합니다.
+"""
+
+from .policy import (
+    LATENCY_BUDGETS_MS, MODEL_TIERS, PHASE_PROFILES, ModelRouter, ModelTier, PhaseProfile, RouteDecision,
+    RoutingContext, model_router, routing_context
+)
+
+__all__ = [
+    'LATENCY_BUDGETS_MS', 'MODEL_TIERS', 'PHASE_PROFILES', 'ModelRouter', 'ModelTier', 'PhaseProfile', 'RouteDecision',
+    'RoutingContext', 'model_router', 'routing_context'
+]
@@ -0,0 +1,246 @@
+"""
+모델 라우팅 정책 - 단계(섹션)별로 입력 크기, 요구 품질, 요청 지연 예산에 맞는 Gemini 모델 선택
+기본은 단계의 선호 모델이고, 동시 호출이 몰리거나 남은 시간이 부족하면 요구 품질을 지키는 범위에서 하위 모델로 내립니다.
+호출마다 실제로 응답한 모델과 지연을 기록하고, 관측 지연으로 모델별 예상 지연을 보정합니다.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """모델 등급 - 품질(높을수록 좋음), 컨텍스트 한도, 지연 추정 계수, 과부하 기준 동시 호출 수"""
+    name: str
+    quality: int
+    context_tokens: int
+    base_ms: float
+    input_ms_per_1k: float
+    output_ms_per_1k: float
+    max_concurrency: int
+
+    def estimate_ms(self, input_tokens: int, output_tokens: int) -> float:
+        return self.base_ms + self.input_ms_per_1k * input_tokens / 1000 + self.output_ms_per_1k * output_tokens / 1000
+
+
+@dataclass(frozen=True)
+class PhaseProfile:
+    """단계별 선호 모델, 최소 품질, 예상 출력 토큰"""
+    preferred: str
+    min_quality: int
+    output_tokens: int
+
+
+# 품질 내림차순
+MODEL_TIERS: Sequence[ModelTier] = (
+    ModelTier("gemini-2.0-flash-exp", 3, 1_000_000, 700, 20, 5500, 8),
+    ModelTier("gemini-1.5-flash", 2, 1_000_000, 600, 20, 5000, 16),
+    ModelTier("gemini-1.5-flash-8b", 1, 1_000_000, 400, 10, 2500, 32),
+)
+
+DEFAULT_PROFILE = PhaseProfile("gemini-2.0-flash-exp", 1, 1000)
+
+PHASE_PROFILES: Dict[str, PhaseProfile] = {
+    # 투자 보고서 - 장문 보고서는 8b로 내리지 않음
+    "report": PhaseProfile("gemini-1.5-flash", 2, 6000),
+    "long_report": PhaseProfile("gemini-1.5-flash", 2, 8000),
+    "basic_analysis": PhaseProfile("gemini-1.5-flash", 1, 1500),
+    "followup": PhaseProfile("gemini-1.5-flash", 1, 1500),
+    # 변화이론 에이전트 - 전략 설계만 품질 하한 유지
+    "toc.context": PhaseProfile("gemini-2.0-flash-exp", 1, 900),
+    "toc.user_insights": PhaseProfile("gemini-2.0-flash-exp", 1, 900),
+    "toc.strategy": PhaseProfile("gemini-2.0-flash-exp", 2, 1200),
+    "toc.validation": PhaseProfile("gemini-2.0-flash-exp", 1, 1000),
+    "toc.visualization": PhaseProfile("gemini-2.0-flash-exp", 1, 1000),
+    # 임팩트 스토리
+    "story.context_analysis": PhaseProfile("gemini-2.0-flash-exp", 1, 700),
+    "story.user_insights": PhaseProfile("gemini-2.0-flash-exp", 1, 700),
+    "story.strategy_design": PhaseProfile("gemini-2.0-flash-exp", 1, 800),
+    "story.story_visualization": PhaseProfile("gemini-2.0-flash-exp", 2, 1200),
+    "story.one_shot": PhaseProfile("gemini-2.0-flash-exp", 2, 1500),
+}
+
+# 요청 종류별 기본 지연 예산(ms)
+LATENCY_BUDGETS_MS = {
+    "report": int(os.getenv("REPORT_LATENCY_BUDGET_MS", "90000")),
+    "toc": int(os.getenv("TOC_LATENCY_BUDGET_MS", "120000")),
+    "story": int(os.getenv("STORY_LATENCY_BUDGET_MS", "60000")),
+}
+
+
+@dataclass
+class RouteDecision:
+    phase: str
+    model: str
+    reason: str  # preferred, load, latency_budget, input_size, best_effort
+    expected_ms: float
+    budget_ms: Optional[float]
+    preferred: str
+
+    @property
+    def downgraded(self) -> bool:
+        return self.model != self.preferred
+
+
+@dataclass
+class RoutingContext:
+    """요청 단위 지연 예산과 단계별 모델 기록"""
+    budget_ms: Optional[float] = None
+    started: float = field(default_factory=time.monotonic)
+    records: List[Dict[str, Any]] = field(default_factory=list)
+
+    def remaining_ms(self) -> Optional[float]:
+        if self.budget_ms is None:
+            return None
+        return self.budget_ms - (time.monotonic() - self.started) * 1000
+
+
+_current: ContextVar[Optional[RoutingContext]] = ContextVar("model_routing", default=None)
+
+
+@contextmanager
+def routing_context(budget_ms: Optional[float] = None) -> Iterator[RoutingContext]:
+    """이 블록(및 하위 태스크/스레드)의 모델 선택이 공유하는 요청 예산"""
+    context = RoutingContext(budget_ms)
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
+
+
+class ModelRouter:
+    """단계별 모델 선택 + 모델별 동시 호출 수/관측 지연 추적"""
+
+    def __init__(
+        self,
+        tiers: Sequence[ModelTier] = MODEL_TIERS,
+        profiles: Optional[Dict[str, PhaseProfile]] = None,
+        smoothing: float = 0.3,
+    ):
+        self.tiers = sorted(tiers, key=lambda tier: -tier.quality)
+        self.by_name = {tier.name: tier for tier in self.tiers}
+        self.profiles = PHASE_PROFILES if profiles is None else profiles
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._in_flight = {tier.name: 0 for tier in self.tiers}
+        # 실제 지연 / 추정 지연 비율의 지수 이동 평균 (1.0 = 추정과 같음)
+        self._slowdown = {tier.name: 1.0 for tier in self.tiers}
+        self._served = {tier.name: 0 for tier in self.tiers}
+        self._downgrades = 0
+        # API 키(해시)별 Gemini 클라이언트 LRU - 모델 객체는 호출마다 새로 만들고 호출자 키의 클라이언트를 연결
+        self._clients: "OrderedDict[str, Any]" = OrderedDict()
+        self.max_clients = int(os.getenv("GEMINI_CLIENT_CACHE", "32"))
+
+    def expected_ms(self, tier: ModelTier, input_tokens: int, output_tokens: int) -> float:
+        return tier.estimate_ms(input_tokens, output_tokens) * self._slowdown[tier.name]
+
+    def choose(self, phase: str, input_tokens: int, budget_ms: Optional[float] = None) -> RouteDecision:
+        """선호 모델부터 품질 하한까지 내려가며 입력 크기/부하/남은 예산을 만족하는 첫 모델"""
+        profile = self.profiles.get(phase, DEFAULT_PROFILE)
+        if budget_ms is None and _current.get() is not None:
+            budget_ms = _current.get().remaining_ms()
+        preferred = self.by_name.get(profile.preferred, self.tiers[0])
+        ladder = [
+            tier for tier in self.tiers
+            if profile.min_quality <= tier.quality <= preferred.quality
+        ] or [preferred]
+
+        reason = "preferred"
+        with self._lock:
+            for tier in ladder:
+                expected = self.expected_ms(tier, input_tokens, profile.output_tokens)
+                if input_tokens > tier.context_tokens:
+                    reason = "input_size"
+                elif self._in_flight[tier.name] >= tier.max_concurrency:
+                    reason = "load"
+                elif budget_ms is not None and expected > budget_ms:
+                    reason = "latency_budget"
+                else:
+                    return RouteDecision(phase, tier.name, reason, round(expected, 1), budget_ms, preferred.name)
+            # 조건을 모두 만족하는 모델이 없으면 입력이 들어가는 가장 빠른 모델
+            fitting = [tier for tier in ladder if input_tokens <= tier.context_tokens] or ladder
+            fastest = min(fitting, key=lambda tier: self.expected_ms(tier, input_tokens, profile.output_tokens))
+            expected = self.expected_ms(fastest, input_tokens, profile.output_tokens)
+            return RouteDecision(phase, fastest.name, "best_effort", round(expected, 1), budget_ms, preferred.name)
+
+    def _client(self, api_key: str):
+        digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        with self._lock:
+            client = self._clients.get(digest)
+            if client is not None:
+                self._clients.move_to_end(digest)
+                return client
+        from google.ai import generativelanguage as glm
+        client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+        with self._lock:
+            client = self._clients.setdefault(digest, client)
+            self._clients.move_to_end(digest)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        return client
+
+    def model(self, name: str, api_key: Optional[str] = None):
+        """호출자 API 키에 묶인 GenerativeModel
+        genai.configure는 프로세스 전역이고 모델은 첫 호출 때의 전역 키로 클라이언트를 고정하므로,
+        공유 모델 대신 키별 클라이언트를 직접 연결해 동시 요청 간 키가 섞이지 않게 합니다.
+        api_key가 없으면 SDK 기본 설정(GEMINI_API_KEY 환경 변수 등) 사용 - 로컬 도구 전용"""
+        import google.generativeai as genai
+        model = genai.GenerativeModel(name)
+        if api_key:
+            # SDK에 모델별 키 지정 API가 없어 지연 생성되는 클라이언트를 미리 채움
+            model._client = self._client(api_key)
+        return model
+
+    @contextmanager
+    def track(self, decision: RouteDecision) -> Iterator[Dict[str, Any]]:
+        """호출 구간의 동시 호출 수와 지연 기록 - 요청 컨텍스트가 있으면 단계 기록에 추가"""
+        with self._lock:
+            self._in_flight[decision.model] = self._in_flight.get(decision.model, 0) + 1
+        record: Dict[str, Any] = {
+            "phase": decision.phase,
+            "model": decision.model,
+            "reason": decision.reason,
+            "expected_ms": decision.expected_ms,
+        }
+        started = time.perf_counter()
+        try:
+            yield record
+            record["ok"] = True
+        except Exception:
+            record["ok"] = False
+            raise
+        finally:
+            latency = (time.perf_counter() - started) * 1000
+            record["latency_ms"] = round(latency, 1)
+            with self._lock:
+                self._in_flight[decision.model] -= 1
+                self._served[decision.model] = self._served.get(decision.model, 0) + 1
+                if decision.downgraded:
+                    self._downgrades += 1
+                # 성공한 호출만 지연 보정에 반영
+                if record["ok"] and decision.expected_ms > 0 and decision.model in self._slowdown:
+                    ratio = latency * self._slowdown[decision.model] / decision.expected_ms
+                    self._slowdown[decision.model] += self.smoothing * (ratio - self._slowdown[decision.model])
+            context = _current.get()
+            if context is not None:
+                context.records.append(record)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": dict(self._in_flight),
+                "served": dict(self._served),
+                "slowdown": {name: round(value, 3) for name, value in self._slowdown.items()},
+                "downgrades": self._downgrades,
+            }
+
+
+model_router = ModelRouter()
@@ -0,0 +1,17 @@
+"""
+구조화 출력 모듈
+에이전트와 스토리 빌더의 JSON 응답을 스키마 제약 모드로 생성하고, 검증에 실패한 필드만 다시 요청합니다.
+응답은 스트리밍 조각 단위로 증분 추출하며, 잘린 출력은 유효한 앞부분까지 복구합니다.
+"""
+
+from .extractor import JSONStreamExtractor, extract_json
+from .generator import (
+    StructuredGenerator, StructuredOutputMetrics, parse_json, structured_generator, structured_metrics
+)
+from .schema import ResultModel, generation_schema, schema_from_example, validate
+
+__all__ = [
+    'JSONStreamExtractor', 'ResultModel', 'StructuredGenerator', 'StructuredOutputMetrics', 'extract_json', 'generation_schema',
+    'parse_json',
+    'schema_from_example', 'structured_generator', 'structured_metrics', 'validate'
+]
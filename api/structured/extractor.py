@@ -0,0 +1,140 @@
+"""
+증분 JSON 추출기 - 스트리밍 응답 조각에서 첫 번째 JSON 객체를 찾아 완성되는 즉시 반환
+코드 펜스, 앞뒤 설명(중괄호 포함), 잘린 출력을 처리합니다. 잘린 경우 파싱 가능한 가장 긴 앞부분을 복구합니다.
+"""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_STRUCTURAL = re.compile(r'[{}\[\]",]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_CLOSERS = {"{": "}", "[": "]"}
+
+# 잘린 출력 복구 시 뒤에서부터 시도할 절단 지점 수
+MAX_RECOVERY_ATTEMPTS = 64
+
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", text))
+
+
+class JSONStreamExtractor:
+    """조각을 받을 때마다 새로 들어온 부분만 스캔하는 JSON 추출기
+    문자열/이스케이프 상태와 괄호 스택을 유지하고, 최상위 객체가 닫히면 complete가 됩니다."""
+
+    def __init__(self, openers: str = "{"):
+        self.openers = openers
+        self.value: Any = None
+        self.complete = False
+        self.truncated = False
+        self._text = ""
+        self._pos = 0
+        self._reset_candidate()
+
+    def _reset_candidate(self) -> None:
+        self._start = -1
+        self._stack: List[str] = []
+        self._in_string = False
+        self._checkpoints: List[Tuple[int, Tuple[str, ...]]] = []  # (절단 위치, 그 시점의 괄호 스택)
+
+    def feed(self, chunk: str) -> bool:
+        """조각 추가 후 스캔 - 최상위 객체가 완성되면 True"""
+        if self.complete or not chunk:
+            return self.complete
+        self._text += chunk
+        self._scan()
+        return self.complete
+
+    def _scan(self) -> None:
+        text, pos = self._text, self._pos
+        while pos < len(text):
+            if self._in_string:
+                match = _STRING_SPECIAL.search(text, pos)
+                if not match:
+                    pos = len(text)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(text):
+                        pos = match.start()  # 이스케이프 대상 문자는 다음 조각에
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                pos = match.end()
+                self._checkpoints.append((pos, tuple(self._stack)))
+                continue
+
+            match = _STRUCTURAL.search(text, pos)
+            if not match:
+                pos = len(text)
+                break
+            char, pos = match.group(), match.end()
+            if self._start < 0:
+                if char in self.openers:
+                    self._start = match.start()
+                    self._stack = [char]
+                    self._checkpoints.append((pos, tuple(self._stack)))
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char == ",":
+                self._checkpoints.append((match.start(), tuple(self._stack)))
+            elif char in _CLOSERS:
+                self._stack.append(char)
+                self._checkpoints.append((pos, tuple(self._stack)))
+            elif _CLOSERS[self._stack[-1]] != char:
+                # 괄호 짝이 안 맞음 - 설명 문장 속 괄호로 보고 다음 시작점부터 다시 탐색
+                pos = self._start + 1
+                self._reset_candidate()
+            else:
+                self._stack.pop()
+                if self._stack:
+                    self._checkpoints.append((pos, tuple(self._stack)))
+                    continue
+                try:
+                    self.value = _loads(text[self._start:pos])
+                    self.complete = True
+                    break
+                except ValueError:
+                    pos = self._start + 1
+                    self._reset_candidate()
+        self._pos = pos
+
+    def result(self) -> Optional[Any]:
+        """완성된 객체, 또는 잘린 출력에서 복구한 가장 긴 유효 앞부분 (없으면 None)"""
+        if self.complete:
+            return self.value
+        if self._start < 0:
+            return None
+        body = self._text[self._start:].rstrip()
+        closing = "".join(_CLOSERS[opener] for opener in reversed(self._stack))
+        candidates = []
+        if self._in_string:
+            candidates.append(body + '"' + closing)  # 잘린 문장은 닫아서 살림
+        elif body.endswith(("}", "]", '"')):
+            candidates.append(body + closing)  # 끝의 숫자/리터럴은 잘렸을 수 있어 제외
+        for cut, stack in reversed(self._checkpoints[-MAX_RECOVERY_ATTEMPTS:]):
+            candidates.append(
+                self._text[self._start:cut].rstrip().rstrip(",:")
+                + "".join(_CLOSERS[opener] for opener in reversed(stack))
+            )
+        for candidate in candidates:
+            try:
+                value = _loads(candidate)
+            except ValueError:
+                continue
+            self.truncated = True
+            return value
+        return None
+
+
+def extract_json(text: Optional[str], openers: str = "{") -> Optional[Any]:
+    """텍스트 전체에서 JSON 추출 (스트리밍이 아닐 때)"""
+    extractor = JSONStreamExtractor(openers)
+    extractor.feed(text or "")
+    return extractor.result()
@@ -0,0 +1,179 @@
+"""
+구조화 출력 생성기 - JSON 스키마 제약 모드로 생성하고, 검증에 실패한 필드만 다시 요청
+응답 전체가 깨져도 기본값으로 바로 버리지 않고, 실패 필드만 작은 프롬프트로 복구합니다.
+"""
+
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from ..logging_utils import get_logger
+from ..prompt_budget import trim_middle
+from .extractor import JSONStreamExtractor, extract_json
+from .schema import ResultModel, generation_schema, top_level_field
+
+logger = get_logger("structured")
+
+# repair 프롬프트에 다시 넣는 원래 요청 분량 (앞의 지시와 끝의 JSON 예시를 함께 남기도록 가운데를 생략)
+REPAIR_CONTEXT_TOKENS = 1500
+
+
+def parse_json(text: Optional[str]) -> Optional[Any]:
+    """응답 텍스트 → JSON 객체 (코드 펜스, 앞뒤 설명, 끝 쉼표, 잘린 출력 허용). 실패하면 None"""
+    return extract_json(text)
+
+
+def _rejects_schema(error: Exception) -> bool:
+    """모델이 response_schema를 거부한 오류인지 (400/InvalidArgument이면서 스키마를 언급)
+    네트워크 오류, 5xx, 할당량 초과는 일시적이므로 스키마 모드를 끄지 않습니다."""
+    text = str(error)
+    invalid_argument = (
+        type(error).__name__ == "InvalidArgument"
+        or getattr(error, "code", None) == 400
+        or text.lstrip().startswith("400")
+    )
+    return invalid_argument and "schema" in text.lower()
+
+
+class StructuredOutputMetrics:
+    """결과 모델별 파싱 실패율과 재시도 횟수"""
+
+    COUNTERS = (
+        "calls", "parse_failures", "invalid_responses", "repair_calls",
+        "repaired_fields", "defaulted_fields", "schema_fallbacks", "truncated_recoveries",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def incr(self, name: str, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(name, dict.fromkeys(self.COUNTERS, 0))
+            counts[counter] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            result = {}
+            for name, counts in self._counts.items():
+                calls = counts["calls"] or 1
+                result[name] = dict(
+                    counts,
+                    parse_failure_rate=round(counts["parse_failures"] / calls, 3),
+                    retries_per_call=round(counts["repair_calls"] / calls, 3),
+                )
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+class StructuredGenerator:
+    """스키마 제약 생성 + 검증 + 실패 필드 repair"""
+
+    def __init__(self, max_repairs: int = 1, metrics: Optional[StructuredOutputMetrics] = None):
+        self.max_repairs = max_repairs
+        self.metrics = metrics or StructuredOutputMetrics()
+        self._schema_unsupported = set()  # response_schema를 거부한 모델
+
+    def _call(self, model: Any, prompt: str, schema: Dict[str, Any], name: str) -> Optional[Any]:
+        """JSON 스키마 제약 모드로 스트리밍 호출 (모델이 스키마를 거부하면 일반 모드로 전환하고 기억)
+        그 밖의 오류는 호출자에게 전달합니다. 최상위 객체가 닫히면 나머지 스트림(뒤따르는 설명)은 읽지 않습니다."""
+        model_name = getattr(model, "model_name", None) or id(model)
+        response_schema = generation_schema(schema)
+        if response_schema and model_name not in self._schema_unsupported:
+            try:
+                return self._stream(name, model.generate_content(prompt, stream=True, generation_config={
+                    "response_mime_type": "application/json",
+                    "response_schema": response_schema,
+                }))
+            except Exception as schema_error:
+                if not _rejects_schema(schema_error):
+                    raise
+                logger.warning("Schema mode rejected for %s: %s", name, schema_error)
+                self._schema_unsupported.add(model_name)
+                self.metrics.incr(name, "schema_fallbacks")
+        return self._stream(name, model.generate_content(prompt, stream=True))
+
+    def _stream(self, name: str, response: Any) -> Optional[Any]:
+        extractor = JSONStreamExtractor()
+        for chunk in response:
+            if extractor.feed(getattr(chunk, "text", "") or ""):
+                break
+        value = extractor.result()
+        if extractor.truncated:
+            self.metrics.incr(name, "truncated_recoveries")
+        return value
+
+    def generate(self, model: Any, prompt: str, result_model: ResultModel) -> Dict[str, Any]:
+        """생성 → 검증 → 실패 필드만 repair → 그래도 실패한 필드는 기본값"""
+        name = result_model.name
+        self.metrics.incr(name, "calls")
+        data = self._call(model, prompt, result_model.schema, name)
+        if not isinstance(data, dict):
+            self.metrics.incr(name, "parse_failures")
+            data = {}
+
+        data, errors = result_model.validate(data)
+        if errors:
+            self.metrics.incr(name, "invalid_responses")
+        for _ in range(self.max_repairs):
+            if not errors:
+                break
+            failing = list(dict.fromkeys(top_level_field(path) for path, _ in errors))
+            data, errors = self._repair(model, prompt, result_model, data, failing, errors)
+
+        if errors:
+            # repair 후에도 실패한 필드는 기본값으로 교체
+            failing = list(dict.fromkeys(top_level_field(path) for path, _ in errors))
+            for key in failing:
+                if key in result_model.default:
+                    data[key] = result_model.default[key]
+                else:
+                    data.pop(key, None)
+            self.metrics.incr(name, "defaulted_fields", len(failing))
+            logger.info("Defaulted fields for %s: %s", name, failing)
+        return data
+
+    def _repair(
+        self,
+        model: Any,
+        prompt: str,
+        result_model: ResultModel,
+        data: Dict[str, Any],
+        failing: List[str],
+        errors: List[Any],
+    ):
+        name = result_model.name
+        self.metrics.incr(name, "repair_calls")
+        problems = "\n".join(f"- {path or '(전체)'}: {message}" for path, message in errors[:20])
+        schema = result_model.subset(failing)
+        repair_prompt = f"""이전 응답의 다음 필드가 누락되었거나 형식이 맞지 않습니다.
+{problems}
+
+아래 원래 요청의 지시에 따라 {', '.join(failing)} 필드만 포함한 JSON 객체로 다시 작성하세요.
+JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
+
+## 필드 스키마
+{json.dumps(schema, ensure_ascii=False)}
+
+## 원래 요청
+{trim_middle(prompt, REPAIR_CONTEXT_TOKENS)}
+"""
+        try:
+            patch = self._call(model, repair_prompt, schema, name)
+        except Exception as repair_error:
+            logger.warning("Repair call failed for %s: %s", name, repair_error)
+            patch = None
+        if isinstance(patch, dict):
+            data = dict(data)
+            data.update({key: patch[key] for key in failing if key in patch})
+        data, remaining = result_model.validate(data)
+        still_failing = {top_level_field(path) for path, _ in remaining}
+        self.metrics.incr(name, "repaired_fields", len([key for key in failing if key not in still_failing]))
+        return data, remaining
+
+
+structured_metrics = StructuredOutputMetrics()
+structured_generator = StructuredGenerator(metrics=structured_metrics)
@@ -0,0 +1,154 @@
+"""
+구조화 출력 스키마 - 프롬프트의 JSON 예시에서 결과 모델(스키마)을 만들고 응답을 검증
+스키마는 Gemini response_schema와 같은 형식(type/properties/required/items)을 그대로 사용합니다.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+_JSON_BLOCK = re.compile(r"```json\s*(.*?)```", re.S)
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+SchemaError = Tuple[str, str]  # (필드 경로, 오류 설명)
+
+
+def schema_from_example(example: Any) -> Dict[str, Any]:
+    """예시 값의 구조로 스키마 생성 (모든 키 필수, 배열 항목은 첫 원소 기준)"""
+    if isinstance(example, dict):
+        return {
+            "type": "object",
+            "properties": {key: schema_from_example(value) for key, value in example.items()},
+            "required": list(example),
+        }
+    if isinstance(example, list):
+        schema: Dict[str, Any] = {"type": "array"}
+        if example:
+            schema["items"] = schema_from_example(example[0])
+        return schema
+    if isinstance(example, bool):
+        return {"type": "boolean"}
+    if isinstance(example, (int, float)):
+        return {"type": "number"}
+    return {"type": "string"}
+
+
+def generation_schema(schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Gemini가 받는 형식으로 정리 - 항목 타입을 모르는 배열과 빈 객체는 제외"""
+    kind = schema.get("type")
+    if kind == "array":
+        items = generation_schema(schema["items"]) if "items" in schema else None
+        return {"type": "array", "items": items} if items else None
+    if kind == "object":
+        properties = {}
+        for key, sub in schema.get("properties", {}).items():
+            converted = generation_schema(sub)
+            if converted:
+                properties[key] = converted
+        if not properties:
+            return None
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": [key for key in schema.get("required", []) if key in properties],
+        }
+    return {"type": kind}
+
+
+def validate(value: Any, schema: Dict[str, Any], path: str = "") -> Tuple[Any, List[SchemaError]]:
+    """스키마 검증 - 숫자↔문자열, 단일 값→배열 같은 사소한 차이는 교정하고 나머지는 오류로 반환"""
+    kind = schema.get("type")
+    if kind == "object":
+        if not isinstance(value, dict):
+            return value, [(path, "object 필요")]
+        result, errors = dict(value), []
+        required = set(schema.get("required", ()))
+        for key, sub in schema.get("properties", {}).items():
+            sub_path = f"{path}.{key}" if path else key
+            if value.get(key) is None:
+                if key in required:
+                    errors.append((sub_path, "필수 필드 누락"))
+                continue
+            result[key], sub_errors = validate(value[key], sub, sub_path)
+            errors.extend(sub_errors)
+        return result, errors
+
+    if kind == "array":
+        if isinstance(value, (str, dict)):
+            value = [value]
+        if not isinstance(value, list):
+            return value, [(path, "array 필요")]
+        if "items" not in schema:
+            return value, []
+        result, errors = [], []
+        for index, item in enumerate(value):
+            item, item_errors = validate(item, schema["items"], f"{path}[{index}]")
+            result.append(item)
+            errors.extend(item_errors)
+        return result, errors
+
+    if kind == "string":
+        if isinstance(value, str):
+            return value, []
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value), []
+        return value, [(path, "string 필요")]
+
+    if kind in ("number", "integer"):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value, []
+        number = _NUMBER.search(value) if isinstance(value, str) else None
+        if number:
+            return float(number.group()), []
+        return value, [(path, "number 필요")]
+
+    if kind == "boolean":
+        if isinstance(value, bool):
+            return value, []
+        return value, [(path, "boolean 필요")]
+    return value, []
+
+
+def top_level_field(path: str) -> str:
+    """오류 경로의 최상위 필드명 (repair 단위)"""
+    return re.split(r"[.\[]", path, maxsplit=1)[0]
+
+
+@dataclass
+class ResultModel:
+    """에이전트 결과 모델 - 스키마와 필드별 기본값(repair 실패 시 사용)"""
+    name: str
+    schema: Dict[str, Any]
+    default: Dict[str, Any] = field(default_factory=dict)
+
+    _cache = {}  # 이름별 스키마 (프롬프트 예시 구조는 호출마다 같음)
+
+    @classmethod
+    def from_prompt(cls, name: str, prompt: str, default: Optional[Dict[str, Any]] = None) -> "ResultModel":
+        """프롬프트에 제시한 ```json 예시를 그대로 결과 스키마로 사용"""
+        schema = cls._cache.get(name)
+        if schema is None:
+            match = _JSON_BLOCK.search(prompt)
+            try:
+                schema = cls._cache[name] = schema_from_example(json.loads(match.group(1)))
+            except (AttributeError, ValueError):
+                # 예시가 없거나 입력값 때문에 깨진 경우 - 이번 호출만 기본값 구조 사용
+                schema = schema_from_example(default or {})
+        return cls(name, schema, default or {})
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.schema.get("properties", {}))
+
+    def validate(self, data: Any) -> Tuple[Any, List[SchemaError]]:
+        return validate(data, self.schema)
+
+    def subset(self, fields: List[str]) -> Dict[str, Any]:
+        """일부 최상위 필드만의 스키마 (repair 요청용)"""
+        properties = self.schema.get("properties", {})
+        return {
+            "type": "object",
+            "properties": {key: properties[key] for key in fields if key in properties},
+            "required": [key for key in fields if key in properties],
+        }
@@ -3,6 +3,9 @@
 agents 시스템 기반 다중 에이전트 협업으로 변화이론을 생성합니다.
 """
 
+from .layout import LayoutConfig, layout_theory
+from .memo import AgentOutputCache
 from .orchestrator import TheoryOfChangeOrchestrator
+from .batch import PortfolioBatchRunner
 
-__all__ = ['TheoryOfChangeOrchestrator']
\ No newline at end of file
+__all__ = ['TheoryOfChangeOrchestrator', 'AgentOutputCache', 'LayoutConfig', 'layout_theory', 'PortfolioBatchRunner']
\ No newline at end of file
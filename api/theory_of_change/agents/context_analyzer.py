@@ -4,16 +4,26 @@ analytics-reporter + trend-researcher의 전문성을 결합하여
 조직의 현재 상황과 변화 기회를 체계적으로 분석합니다.
 """
 
-import google.generativeai as genai
+import asyncio
+
 from typing import Dict, Any, Optional
 
+from ...prompt_budget import allocate, estimate_tokens
+from ...routing import model_router
+from ...structured import ResultModel, structured_generator
+
 
 class ContextAnalyzer:
     """현황 분석과 기회 식별 전문가"""
     
+    # 모델 라우팅 단계 이름
+    PHASE = "toc.context"
+    
+    # 프롬프트에 넣는 입력 필드 전체의 토큰 예산
+    INPUT_TOKEN_BUDGET = 300
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
     
     async def analyze_organization_context(self, org_data: Dict[str, Any]) -> Dict[str, Any]:
         """조직의 현재 상황과 변화 기회를 분석"""
@@ -21,9 +31,12 @@ class ContextAnalyzer:
         prompt = self._build_context_analysis_prompt(org_data)
         
         try:
-            response = self.model.generate_content(prompt)
-            context_analysis = self._parse_context_response(response.text, org_data)
-            return context_analysis
+            # 프롬프트의 JSON 예시를 스키마로 제약 생성, 검증 실패 필드만 다시 요청
+            result_model = ResultModel.from_prompt("context_analyzer", prompt, self._get_default_context(org_data))
+            # 블로킹 Gemini 호출은 스레드에서 실행 (다른 단계와 동시 진행)
+            decision = model_router.choose(self.PHASE, estimate_tokens(prompt))
+            with model_router.track(decision):
+                return await asyncio.to_thread(structured_generator.generate, model_router.model(decision.model, self.api_key), prompt, result_model)
             
         except Exception as e:
             print(f"Context analysis 오류: {str(e)}")
@@ -35,6 +48,10 @@ class ContextAnalyzer:
         org_name = org_data.get('name', '조직')
         impact_focus = org_data.get('focus', '사회혁신')
         
+        # 사용자 입력 필드를 토큰 예산 안으로 제한
+        fields = allocate({"org_name": str(org_name), "impact_focus": str(impact_focus)}, self.INPUT_TOKEN_BUDGET)
+        org_name, impact_focus = fields["org_name"], fields["impact_focus"]
+        
         return f"""
 당신은 **Context Analysis Specialist**입니다. analytics-reporter와 trend-researcher의 전문성을 결합하여 조직의 현재 상황과 변화 기회를 체계적으로 분석합니다.
 
@@ -88,26 +105,6 @@ class ContextAnalyzer:
 JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
 """
     
-    def _parse_context_response(self, response_text: str, org_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Gemini 응답 파싱"""
-        try:
-            import json
-            
-            # JSON 블록 추출
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                parsed_data = json.loads(json_str)
-                return parsed_data
-            else:
-                return self._get_default_context(org_data)
-                
-        except Exception as e:
-            print(f"Context parsing 오류: {str(e)}")
-            return self._get_default_context(org_data)
-    
     def _get_default_context(self, org_data: Dict[str, Any]) -> Dict[str, Any]:
         """기본 컨텍스트 데이터 반환"""
         org_name = org_data.get('name', '조직')
@@ -4,16 +4,27 @@ visual-storyteller + content-creator의 전문성을 결합하여
 변화이론의 시각화와 커뮤니케이션을 설계합니다.
 """
 
-import google.generativeai as genai
+import asyncio
+
 from typing import Dict, Any
 
+from ...prompt_budget import allocate, estimate_tokens
+from ...routing import model_router
+from ...structured import ResultModel, structured_generator
+from ..layout import layout_theory
+
 
 class Storyteller:
     """변화이론 시각화 및 스토리텔링 전문가"""
     
+    # 모델 라우팅 단계 이름
+    PHASE = "toc.visualization"
+    
+    # 프롬프트에 넣는 입력 필드 전체의 토큰 예산
+    INPUT_TOKEN_BUDGET = 600
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
     
     async def create_theory_visualization(self, complete_theory: Dict[str, Any]) -> Dict[str, Any]:
         """변화이론의 시각화와 스토리텔링 생성"""
@@ -21,9 +32,13 @@ class Storyteller:
         prompt = self._build_storytelling_prompt(complete_theory)
         
         try:
-            response = self.model.generate_content(prompt)
-            visualization = self._parse_storytelling_response(response.text, complete_theory)
-            return visualization
+            # 프롬프트의 JSON 예시를 스키마로 제약 생성, 검증 실패 필드만 다시 요청
+            result_model = ResultModel.from_prompt("storyteller", prompt, self._get_default_visualization(complete_theory))
+            # 블로킹 Gemini 호출은 스레드에서 실행 (다른 단계와 동시 진행)
+            decision = model_router.choose(self.PHASE, estimate_tokens(prompt))
+            with model_router.track(decision):
+                visualization = await asyncio.to_thread(structured_generator.generate, model_router.model(decision.model, self.api_key), prompt, result_model)
+            return self._apply_layout(visualization)
             
         except Exception as e:
             print(f"Storytelling 오류: {str(e)}")
@@ -39,19 +54,22 @@ class Storyteller:
         mission = context.get('current_state', {}).get('mission', '사회적 가치 창출')
         target_outcome = strategy.get('intervention_logic', {}).get('target_outcome', '긍정적 사회 변화')
         
+        # 이전 단계 출력이 길어져도 프롬프트가 커지지 않도록 필드별 예산 배분
+        fields = allocate({"mission": str(mission), "target_outcome": str(target_outcome)}, self.INPUT_TOKEN_BUDGET)
+        
         return f"""
 당신은 **Theory Visualization Specialist**입니다. visual-storyteller와 content-creator의 전문성을 결합하여 변화이론을 효과적으로 시각화하고 스토리텔링합니다.
 
 ## 변화이론 핵심 정보
 ### 조직 미션
-{mission}
+{fields['mission']}
 
 ### 목표 성과
-{target_outcome}
+{fields['target_outcome']}
 
 ## 6가지 핵심 시각화 영역
 1. **Theory Structure**: 5단계 변화이론 구조 설계
-2. **Visual Design**: 색상, 레이아웃, 아이콘 체계
+2. **Visual Design**: 색상 팔레트, 아이콘 체계
 3. **Narrative Flow**: 스토리 흐름과 메시지
 4. **Interaction Design**: 사용자 인터랙션 설계
 5. **Stakeholder Messages**: 이해관계자별 맞춤 메시지
@@ -65,63 +83,20 @@ class Storyteller:
       "layers": [
         {{
           "id": "inputs",
-          "name": "투입(Inputs)",
-          "layer": 1,
-          "yPosition": 100,
-          "height": 120,
-          "backgroundColor": "#E8F4FD",
-          "borderColor": "#2196F3",
           "items": [
             {{
               "id": "resource1",
               "title": "자원 제목",
               "value": "구체적 수치",
               "description": "상세 설명",
-              "position": {{"x": 50, "y": 100, "width": 180, "height": 80}},
               "icon": "적절한 이모티콘"
             }}
           ]
         }},
-        {{
-          "id": "activities",
-          "name": "활동(Activities)",
-          "layer": 2,
-          "yPosition": 280,
-          "height": 120,
-          "backgroundColor": "#F3E5F5",
-          "borderColor": "#9C27B0",
-          "items": []
-        }},
-        {{
-          "id": "outputs",
-          "name": "산출(Outputs)",
-          "layer": 3,
-          "yPosition": 460,
-          "height": 120,
-          "backgroundColor": "#E8F5E8",
-          "borderColor": "#4CAF50",
-          "items": []
-        }},
-        {{
-          "id": "outcomes",
-          "name": "성과(Outcomes)",
-          "layer": 4,
-          "yPosition": 640,
-          "height": 120,
-          "backgroundColor": "#FFF3E0",
-          "borderColor": "#FF9800",
-          "items": []
-        }},
-        {{
-          "id": "impact",
-          "name": "임팩트(Impact)",
-          "layer": 5,
-          "yPosition": 820,
-          "height": 120,
-          "backgroundColor": "#FFEBEE",
-          "borderColor": "#F44336",
-          "items": []
-        }}
+        {{"id": "activities", "items": []}},
+        {{"id": "outputs", "items": []}},
+        {{"id": "outcomes", "items": []}},
+        {{"id": "impact", "items": []}}
       ],
       "connections": [
         {{
@@ -131,20 +106,6 @@ class Storyteller:
           "style": "solid"
         }}
       ]
-    }},
-    "designSpecs": {{
-      "container": {{
-        "width": "1200px",
-        "height": "1000px",
-        "background": "linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%)",
-        "padding": "40px"
-      }},
-      "layerSpacing": 140,
-      "itemSpacing": 20,
-      "animations": {{
-        "fadeIn": {{"duration": "0.6s", "delay": "0.1s"}},
-        "slideUp": {{"duration": "0.8s", "distance": "30px"}}
-      }}
     }}
   }},
   "narrative_elements": {{
@@ -175,51 +136,32 @@ class Storyteller:
 ```
 
 각 단계별로 구체적이고 실행 가능한 항목들을 3-4개씩 포함하여 완전한 변화이론을 설계해주세요.
+좌표, 크기, 색상은 시스템이 자동 배치하므로 항목 내용과 연결 관계만 작성하세요.
 JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
 """
     
-    def _parse_storytelling_response(self, response_text: str, complete_theory: Dict[str, Any]) -> Dict[str, Any]:
-        """Gemini 응답 파싱"""
-        try:
-            import json
-            
-            # JSON 블록 추출
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                parsed_data = json.loads(json_str)
-                return parsed_data
-            else:
-                return self._get_default_visualization(complete_theory)
-                
-        except Exception as e:
-            print(f"Storytelling parsing 오류: {str(e)}")
-            return self._get_default_visualization(complete_theory)
+    def _apply_layout(self, visualization: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM이 만든 항목/연결로 좌표·층 높이·색상을 로컬 계산"""
+        structure = visualization.get("theory_structure", {}).get("structure", {})
+        if isinstance(structure, dict) and structure.get("layers"):
+            visualization["theory_structure"] = layout_theory(structure["layers"], structure.get("connections"))
+        return visualization
     
     def _get_default_visualization(self, complete_theory: Dict[str, Any]) -> Dict[str, Any]:
         """기본 시각화 데이터 반환"""
         
-        return {
+        return self._apply_layout({
             "theory_structure": {
                 "structure": {
                     "layers": [
                         {
                             "id": "inputs",
-                            "name": "투입(Inputs)",
-                            "layer": 1,
-                            "yPosition": 100,
-                            "height": 120,
-                            "backgroundColor": "#E8F4FD",
-                            "borderColor": "#2196F3",
                             "items": [
                                 {
                                     "id": "funding",
                                     "title": "자금",
                                     "value": "운영 자금",
                                     "description": "프로젝트 실행을 위한 기본 자금",
-                                    "position": {"x": 50, "y": 100, "width": 180, "height": 80},
                                     "icon": "💰"
                                 },
                                 {
@@ -227,7 +169,6 @@ JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
                                     "title": "인력",
                                     "value": "전문 팀",
                                     "description": "경험 있는 전문가와 자원봉사자",
-                                    "position": {"x": 250, "y": 100, "width": 180, "height": 80},
                                     "icon": "👥"
                                 },
                                 {
@@ -235,26 +176,18 @@ JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
                                     "title": "기술",
                                     "value": "디지털 도구",
                                     "description": "효과적인 서비스 제공을 위한 기술",
-                                    "position": {"x": 450, "y": 100, "width": 180, "height": 80},
                                     "icon": "💻"
                                 }
                             ]
                         },
                         {
                             "id": "activities",
-                            "name": "활동(Activities)",
-                            "layer": 2,
-                            "yPosition": 280,
-                            "height": 120,
-                            "backgroundColor": "#F3E5F5",
-                            "borderColor": "#9C27B0",
                             "items": [
                                 {
                                     "id": "education",
                                     "title": "교육 프로그램",
                                     "value": "맞춤형 교육",
                                     "description": "대상별 특화된 교육 과정",
-                                    "position": {"x": 50, "y": 280, "width": 180, "height": 80},
                                     "icon": "📚"
                                 },
                                 {
@@ -262,7 +195,6 @@ JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
                                     "title": "플랫폼 구축",
                                     "value": "온라인 서비스",
                                     "description": "접근성 높은 디지털 플랫폼",
-                                    "position": {"x": 250, "y": 280, "width": 180, "height": 80},
                                     "icon": "🔧"
                                 },
                                 {
@@ -270,23 +202,12 @@ JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
                                     "title": "아웃리치",
                                     "value": "지역 연계",
                                     "description": "지역사회와의 적극적 소통",
-                                    "position": {"x": 450, "y": 280, "width": 180, "height": 80},
                                     "icon": "📢"
                                 }
                             ]
                         }
                     ],
                     "connections": []
-                },
-                "designSpecs": {
-                    "container": {
-                        "width": "1200px",
-                        "height": "1000px",
-                        "background": "linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%)",
-                        "padding": "40px"
-                    },
-                    "layerSpacing": 140,
-                    "itemSpacing": 20
                 }
             },
             "narrative_elements": {
@@ -307,4 +228,4 @@ JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
                     "caption": "light, 12px"
                 }
             }
-        }
\ No newline at end of file
+        })
\ No newline at end of file
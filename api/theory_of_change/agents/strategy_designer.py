@@ -4,16 +4,26 @@ sprint-prioritizer + studio-producer의 전문성을 결합하여
 실행 가능한 변화이론 전략을 수립합니다.
 """
 
-import google.generativeai as genai
+import asyncio
+
 from typing import Dict, Any
 
+from ...prompt_budget import allocate, estimate_tokens
+from ...routing import model_router
+from ...structured import ResultModel, structured_generator
+
 
 class StrategyDesigner:
     """실행 전략 설계 전문가"""
     
+    # 모델 라우팅 단계 이름
+    PHASE = "toc.strategy"
+    
+    # 프롬프트에 넣는 입력 필드 전체의 토큰 예산
+    INPUT_TOKEN_BUDGET = 900
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
     
     async def design_intervention_logic(
         self, 
@@ -25,9 +35,12 @@ class StrategyDesigner:
         prompt = self._build_strategy_prompt(context, user_insights)
         
         try:
-            response = self.model.generate_content(prompt)
-            strategy = self._parse_strategy_response(response.text, context, user_insights)
-            return strategy
+            # 프롬프트의 JSON 예시를 스키마로 제약 생성, 검증 실패 필드만 다시 요청
+            result_model = ResultModel.from_prompt("strategy_designer", prompt, self._get_default_strategy(context, user_insights))
+            # 블로킹 Gemini 호출은 스레드에서 실행 (다른 단계와 동시 진행)
+            decision = model_router.choose(self.PHASE, estimate_tokens(prompt))
+            with model_router.track(decision):
+                return await asyncio.to_thread(structured_generator.generate, model_router.model(decision.model, self.api_key), prompt, result_model)
             
         except Exception as e:
             print(f"Strategy design 오류: {str(e)}")
@@ -40,18 +53,28 @@ class StrategyDesigner:
         opportunities = context.get('opportunities', {}).get('high_priority', [])
         user_needs = user_insights.get('key_insights', {}).get('primary_needs', [])
         
+        # 이전 단계 출력이 길어져도 프롬프트가 커지지 않도록 필드별 예산 배분
+        fields = allocate(
+            {
+                "mission": str(mission),
+                "opportunities": ', '.join(map(str, opportunities)) if opportunities else '기회 분석 필요',
+                "user_needs": ', '.join(map(str, user_needs)) if user_needs else '니즈 분석 필요',
+            },
+            self.INPUT_TOKEN_BUDGET,
+        )
+        
         return f"""
 당신은 **Strategy Design Specialist**입니다. sprint-prioritizer와 studio-producer의 전문성을 결합하여 실행 가능한 변화이론 전략을 수립합니다.
 
 ## 입력 정보
 ### 조직 미션
-{mission}
+{fields['mission']}
 
 ### 핵심 기회
-{', '.join(opportunities) if opportunities else '기회 분석 필요'}
+{fields['opportunities']}
 
 ### 사용자 핵심 니즈
-{', '.join(user_needs) if user_needs else '니즈 분석 필요'}
+{fields['user_needs']}
 
 ## 6가지 핵심 설계 영역
 1. **Intervention Logic**: 변화를 만들어낼 핵심 개입 논리
@@ -108,31 +131,6 @@ class StrategyDesigner:
 JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
 """
     
-    def _parse_strategy_response(
-        self, 
-        response_text: str, 
-        context: Dict[str, Any], 
-        user_insights: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Gemini 응답 파싱"""
-        try:
-            import json
-            
-            # JSON 블록 추출
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                parsed_data = json.loads(json_str)
-                return parsed_data
-            else:
-                return self._get_default_strategy(context, user_insights)
-                
-        except Exception as e:
-            print(f"Strategy parsing 오류: {str(e)}")
-            return self._get_default_strategy(context, user_insights)
-    
     def _get_default_strategy(self, context: Dict[str, Any], user_insights: Dict[str, Any]) -> Dict[str, Any]:
         """기본 전략 데이터 반환"""
         
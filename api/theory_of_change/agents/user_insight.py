@@ -4,16 +4,26 @@ feedback-synthesizer + ux-researcher의 전문성을 결합하여
 사용자 니즈와 행동 패턴을 분석합니다.
 """
 
-import google.generativeai as genai
+import asyncio
+
 from typing import Dict, Any
 
+from ...prompt_budget import allocate, estimate_tokens
+from ...routing import model_router
+from ...structured import ResultModel, structured_generator
+
 
 class UserInsightAgent:
     """사용자 인사이트 분석 전문가"""
     
+    # 모델 라우팅 단계 이름
+    PHASE = "toc.user_insights"
+    
+    # 프롬프트에 넣는 입력 필드 전체의 토큰 예산
+    INPUT_TOKEN_BUDGET = 600
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
     
     async def synthesize_user_needs(self, context_data: Dict[str, Any]) -> Dict[str, Any]:
         """사용자 니즈와 행동 패턴 분석"""
@@ -21,9 +31,12 @@ class UserInsightAgent:
         prompt = self._build_user_insight_prompt(context_data)
         
         try:
-            response = self.model.generate_content(prompt)
-            user_insights = self._parse_user_response(response.text, context_data)
-            return user_insights
+            # 프롬프트의 JSON 예시를 스키마로 제약 생성, 검증 실패 필드만 다시 요청
+            result_model = ResultModel.from_prompt("user_insight", prompt, self._get_default_insights(context_data))
+            # 블로킹 Gemini 호출은 스레드에서 실행 (다른 단계와 동시 진행)
+            decision = model_router.choose(self.PHASE, estimate_tokens(prompt))
+            with model_router.track(decision):
+                return await asyncio.to_thread(structured_generator.generate, model_router.model(decision.model, self.api_key), prompt, result_model)
             
         except Exception as e:
             print(f"User insight 오류: {str(e)}")
@@ -35,12 +48,18 @@ class UserInsightAgent:
         mission = context_data.get('current_state', {}).get('mission', '사회적 가치 창출')
         stakeholders = context_data.get('stakeholders', {}).get('primary', ['사용자'])
         
+        # 이전 단계 출력이 길어져도 프롬프트가 커지지 않도록 필드별 예산 배분
+        fields = allocate(
+            {"mission": str(mission), "stakeholders": ', '.join(map(str, stakeholders))},
+            self.INPUT_TOKEN_BUDGET,
+        )
+        
         return f"""
 당신은 **User Insight Specialist**입니다. feedback-synthesizer와 ux-researcher의 전문성을 결합하여 사용자의 진짜 니즈와 행동 패턴을 깊이 있게 분석합니다.
 
 ## 분석 대상 조직 정보
-- 미션: {mission}
-- 주요 이해관계자: {', '.join(stakeholders)}
+- 미션: {fields['mission']}
+- 주요 이해관계자: {fields['stakeholders']}
 
 ## 6가지 핵심 분석 영역
 1. **User Persona Development**: 핵심 사용자 그룹 정의
@@ -90,26 +109,6 @@ class UserInsightAgent:
 JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
 """
     
-    def _parse_user_response(self, response_text: str, context_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Gemini 응답 파싱"""
-        try:
-            import json
-            
-            # JSON 블록 추출
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                parsed_data = json.loads(json_str)
-                return parsed_data
-            else:
-                return self._get_default_insights(context_data)
-                
-        except Exception as e:
-            print(f"User insight parsing 오류: {str(e)}")
-            return self._get_default_insights(context_data)
-    
     def _get_default_insights(self, context_data: Dict[str, Any]) -> Dict[str, Any]:
         """기본 사용자 인사이트 데이터 반환"""
         
@@ -4,16 +4,26 @@ experiment-tracker + finance-tracker의 전문성을 결합하여
 가설 검증과 임팩트 측정 체계를 설계합니다.
 """
 
-import google.generativeai as genai
+import asyncio
+
 from typing import Dict, Any
 
+from ...prompt_budget import allocate, estimate_tokens
+from ...routing import model_router
+from ...structured import ResultModel, structured_generator
+
 
 class Validator:
     """검증 및 측정 체계 설계 전문가"""
     
+    # 모델 라우팅 단계 이름
+    PHASE = "toc.validation"
+    
+    # 프롬프트에 넣는 입력 필드 전체의 토큰 예산
+    INPUT_TOKEN_BUDGET = 600
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
     
     async def design_validation_framework(self, strategy: Dict[str, Any]) -> Dict[str, Any]:
         """가설 검증과 임팩트 측정 체계 설계"""
@@ -21,9 +31,12 @@ class Validator:
         prompt = self._build_validation_prompt(strategy)
         
         try:
-            response = self.model.generate_content(prompt)
-            validation = self._parse_validation_response(response.text, strategy)
-            return validation
+            # 프롬프트의 JSON 예시를 스키마로 제약 생성, 검증 실패 필드만 다시 요청
+            result_model = ResultModel.from_prompt("validator", prompt, self._get_default_validation(strategy))
+            # 블로킹 Gemini 호출은 스레드에서 실행 (다른 단계와 동시 진행)
+            decision = model_router.choose(self.PHASE, estimate_tokens(prompt))
+            with model_router.track(decision):
+                return await asyncio.to_thread(structured_generator.generate, model_router.model(decision.model, self.api_key), prompt, result_model)
             
         except Exception as e:
             print(f"Validation design 오류: {str(e)}")
@@ -35,15 +48,21 @@ class Validator:
         core_hypothesis = strategy.get('intervention_logic', {}).get('core_hypothesis', '')
         target_outcome = strategy.get('intervention_logic', {}).get('target_outcome', '')
         
+        # 이전 단계 출력이 길어져도 프롬프트가 커지지 않도록 필드별 예산 배분
+        fields = allocate(
+            {"core_hypothesis": str(core_hypothesis), "target_outcome": str(target_outcome)},
+            self.INPUT_TOKEN_BUDGET,
+        )
+        
         return f"""
 당신은 **Validation Framework Specialist**입니다. experiment-tracker와 finance-tracker의 전문성을 결합하여 가설 검증과 임팩트 측정을 위한 체계적인 프레임워크를 설계합니다.
 
 ## 검증 대상
 ### 핵심 가설
-{core_hypothesis}
+{fields['core_hypothesis']}
 
 ### 목표 성과
-{target_outcome}
+{fields['target_outcome']}
 
 ## 6가지 핵심 설계 영역
 1. **Success Metrics Definition**: 성공 지표 정의와 측정 방법
@@ -116,26 +135,6 @@ class Validator:
 JSON 형태로만 응답하고, 다른 설명은 포함하지 마세요.
 """
     
-    def _parse_validation_response(self, response_text: str, strategy: Dict[str, Any]) -> Dict[str, Any]:
-        """Gemini 응답 파싱"""
-        try:
-            import json
-            
-            # JSON 블록 추출
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                parsed_data = json.loads(json_str)
-                return parsed_data
-            else:
-                return self._get_default_validation(strategy)
-                
-        except Exception as e:
-            print(f"Validation parsing 오류: {str(e)}")
-            return self._get_default_validation(strategy)
-    
     def _get_default_validation(self, strategy: Dict[str, Any]) -> Dict[str, Any]:
         """기본 검증 체계 데이터 반환"""
         
@@ -0,0 +1,248 @@
+"""
+포트폴리오 일괄 생성 - 코호트(20~50개 조직)의 변화이론을 한 번에 생성
+모든 조직의 에이전트 단계가 하나의 동시성 풀과 호출 속도 제한을 공유하고, 조직별 결과는 완료 순서대로 스트리밍합니다.
+
+재시작 시 이어하기:
+- 완료된 조직은 저널(NDJSON)에 기록되어 다시 실행하지 않음
+- 중단된 조직도 디스크 에이전트 캐시 덕분에 마지막으로 완료된 단계 다음부터 실행
+
+사용법:
+    python -m api.theory_of_change.batch organizations.json --out results.ndjson [--concurrency 8] [--rpm 60]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional
+
+from .memo import AgentOutputCache, input_hash
+from .orchestrator import TheoryOfChangeOrchestrator
+
+
+class KeyRateLimiter:
+    """키별 슬라이딩 윈도우 속도 제한 (period초 동안 최대 max_calls회)"""
+
+    def __init__(self, max_calls: int, period: float = 60.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls: Dict[str, Deque[float]] = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, key: str) -> None:
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                calls = self._calls.setdefault(key, deque())
+                while calls and now - calls[0] >= self.period:
+                    calls.popleft()
+                if len(calls) < self.max_calls:
+                    calls.append(now)
+                    return
+                wait = self.period - (now - calls[0])
+            await asyncio.sleep(wait)
+
+
+class AgentPool:
+    """조직 간 공유 에이전트 실행 슬롯 - 속도 제한 통과 후 동시성 슬롯 획득"""
+
+    def __init__(self, concurrency: int, calls_per_minute: int):
+        self.concurrency = concurrency
+        self.limiter = KeyRateLimiter(calls_per_minute)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    @asynccontextmanager
+    async def slot(self, key: str):
+        await self.limiter.acquire(key)
+        async with self._semaphore:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.calls += 1
+            try:
+                yield
+            finally:
+                self.active -= 1
+
+
+class BatchJournal:
+    """조직 결과를 한 줄씩 append + fsync - status가 ok인 줄만 완료로 간주 (끊긴 마지막 줄은 무시)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        completed: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and record.get("status") == "ok" and record.get("key"):
+                        completed[record["key"]] = record
+        except FileNotFoundError:
+            pass
+        return completed
+
+    def append(self, record: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def normalize_organization(org: Dict[str, Any]) -> Dict[str, Any]:
+    """입력 조직 항목 정규화 (name/organization_name, impact_focus/focus 모두 허용)
+    조직별 api_key는 받지 않음 - 공유 풀의 속도 제한과 과금은 실행 키 하나 기준"""
+    name = org.get("name") or org.get("organization_name")
+    if not name:
+        raise ValueError(f"조직 이름 누락: {org}")
+    return {
+        "name": str(name),
+        "impact_focus": org.get("impact_focus", org.get("focus")),
+        "files": org.get("files"),
+    }
+
+
+def organization_key(org: Dict[str, Any]) -> str:
+    """이어하기용 조직 식별 키 (생성 입력의 해시)"""
+    return input_hash("batch", {k: org[k] for k in ("name", "impact_focus", "files")})
+
+
+class PortfolioBatchRunner:
+    """여러 조직의 변화이론을 공유 풀에서 생성하고 완료 순서대로 결과를 내보냄"""
+
+    def __init__(
+        self,
+        api_key: str,
+        concurrency: Optional[int] = None,
+        calls_per_minute: Optional[int] = None,
+        journal_path: Optional[str] = None,
+        cache: Optional[AgentOutputCache] = None,
+        orchestrator_factory: Optional[Callable[[str], TheoryOfChangeOrchestrator]] = None,
+    ):
+        self.api_key = api_key
+        self.concurrency = concurrency or int(os.getenv("TOC_BATCH_CONCURRENCY", "8"))
+        self.calls_per_minute = calls_per_minute or int(os.getenv("TOC_BATCH_RPM", "60"))
+        self.journal = BatchJournal(journal_path) if journal_path else None
+        self.orchestrator_factory = orchestrator_factory or (
+            lambda key: TheoryOfChangeOrchestrator(key, cache=cache)
+        )
+        self._orchestrator: Optional[TheoryOfChangeOrchestrator] = None
+        self.pool: Optional[AgentPool] = None
+
+    def _get_orchestrator(self) -> TheoryOfChangeOrchestrator:
+        # 모든 조직이 실행 키 하나를 공유 (에이전트 호출마다 이 키의 클라이언트 사용)
+        if self._orchestrator is None:
+            self._orchestrator = self.orchestrator_factory(self.api_key)
+        return self._orchestrator
+
+    async def _generate(self, index: int, org: Dict[str, Any], key: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        theory = await self._get_orchestrator().generate_theory_of_change(
+            org["name"], org["impact_focus"], org["files"], gate=lambda phase: self.pool.slot(self.api_key)
+        )
+        pipeline = theory.get("reportInfo", {}).get("pipeline", {})
+        failed = [phase for phase, status in pipeline.items() if status.get("status") != "ok"]
+        generated = theory.get("reportInfo", {}).get("generated_by") == "multi-agent-system"
+        return {
+            "index": index,
+            "key": key,
+            "organization": org["name"],
+            # 실패/기본값 단계가 있으면 완료로 보지 않아 다음 실행에서 해당 단계만 재시도
+            "status": "ok" if generated and not failed else "partial",
+            "failed_phases": failed if generated else ["pipeline"],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            "theory": theory,
+        }
+
+    async def run(self, organizations: Iterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """저널에 있는 조직은 바로, 나머지는 완료되는 순서대로 결과 산출"""
+        self.pool = AgentPool(self.concurrency, self.calls_per_minute)
+        completed = self.journal.load() if self.journal else {}
+
+        resumed, pending = [], []
+        for index, raw in enumerate(organizations):
+            org = normalize_organization(raw)
+            key = organization_key(org)
+            if key in completed:
+                resumed.append({**completed[key], "index": index, "resumed": True})
+            else:
+                pending.append((index, org, key))
+
+        # 남은 조직을 먼저 시작한 뒤 저널 결과를 내보냄
+        tasks = [asyncio.create_task(self._generate(index, org, key)) for index, org, key in pending]
+        try:
+            for record in resumed:
+                yield record
+            for next_done in asyncio.as_completed(tasks):
+                record = await next_done
+                if self.journal:
+                    self.journal.append(record)
+                yield record
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.pool
+        return {
+            "concurrency": self.concurrency,
+            "calls_per_minute": self.calls_per_minute,
+            "agent_calls": pool.calls if pool else 0,
+            "peak_concurrency": pool.peak if pool else 0,
+        }
+
+
+def load_organizations(path: str) -> List[Dict[str, Any]]:
+    """JSON 배열 또는 NDJSON (한 줄에 조직 하나)"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        return json.loads(stripped)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+async def _main(args: argparse.Namespace) -> int:
+    api_key = args.api_key or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        print("GEMINI_API_KEY 또는 --api-key가 필요합니다", file=sys.stderr)
+        return 2
+    organizations = load_organizations(args.input)
+    runner = PortfolioBatchRunner(api_key, args.concurrency, args.rpm, journal_path=args.out)
+    counts = {"ok": 0, "partial": 0, "resumed": 0}
+    async for record in runner.run(organizations):
+        counts["resumed" if record.get("resumed") else record["status"]] += 1
+        print(
+            f"[{sum(counts.values())}/{len(organizations)}] {record['organization']}: "
+            f"{'resumed' if record.get('resumed') else record['status']}",
+            file=sys.stderr,
+        )
+    print(json.dumps({**counts, **runner.stats()}, ensure_ascii=False))
+    return 0 if counts["partial"] == 0 else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Theory of Change portfolio batch runner")
+    parser.add_argument("input", help="조직 목록 (JSON 배열 또는 NDJSON)")
+    parser.add_argument("--out", required=True, help="결과 NDJSON (이어하기 저널 겸용)")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--rpm", type=int, default=None, help="분당 에이전트 호출 수")
+    parser.add_argument("--api-key", default=None)
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+에이전트 DAG 실행기 - 단계 간 의존 관계대로 독립적인 단계를 동시에 실행
+단계마다 타임아웃과 폴백을 두어, 한 단계가 실패해도 이미 완료된 단계 결과는 유지합니다.
+캐시를 주면 입력 해시가 같은 단계는 실행하지 않고 이전 결과를 재사용합니다.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .memo import AgentOutputCache, input_hash
+
+
+@dataclass
+class Node:
+    """DAG 단계 - run/fallback/key는 의존 단계 결과 dict를 받음 (key가 없으면 캐시하지 않음)"""
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]
+    deps: Tuple[str, ...] = ()
+    fallback: Optional[Callable[[Dict[str, Any]], Any]] = None
+    timeout: Optional[float] = None
+    key: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+
+@dataclass
+class DAGResult:
+    """단계별 결과와 실행 상태 (ok, degraded, timeout, error, skipped)
+    degraded: 예외 없이 끝났지만 에이전트가 내부 실패로 폴백과 같은 기본값을 돌려준 단계"""
+    results: Dict[str, Any] = field(default_factory=dict)
+    statuses: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def failed(self) -> List[str]:
+        return [name for name, status in self.statuses.items() if status["status"] != "ok"]
+
+    @property
+    def cached(self) -> List[str]:
+        return [name for name, status in self.statuses.items() if status.get("cached")]
+
+    def cache_summary(self) -> Dict[str, Any]:
+        """이번 실행의 캐시 재사용/재계산 단계"""
+        keyed = [name for name, status in self.statuses.items() if "cached" in status]
+        reused = self.cached
+        return {
+            "hits": len(reused),
+            "misses": len(keyed) - len(reused),
+            "reused": reused,
+            "recomputed": [name for name in keyed if name not in reused],
+        }
+
+
+def topological_order(nodes: List[Node]) -> List[str]:
+    """의존 순서 (알 수 없는 의존이나 순환이 있으면 ValueError)"""
+    by_name = {node.name: node for node in nodes}
+    for node in nodes:
+        unknown = [dep for dep in node.deps if dep not in by_name]
+        if unknown:
+            raise ValueError(f"{node.name}: 알 수 없는 의존 단계 {unknown}")
+    indegree = {node.name: len(node.deps) for node in nodes}
+    dependents: Dict[str, List[str]] = {node.name: [] for node in nodes}
+    for node in nodes:
+        for dep in node.deps:
+            dependents[dep].append(node.name)
+    ready = [name for name, degree in indegree.items() if degree == 0]
+    order = []
+    while ready:
+        name = ready.pop(0)
+        order.append(name)
+        for child in dependents[name]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    if len(order) != len(nodes):
+        raise ValueError(f"순환 의존: {sorted(set(by_name) - set(order))}")
+    return order
+
+
+class DAGExecutor:
+    """의존 단계가 모두 끝난 단계부터 바로 시작하는 비동기 실행기"""
+
+    def __init__(
+        self,
+        nodes: List[Node],
+        default_timeout: Optional[float] = None,
+        cache: Optional[AgentOutputCache] = None,
+        gate: Optional[Callable[[str], AsyncContextManager]] = None,
+    ):
+        self.nodes = {node.name: node for node in nodes}
+        self.order = topological_order(nodes)
+        self.default_timeout = default_timeout
+        self.cache = cache
+        # 실제 실행(캐시 미적중) 구간을 감싸는 컨텍스트 - 배치 실행의 공유 동시성/속도 제한용
+        self.gate = gate
+        # 타임아웃 후에도 끝나기를 기다리며 gate 슬롯을 쥐고 있는 작업
+        self._lingering = set()
+
+    @staticmethod
+    def _returned_fallback(node: Node, inputs: Dict[str, Any], value: Any) -> bool:
+        """에이전트가 Gemini 오류를 삼키고 기본값을 돌려줬는지 (폴백 결과와 같으면 실패로 간주)"""
+        if node.fallback is None:
+            return False
+        try:
+            return value == node.fallback(inputs)
+        except Exception:
+            return False
+
+    async def _invoke(self, node: Node, inputs: Dict[str, Any], timeout: Optional[float]) -> Any:
+        """타임아웃은 gate 대기 시간을 제외한 실행 시간에만 적용
+        wait_for는 에이전트 안의 asyncio.to_thread Gemini 호출을 중단시키지 못하므로(스레드는 응답까지 계속 실행),
+        타임아웃이 나면 단계는 바로 폴백으로 넘어가되 gate 슬롯은 그 작업이 실제로 끝날 때 반납합니다.
+        gate가 없으면 남은 호출은 제한 없이 끝까지 실행되고 결과만 버려집니다."""
+        if self.gate is None:
+            return await asyncio.wait_for(node.run(inputs), timeout)
+        gate = self.gate(node.name)
+        await gate.__aenter__()
+        task = asyncio.ensure_future(node.run(inputs))
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        finally:
+            if task.done():
+                await gate.__aexit__(None, None, None)
+            else:
+                lingering = asyncio.ensure_future(self._release_when_done(task, gate))
+                self._lingering.add(lingering)
+                lingering.add_done_callback(self._lingering.discard)
+
+    @staticmethod
+    async def _release_when_done(task: "asyncio.Future[Any]", gate: AsyncContextManager) -> None:
+        """시간 초과된 작업의 결과는 버리고, 끝난 뒤 gate 슬롯 반납"""
+        try:
+            await task
+        except BaseException:
+            pass
+        finally:
+            await gate.__aexit__(None, None, None)
+
+    async def run(self) -> DAGResult:
+        result = DAGResult()
+        done = {name: asyncio.Event() for name in self.nodes}
+
+        async def execute(node: Node) -> None:
+            for dep in node.deps:
+                await done[dep].wait()
+            inputs = {dep: result.results[dep] for dep in node.deps if dep in result.results}
+            timeout = node.timeout if node.timeout is not None else self.default_timeout
+            started = time.perf_counter()
+            status: Dict[str, Any] = {"status": "ok"}
+            digest = None
+            try:
+                if len(inputs) < len(node.deps):
+                    status = {"status": "skipped", "error": "의존 단계 결과 없음"}
+                else:
+                    if self.cache is not None and node.key is not None:
+                        digest = input_hash(node.name, node.key(inputs))
+                        cached = self.cache.get(digest)
+                        status["cached"] = cached is not None
+                    if status.get("cached"):
+                        result.results[node.name] = cached
+                    else:
+                        value = await self._invoke(node, inputs, timeout)
+                        result.results[node.name] = value
+                        if self._returned_fallback(node, inputs, value):
+                            # 저장하지 않아 다음 실행에서 다시 시도
+                            status.update(status="degraded", error="에이전트가 기본값을 반환")
+                        elif digest is not None:
+                            self.cache.put(digest, value)
+            except asyncio.TimeoutError:
+                status.update(status="timeout", error=f"{timeout}s 초과")
+            except Exception as error:
+                status.update(status="error", error=str(error))
+
+            if status["status"] != "ok" and node.fallback is not None:
+                try:
+                    result.results[node.name] = node.fallback(inputs)
+                    status["fallback"] = True
+                except Exception as fallback_error:
+                    status["fallback_error"] = str(fallback_error)
+            status["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            result.statuses[node.name] = status
+            done[node.name].set()
+
+        await asyncio.gather(*(execute(self.nodes[name]) for name in self.order))
+        # 상태는 의존 순서대로 정렬
+        result.statuses = {name: result.statuses[name] for name in self.order}
+        return result
@@ -0,0 +1,222 @@
+"""
+변화이론 다이어그램 레이아웃 - 계층 그래프(Sugiyama 방식) 배치를 로컬에서 계산
+LLM은 단계별 항목과 연결만 만들고, 좌표·층 높이·색상은 항목 수에 맞춰 여기서 결정합니다.
+
+1. 층 배정: 변화이론 5단계(투입 → 활동 → 산출 → 성과 → 임팩트)가 층, 역방향 연결은 뒤집고 여러 층을 건너뛰는 연결은 더미 노드로 분할
+2. 교차 최소화: 위/아래 방향 barycenter 정렬을 번갈아 반복하고 교차 수가 가장 적은 순서를 채택
+3. 좌표 배정: 연결된 이웃의 중심으로 끌어당기되 같은 층 항목 간격은 유지
+"""
+
+import copy
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# 표준 단계별 이름/색상 (LLM이나 기본값이 생략해도 채움)
+LAYER_STYLES: Dict[str, Dict[str, str]] = {
+    "inputs": {"name": "투입(Inputs)", "backgroundColor": "#E8F4FD", "borderColor": "#2196F3"},
+    "activities": {"name": "활동(Activities)", "backgroundColor": "#F3E5F5", "borderColor": "#9C27B0"},
+    "outputs": {"name": "산출(Outputs)", "backgroundColor": "#E8F5E8", "borderColor": "#4CAF50"},
+    "outcomes": {"name": "성과(Outcomes)", "backgroundColor": "#FFF3E0", "borderColor": "#FF9800"},
+    "impact": {"name": "임팩트(Impact)", "backgroundColor": "#FFEBEE", "borderColor": "#F44336"},
+}
+
+CONTAINER_BACKGROUND = "linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%)"
+
+
+@dataclass
+class LayoutConfig:
+    """배치 치수 (픽셀) - 기본값은 기존 1200x1000 다이어그램과 같은 격자"""
+    item_width: int = 180
+    item_height: int = 80
+    item_spacing: int = 20
+    layer_height: int = 120
+    layer_gap: int = 60
+    margin: int = 50
+    top: int = 100
+    min_width: int = 1200
+    sweeps: int = 8
+    refinements: int = 4
+
+
+def _ranked_layers(layers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """layer 번호 순 (번호가 없으면 입력 순서)"""
+    indexed = list(enumerate(layers))
+    indexed.sort(key=lambda pair: (pair[1].get("layer") if isinstance(pair[1].get("layer"), (int, float)) else pair[0], pair[0]))
+    return [layer for _, layer in indexed]
+
+
+def _build_graph(
+    layers: List[Dict[str, Any]], connections: List[Dict[str, Any]]
+) -> Tuple[List[List[str]], List[Tuple[str, str]]]:
+    """층별 노드 목록과 인접 층 사이 간선 (더미 노드는 '\\0'으로 시작)"""
+    ranks: List[List[str]] = [[item["id"] for item in layer.get("items", [])] for layer in layers]
+    rank_of = {node: r for r, nodes in enumerate(ranks) for node in nodes}
+    edges: List[Tuple[str, str]] = []
+    for index, connection in enumerate(connections):
+        source, target = connection.get("from"), connection.get("to")
+        if source not in rank_of or target not in rank_of or rank_of[source] == rank_of[target]:
+            continue
+        if rank_of[source] > rank_of[target]:
+            source, target = target, source
+        previous = source
+        for r in range(rank_of[source] + 1, rank_of[target]):
+            dummy = f"\0{index}:{r}"
+            ranks[r].append(dummy)
+            edges.append((previous, dummy))
+            previous = dummy
+        edges.append((previous, target))
+    return ranks, edges
+
+
+def count_crossings(ranks: List[List[str]], edges: List[Tuple[str, str]]) -> int:
+    """인접 층 사이 간선 교차 수"""
+    position = {node: i for nodes in ranks for i, node in enumerate(nodes)}
+    rank_of = {node: r for r, nodes in enumerate(ranks) for node in nodes}
+    by_rank: Dict[int, List[Tuple[int, int]]] = {}
+    for source, target in edges:
+        by_rank.setdefault(rank_of[source], []).append((position[source], position[target]))
+    total = 0
+    for pairs in by_rank.values():
+        for i, (a1, b1) in enumerate(pairs):
+            for a2, b2 in pairs[i + 1:]:
+                if (a1 - a2) * (b1 - b2) < 0:
+                    total += 1
+    return total
+
+
+def _order_ranks(ranks: List[List[str]], edges: List[Tuple[str, str]], sweeps: int) -> List[List[str]]:
+    """barycenter 휴리스틱 - 이웃 층 위치 평균으로 정렬 (이웃이 없으면 현재 위치 유지)"""
+    upper: Dict[str, List[str]] = {}
+    lower: Dict[str, List[str]] = {}
+    for source, target in edges:
+        lower.setdefault(source, []).append(target)
+        upper.setdefault(target, []).append(source)
+
+    def reorder(nodes: List[str], fixed: List[str], neighbors: Dict[str, List[str]]) -> List[str]:
+        position = {node: i for i, node in enumerate(fixed)}
+        scale = (len(fixed) - 1) / max(len(nodes) - 1, 1) if fixed else 1.0
+
+        def barycenter(pair: Tuple[int, str]) -> float:
+            index, node = pair
+            linked = [position[n] for n in neighbors.get(node, ()) if n in position]
+            return sum(linked) / len(linked) if linked else index * scale
+
+        return [node for _, node in sorted(enumerate(nodes), key=barycenter)]
+
+    current = [list(nodes) for nodes in ranks]
+    best, best_crossings = [list(nodes) for nodes in current], count_crossings(current, edges)
+    for sweep in range(sweeps):
+        if best_crossings == 0:
+            break
+        if sweep % 2 == 0:
+            for r in range(1, len(current)):
+                current[r] = reorder(current[r], current[r - 1], upper)
+        else:
+            for r in range(len(current) - 2, -1, -1):
+                current[r] = reorder(current[r], current[r + 1], lower)
+        crossings = count_crossings(current, edges)
+        if crossings < best_crossings:
+            best, best_crossings = [list(nodes) for nodes in current], crossings
+    return best
+
+
+def _assign_x(
+    ranks: List[List[str]], edges: List[Tuple[str, str]], config: LayoutConfig
+) -> Dict[str, float]:
+    """층 안 순서를 유지하며 각 노드 중심을 연결된 이웃 중심 쪽으로 이동"""
+    width = {node: (0 if node.startswith("\0") else config.item_width) for nodes in ranks for node in nodes}
+    neighbors: Dict[str, List[str]] = {}
+    for source, target in edges:
+        neighbors.setdefault(source, []).append(target)
+        neighbors.setdefault(target, []).append(source)
+
+    x: Dict[str, float] = {}
+    for nodes in ranks:
+        cursor = 0.0
+        for node in nodes:
+            x[node] = cursor
+            cursor += width[node] + config.item_spacing
+
+    def place(nodes: List[str]) -> None:
+        desired = []
+        for node in nodes:
+            linked = neighbors.get(node)
+            center = sum(x[n] + width[n] / 2 for n in linked) / len(linked) if linked else x[node] + width[node] / 2
+            desired.append(center - width[node] / 2)
+        # 왼쪽→오른쪽, 오른쪽→왼쪽으로 겹침을 밀어낸 두 배치의 평균 (둘 다 간격 조건을 만족하므로 평균도 만족)
+        left = list(desired)
+        for i in range(1, len(nodes)):
+            left[i] = max(left[i], left[i - 1] + width[nodes[i - 1]] + config.item_spacing)
+        right = list(desired)
+        for i in range(len(nodes) - 2, -1, -1):
+            right[i] = min(right[i], right[i + 1] - width[nodes[i]] - config.item_spacing)
+        for node, a, b in zip(nodes, left, right):
+            x[node] = (a + b) / 2
+
+    for _ in range(config.refinements):
+        for nodes in ranks:
+            place(nodes)
+        for nodes in reversed(ranks):
+            place(nodes)
+    return x
+
+
+def layout_theory(
+    layers: List[Dict[str, Any]],
+    connections: Optional[List[Dict[str, Any]]] = None,
+    config: Optional[LayoutConfig] = None,
+) -> Dict[str, Any]:
+    """항목/연결만 있는 층 목록 → position, yPosition, 색상, designSpecs가 채워진 theory_structure"""
+    config = config or LayoutConfig()
+    layers = _ranked_layers(copy.deepcopy([layer for layer in layers if isinstance(layer, dict)]))
+    connections = copy.deepcopy([c for c in connections or [] if isinstance(c, dict)])
+
+    # id가 없거나 중복된 항목은 층 id 기반으로 부여
+    seen = set()
+    for layer_index, layer in enumerate(layers):
+        layer.setdefault("id", f"layer{layer_index + 1}")
+        layer["items"] = [item for item in layer.get("items") or [] if isinstance(item, dict)]
+        for item_index, item in enumerate(layer["items"]):
+            if not item.get("id") or item["id"] in seen:
+                item["id"] = f"{layer['id']}_{item_index + 1}"
+            seen.add(item["id"])
+
+    ranks, edges = _build_graph(layers, connections)
+    ranks = _order_ranks(ranks, edges, config.sweeps)
+    x = _assign_x(ranks, edges, config)
+
+    real = [node for nodes in ranks for node in nodes if not node.startswith("\0")]
+    left = min((x[node] for node in real), default=0.0)
+    right = max((x[node] + config.item_width for node in real), default=0.0)
+    width = max(config.min_width, int(right - left) + 2 * config.margin)
+    offset = (width - (right - left)) / 2 - left
+
+    for rank, (layer, nodes) in enumerate(zip(layers, ranks)):
+        y = config.top + rank * (config.layer_height + config.layer_gap)
+        for key, value in LAYER_STYLES.get(layer["id"], {}).items():
+            layer.setdefault(key, value)
+        layer.update(layer=rank + 1, yPosition=y, height=config.layer_height)
+        items = {item["id"]: item for item in layer["items"]}
+        layer["items"] = [items[node] for node in nodes if node in items]
+        for item in layer["items"]:
+            item["position"] = {
+                "x": int(round(x[item["id"]] + offset)),
+                "y": y,
+                "width": config.item_width,
+                "height": config.item_height,
+            }
+
+    height = config.top + len(layers) * config.layer_height + len(layers) * config.layer_gap
+    return {
+        "structure": {"layers": layers, "connections": connections},
+        "designSpecs": {
+            "container": {
+                "width": f"{width}px",
+                "height": f"{height}px",
+                "background": CONTAINER_BACKGROUND,
+                "padding": "40px",
+            },
+            "layerSpacing": config.layer_gap,
+            "itemSpacing": config.item_spacing,
+        },
+    }
@@ -0,0 +1,92 @@
+"""
+에이전트 결과 캐시 - 단계 이름과 정확한 입력의 해시를 키로 하는 메모리/디스크 2단계 캐시
+impact_focus만 바꾸거나 파일 하나를 추가해 다시 생성할 때, 입력이 그대로인 단계는 Gemini를 다시 호출하지 않습니다.
+"""
+
+import copy
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..checkpoints import atomic_write_json, canonical_hash
+
+# 프롬프트/결과 구조가 바뀌면 올려서 기존 캐시를 무효화
+AGENT_CACHE_VERSION = 2
+
+
+def input_hash(node: str, inputs: Any) -> str:
+    """단계 이름 + 입력의 정규화 JSON SHA-256 (dict 키 순서와 무관)"""
+    return canonical_hash({"node": node, "version": AGENT_CACHE_VERSION, "inputs": inputs})
+
+
+class AgentOutputCache:
+    """메모리 LRU(항목 수 기준) + 디스크 JSON 캐시"""
+
+    def __init__(self, max_entries: Optional[int] = None, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries or int(os.getenv("TOC_CACHE_ENTRIES", "256"))
+        disk_dir = disk_dir or os.getenv("TOC_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "ir-toc-cache")
+        self.disk_dir = disk_dir if disk_dir != "off" else None
+
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self.stores = 0
+
+    def _disk_path(self, digest: str) -> str:
+        return os.path.join(self.disk_dir, f"{digest}.json")
+
+    def _memory_put(self, digest: str, value: Any) -> None:
+        self._memory[digest] = value
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, digest: str) -> Optional[Any]:
+        """조회 (메모리 → 디스크 순, 디스크 적중 시 메모리로 승격)"""
+        with self._lock:
+            if digest in self._memory:
+                self._memory.move_to_end(digest)
+                self.hits["memory"] += 1
+                # 호출 측 수정이 캐시에 번지지 않도록 사본 반환
+                return copy.deepcopy(self._memory[digest])
+            value = None
+            if self.disk_dir:
+                try:
+                    with open(self._disk_path(digest), "r", encoding="utf-8") as f:
+                        value = json.load(f)
+                except (OSError, ValueError):
+                    value = None
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits["disk"] += 1
+            self._memory_put(digest, value)
+            return copy.deepcopy(value)
+
+    def put(self, digest: str, value: Any) -> None:
+        """JSON으로 직렬화되는 결과만 저장 (원자적 파일 교체)"""
+        try:
+            json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._memory_put(digest, copy.deepcopy(value))
+            self.stores += 1
+        if self.disk_dir:
+            atomic_write_json(self._disk_path(digest), value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_entries": len(self._memory),
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "stores": self.stores,
+        }
+
+
+# 오케스트레이터 인스턴스 간 공유 캐시
+agent_output_cache = AgentOutputCache()
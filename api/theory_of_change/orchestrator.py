@@ -3,24 +3,31 @@
 studio-coach 패턴으로 다중 에이전트를 조율하여 변화이론을 생성합니다.
 """
 
-import google.generativeai as genai
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, AsyncContextManager, Callable, Optional, List
 from datetime import datetime
 from .agents.context_analyzer import ContextAnalyzer
 from .agents.user_insight import UserInsightAgent
 from .agents.strategy_designer import StrategyDesigner
 from .agents.validator import Validator
 from .agents.storyteller import Storyteller
+from ..logging_utils import get_logger
+from ..projections import ProjectionSpec, project
+from ..routing import LATENCY_BUDGETS_MS, routing_context
+from .dag import DAGExecutor, Node
+from .layout import layout_theory
+from .memo import AgentOutputCache, agent_output_cache
+
+logger = get_logger("theory_of_change")
 
 
 class TheoryOfChangeOrchestrator:
     """다중 에이전트 조율기 - studio-coach 패턴"""
     
-    def __init__(self, api_key: str):
-        """오케스트레이터 초기화"""
+    def __init__(self, api_key: str, cache: Optional[AgentOutputCache] = None):
+        """오케스트레이터 초기화 (cache를 생략하면 인스턴스 간 공유 캐시 사용)"""
         self.api_key = api_key
-        genai.configure(api_key=api_key)
+        self.cache = cache if cache is not None else agent_output_cache
         
         # 각 전문 에이전트 초기화
         self.context_analyzer = ContextAnalyzer(api_key)
@@ -29,65 +36,140 @@ class TheoryOfChangeOrchestrator:
         self.validator = Validator(api_key)
         self.storyteller = Storyteller(api_key)
     
+    # 단계별 타임아웃(초) - 초과하면 해당 단계만 기본값 사용
+    NODE_TIMEOUTS = {
+        "context": 60,
+        "user_insights": 60,
+        "strategy": 90,
+        "validation": 60,
+        "visualization": 90,
+    }
+    
+    # 단계별 입력 투영 - 각 에이전트 프롬프트가 실제로 보간하는 선행 결과 경로만 전달
+    PROJECTIONS: Dict[str, ProjectionSpec] = {
+        "user_insights": {
+            "context": (("current_state", "mission"), ("stakeholders", "primary")),
+        },
+        "strategy": {
+            "context": (("current_state", "mission"), ("opportunities", "high_priority")),
+            "user_insights": (("key_insights", "primary_needs"),),
+        },
+        "validation": {
+            "strategy": (("intervention_logic", "core_hypothesis"), ("intervention_logic", "target_outcome")),
+        },
+        "visualization": {
+            "context": (("current_state", "mission"),),
+            "strategy": (("intervention_logic", "target_outcome"),),
+        },
+    }
+    
+    def _build_pipeline(
+        self, 
+        organization_name: str, 
+        impact_focus: Optional[str], 
+        files: Optional[List]
+    ) -> List[Node]:
+        """변화이론 단계 DAG - 검증(Validator)과 시각화(Storyteller)는 전략 설계 후 동시에 실행
+        
+        각 단계의 캐시 키는 에이전트에 전달되는 입력 그대로 (현황 분석은 조직 데이터, 이후 단계는 투영된 선행 결과)
+        """
+        org_data = {"name": organization_name, "focus": impact_focus, "files": files}
+        
+        def view(phase: str) -> Callable[[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+            return lambda inputs: project(self.PROJECTIONS[phase], inputs)
+        
+        insights_view, strategy_view = view("user_insights"), view("strategy")
+        validation_view, visualization_view = view("validation"), view("visualization")
+        
+        return [
+            Node(
+                "context",
+                lambda inputs: self.context_analyzer.analyze_organization_context(org_data),
+                fallback=lambda inputs: self.context_analyzer._get_default_context(org_data),
+                timeout=self.NODE_TIMEOUTS["context"],
+                key=lambda inputs: org_data,
+            ),
+            Node(
+                "user_insights",
+                lambda inputs: self.user_insight.synthesize_user_needs(insights_view(inputs)["context"]),
+                deps=("context",),
+                fallback=lambda inputs: self.user_insight._get_default_insights(insights_view(inputs)["context"]),
+                timeout=self.NODE_TIMEOUTS["user_insights"],
+                key=insights_view,
+            ),
+            Node(
+                "strategy",
+                lambda inputs: self.strategy_designer.design_intervention_logic(
+                    strategy_view(inputs)["context"], strategy_view(inputs)["user_insights"]
+                ),
+                deps=("context", "user_insights"),
+                fallback=lambda inputs: self.strategy_designer._get_default_strategy(
+                    strategy_view(inputs)["context"], strategy_view(inputs)["user_insights"]
+                ),
+                timeout=self.NODE_TIMEOUTS["strategy"],
+                key=strategy_view,
+            ),
+            Node(
+                "validation",
+                lambda inputs: self.validator.design_validation_framework(validation_view(inputs)["strategy"]),
+                deps=("strategy",),
+                fallback=lambda inputs: self.validator._get_default_validation(validation_view(inputs)["strategy"]),
+                timeout=self.NODE_TIMEOUTS["validation"],
+                key=validation_view,
+            ),
+            Node(
+                "visualization",
+                lambda inputs: self.storyteller.create_theory_visualization(visualization_view(inputs)),
+                deps=("context", "strategy"),
+                fallback=lambda inputs: self.storyteller._get_default_visualization(visualization_view(inputs)),
+                timeout=self.NODE_TIMEOUTS["visualization"],
+                key=visualization_view,
+            ),
+        ]
+    
     async def generate_theory_of_change(
         self, 
         organization_name: str, 
         impact_focus: Optional[str] = None,
-        files: Optional[List] = None
+        files: Optional[List] = None,
+        gate: Optional[Callable[[str], AsyncContextManager]] = None
     ) -> Dict[str, Any]:
-        """6단계 협업 파이프라인으로 변화이론 생성"""
+        """단계 DAG로 변화이론 생성 (독립 단계는 동시에, 실패한 단계만 기본값으로 대체)
+        
+        gate를 주면 각 에이전트 호출이 그 컨텍스트 안에서 실행 (여러 조직이 공유하는 동시성 풀/속도 제한)
+        """
         
         try:
-            print(f"🎯 변화이론 생성 시작: {organization_name}")
+            logger.info("Theory of change started", extra={"organization": organization_name})
             
-            # Phase 1: 현황 분석 (Context Analysis)
-            print("📊 Phase 1: 현황 분석 중...")
-            context = await self.context_analyzer.analyze_organization_context({
-                "name": organization_name,
-                "focus": impact_focus,
-                "files": files
-            })
-            
-            # Phase 2: 사용자 인사이트 (User Insights)
-            print("👥 Phase 2: 사용자 인사이트 분석 중...")
-            user_insights = await self.user_insight.synthesize_user_needs(context)
-            
-            # Phase 3: 전략 설계 (Strategy Design)
-            print("🎨 Phase 3: 전략 설계 중...")
-            strategy = await self.strategy_designer.design_intervention_logic(
-                context, user_insights
+            # Phase 1-5: 현황 분석 → 사용자 인사이트 → 전략 설계 → (검증 체계 ∥ 스토리텔링)
+            # 입력이 바뀌지 않은 단계는 캐시된 결과를 재사용
+            executor = DAGExecutor(
+                self._build_pipeline(organization_name, impact_focus, files), cache=self.cache, gate=gate
             )
-            
-            # Phase 4: 검증 체계 (Validation Framework)
-            print("🔬 Phase 4: 검증 체계 구성 중...")
-            validation = await self.validator.design_validation_framework(strategy)
-            
-            # Phase 5: 스토리텔링 (Visualization)
-            print("📖 Phase 5: 스토리텔링 및 시각화 중...")
-            visualization = await self.storyteller.create_theory_visualization({
-                "context": context,
-                "user_insights": user_insights,
-                "strategy": strategy,
-                "validation": validation
-            })
+            # 요청 전체 지연 예산 안에서 단계별 모델 선택 (남은 시간이 부족하면 하위 모델)
+            with routing_context(LATENCY_BUDGETS_MS["toc"]) as routing:
+                pipeline = await executor.run()
+            if pipeline.cached:
+                logger.info("Reused cached stages", extra={"organization": organization_name, "stages": pipeline.cached})
+            if pipeline.failed:
+                logger.warning("Stages replaced with defaults", extra={"organization": organization_name, "stages": pipeline.failed})
             
             # Phase 6: 통합 & 품질 보장
-            print("⚡ Phase 6: 최종 통합 중...")
             complete_theory = self._synthesize_complete_theory({
                 "organization_name": organization_name,
                 "impact_focus": impact_focus,
-                "context": context,
-                "user_insights": user_insights,
-                "strategy": strategy,
-                "validation": validation,
-                "visualization": visualization
+                **pipeline.results
             })
+            complete_theory["reportInfo"]["pipeline"] = pipeline.statuses
+            complete_theory["reportInfo"]["cache"] = {**pipeline.cache_summary(), "totals": self.cache.stats()}
+            complete_theory["reportInfo"]["models"] = routing.records
             
-            print("✅ 변화이론 생성 완료")
+            logger.info("Theory of change completed", extra={"organization": organization_name})
             return complete_theory
             
         except Exception as e:
-            print(f"❌ 변화이론 생성 중 오류: {str(e)}")
+            logger.error("Theory of change failed for %s: %s", organization_name, e)
             # 오류 시 기본 템플릿 반환
             return self._get_fallback_theory(organization_name, impact_focus)
     
@@ -130,73 +212,17 @@ class TheoryOfChangeOrchestrator:
     def _create_default_theory_structure(self, components: Dict[str, Any]) -> Dict[str, Any]:
         """기본 변화이론 구조 생성"""
         
-        return {
-            "structure": {
-                "layers": [
-                    {
-                        "id": "inputs",
-                        "name": "투입(Inputs)",
-                        "layer": 1,
-                        "yPosition": 100,
-                        "height": 120,
-                        "backgroundColor": "#E8F4FD",
-                        "borderColor": "#2196F3",
-                        "items": self._extract_inputs(components)
-                    },
-                    {
-                        "id": "activities",
-                        "name": "활동(Activities)",
-                        "layer": 2,
-                        "yPosition": 280,
-                        "height": 120,
-                        "backgroundColor": "#F3E5F5",
-                        "borderColor": "#9C27B0",
-                        "items": self._extract_activities(components)
-                    },
-                    {
-                        "id": "outputs",
-                        "name": "산출(Outputs)",
-                        "layer": 3,
-                        "yPosition": 460,
-                        "height": 120,
-                        "backgroundColor": "#E8F5E8",
-                        "borderColor": "#4CAF50",
-                        "items": self._extract_outputs(components)
-                    },
-                    {
-                        "id": "outcomes",
-                        "name": "성과(Outcomes)",
-                        "layer": 4,
-                        "yPosition": 640,
-                        "height": 120,
-                        "backgroundColor": "#FFF3E0",
-                        "borderColor": "#FF9800",
-                        "items": self._extract_outcomes(components)
-                    },
-                    {
-                        "id": "impact",
-                        "name": "임팩트(Impact)",
-                        "layer": 5,
-                        "yPosition": 820,
-                        "height": 120,
-                        "backgroundColor": "#FFEBEE",
-                        "borderColor": "#F44336",
-                        "items": self._extract_impact(components)
-                    }
-                ],
-                "connections": self._create_connections()
-            },
-            "designSpecs": {
-                "container": {
-                    "width": "1200px",
-                    "height": "1000px",
-                    "background": "linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%)",
-                    "padding": "40px"
-                },
-                "layerSpacing": 140,
-                "itemSpacing": 20
-            }
-        }
+        # 항목 수가 달라져도 겹치지 않도록 좌표는 레이아웃 엔진이 계산
+        return layout_theory(
+            [
+                {"id": "inputs", "items": self._extract_inputs(components)},
+                {"id": "activities", "items": self._extract_activities(components)},
+                {"id": "outputs", "items": self._extract_outputs(components)},
+                {"id": "outcomes", "items": self._extract_outcomes(components)},
+                {"id": "impact", "items": self._extract_impact(components)},
+            ],
+            self._create_connections(),
+        )
     
     def _extract_inputs(self, components: Dict[str, Any]) -> List[Dict[str, Any]]:
         """투입 요소 추출"""
@@ -208,7 +234,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "자금",
                 "value": context.get('funding', '분석 필요'),
                 "description": context.get('funding_desc', '운영 자금 및 프로젝트 예산'),
-                "position": {"x": 50, "y": 100, "width": 180, "height": 80},
                 "icon": "💰"
             },
             {
@@ -216,7 +241,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "인력",
                 "value": context.get('team_size', '분석 필요'),
                 "description": context.get('team_desc', '전문 인력 및 자원봉사자'),
-                "position": {"x": 250, "y": 100, "width": 180, "height": 80},
                 "icon": "👥"
             },
             {
@@ -224,7 +248,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "기술",
                 "value": context.get('technology', '디지털 도구'),
                 "description": context.get('tech_desc', '필요한 기술 인프라'),
-                "position": {"x": 450, "y": 100, "width": 180, "height": 80},
                 "icon": "💻"
             }
         ]
@@ -241,7 +264,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "교육 프로그램",
                 "value": strategy.get('education_programs', '계획 수립 필요'),
                 "description": strategy.get('education_desc', '대상 그룹별 맞춤 교육'),
-                "position": {"x": 50, "y": 280, "width": 180, "height": 80},
                 "icon": "📚"
             },
             {
@@ -249,7 +271,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "플랫폼 구축",
                 "value": strategy.get('platform_dev', '개발 예정'),
                 "description": strategy.get('platform_desc', '서비스 제공 플랫폼'),
-                "position": {"x": 250, "y": 280, "width": 180, "height": 80},
                 "icon": "🔧"
             },
             {
@@ -257,7 +278,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "아웃리치",
                 "value": strategy.get('outreach', '커뮤니티 활동'),
                 "description": strategy.get('outreach_desc', '지역사회 참여 확대'),
-                "position": {"x": 450, "y": 280, "width": 180, "height": 80},
                 "icon": "📢"
             }
         ]
@@ -274,7 +294,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "교육 이수자",
                 "value": validation.get('target_participants', '목표 설정 필요'),
                 "description": validation.get('participants_desc', '프로그램 완료자 수'),
-                "position": {"x": 80, "y": 460, "width": 160, "height": 80},
                 "icon": "🎓"
             },
             {
@@ -282,7 +301,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "제공 서비스",
                 "value": validation.get('service_count', '서비스 개수'),
                 "description": validation.get('service_desc', '실제 제공된 서비스'),
-                "position": {"x": 260, "y": 460, "width": 160, "height": 80},
                 "icon": "🚀"
             },
             {
@@ -290,7 +308,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "구축된 파트너십",
                 "value": validation.get('partnerships', '파트너 수'),
                 "description": validation.get('partnership_desc', '협력 관계 수'),
-                "position": {"x": 440, "y": 460, "width": 160, "height": 80},
                 "icon": "🤝"
             }
         ]
@@ -307,7 +324,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "역량 향상",
                 "value": user_insights.get('skill_target', '75%'),
                 "description": user_insights.get('skill_desc', '참여자 역량 향상도'),
-                "position": {"x": 50, "y": 640, "width": 180, "height": 80},
                 "icon": "🎯"
             },
             {
@@ -315,7 +331,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "행동 변화",
                 "value": user_insights.get('behavior_target', '60%'),
                 "description": user_insights.get('behavior_desc', '긍정적 행동 변화율'),
-                "position": {"x": 250, "y": 640, "width": 180, "height": 80},
                 "icon": "📈"
             },
             {
@@ -323,7 +338,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "네트워크 확장",
                 "value": user_insights.get('network_target', '증가'),
                 "description": user_insights.get('network_desc', '사회적 연결망 확대'),
-                "position": {"x": 450, "y": 640, "width": 180, "height": 80},
                 "icon": "🌐"
             }
         ]
@@ -340,7 +354,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "사회적 변화",
                 "value": "장기적 변화",
                 "description": f"{impact_focus} 영역의 지속가능한 사회 변화",
-                "position": {"x": 150, "y": 820, "width": 250, "height": 80},
                 "icon": "🌍"
             },
             {
@@ -348,7 +361,6 @@ class TheoryOfChangeOrchestrator:
                 "title": "시스템 개선",
                 "value": "구조적 변화",
                 "description": "기존 시스템의 긍정적 변화 유도",
-                "position": {"x": 450, "y": 820, "width": 250, "height": 80},
                 "icon": "⚡"
             }
         ]
@@ -391,38 +403,18 @@ class TheoryOfChangeOrchestrator:
                 "location": "대한민국",
                 "impactFocus": impact_focus or '사회혁신'
             },
-            "theoryOfChange": {
-                "structure": {
-                    "layers": [
+            "theoryOfChange": layout_theory([
+                {
+                    "id": "inputs",
+                    "items": [
                         {
-                            "id": "inputs",
-                            "name": "투입(Inputs)",
-                            "layer": 1,
-                            "yPosition": 100,
-                            "height": 120,
-                            "backgroundColor": "#E8F4FD",
-                            "borderColor": "#2196F3",
-                            "items": [
-                                {
-                                    "id": "funding",
-                                    "title": "자금",
-                                    "value": "분석 필요",
-                                    "description": "운영 자금 및 프로젝트 예산",
-                                    "position": {"x": 50, "y": 100, "width": 180, "height": 80},
-                                    "icon": "💰"
-                                }
-                            ]
+                            "id": "funding",
+                            "title": "자금",
+                            "value": "분석 필요",
+                            "description": "운영 자금 및 프로젝트 예산",
+                            "icon": "💰"
                         }
-                    ],
-                    "connections": []
-                },
-                "designSpecs": {
-                    "container": {
-                        "width": "1200px",
-                        "height": "1000px",
-                        "background": "linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%)",
-                        "padding": "40px"
-                    }
+                    ]
                 }
-            }
+            ])
         }
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+에이전트 입력 투영 벤치마크 - 선행 단계 결과 전체 전달과 단계별 투영 전달의 토큰 비교
+대표 조직들의 현실적인 에이전트 출력(공백/중복이 섞인 LLM 응답 형태)으로 단계별 입력 페이로드와 프롬프트 토큰을 측정합니다.
+
+사용법:
+    python benchmarks/bench_agent_projections.py [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.impact_story.enhanced_builder import EnhancedImpactStoryBuilder  # noqa: E402
+from api.projections import compact_json, project  # noqa: E402
+from api.prompt_budget import estimate_tokens  # noqa: E402
+from api.theory_of_change.agents.storyteller import Storyteller  # noqa: E402
+from api.theory_of_change.agents.strategy_designer import StrategyDesigner  # noqa: E402
+from api.theory_of_change.agents.user_insight import UserInsightAgent  # noqa: E402
+from api.theory_of_change.agents.validator import Validator  # noqa: E402
+from api.theory_of_change.orchestrator import TheoryOfChangeOrchestrator  # noqa: E402
+
+ORGANIZATIONS = [
+    {"name": "그린브릿지", "focus": "기후 테크", "field": "도시 탄소 배출 감축", "who": "중소 제조 기업"},
+    {"name": "함께배움", "focus": "교육", "field": "농어촌 청소년 학습 격차", "who": "읍면 지역 중학생"},
+    {"name": "온기돌봄", "focus": "돌봄", "field": "독거 노인 고립", "who": "1인 가구 고령자"},
+]
+
+
+def messy(text: str, repeat: int) -> str:
+    """LLM 응답처럼 줄바꿈/들여쓰기가 섞인 장문"""
+    return ("\n  " + text + "  ") * repeat
+
+
+def toc_upstream(org, repeat):
+    """대표 변화이론 에이전트 출력 (프롬프트 JSON 예시의 모든 필드를 채운 형태)"""
+    need = f"{org['who']}의 {org['field']} 해소"
+    context = {
+        "current_state": {
+            "mission": messy(f"{org['field']} 문제를 데이터와 현장 파트너십으로 해결", 1),
+            "vision": messy(f"{org['focus']} 분야의 지속가능한 변화", repeat),
+            "team_size": "12명", "funding": "시드 5억원", "funding_desc": messy("정부 보조금과 임팩트 투자 병행", repeat),
+        },
+        "market_context": {
+            "market_size": messy(f"{org['focus']} 시장 2조원", repeat),
+            "growth_trend": messy("연 15% 성장", repeat),
+            "key_opportunities": [messy(f"{org['focus']} 기회 {i}", 1) for i in range(6)],
+        },
+        "stakeholders": {
+            "primary": [org["who"], "지자체", org["who"], "현장 파트너"],
+            "secondary": [f"2차 이해관계자 {i}" for i in range(6)],
+            "influencers": [f"영향자 {i}" for i in range(4)],
+        },
+        "resources": {
+            "technology": "모바일 플랫폼", "tech_desc": messy("매칭 알고리즘과 대시보드", repeat),
+            "key_constraints": [messy("인력 부족", 1) for _ in range(3)],
+            "competitive_advantages": [f"우위 {i}" for i in range(5)],
+        },
+        "opportunities": {
+            "high_priority": [need, "공공 조달 진입", need],
+            "medium_priority": [f"중간 기회 {i}" for i in range(5)],
+            "timing_factors": [messy("정책 예산 편성 시기", 1) for _ in range(3)],
+        },
+    }
+    user_insights = {
+        "user_personas": [
+            {"name": f"페르소나 {i}", "description": messy(f"{org['who']} 유형 {i}", repeat),
+             "goals": ["목표 A", "목표 B"], "pain_points": ["불편 A", "불편 B"], "behaviors": ["행동 A"]}
+            for i in range(3)
+        ],
+        "key_insights": {
+            "primary_needs": [need, "지속적 지원", need, "  커뮤니티 연결  "],
+            "behavioral_drivers": [f"동기 {i}" for i in range(5)],
+            "decision_factors": [f"요인 {i}" for i in range(5)],
+            "barriers": [f"장벽 {i}" for i in range(5)],
+        },
+        "user_journey": {stage: messy(f"{stage} 단계 설명", repeat) for stage in ("awareness", "consideration", "adoption", "retention")},
+    }
+    strategy = {
+        "intervention_logic": {
+            "core_hypothesis": messy(f"{org['who']}에게 맞춤 지원을 제공하면 {org['field']}이 완화된다", 1),
+            "target_outcome": messy(f"3년 내 {org['field']} 30% 감소", 1),
+            "success_indicators": [f"지표 {i}" for i in range(6)],
+        },
+        "activity_design": {f"activity_{i}": messy(f"활동 {i} 상세", repeat) for i in range(4)},
+        "implementation_timeline": {f"phase{i}": {"duration": "6개월", "milestones": [f"마일스톤 {j}" for j in range(4)]} for i in range(3)},
+        "partnerships": {"strategic_partners": [f"파트너 {i}" for i in range(6)], "funding_sources": ["정부", "민간"]},
+    }
+    return {"context": context, "user_insights": user_insights, "strategy": strategy}
+
+
+def story_upstream(org, repeat):
+    """대표 임팩트 스토리 단계 출력"""
+    toc = toc_upstream(org, repeat)
+    return {
+        "context": {
+            **toc["context"],
+            "success_factors": {"critical_factors": [f"요인 {i}" for i in range(5)], "risk_factors": ["위험 A", "위험 B"]},
+        },
+        "user_insights": toc["user_insights"],
+        "strategy": {
+            "impact_logic": {"core_hypothesis": toc["strategy"]["intervention_logic"]["core_hypothesis"]},
+            "implementation_strategy": toc["strategy"]["implementation_timeline"],
+            "activity_design": toc["strategy"]["activity_design"],
+        },
+    }
+
+
+def toc_prompts(upstream):
+    """변화이론 단계별 프롬프트 (upstream은 단계별 선행 결과 dict)"""
+    insight, strategist = UserInsightAgent("AIzaBENCH"), StrategyDesigner("AIzaBENCH")
+    validator, storyteller = Validator("AIzaBENCH"), Storyteller("AIzaBENCH")
+    return {
+        "user_insights": lambda u: insight._build_user_insight_prompt(u["context"]),
+        "strategy": lambda u: strategist._build_strategy_prompt(u["context"], u["user_insights"]),
+        "validation": lambda u: validator._build_validation_prompt(u["strategy"]),
+        "visualization": lambda u: storyteller._build_storytelling_prompt(u),
+    }
+
+
+def story_prompts(builder, steps):
+    """임팩트 스토리 단계별 프롬프트 - 생성 호출 대신 프롬프트만 수집"""
+    captured = {}
+
+    def capture(prompt, analysis_type):
+        captured["prompt"] = prompt
+        return builder._get_fallback_data(analysis_type)
+
+    builder._generate_structured = capture
+
+    def build(method, *args):
+        asyncio.run(method(steps, *args))
+        return captured["prompt"]
+
+    return {
+        "user_insights": lambda u: build(builder._analyze_user_insights_with_ai, u["context"]),
+        "strategy": lambda u: build(builder._design_strategy_with_ai, u["context"], u["user_insights"]),
+        "story": lambda u: build(builder._create_story_with_ai, u["context"], u["user_insights"], u["strategy"]),
+    }
+
+
+# 투영 전 각 단계가 받던 선행 결과
+_FULL_INPUTS = {
+    "user_insights": ("context",),
+    "strategy": ("context", "user_insights"),
+    "validation": ("strategy",),
+    "visualization": ("context", "user_insights", "strategy"),
+    "story": ("context", "user_insights", "strategy"),
+}
+
+
+def measure(pipeline, phase, spec, upstream, prompts):
+    full = {name: upstream[name] for name in _FULL_INPUTS[phase]}
+    projected = project(spec, upstream)
+    full_prompt, projected_prompt = prompts[phase](full), prompts[phase](projected)
+    return {
+        "pipeline": pipeline,
+        "phase": phase,
+        "payload_tokens": [estimate_tokens(compact_json(full)), estimate_tokens(compact_json(projected))],
+        "prompt_tokens": [estimate_tokens(full_prompt), estimate_tokens(projected_prompt)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="agent input projection benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="장문 필드 반복 횟수 (응답 길이)")
+    args = parser.parse_args()
+
+    rows = []
+    for org in ORGANIZATIONS:
+        upstream = toc_upstream(org, args.repeat)
+        prompts = toc_prompts(upstream)
+        for phase, spec in TheoryOfChangeOrchestrator.PROJECTIONS.items():
+            rows.append({"organization": org["name"], **measure("theory_of_change", phase, spec, upstream, prompts)})
+
+        steps = {"problem": org["field"], "target": org["who"], "solution": "맞춤 지원 플랫폼",
+                 "change": f"{org['field']} 완화", "measurement": "분기별 설문"}
+        builder = EnhancedImpactStoryBuilder()
+        prompts = story_prompts(builder, steps)
+        upstream = story_upstream(org, args.repeat)
+        for phase, spec in EnhancedImpactStoryBuilder.PROJECTIONS.items():
+            rows.append({"organization": org["name"], **measure("impact_story", phase, spec, upstream, prompts)})
+
+    summary = {}
+    for row in rows:
+        key = f"{row['pipeline']}.{row['phase']}"
+        entry = summary.setdefault(key, {"payload_tokens": [0, 0], "prompt_tokens": [0, 0]})
+        for metric in ("payload_tokens", "prompt_tokens"):
+            entry[metric] = [a + b for a, b in zip(entry[metric], row[metric])]
+    for entry in summary.values():
+        for metric in ("payload_tokens", "prompt_tokens"):
+            full, projected = entry[metric]
+            entry[metric.replace("tokens", "reduction")] = round(1 - projected / full, 3) if full else 0.0
+
+    print(json.dumps({"repeat": args.repeat, "phases": summary, "rows": rows}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Cold Start 벤치마크 - api.index import 시간과 첫 요청 지연 측정
+Cloud Run 콜드 스타트 회귀를 추적하기 위해 매 측정마다 새 인터프리터를 띄웁니다.
+
+사용법:
+    python benchmarks/bench_cold_start.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 새 프로세스에서 실행되는 측정 스크립트 (import → 첫 요청 순서)
+_PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import api.index as index
+t1 = time.perf_counter()
+
+from fastapi.testclient import TestClient
+client = TestClient(index.app)
+
+t2 = time.perf_counter()
+client.get("/health")
+t3 = time.perf_counter()
+client.post("/api/login", json={"api_key": "AIza" + "x" * 35})
+t4 = time.perf_counter()
+index.decrypt_api_key(index.encrypt_api_key("AIza" + "x" * 35))
+t5 = time.perf_counter()
+index.decrypt_api_key(index.encrypt_api_key("AIza" + "x" * 35))
+t6 = time.perf_counter()
+
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_health_ms": (t3 - t2) * 1000,
+    "first_login_ms": (t4 - t3) * 1000,
+    "first_cipher_ms": (t5 - t4) * 1000,
+    "warm_cipher_ms": (t6 - t5) * 1000,
+}))
+"""
+
+
+def run_probe() -> dict:
+    """새 인터프리터에서 한 번 측정"""
+    env = dict(os.environ)
+    env.setdefault("ENVIRONMENT", "benchmark")
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # 앱이 stdout에 로그를 남길 수 있으므로 마지막 JSON 라인만 사용
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="api.index cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [run_probe() for _ in range(args.runs)]
+    summary = {
+        key: {
+            "median": round(statistics.median(s[key] for s in samples), 2),
+            "max": round(max(s[key] for s in samples), 2),
+        }
+        for key in samples[0]
+    }
+    print(json.dumps({"runs": args.runs, "results_ms": summary}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
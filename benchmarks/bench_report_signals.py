@@ -0,0 +1,92 @@
+"""
+보고서 신호 추출 벤치마크 - 기존 lower() + 개별 substring/정규식 스캔과 단일 결합 정규식 비교
+긴 보고서(수십~수백 KB)에서 투자 점수/추천/리스크 추출 시간을 측정합니다.
+
+사용법:
+    python benchmarks/bench_report_signals.py [--sizes 20000 200000 1000000] [--runs 20]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.reports import extract_signals  # noqa: E402
+
+_PARAGRAPH = (
+    "## III. 시장 분석\n국내 임팩트 투자 시장은 연평균 18% 성장하고 있으며 TAM은 5조원 규모입니다. "
+    "The company targets rural youth employment with a subscription model and partnerships. "
+    "경쟁사 대비 데이터 기반 매칭 정확도가 높고, 지방자치단체와의 협력으로 진입 장벽을 확보했습니다.\n\n"
+)
+_TAIL = "\n# VIII. 종합 결론\n투자 매력도: 8.2/10\n투자 추천: Strong Buy\n낮은 리스크 요인이 우세합니다.\n"
+
+
+def legacy_signals(response_text: str) -> tuple:
+    """변경 전 analyze_with_gemini의 추출 방식"""
+    text_lower = response_text.lower()
+    investment_score = 7.5
+    if "10점" in response_text or "/10" in response_text:
+        import re
+        score_match = re.search(r'(\d+\.?\d*)/10|(\d+\.?\d*)점', response_text)
+        if score_match:
+            investment_score = float(score_match.group(1) or score_match.group(2))
+    recommendation = "Hold"
+    if "buy" in text_lower or "매수" in response_text or "투자추천" in response_text:
+        recommendation = "Buy"
+    elif "sell" in text_lower or "매도" in response_text:
+        recommendation = "Sell"
+    risk_level = "Medium"
+    if "높은 리스크" in response_text or "high risk" in text_lower:
+        risk_level = "High"
+    elif "낮은 리스크" in response_text or "low risk" in text_lower:
+        risk_level = "Low"
+    return investment_score, recommendation, risk_level
+
+
+def compiled_signals(response_text: str) -> tuple:
+    signals = extract_signals(response_text)
+    score = signals.score if signals.score is not None else 7.5
+    return score, signals.recommendation(strong=False), signals.risk_level()
+
+
+def make_report(size: int) -> str:
+    """신호가 끝부분에만 있는 최악의 경우 (모든 스캔이 전체를 훑어야 함)"""
+    return _PARAGRAPH * max(1, size // len(_PARAGRAPH)) + _TAIL
+
+
+def measure(func, text: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="report signal extraction benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20000, 200000, 1000000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        report = make_report(size)
+        assert legacy_signals(report) == compiled_signals(report)
+        legacy_ms = measure(legacy_signals, report, args.runs)
+        compiled_ms = measure(compiled_signals, report, args.runs)
+        results.append({
+            "chars": len(report),
+            "legacy_ms": round(legacy_ms, 3),
+            "compiled_ms": round(compiled_ms, 3),
+            "speedup": round(legacy_ms / compiled_ms, 2) if compiled_ms else None,
+        })
+    print(json.dumps({"runs": args.runs, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+임팩트 스토리 생성 모드 벤치마크 - 단계별(4회 호출)과 한 번에(1회 호출) 생성의 지연, 토큰, 스키마 완성도 비교
+고정된 단계 입력 세트로 두 모드를 번갈아 실행하고, 모든 Gemini 호출(repair 포함)의 프롬프트/응답 토큰과 지연을 기록합니다.
+
+기본은 시뮬레이션 모델 - 요청한 response_schema를 채운 응답을 모델 등급의 지연 추정치(입력/출력 토큰 기준)만큼 늦게 반환합니다.
+호출 횟수와 토큰에 따른 지연 차이를 재현하지만 응답 품질은 항상 완전하므로, 스키마 완성도 비교는 --live(실제 Gemini)에서만 의미가 있습니다.
+
+사용법:
+    python benchmarks/bench_story_modes.py [--repeat 2] [--time-scale 0.01]
+    GEMINI_API_KEY=... python benchmarks/bench_story_modes.py --live
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.checkpoints import CheckpointStore  # noqa: E402
+from api.impact_story.enhanced_builder import EnhancedImpactStoryBuilder  # noqa: E402
+from api.prompt_budget import estimate_tokens  # noqa: E402
+from api.routing import model_router  # noqa: E402
+from api.structured import schema_from_example, structured_metrics  # noqa: E402
+
+STEP_INPUTS = [
+    {"problem": "농어촌 청소년의 학습 격차", "target": "읍면 지역 중학생 2,000명", "solution": "대학생 온라인 멘토링 플랫폼",
+     "change": "기초학력 미달 비율 30% 감소", "measurement": "학기별 성취도 평가와 설문"},
+    {"problem": "독거 노인의 사회적 고립", "target": "1인 가구 고령자 500명", "solution": "AI 안부 전화와 지역 돌봄 연계",
+     "change": "고독감 지수 20% 개선", "measurement": "분기별 UCLA 고독감 척도"},
+    {"problem": "중소 제조 기업의 탄소 배출 관리 부재", "target": "수도권 중소 제조 기업 300곳", "solution": "에너지 사용 모니터링 SaaS",
+     "change": "연간 탄소 배출 15% 감축", "measurement": "전력/가스 사용량 데이터"},
+    {"problem": "경력 단절 여성의 재취업 어려움", "target": "30~40대 경력 단절 여성 1,000명", "solution": "직무 전환 부트캠프와 기업 매칭",
+     "change": "6개월 내 재취업률 60% 달성", "measurement": "취업 추적 조사"},
+]
+
+
+def _fill(schema):
+    """response_schema를 채운 예시 값 (문자열은 실제 응답 길이 수준)"""
+    kind = schema.get("type")
+    if kind == "object":
+        return {key: _fill(sub) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_fill(schema["items"]) for _ in range(3)] if "items" in schema else []
+    if kind == "number":
+        return 1
+    if kind == "boolean":
+        return True
+    return "지역 파트너와 함께 대상 그룹의 필요에 맞춘 지원을 제공합니다"
+
+
+class SimulatedModel:
+    """모델 등급 지연 추정치만큼 기다린 뒤 스키마를 채운 JSON을 스트리밍"""
+
+    def __init__(self, name, time_scale):
+        self.model_name = name
+        self.tier = model_router.by_name[name]
+        self.time_scale = time_scale
+
+    def generate_content(self, prompt, stream=False, generation_config=None):
+        schema = (generation_config or {}).get("response_schema") or {"type": "object"}
+        text = json.dumps(_fill(schema), ensure_ascii=False)
+        time.sleep(self.tier.estimate_ms(estimate_tokens(prompt), estimate_tokens(text)) / 1000 * self.time_scale)
+        return [SimpleNamespace(text=text[i:i + 200]) for i in range(0, len(text), 200)]
+
+
+class RecordingModel:
+    """호출별 프롬프트/응답 토큰과 지연 기록"""
+
+    def __init__(self, inner, calls):
+        self.inner = inner
+        self.model_name = getattr(inner, "model_name", None)
+        self.calls = calls
+
+    def generate_content(self, prompt, stream=False, generation_config=None):
+        started = time.perf_counter()
+        kwargs = {"stream": stream}
+        if generation_config is not None:
+            kwargs["generation_config"] = generation_config
+        chunks = [chunk for chunk in self.inner.generate_content(prompt, **kwargs)]
+        text = "".join(getattr(chunk, "text", "") or "" for chunk in chunks)
+        self.calls.append({
+            "model": self.model_name,
+            "prompt_tokens": estimate_tokens(prompt),
+            "output_tokens": estimate_tokens(text),
+            "latency_ms": (time.perf_counter() - started) * 1000,
+        })
+        return chunks
+
+
+def _leaves(schema, prefix=""):
+    if schema.get("type") == "object":
+        for key, sub in schema.get("properties", {}).items():
+            yield from _leaves(sub, f"{prefix}.{key}" if prefix else key)
+    else:
+        yield prefix
+
+
+def _lookup(data, path):
+    for key in path.split("."):
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+STORY_LEAVES = list(_leaves(schema_from_example(json.loads(EnhancedImpactStoryBuilder.STORY_JSON_EXAMPLE))))
+
+
+def completeness(story):
+    """story 스키마 말단 필드 중 비어 있지 않게 생성된 비율"""
+    filled = [path for path in STORY_LEAVES if _lookup(story, path) not in (None, "", [], {})]
+    return len(filled) / len(STORY_LEAVES)
+
+
+def run_once(mode, steps, make_model, time_scale):
+    calls = []
+    model_router.model = lambda name, api_key=None: RecordingModel(make_model(name), calls)
+    builder = EnhancedImpactStoryBuilder(checkpoints=CheckpointStore(disk_dir="off"))
+    builder.ai_enabled = True  # AI 사용 가능 표시 (실제 호출은 라우터 모델)
+    structured_metrics.reset()
+
+    started = time.perf_counter()
+    result = asyncio.run(builder.build_enhanced_story(steps, mode=mode))
+    elapsed = (time.perf_counter() - started) * 1000
+
+    counters = structured_metrics.snapshot().values()
+    return {
+        "mode": mode,
+        "generation_method": result.get("generation_method"),
+        "latency_ms": round(elapsed / time_scale, 1),
+        "calls": len(calls),
+        "prompt_tokens": sum(call["prompt_tokens"] for call in calls),
+        "output_tokens": sum(call["output_tokens"] for call in calls),
+        "repair_calls": sum(counts["repair_calls"] for counts in counters),
+        "defaulted_fields": sum(counts["defaulted_fields"] for counts in counters),
+        "completeness": round(completeness(result.get("story") or {}), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="impact story generation mode benchmark")
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--time-scale", type=float, default=0.01, help="시뮬레이션 지연 배율 (결과는 배율 적용 전 ms로 환산)")
+    parser.add_argument("--live", action="store_true", help="GEMINI_API_KEY로 실제 Gemini 호출")
+    args = parser.parse_args()
+
+    if args.live:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            parser.error("--live에는 GEMINI_API_KEY가 필요합니다")
+        keyed_model = model_router.model
+        make_model, time_scale = (lambda name: keyed_model(name, api_key)), 1.0
+    else:
+        make_model, time_scale = (lambda name: SimulatedModel(name, args.time_scale)), args.time_scale
+
+    rows = []
+    for _ in range(args.repeat):
+        for index, steps in enumerate(STEP_INPUTS):
+            for mode in EnhancedImpactStoryBuilder.MODES:
+                rows.append({"input": index, **run_once(mode, steps, make_model, time_scale)})
+
+    summary = {}
+    for mode in EnhancedImpactStoryBuilder.MODES:
+        runs = [row for row in rows if row["mode"] == mode]
+        latencies = sorted(row["latency_ms"] for row in runs)
+        summary[mode] = {
+            "runs": len(runs),
+            "latency_ms_p50": round(statistics.median(latencies), 1),
+            "latency_ms_max": latencies[-1],
+            "calls_mean": round(statistics.mean(row["calls"] for row in runs), 2),
+            "prompt_tokens_mean": round(statistics.mean(row["prompt_tokens"] for row in runs), 1),
+            "output_tokens_mean": round(statistics.mean(row["output_tokens"] for row in runs), 1),
+            "repair_calls": sum(row["repair_calls"] for row in runs),
+            "defaulted_fields": sum(row["defaulted_fields"] for row in runs),
+            "completeness_mean": round(statistics.mean(row["completeness"] for row in runs), 3),
+        }
+
+    print(json.dumps({"live": args.live, "summary": summary, "rows": rows}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
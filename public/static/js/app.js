@@ -570,28 +570,70 @@ class MYSCPlatform {
         return typingDiv;
     }
     
-    async performBasicAnalysis(companyName) {
+    async hashFile(file) {
+        const buffer = await file.arrayBuffer();
+        const digest = await crypto.subtle.digest('SHA-256', buffer);
+        return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+    }
+    
+    async appendFilesWithCache(formData, token, forceUpload = new Set()) {
+        // 서버에 이미 추출된 파일은 해시만 보내고 재업로드 생략
+        // forceUpload: 서버 캐시에서 사라진 해시 (409 응답) - 해당 파일은 원본 전송
         try {
-            const formData = new FormData();
-            formData.append('company_name', companyName);
-            
-            // Add selected files
-            this.selectedFiles.forEach(file => {
-                formData.append('files', file);
+            const hashes = await Promise.all(this.selectedFiles.map(file => this.hashFile(file)));
+            const lookupResponse = await fetch(window.location.origin + '/api/files/lookup', {
+                method: 'POST',
+                headers: {
+                    'Authorization': `Bearer ${token}`,
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ hashes })
             });
+            const lookup = await lookupResponse.json();
+            const cached = new Set(lookup.success ? lookup.cached : []);
             
+            this.selectedFiles.forEach((file, index) => {
+                if (cached.has(hashes[index]) && !forceUpload.has(hashes[index])) {
+                    formData.append('file_hashes', `${hashes[index]}:${file.name}`);
+                } else {
+                    formData.append('files', file);
+                }
+            });
+        } catch (error) {
+            // 해시 계산/조회 실패 시 전체 업로드
+            this.selectedFiles.forEach(file => formData.append('files', file));
+        }
+    }
+    
+    async startAnalysis(companyName, token, forceUpload = new Set()) {
+        const formData = new FormData();
+        formData.append('company_name', companyName);
+        
+        // Add selected files (캐시된 파일은 해시만 전송)
+        await this.appendFilesWithCache(formData, token, forceUpload);
+        
+        return fetch(window.location.origin + '/api/analyze/start', {
+            method: 'POST',
+            headers: {
+                'Authorization': `Bearer ${token}`
+            },
+            body: formData
+        });
+    }
+    
+    async performBasicAnalysis(companyName) {
+        try {
             const token = localStorage.getItem('auth_token');
             
             // 1. 분석 시작
-            const startResponse = await fetch(window.location.origin + '/api/analyze/start', {
-                method: 'POST',
-                headers: {
-                    'Authorization': `Bearer ${token}`
-                },
-                body: formData
-            });
+            let startResponse = await this.startAnalysis(companyName, token);
+            let startResult = await startResponse.json();
             
-            const startResult = await startResponse.json();
+            // 조회와 요청 사이에 캐시가 만료된 파일은 원본을 포함해 한 번 재전송
+            if (startResponse.status === 409 && Array.isArray(startResult.missing_hashes)) {
+                startResponse = await this.startAnalysis(companyName, token, new Set(startResult.missing_hashes));
+                startResult = await startResponse.json();
+            }
             
             if (!startResult.success) {
                 this.displayError(startResult.error);
@@ -610,7 +652,10 @@ class MYSCPlatform {
     
     async pollAnalysisStatus() {
         try {
-            const response = await fetch(window.location.origin + `/api/analyze/status/${this.currentJobId}`);
+            const token = localStorage.getItem('auth_token');
+            const response = await fetch(window.location.origin + `/api/analyze/status/${this.currentJobId}`, {
+                headers: token ? { 'Authorization': `Bearer ${token}` } : {}
+            });
             const result = await response.json();
             
             if (!result.success) {
@@ -922,6 +967,7 @@ class MYSCPlatform {
                     'Authorization': `Bearer ${token}`
                 },
                 body: JSON.stringify({
+                    project_id: this.currentProjectId,
                     conversation_id: this.currentConversationId,
                     question_type: 'custom',
                     custom_question: question,
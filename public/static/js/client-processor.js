@@ -1,4 +1,50 @@
 // Client-side PDF processing with Web Workers
+
+// 토큰 예산 (api/prompt_budget.py 와 같은 근사: 한글 음절 0.8, 영어 4자, 숫자 3자리, 기호 1토큰)
+const PromptBudget = {
+    HANGUL_TOKENS_PER_SYLLABLE: 0.8,
+    TOKEN_CLASSES: /([가-힣ㄱ-ㅎㅏ-ㅣ]+)|([A-Za-z]+)|(\d+)|(\s+)|([\s\S])/g,
+    BOUNDARY: /(?<=[.!?。…])\s+|\n+/g,
+
+    estimateTokens(text) {
+        if (!text) return 0;
+        let hangul = 0;
+        let total = 0;
+        for (const [, ko, latin, digits, , other] of text.matchAll(this.TOKEN_CLASSES)) {
+            if (ko) hangul += ko.length;
+            else if (latin) total += Math.ceil(latin.length / 4);
+            else if (digits) total += Math.ceil(digits.length / 3);
+            else if (other) total += 1;
+        }
+        return total + Math.ceil(hangul * this.HANGUL_TOKENS_PER_SYLLABLE);
+    },
+
+    // 예산 안에서 문장 경계까지만 남김
+    trimToTokens(text, maxTokens) {
+        if (this.estimateTokens(text) <= maxTokens) return text;
+        const budget = maxTokens - 1;
+        let kept = '';
+        let used = 0;
+        let start = 0;
+        const segments = [];
+        for (const match of text.matchAll(this.BOUNDARY)) {
+            segments.push(text.slice(start, match.index + match[0].length));
+            start = match.index + match[0].length;
+        }
+        if (start < text.length) segments.push(text.slice(start));
+        for (const segment of segments) {
+            const cost = this.estimateTokens(segment);
+            if (used + cost > budget) {
+                if (!kept) kept = segment.slice(0, Math.floor(budget / this.HANGUL_TOKENS_PER_SYLLABLE));
+                break;
+            }
+            kept += segment;
+            used += cost;
+        }
+        return kept.trimEnd() + '…';
+    }
+};
+
 class ClientProcessor {
     constructor() {
         this.worker = null;
@@ -77,7 +123,7 @@ class ClientProcessor {
                         text: `VC 파트너로서 ${companyName}의 Investment Thesis Memo 작성:
                         
 다음 문서를 분석해주세요:
-${text.substring(0, 30000)}
+${PromptBudget.trimToTokens(text, 24000)}
 
 # Executive Summary
 ## 1. 투자 개요  
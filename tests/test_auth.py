@@ -0,0 +1,78 @@
+"""
+JWT 인증 캐시 테스트
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+
+from api.auth import AuthContext, AuthError, TokenCache, TokenVerifier
+
+SECRET = "test-secret"
+
+
+def make_token(**claims):
+    payload = {"user_id": "u1", "api_key": "AIza-test", "exp": datetime.utcnow() + timedelta(hours=1)}
+    payload.update(claims)
+    return jwt.encode(payload, SECRET, algorithm="HS256")
+
+
+class TestTokenVerifier:
+    """토큰 검증 및 캐시 동작 테스트"""
+
+    def setup_method(self):
+        self.decrypt_calls = 0
+
+        def decrypt(value):
+            self.decrypt_calls += 1
+            return f"decrypted-{value}"
+
+        self.verifier = TokenVerifier(SECRET, decrypt)
+
+    def test_repeat_calls_hit_cache(self, monkeypatch):
+        token = make_token()
+        first = self.verifier.verify_token(token)
+
+        # 두 번째 호출은 jwt.decode를 거치지 않아야 함
+        monkeypatch.setattr(jwt, "decode", lambda *a, **k: pytest.fail("decode called on cache hit"))
+        second = self.verifier.verify_token(token)
+
+        assert first == second
+        assert first.user_id == "u1"
+        assert self.verifier.cache.stats()["hits"] == 1
+
+    def test_encrypted_key_decrypted_once(self):
+        token = make_token(api_key=None, encrypted_api_key="blob")
+        for _ in range(3):
+            assert self.verifier.verify_token(token).api_key == "decrypted-blob"
+        assert self.decrypt_calls == 1
+
+    def test_expired_token_rejected(self):
+        token = make_token(exp=datetime.utcnow() - timedelta(seconds=5))
+        with pytest.raises(AuthError) as error:
+            self.verifier.verify_token(token)
+        assert error.value.status_code == 401
+
+    def test_invalid_signature_rejected(self):
+        token = jwt.encode({"api_key": "x"}, "other-secret", algorithm="HS256")
+        with pytest.raises(AuthError):
+            self.verifier.verify_token(token)
+
+
+class TestTokenCache:
+    """LRU 및 만료 처리 테스트"""
+
+    def test_expired_entry_evicted(self):
+        cache = TokenCache(maxsize=4)
+        cache.put("k", AuthContext("u", "key", expires_at=time.time() - 1))
+        assert cache.get("k") is None
+        assert cache.stats()["size"] == 0
+
+    def test_lru_bound(self):
+        cache = TokenCache(maxsize=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, AuthContext(key, "k", None))
+        assert cache.get("a") is None
+        assert cache.get("c") is not None
@@ -0,0 +1,201 @@
+"""
+단계 체크포인트 테스트 - 원자적 저장/재시작 후 이어받기, 만료와 정리, 임팩트 스토리/장문 보고서/Supabase 분석 재시도 시 완료 단계 생략
+"""
+
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import api.index as ix
+from api.checkpoints import CheckpointStore, atomic_write_json
+from api.impact_story.enhanced_builder import EnhancedImpactStoryBuilder
+
+
+class TestCheckpointStore:
+    """체크포인트 저장소 테스트"""
+
+    def test_resumes_after_restart(self, tmp_path):
+        """디스크에 기록된 단계는 새 저장소(프로세스 재시작)에서도 이어받음"""
+        checkpoint = CheckpointStore(disk_dir=str(tmp_path)).open("pipeline", {"company": "A"})
+        assert checkpoint.resumed == []
+        checkpoint.save("first", {"value": 1})
+
+        restarted = CheckpointStore(disk_dir=str(tmp_path)).open("pipeline", {"company": "A"})
+        assert restarted.resumed == ["first"]
+        assert restarted.get("first") == {"value": 1}
+        assert "second" not in restarted
+        # 입력이 다르면 다른 실행
+        assert CheckpointStore(disk_dir=str(tmp_path)).open("pipeline", {"company": "B"}).resumed == []
+
+    def test_clear_removes_run(self, tmp_path):
+        """완료 후 정리하면 다음 실행은 처음부터"""
+        store = CheckpointStore(disk_dir=str(tmp_path))
+        checkpoint = store.open("pipeline", {"company": "A"})
+        checkpoint.save("first", {"value": 1})
+        checkpoint.clear()
+        assert store.open("pipeline", {"company": "A"}).resumed == []
+        assert os.listdir(tmp_path) == []
+
+    def test_expired_stages_ignored(self, tmp_path):
+        """보관 기간이 지난 단계는 이어받지 않음"""
+        CheckpointStore(disk_dir=str(tmp_path)).open("pipeline", 1).save("first", {"value": 1})
+        time.sleep(0.01)
+        store = CheckpointStore(disk_dir=str(tmp_path))
+        store.ttl_seconds = 0  # 생성자의 0은 기본값으로 대체되므로 직접 지정
+        assert store.open("pipeline", 1).resumed == []
+        # 만료된 단계 파일과 빈 실행 디렉터리는 삭제
+        assert os.listdir(tmp_path) == []
+
+    def test_memory_tier_respects_ttl(self):
+        """메모리에 남은 실행도 보관 기간이 지나면 이어받지 않음"""
+        store = CheckpointStore(disk_dir="off")
+        store.open("pipeline", 1).save("first", {"value": 1})
+        assert store.open("pipeline", 1).resumed == ["first"]
+        time.sleep(0.01)
+        store.ttl_seconds = 0
+        assert store.open("pipeline", 1).resumed == []
+        assert store.stats()["memory_runs"] == 0
+
+    def test_sweep_removes_abandoned_runs(self, tmp_path):
+        """다시 열리지 않는 실행 디렉터리도 주기적 정리에서 삭제"""
+        store = CheckpointStore(disk_dir=str(tmp_path))
+        store.open("pipeline", {"company": "A"}).save("first", {"value": 1})
+        assert store.sweep() == 0
+        assert store.sweep(now=time.time() + store.ttl_seconds + 1) == 1
+        assert os.listdir(tmp_path) == []
+
+    def test_unhashable_input_rejected(self):
+        """repr에 메모리 주소가 들어가는 값은 키로 쓰지 않음"""
+        with pytest.raises(TypeError):
+            CheckpointStore(disk_dir="off").open("pipeline", {"value": object()})
+
+    def test_atomic_write_leaves_no_temp_files(self, tmp_path):
+        """교체 쓰기 후 임시 파일이 남지 않고, 직렬화할 수 없는 값은 기록하지 않음"""
+        path = str(tmp_path / "stage.json")
+        assert atomic_write_json(path, {"값": 1})
+        assert not atomic_write_json(path, {"값": object()})
+        assert os.listdir(tmp_path) == ["stage.json"]
+
+
+class TestImpactStoryResume:
+    """임팩트 스토리 단계 이어받기 테스트"""
+
+    STEPS = {"problem": "학습 격차", "target": "청소년", "solution": "멘토링", "change": "학업 성취", "measurement": "설문"}
+
+    def test_retry_skips_completed_stages(self, tmp_path):
+        """기본값으로 대체된 단계부터 다시 생성하고, 모두 완료되면 체크포인트 정리"""
+        builder = EnhancedImpactStoryBuilder(checkpoints=CheckpointStore(disk_dir=str(tmp_path)))
+        calls, strategy_ok = [], []
+
+        async def context(steps):
+            calls.append("context_analysis")
+            return {"current_state": {"problem_severity": "높음"}}
+
+        async def insights(steps, context):
+            calls.append("user_insights")
+            return {"key_insights": {"primary_needs": ["니즈"]}}
+
+        async def strategy(steps, context, user_insights):
+            calls.append("strategy_design")
+            if not strategy_ok:
+                return builder._get_fallback_data("strategy_design")
+            return {"impact_logic": {"core_hypothesis": "가설"}}
+
+        async def story(steps, context, user_insights, strategy):
+            calls.append("story_visualization")
+            return {"story_narrative": {"title": strategy["impact_logic"].get("core_hypothesis", "기본")}}
+
+        builder._analyze_context_with_ai = context
+        builder._analyze_user_insights_with_ai = insights
+        builder._design_strategy_with_ai = strategy
+        builder._create_story_with_ai = story
+
+        asyncio.run(builder._generate_ai_enhanced_story(self.STEPS))
+        assert calls == ["context_analysis", "user_insights", "strategy_design", "story_visualization"]
+
+        calls.clear()
+        strategy_ok.append(True)
+        result = asyncio.run(builder._generate_ai_enhanced_story(self.STEPS))
+        assert calls == ["strategy_design", "story_visualization"]
+        assert result["resumed_stages"] == ["context_analysis", "user_insights"]
+        assert result["story"]["story_narrative"]["title"] == "가설"
+        assert os.listdir(tmp_path) == []
+
+
+class TestLongReportResume:
+    """장문 보고서 단계 이어받기 테스트"""
+
+    def test_retry_reuses_generated_report(self, tmp_path, monkeypatch):
+        """보고서 생성 후 실패한 작업은 재시도 시 Gemini를 다시 호출하지 않음"""
+        streams = []
+
+        class FakeModel:
+            def __init__(self, name):
+                pass
+
+            def generate_content(self, prompt, stream=False):
+                streams.append(prompt)
+                return [SimpleNamespace(text="# Executive Summary\n투자 매력도: 8.2/10\n요약 본문\n")]
+
+        fake_model = lambda name, api_key=None: FakeModel(name)
+        monkeypatch.setattr(ix.model_router, "model", fake_model)
+        monkeypatch.setattr(ix, "checkpoint_store", CheckpointStore(disk_dir=str(tmp_path)))
+
+        def broken_signals(text):
+            raise RuntimeError("finalize failed")
+
+        files = [{"name": "ir.pdf", "content": "회사 소개와 재무 현황"}]
+        monkeypatch.setattr(ix, "extract_signals", broken_signals)
+        ix.ANALYSIS_JOBS["job-1"] = {}
+        asyncio.run(ix.run_long_analysis("job-1", "AIzaTEST", "테스트 회사", files))
+        assert ix.ANALYSIS_JOBS["job-1"]["status"] == "error"
+        assert len(streams) == 1
+
+        monkeypatch.undo()
+        monkeypatch.setattr(ix.model_router, "model", fake_model)
+        monkeypatch.setattr(ix, "checkpoint_store", CheckpointStore(disk_dir=str(tmp_path)))
+        ix.ANALYSIS_JOBS["job-2"] = {}
+        asyncio.run(ix.run_long_analysis("job-2", "AIzaTEST", "테스트 회사", files))
+        job = ix.ANALYSIS_JOBS.pop("job-2")
+        ix.ANALYSIS_JOBS.pop("job-1")
+        assert job["status"] == "completed"
+        assert sorted(job["resumed_stages"]) == ["documents", "report"]
+        assert job["result"]["investment_score"] == 8.2
+        assert len(streams) == 1
+
+
+class TestSupabaseAnalysisResume:
+    """Supabase 분석 경로 이어받기 테스트"""
+
+    def test_failed_save_does_not_repeat_gemini_call(self, tmp_path, monkeypatch):
+        """분석 결과 저장이 실패해도 재시도 시 완료된 Gemini 분석을 재사용"""
+        calls, saved = [], []
+
+        async def fake_analyze(api_key, company_name, file_info):
+            calls.append(company_name)
+            return {"summary": "요약", "tokens_used": 10}
+
+        async def flaky_save(project_id, section, result, tokens):
+            if not saved:
+                saved.append(None)
+                raise RuntimeError("supabase down")
+            saved.append(result)
+
+        async def set_status(project_id, status):
+            return None
+
+        monkeypatch.setattr(ix, "analyze_with_gemini", fake_analyze)
+        monkeypatch.setattr(ix, "checkpoint_store", CheckpointStore(disk_dir=str(tmp_path)))
+        monkeypatch.setattr(ix.supabase_client, "save_analysis_result", flaky_save)
+        monkeypatch.setattr(ix.supabase_client, "update_project_status", set_status)
+
+        files = [{"name": "ir.pdf", "content": "회사 소개", "tables": []}]
+        asyncio.run(ix.run_supabase_analysis("p-1", "AIzaTEST", "테스트 회사", files))
+        asyncio.run(ix.run_supabase_analysis("p-1", "AIzaTEST", "테스트 회사", files))
+        assert calls == ["테스트 회사"]
+        assert saved[-1] == {"summary": "요약", "tokens_used": 10}
+        # 저장까지 끝난 실행은 체크포인트 정리
+        assert os.listdir(tmp_path) == []
@@ -0,0 +1,195 @@
+"""
+문서 추출 엔진 테스트 - 포맷별 파싱과 프로세스 풀 실행
+"""
+
+import asyncio
+import io
+import os
+import time
+
+import pytest
+
+from api.extraction import DocumentExtractor, detect_format
+from api.extraction.parsers import parse_document
+
+
+def make_xlsx() -> bytes:
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "손익계산서"
+    sheet.append(["항목", "2023", "2024"])
+    sheet.append(["매출액", 1000, 1500])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def make_docx() -> bytes:
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    document.add_paragraph("회사 소개: 임팩트 스타트업")
+    table = document.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text = "팀원"
+    table.rows[0].cells[1].text = "12명"
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class TestParsers:
+    """포맷별 파서 테스트"""
+
+    def test_detect_format(self):
+        assert detect_format("deck.pdf", b"%PDF-1.7") == "pdf"
+        assert detect_format("fin.xlsx", b"PK\x03\x04") == "xlsx"
+        assert detect_format("memo.txt", "안녕".encode()) == "text"
+
+    def test_xlsx_tables(self):
+        parsed = parse_document("fin.xlsx", make_xlsx(), max_pages=10, max_rows=100)
+        assert parsed["format"] == "xlsx"
+        assert parsed["tables"][0]["name"] == "손익계산서"
+        assert parsed["tables"][0]["rows"][1] == ["매출액", "1000", "1500"]
+        assert "매출액 | 1000 | 1500" in parsed["pages"][0]
+
+    def test_xlsx_row_limit(self):
+        parsed = parse_document("fin.xlsx", make_xlsx(), max_pages=10, max_rows=1)
+        assert parsed["truncated"] is True
+        assert len(parsed["tables"][0]["rows"]) == 1
+
+    def test_docx_paragraphs_and_tables(self):
+        parsed = parse_document("memo.docx", make_docx(), max_pages=10, max_rows=100)
+        assert "임팩트 스타트업" in parsed["pages"][0]
+        assert parsed["tables"][0]["rows"] == [["팀원", "12명"]]
+
+    def test_cp949_text(self):
+        parsed = parse_document("memo.txt", "투자 검토".encode("cp949"), max_pages=10, max_rows=100)
+        assert parsed["pages"][0] == "투자 검토"
+
+
+def hang_on_request(filename, content, max_pages, max_rows):
+    """이름이 hang으로 시작하는 파일에서 멈추는 파서 (워커 프로세스에서 실행)"""
+    if filename.startswith("hang"):
+        time.sleep(60)
+    return parse_document(filename, content, max_pages, max_rows)
+
+
+class TestDocumentExtractor:
+    """프로세스 풀 추출 테스트"""
+
+    def test_extract_many_in_pool(self):
+        extractor = DocumentExtractor(max_workers=1, timeout=30)
+        try:
+            results = asyncio.run(extractor.extract_many([
+                {"name": "fin.xlsx", "content": make_xlsx()},
+                {"name": "memo.txt", "content": "IR 요약".encode()},
+            ]))
+        finally:
+            extractor.shutdown()
+
+        assert [r.format for r in results] == ["xlsx", "text"]
+        assert all(r.ok for r in results)
+        assert "매출액" in results[0].text
+
+    def test_corrupt_pdf_returns_error_without_garbage(self):
+        extractor = DocumentExtractor(max_workers=1, timeout=30)
+        try:
+            result = asyncio.run(extractor.extract("broken.pdf", b"%PDF-1.4 \x00\xff garbage"))
+        finally:
+            extractor.shutdown()
+
+        assert result.error is not None
+        assert result.text == ""
+
+    def test_timeout_isolates_hung_file(self):
+        """대기열 시간은 타임아웃에 포함하지 않고, 멈춘 파일의 워커만 종료"""
+        extractor = DocumentExtractor(max_workers=1, timeout=1, parser=hang_on_request)
+        try:
+            results = asyncio.run(extractor.extract_many([
+                {"name": "hang.txt", "content": "멈춤".encode()},
+                {"name": "fast.txt", "content": "IR 요약".encode()},
+            ]))
+            # 워커를 교체한 풀로 이후 요청도 처리
+            after = asyncio.run(extractor.extract("next.txt", "후속".encode()))
+        finally:
+            extractor.shutdown()
+
+        assert "시간 초과" in results[0].error
+        assert results[1].ok and results[1].text == "IR 요약"
+        assert after.ok
+
+    def test_queue_wait_is_bounded(self):
+        """워커를 기다리는 시간도 상한이 있고, 버려진 작업 뒤의 요청은 정상 처리"""
+        extractor = DocumentExtractor(max_workers=1, timeout=2, queue_timeout=0.5, parser=hang_on_request)
+        try:
+            results = asyncio.run(extractor.extract_many([
+                {"name": "hang.txt", "content": "멈춤".encode()},
+                {"name": "queued.txt", "content": "대기".encode()},
+            ]))
+            after = asyncio.run(extractor.extract("next.txt", "후속".encode()))
+        finally:
+            extractor.shutdown()
+
+        assert "시간 초과 (2초)" in results[0].error
+        assert "대기 시간 초과" in results[1].error
+        assert after.ok and after.text == "후속"
+
+    def test_kill_skips_worker_that_moved_on(self):
+        """워커가 이미 다음 파일을 처리 중이면 종료하지 않음"""
+        extractor = DocumentExtractor(max_workers=1)
+        extractor._running[os.getpid()] = 7
+        assert extractor._kill_task(3, os.getpid()) is False
+        assert extractor._abandoned == 0
+
+
+class TestExtractionCache:
+    """해시 기반 추출 캐시 테스트"""
+
+    def test_reupload_skips_extraction(self, tmp_path, monkeypatch):
+        from api.extraction import ExtractionCache, content_hash
+
+        cache = ExtractionCache(disk_dir=str(tmp_path))
+        extractor = DocumentExtractor(max_workers=1, cache=cache)
+        content = "IR 요약 자료".encode()
+
+        first = asyncio.run(extractor.extract("a.txt", content))
+
+        async def fail(*args):
+            raise AssertionError("cache miss: extraction re-ran")
+
+        monkeypatch.setattr(extractor, "_extract_uncached", fail)
+        second = asyncio.run(extractor.extract("renamed.txt", content))
+        extractor.shutdown()
+
+        assert first.content_hash == content_hash(content)
+        assert second.cached is True
+        assert second.filename == "renamed.txt"
+        assert second.text == first.text
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        from api.extraction import ExtractionCache, ExtractionResult
+
+        digest = "a" * 64
+        ExtractionCache(disk_dir=str(tmp_path)).put(digest, ExtractionResult("f.txt", "text", "본문"))
+
+        fresh = ExtractionCache(disk_dir=str(tmp_path))
+        assert fresh.contains(digest)
+        assert fresh.get(digest).text == "본문"
+        assert fresh.stats()["hits"]["disk"] == 1
+
+    def test_memory_lru_eviction(self, tmp_path):
+        from api.extraction import ExtractionCache, ExtractionResult
+
+        cache = ExtractionCache(max_memory_bytes=400, disk_dir="off")
+        for index in range(5):
+            cache.put(f"{index:064x}", ExtractionResult("f.txt", "text", "x" * 100))
+        assert cache.stats()["memory_bytes"] <= 400
+        assert cache.get(f"{0:064x}") is None
+        assert cache.get(f"{4:064x}") is not None
+
+    def test_failed_extraction_not_cached(self):
+        from api.extraction import ExtractionCache, ExtractionResult
+
+        cache = ExtractionCache(disk_dir="off")
+        cache.put("b" * 64, ExtractionResult("x.pdf", "pdf", "", error="timeout"))
+        assert not cache.contains("b" * 64)
@@ -0,0 +1,113 @@
+"""
+재무 지표 엔진 테스트 - 표 정규화, 성장률/이익률, Burn Rate/Runway, 손익분기
+"""
+
+import numpy as np
+import pytest
+
+from api.financials import compute_financial_metrics, growth_rates, parse_number, parse_period
+
+
+ANNUAL_TABLE = {
+    "name": "손익계산서",
+    "rows": [
+        ["(단위: 백만원)", "", "", ""],
+        ["항목", "2022", "2023", "2024"],
+        ["매출액", "1,000", "1,500", "2,400"],
+        ["매출원가", "600", "800", "1,200"],
+        ["판매비와관리비", "700", "900", "1,300"],
+        ["현금및현금성자산", "3,000", "2,200", "1,500"],
+        ["부채총계", "500", "600", "900"],
+        ["자본총계", "2,000", "1,800", "1,500"],
+    ],
+}
+
+
+class TestTableParsing:
+    """기간/숫자 파싱 테스트"""
+
+    def test_parse_number_formats(self):
+        """천 단위 구분, 괄호/△ 음수, 억 단위, 결측"""
+        assert parse_number("1,500") == 1500
+        assert parse_number("(200)") == -200
+        assert parse_number("△30") == -30
+        assert parse_number("15억") == 15e8
+        assert np.isnan(parse_number("-"))
+
+    def test_parse_period_kinds(self):
+        """연도/분기/월 라벨 인식"""
+        assert parse_period("2024")[0] == "year"
+        assert parse_period("FY2023")[2] == "2023"
+        assert parse_period("2024 1Q")[2] == "2024 Q1"
+        assert parse_period("2024년 3분기")[2] == "2024 Q3"
+        assert parse_period("2024.03")[2] == "2024-03"
+        assert parse_period("매출액") is None
+
+
+class TestMetricsEngine:
+    """지표 계산 테스트"""
+
+    def test_growth_rates_vectorized(self):
+        """행렬 전체 성장률, 0 기준값은 NaN"""
+        values = np.array([[100.0, 150.0, 300.0], [0.0, 10.0, 20.0]])
+        rates = growth_rates(values, 1)
+        assert rates[0].tolist() == [0.5, 1.0]
+        assert np.isnan(rates[1, 0]) and rates[1, 1] == 1.0
+
+    def test_growth_rates_match_periods(self):
+        """기간 서수로 비교 기간을 찾고, 빠진 기간은 NaN"""
+        values = np.array([[100.0, 150.0, 300.0]])
+        rates = growth_rates(values, 1, np.array([2020, 2022, 2023]))
+        assert np.isnan(rates[0, 0]) and np.isnan(rates[0, 1])
+        assert rates[0, 2] == 1.0
+
+    def test_growth_skips_missing_years(self):
+        """FY2021/FY2023이 빠진 표는 YoY를 만들지 않음"""
+        table = {"name": "손익계산서", "rows": [
+            ["항목", "FY2020", "FY2022", "FY2024"],
+            ["매출액", "1,000", "1,500", "2,400"],
+        ]}
+        metrics = compute_financial_metrics([{"tables": [table]}])
+        assert metrics.periods == ["2020", "2022", "2024"]
+        assert "revenue" not in metrics.growth
+
+    def test_quarter_gap_returns_none(self):
+        """직전 분기가 빠지면 QoQ는 None, 전년 동기가 있으면 YoY는 계산"""
+        table = {"name": "분기 실적", "rows": [
+            ["구분", "2023 3Q", "2024 1Q", "2024 3Q"],
+            ["매출액", "100", "120", "150"],
+        ]}
+        metrics = compute_financial_metrics([{"tables": [table]}])
+        assert metrics.growth["revenue"]["qoq"] is None
+        assert metrics.growth["revenue"]["yoy"] == pytest.approx(0.5)
+
+    def test_annual_statement(self):
+        """연간 표에서 YoY, 이익률, 부채비율, Burn/Runway 계산"""
+        metrics = compute_financial_metrics([{"tables": [ANNUAL_TABLE]}])
+        assert metrics.unit == "백만원"
+        assert metrics.growth["revenue"]["yoy"] == pytest.approx(0.6)
+        # 매출총이익/영업이익은 원가·판관비로 보완
+        assert metrics.margins["gross_profit"] == pytest.approx(0.5)
+        assert metrics.margins["operating_income"] == pytest.approx(-100 / 2400)
+        assert metrics.debt_ratio == pytest.approx(0.6)
+        # 현금 700 감소 / 12개월
+        assert metrics.monthly_burn == pytest.approx(700 / 12)
+        assert metrics.runway_months == pytest.approx(1500 / (700 / 12))
+        assert metrics.break_even["estimated_period"] == "2025"
+
+    def test_quarterly_pdf_text(self):
+        """표 구조가 없는 PDF 텍스트에서 분기 표 복원"""
+        page = (
+            "재무 현황\n구분 2024 1Q 2024 2Q 2024 3Q 2024 4Q\n"
+            "매출액 100 120 150 180\n영업손실 50 40 30 25\n현금 900 800 720 650"
+        )
+        metrics = compute_financial_metrics([{"tables": [], "pages": [page]}])
+        assert metrics.period_kind == "quarter"
+        assert metrics.growth["revenue"]["qoq"] == pytest.approx(0.2)
+        assert metrics.series["operating_income"][-1] == -25
+        assert metrics.monthly_burn == pytest.approx(70 / 3)
+        assert metrics.to_display()["revenue_growth"] == "20.0%"
+
+    def test_no_financial_tables(self):
+        """재무 표가 없으면 None (하드코딩 값 대신 지표 생략)"""
+        assert compute_financial_metrics([{"tables": [], "pages": ["회사 소개"]}]) is None
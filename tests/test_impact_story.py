@@ -187,6 +187,33 @@ class TestStoryTemplates:
         assert "change" in sample
         assert len(sample["problem"]) > 10
 
+    def test_registry_shared_and_frozen(self):
+        """템플릿은 인스턴스 간 공유되고 수정할 수 없음 (샘플은 수정 가능한 사본)"""
+        other = StoryTemplates()
+        assert other.templates is self.templates.templates
+        with pytest.raises(TypeError):
+            self.templates.templates["education"]["name"] = "변경"
+        sample = self.templates.get_sample_story("education")
+        sample["problem"] = "수정한 문제"
+        assert self.templates.get_sample_story("education")["problem"] != "수정한 문제"
+
+    def test_keyword_index_matches_scan_priority(self):
+        """색인 조회는 템플릿 순서대로 any() 스캔하던 결과와 동일"""
+        from api.impact_story.templates import TemplateRegistry
+        texts = [
+            "에너지 절약 캠페인", "학교 건강 검진", "기후 위기와 질병", "병원 접근성과 탄소 배출",
+            "지역 대학 강의", "웰빙 친환경 제품", "알 수 없는 문제입니다", "",
+        ]
+        for mapping, index in (
+            (TemplateRegistry.KEYWORDS, self.templates.registry.keyword_index),
+            (TemplateRegistry.STORY_KEYWORDS, self.templates.registry.story_index),
+        ):
+            for text in texts:
+                expected = next(
+                    (name for name, keywords in mapping.items() if any(k in text.lower() for k in keywords)), "general"
+                )
+                assert index.lookup(text) == expected
+
 
 class TestAPIEndpoints:
     """API 엔드포인트 테스트"""
@@ -270,6 +297,58 @@ class TestAdvancedFeatures:
         
         assert updated_story is not None
         # 실제 업데이트 로직은 구현에 따라 달라짐
+
+    def _full_story(self):
+        return self.builder.build_story_from_steps({
+            "problem": "청년들이 정신건강 상담을 받기 어려워해요",
+            "target": "20-30대 직장인 청년 1000명",
+            "solution": "AI 기반 24시간 익명 심리상담 챗봇",
+            "change": "우울증 지수(PHQ-9) 30% 개선",
+            "measurement": "6개월 간격으로 PHQ-9 설문조사 실시",
+            "timeframe": "6개월"
+        })["story"]
+    
+    def test_update_recomputes_only_dependents(self):
+        """문제 수정은 헤드라인/문제 맥락/템플릿만 다시 계산하고 나머지 필드는 그대로"""
+        story = self._full_story()
+        solution_approach, metrics = story["solution_approach"], list(story["key_metrics"])
+        
+        self.builder.update_story_component(story, "problem", "청소년 학습 격차가 커지고 있어요")
+        
+        assert story["problem_context"]["problem_statement"] == "청소년 학습 격차가 커지고 있어요"
+        assert story["story_template"] == "education"
+        assert "청소년 학습 격차" in story["headline"]
+        assert story["solution_approach"] is solution_approach
+        assert all(new is old for new, old in zip(story["key_metrics"], metrics))
+    
+    def test_update_refreshes_previously_stale_sections(self):
+        """측정 방법/변화 수정 시 측정 계획과 해당 지표 항목만 갱신"""
+        story = self._full_story()
+        reach = story["key_metrics"][0]
+        
+        self.builder.update_story_component(story, "measurement", "분기별 설문")
+        self.builder.update_story_component(story, "change", "우울증 지수 50% 개선")
+        
+        assert story["measurement_plan"]["measurement_method"] == "분기별 설문"
+        assert story["measurement_plan"]["success_criteria"] == "우울증 지수 50% 개선을 분기별 설문로 측정"
+        assert story["key_metrics"][1]["value"] == "50%"
+        assert story["key_metrics"][0] is reach
+    
+    def test_batched_patch_recomputes_each_field_once(self):
+        """여러 편집을 한 번에 적용하면 파생 필드마다 한 번만 계산하고, 직접 지정한 헤드라인이 우선"""
+        story = self._full_story()
+        calls = []
+        original = self.builder._create_headline
+        self.builder._create_headline = lambda steps: calls.append(steps) or original(steps)
+        
+        self.builder.apply_story_patch(story, {"target": "시니어 500명", "timeframe": "3개월", "change": "20% 증가"})
+        assert len(calls) == 1
+        assert [m["value"] for m in story["key_metrics"]] == ["500명", "20%", "3개월"]
+        assert story["measurement_plan"]["timeline"] == "3개월"
+        
+        self.builder.apply_story_patch(story, {"solution": "방문 상담", "headline": "직접 쓴 헤드라인"})
+        assert story["headline"] == "직접 쓴 헤드라인"
+        assert story["solution_approach"]["solution_description"] == "방문 상담"
     
     def test_quality_score_calculation(self):
         """품질 점수 계산 테스트"""
@@ -335,6 +414,67 @@ class TestIntegration:
         assert validation_result["quality_score"] > 50
 
 
+class TestEnhancedStoryModes:
+    """고도화 스토리 생성 모드 테스트 (단계별 / 한 번에)"""
+    
+    def setup_method(self):
+        from api.checkpoints import CheckpointStore
+        from api.impact_story.enhanced_builder import EnhancedImpactStoryBuilder
+        self.builder = EnhancedImpactStoryBuilder(checkpoints=CheckpointStore(disk_dir="off"))
+        self.builder.ai_enabled = True  # AI 사용 가능 표시
+        self.calls = []
+        
+        def generate(prompt, analysis_type):
+            self.calls.append(analysis_type)
+            if analysis_type == "one_shot":
+                return {
+                    "analysis": {"key_opportunities": ["기회"], "primary_needs": ["니즈"], "core_hypothesis": "가설"},
+                    "story": {"headline": "한 번에 생성한 헤드라인"}
+                }
+            return {"headline": "단계별 헤드라인"} if analysis_type == "story_visualization" else {"생성": analysis_type}
+        
+        self.builder._generate_structured = generate
+        self.sample_steps = {
+            "problem": "청년들이 정신건강 상담을 받기 어려워해요",
+            "target": "20-30대 직장인 청년 1000명",
+            "solution": "AI 기반 24시간 익명 심리상담 챗봇",
+            "change": "우울증 지수(PHQ-9) 30% 개선",
+            "measurement": "6개월 간격으로 PHQ-9 설문조사 실시"
+        }
+    
+    def test_one_shot_single_call(self):
+        """한 번에 생성 모드는 Gemini 호출 1회로 같은 결과 키 구조 반환"""
+        result = asyncio.run(self.builder.build_enhanced_story(self.sample_steps, mode="one_shot"))
+        
+        assert self.calls == ["one_shot"]
+        assert result["generation_method"] == "ai_one_shot"
+        assert result["story"]["headline"] == "한 번에 생성한 헤드라인"
+        assert result["strategy_design"]["impact_logic"]["core_hypothesis"] == "가설"
+    
+    def test_multi_step_default(self):
+        """기본 모드는 4단계 생성"""
+        result = asyncio.run(self.builder.build_enhanced_story(self.sample_steps))
+        
+        assert self.calls == ["context_analysis", "user_insights", "strategy_design", "story_visualization"]
+        assert result["generation_method"] == "ai_enhanced"
+    
+    def test_unknown_mode_rejected(self):
+        """지원하지 않는 모드는 생성 없이 오류"""
+        result = asyncio.run(self.builder.build_enhanced_story(self.sample_steps, mode="fast"))
+        
+        assert result["success"] is False
+        assert self.calls == []
+    
+    def test_one_shot_story_schema_matches_multi_step(self):
+        """한 번에 생성 모드의 story 스키마는 단계별 생성의 스토리 스키마와 동일"""
+        import json
+        from api.structured import schema_from_example
+        builder = type(self.builder)
+        one_shot = schema_from_example(json.loads(builder.ONE_SHOT_JSON_EXAMPLE))
+        
+        assert one_shot["properties"]["story"] == schema_from_example(json.loads(builder.STORY_JSON_EXAMPLE))
+
+
 if __name__ == "__main__":
     # 간단한 테스트 실행
     pytest.main([__file__, "-v"])
\ No newline at end of file
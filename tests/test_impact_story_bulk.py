@@ -0,0 +1,127 @@
+"""
+임팩트 스토리 일괄 생성 테스트 - CSV/NDJSON 입력, 잘못된 행 보고, AI 고도화 동시 호출 상한, CLI 출력
+"""
+
+import asyncio
+import io
+import json
+import sys
+
+import pytest
+
+from api.impact_story import bulk
+from api.impact_story.bulk import BulkStoryGenerator, read_submissions
+
+STEPS = {
+    "problem": "청년들이 정신건강 상담을 받기 어려워해요",
+    "target": "20-30대 직장인 청년 1000명",
+    "solution": "AI 기반 24시간 익명 심리상담 챗봇",
+    "change": "우울증 지수(PHQ-9) 30% 개선",
+    "measurement": "6개월 간격으로 PHQ-9 설문조사 실시",
+    "timeframe": "6개월",
+}
+
+CSV_TEXT = (
+    "\ufeffid,problem,target,solution,change,measurement,timeframe\n"
+    + "s1," + ",".join(STEPS[field] for field in bulk.STEP_FIELDS) + "\n"
+    + "s2,,,,,,\n"
+)
+
+
+def collect(generator, submissions):
+    async def _collect():
+        return [record async for record in generator.run(submissions)]
+    return asyncio.run(_collect())
+
+
+class FakeEnhancedBuilder:
+    """제출물별 지연/실패를 주입하고 동시 실행 수를 기록"""
+
+    def __init__(self, fail_targets=()):
+        self.fail_targets = fail_targets
+        self.in_flight = 0
+        self.peak = 0
+        self.modes = []
+
+    async def build_enhanced_story(self, steps, mode=None):
+        self.modes.append(mode)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if steps["target"] in self.fail_targets:
+                raise RuntimeError("Gemini 오류")
+            return {"success": True, "story": {"title": steps["target"]}, "generation_method": "ai_one_shot"}
+        finally:
+            self.in_flight -= 1
+
+
+class TestReadSubmissions:
+    """입력 형식 자동 판별 테스트"""
+
+    def test_csv_with_bom(self):
+        """BOM이 붙은 CSV도 헤더를 그대로 인식"""
+        rows = list(read_submissions(io.StringIO(CSV_TEXT, newline="")))
+        assert [row["id"] for row in rows] == ["s1", "s2"]
+        assert rows[0]["problem"] == STEPS["problem"]
+        assert rows[1]["problem"] == ""
+
+    def test_ndjson_with_bad_line(self):
+        """파싱할 수 없는 줄은 _error 항목으로 전달하고 나머지는 계속"""
+        lines = [json.dumps(STEPS, ensure_ascii=False), "", "{broken", "[1, 2]"]
+        rows = list(read_submissions(lines))
+        assert rows[0]["target"] == STEPS["target"]
+        assert "_error" in rows[1] and "_error" in rows[2]
+        assert len(rows) == 3
+
+    def test_empty_input(self):
+        assert list(read_submissions(["", "  "])) == []
+
+
+class TestBulkStoryGenerator:
+    """일괄 생성 테스트"""
+
+    def test_template_stories_keep_input_order(self):
+        """AI 없이는 입력 순서대로, 잘못된 행은 index와 검증 오류로 보고"""
+        generator = BulkStoryGenerator()
+        records = collect(generator, read_submissions(io.StringIO(CSV_TEXT, newline="")))
+        assert [(r["index"], r["id"], r["status"]) for r in records] == [(0, "s1", "ok"), (1, "s2", "invalid")]
+        assert "headline" in records[0]["story"]
+        assert records[1]["errors"]
+        assert generator.stats()["ok"] == 1 and generator.stats()["invalid"] == 1
+
+    def test_enhancement_respects_concurrency(self):
+        """동시 AI 고도화 수는 상한을 넘지 않고, 실패한 건은 템플릿 스토리 유지"""
+        fake = FakeEnhancedBuilder(fail_targets=("대상 3",))
+        generator = BulkStoryGenerator(concurrency=2, mode="one_shot", enhanced_builder=fake)
+        submissions = [{**STEPS, "target": f"대상 {i}"} for i in range(6)]
+        records = collect(generator, submissions)
+
+        assert sorted(r["index"] for r in records) == list(range(6))
+        assert fake.peak == 2 and generator.peak_in_flight == 2
+        assert set(fake.modes) == {"one_shot"}
+        failed = next(r for r in records if r["index"] == 3)
+        assert failed["enhanced"] is None and "headline" in failed["story"]
+        assert next(r for r in records if r["index"] == 0)["story"] == {"title": "대상 0"}
+        assert generator.stats()["enhanced"] == 5 and generator.stats()["enhance_failed"] == 1
+
+    def test_invalid_mode_rejected(self):
+        with pytest.raises(ValueError):
+            BulkStoryGenerator(mode="two_shot")
+
+
+class TestBulkCli:
+    """CLI 테스트"""
+
+    def test_writes_ndjson(self, tmp_path, monkeypatch):
+        """결과 파일은 한 줄에 하나의 스토리, 잘못된 행이 있으면 종료 코드 1"""
+        source = tmp_path / "submissions.csv"
+        source.write_text(CSV_TEXT, encoding="utf-8")
+        out = tmp_path / "stories.ndjson"
+        monkeypatch.setattr(sys, "argv", ["bulk", str(source), "--out", str(out)])
+
+        with pytest.raises(SystemExit) as exit_info:
+            bulk.main()
+        assert exit_info.value.code == 1
+        records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+        assert [r["status"] for r in records] == ["ok", "invalid"]
@@ -0,0 +1,70 @@
+"""
+Structured Logging 테스트 - 마스킹과 샘플링
+"""
+
+import io
+import json
+import logging
+
+from api.logging_utils import (
+    SamplingFilter,
+    configure_logging,
+    flush_logging,
+    get_logger,
+    redact,
+)
+
+
+class TestRedaction:
+    """비밀 값 마스킹 테스트"""
+
+    def test_api_key_redacted(self):
+        text = "key=AIzaSyC1234567890abcdefghijklmnop end"
+        assert "AIza" not in redact(text)
+        assert "[REDACTED]" in redact(text)
+
+    def test_bearer_token_redacted(self):
+        assert redact("Authorization: Bearer abc.def.ghi") == "Authorization: Bearer [REDACTED]"
+
+    def test_sensitive_dict_fields(self):
+        result = redact({"api_key": "anything", "user_id": "u1", "nested": {"token": "t"}})
+        assert result["api_key"] == "[REDACTED]"
+        assert result["user_id"] == "u1"
+        assert result["nested"]["token"] == "[REDACTED]"
+
+
+class TestSampling:
+    """로거별 샘플링 테스트"""
+
+    def _record(self, name, level):
+        return logging.LogRecord(name, level, __file__, 1, "msg", None, None)
+
+    def test_zero_rate_drops_debug_but_keeps_warning(self):
+        sampler = SamplingFilter({"ir.api.gemini": 0.0})
+        assert sampler.filter(self._record("ir.api.gemini", logging.DEBUG)) is False
+        assert sampler.filter(self._record("ir.api.gemini", logging.WARNING)) is True
+
+    def test_rate_inherited_from_parent(self):
+        sampler = SamplingFilter({"ir.api": 0.0})
+        assert sampler.filter(self._record("ir.api.auth", logging.INFO)) is False
+        assert sampler.filter(self._record("ir.other", logging.INFO)) is True
+
+
+class TestStructuredOutput:
+    """JSON 출력 통합 테스트"""
+
+    def teardown_method(self):
+        flush_logging()
+
+    def test_json_line_is_redacted(self):
+        stream = io.StringIO()
+        configure_logging(level="DEBUG", stream=stream)
+        get_logger("test").info("login with AIzaSyC1234567890abcdefghij", extra={"api_key": "x", "n": 3})
+        flush_logging()
+
+        line = json.loads(stream.getvalue().strip().splitlines()[-1])
+        assert line["severity"] == "INFO"
+        assert line["logger"] == "ir.test"
+        assert "AIza" not in line["message"]
+        assert line["api_key"] == "[REDACTED]"
+        assert line["n"] == 3
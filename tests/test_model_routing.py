@@ -0,0 +1,116 @@
+"""
+단계별 모델 라우팅 테스트 - 선호 모델, 지연 예산/부하에 따른 하위 모델 전환, 품질 하한, 요청 단위 기록
+"""
+
+import time
+
+import pytest
+
+from api.routing import MODEL_TIERS, ModelRouter, PhaseProfile, routing_context
+
+
+def make_router():
+    profiles = {
+        "fast": PhaseProfile("gemini-2.0-flash-exp", 1, 1000),
+        "quality": PhaseProfile("gemini-1.5-flash", 2, 6000),
+    }
+    return ModelRouter(MODEL_TIERS, profiles)
+
+
+class TestChoose:
+    """모델 선택 테스트"""
+
+    def test_preferred_when_budget_allows(self):
+        """예산과 부하에 여유가 있으면 선호 모델"""
+        decision = make_router().choose("fast", 2000, budget_ms=60000)
+        assert decision.model == "gemini-2.0-flash-exp"
+        assert decision.reason == "preferred"
+        assert not decision.downgraded
+
+    def test_downgrades_on_tight_budget(self):
+        """남은 예산보다 예상 지연이 길면 더 빠른 하위 모델"""
+        decision = make_router().choose("fast", 2000, budget_ms=4000)
+        assert decision.model == "gemini-1.5-flash-8b"
+        assert decision.reason == "latency_budget"
+        assert decision.downgraded
+
+    def test_downgrades_under_load(self):
+        """선호 모델의 동시 호출이 한도에 차면 다음 모델"""
+        router = make_router()
+        router._in_flight["gemini-2.0-flash-exp"] = 8
+        decision = router.choose("fast", 2000)
+        assert decision.model == "gemini-1.5-flash"
+        assert decision.reason == "load"
+
+    def test_respects_min_quality(self):
+        """예산이 모자라도 품질 하한 아래로는 내리지 않음"""
+        decision = make_router().choose("quality", 20000, budget_ms=1000)
+        assert decision.model == "gemini-1.5-flash"
+        assert decision.reason == "best_effort"
+
+    def test_unknown_phase_uses_default(self):
+        """정의되지 않은 단계는 기본 프로필"""
+        assert make_router().choose("unknown", 100).model == "gemini-2.0-flash-exp"
+
+
+class TestTracking:
+    """호출 추적 테스트"""
+
+    def test_records_within_routing_context(self):
+        """요청 컨텍스트 안의 호출은 단계별 모델 기록에 추가되고 남은 예산으로 선택"""
+        router = make_router()
+        with routing_context(60000) as routing:
+            decision = router.choose("fast", 500)
+            assert decision.budget_ms is not None and decision.budget_ms <= 60000
+            with router.track(decision):
+                pass
+        assert [record["model"] for record in routing.records] == ["gemini-2.0-flash-exp"]
+        assert routing.records[0]["ok"] is True
+        assert router.stats()["in_flight"]["gemini-2.0-flash-exp"] == 0
+
+    def test_failed_call_recorded(self):
+        """실패한 호출도 기록하고 동시 호출 수를 되돌림"""
+        router = make_router()
+        with routing_context() as routing:
+            with pytest.raises(RuntimeError):
+                with router.track(router.choose("fast", 500)):
+                    raise RuntimeError("boom")
+        assert routing.records[0]["ok"] is False
+        assert router.stats()["in_flight"]["gemini-2.0-flash-exp"] == 0
+
+    def test_slow_model_adapts_estimate(self):
+        """관측 지연이 추정보다 길면 예상 지연을 보정해 하위 모델로 전환"""
+        router = ModelRouter(MODEL_TIERS, make_router().profiles, smoothing=1.0)
+        decision = router.choose("fast", 500, budget_ms=7000)
+        assert decision.model == "gemini-2.0-flash-exp"
+        # 추정 0.5ms 호출이 1ms 이상 걸린 것으로 관측 → 예상 지연 2배 이상
+        decision.expected_ms = 0.5
+        with router.track(decision):
+            time.sleep(0.002)
+        assert router.stats()["slowdown"]["gemini-2.0-flash-exp"] >= 2
+        assert router.choose("fast", 500, budget_ms=7000).model == "gemini-1.5-flash"
+
+
+class TestKeyedModels:
+    """요청별 API 키 분리 테스트"""
+
+    def test_models_bound_to_caller_key(self):
+        """키마다 별도 클라이언트, 전역 genai.configure는 이미 만든 모델에 영향 없음"""
+        genai = pytest.importorskip("google.generativeai")
+        router = make_router()
+        model_a = router.model("gemini-1.5-flash", "AIzaKEYA")
+        model_b = router.model("gemini-1.5-flash", "AIzaKEYB")
+        genai.configure(api_key="AIzaGLOBAL")
+
+        tokens = [model._client._transport._credentials.token for model in (model_a, model_b)]
+        assert tokens == ["AIzaKEYA", "AIzaKEYB"]
+        # 같은 키는 클라이언트 재사용
+        assert router.model("gemini-2.0-flash-exp", "AIzaKEYA")._client is model_a._client
+
+    def test_client_cache_bounded(self):
+        pytest.importorskip("google.generativeai")
+        router = make_router()
+        router.max_clients = 2
+        for key in ("AIzaK1", "AIzaK2", "AIzaK3"):
+            router.model("gemini-1.5-flash", key)
+        assert len(router._clients) == 2
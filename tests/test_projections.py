@@ -0,0 +1,78 @@
+"""
+에이전트 입력 투영 테스트 - 필요한 경로만 남기기, 값 압축, 투영 밖 필드 변경 시 후속 단계 캐시 재사용
+"""
+
+import asyncio
+
+from api.projections import compact_value, project
+from api.theory_of_change import AgentOutputCache, TheoryOfChangeOrchestrator
+
+
+class TestProject:
+    """투영 함수 테스트"""
+
+    def test_keeps_only_listed_paths_with_nesting(self):
+        """지정 경로만 원래 중첩 구조로 남기고, 없는 경로는 생략"""
+        upstream = {
+            "context": {"current_state": {"mission": "미션", "vision": "비전"}, "resources": {"technology": "앱"}},
+            "strategy": {"intervention_logic": {"target_outcome": "성과"}},
+        }
+        spec = {
+            "context": (("current_state", "mission"), ("stakeholders", "primary")),
+            "strategy": (("intervention_logic", "target_outcome"),),
+            "user_insights": (("key_insights", "primary_needs"),),
+        }
+        assert project(spec, upstream) == {
+            "context": {"current_state": {"mission": "미션"}},
+            "strategy": {"intervention_logic": {"target_outcome": "성과"}},
+            "user_insights": {},
+        }
+
+    def test_compacts_values(self):
+        """공백 정리, 빈 값/중복 제거, 목록 안 객체는 한 줄 JSON"""
+        assert compact_value("  여러\n  줄   미션 ") == "여러 줄 미션"
+        assert compact_value(["니즈", " 니즈 ", "", {"이름": "A"}]) == ["니즈", '{"이름":"A"}']
+
+
+class TestPipelineProjections:
+    """오케스트레이터 투영 + 캐시 테스트"""
+
+    def test_unprojected_change_reuses_downstream(self):
+        """현황 분석 결과 중 후속 프롬프트가 쓰지 않는 필드만 바뀌면 후속 단계는 재사용"""
+        orchestrator = TheoryOfChangeOrchestrator("AIzaTEST", cache=AgentOutputCache(disk_dir="off"))
+        calls, received = [], []
+
+        async def context(org_data):
+            calls.append("context")
+            return {"current_state": {"mission": "미션", "vision": org_data["focus"]}}
+
+        async def insights(context_data):
+            calls.append("user_insights")
+            received.append(context_data)
+            return {"key_insights": {"primary_needs": ["니즈"]}}
+
+        async def strategy(context_data, user_insights):
+            calls.append("strategy")
+            return {"intervention_logic": {"target_outcome": "성과"}}
+
+        async def validation(strategy_data):
+            calls.append("validation")
+            return {"success_metrics": []}
+
+        async def visualization(theory):
+            calls.append("visualization")
+            return {"theory_structure": {"structure": {"layers": [], "connections": []}}}
+
+        orchestrator.context_analyzer.analyze_organization_context = context
+        orchestrator.user_insight.synthesize_user_needs = insights
+        orchestrator.strategy_designer.design_intervention_logic = strategy
+        orchestrator.validator.design_validation_framework = validation
+        orchestrator.storyteller.create_theory_visualization = visualization
+
+        asyncio.run(orchestrator.generate_theory_of_change("테스트 조직", "교육"))
+        assert received == [{"current_state": {"mission": "미션"}}]  # vision은 전달하지 않음
+
+        calls.clear()
+        theory = asyncio.run(orchestrator.generate_theory_of_change("테스트 조직", "환경"))
+        assert calls == ["context"]
+        assert theory["reportInfo"]["cache"]["reused"] == ["user_insights", "strategy", "validation", "visualization"]
@@ -0,0 +1,72 @@
+"""
+프롬프트 토큰 예산 테스트 - 혼합 텍스트 토큰 추정, 문장 경계 자르기, 섹션별 예산 배분
+"""
+
+from api.prompt_budget import allocate, estimate_tokens, fit_documents, trim_middle, trim_to_tokens
+
+
+class TestEstimateTokens:
+    """토큰 추정 테스트"""
+
+    def test_hangul_counts_more_than_latin_per_char(self):
+        """같은 글자 수라도 한글이 영어보다 토큰이 많음"""
+        assert estimate_tokens("가" * 40) > estimate_tokens("a" * 40)
+
+    def test_mixed_text(self):
+        """한글 음절, 영어 단어, 숫자, 기호를 각각 계산"""
+        assert estimate_tokens("매출 revenue 2024%") == 2 + 2 + 2 + 1
+        assert estimate_tokens("") == 0
+
+
+class TestTrimToTokens:
+    """예산 기반 자르기 테스트"""
+
+    TEXT = "첫 번째 문장입니다. 두 번째 문장입니다. 세 번째 문장은 조금 더 깁니다."
+
+    def test_short_text_unchanged(self):
+        """예산 안의 텍스트는 그대로"""
+        assert trim_to_tokens(self.TEXT, 1000) == self.TEXT
+
+    def test_cut_at_sentence_boundary(self):
+        """문장 중간이 아닌 문장 끝에서 자르고 말줄임표 추가"""
+        trimmed = trim_to_tokens(self.TEXT, 18)
+        assert trimmed == "첫 번째 문장입니다. 두 번째 문장입니다.…"
+        assert estimate_tokens(trimmed) <= 18
+
+    def test_single_long_sentence_cut_by_words(self):
+        """문장 하나가 예산보다 길면 어절 단위로 자름"""
+        trimmed = trim_to_tokens("가나다 " * 50, 10)
+        assert trimmed.endswith("…")
+        assert estimate_tokens(trimmed) <= 10
+
+    def test_trim_middle_keeps_head_and_tail(self):
+        """가운데를 생략해 앞의 지시와 끝의 출력 형식을 모두 남김"""
+        text = "지시: 투자 보고서를 작성하세요.\n" + "자료 문장입니다. " * 200 + "\n형식: JSON만 응답하세요."
+        trimmed = trim_middle(text, 40)
+        assert trimmed.startswith("지시: 투자 보고서를 작성하세요.")
+        assert trimmed.endswith("형식: JSON만 응답하세요.")
+        assert "\n…\n" in trimmed
+        assert estimate_tokens(trimmed) <= 40
+        assert trim_middle(self.TEXT, 1000) == self.TEXT
+
+
+class TestAllocate:
+    """섹션별 예산 배분 테스트"""
+
+    def test_short_section_donates_budget(self):
+        """짧은 섹션이 남긴 예산은 긴 섹션이 사용"""
+        long_text = "매출이 증가했습니다. " * 40
+        fields = allocate({"name": "소셜벤처", "focus": long_text}, 100)
+        assert fields["name"] == "소셜벤처"
+        assert estimate_tokens(fields["focus"]) > 50
+        assert sum(estimate_tokens(text) for text in fields.values()) <= 100
+
+    def test_fit_documents_keeps_every_file(self):
+        """여러 파일을 하나의 예산에 배분해도 모든 파일 헤더 유지"""
+        files = [
+            {"name": "deck.pdf", "content": "회사 소개 문장입니다. " * 200},
+            {"name": "fin.xlsx", "content": "매출 15억원"},
+        ]
+        combined = fit_documents(files, 300)
+        assert "=== deck.pdf ===" in combined and "=== fin.xlsx ===\n매출 15억원" in combined
+        assert estimate_tokens(combined) <= 300
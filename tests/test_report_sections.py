@@ -0,0 +1,188 @@
+"""
+보고서 섹션 파서 테스트 - 목차 트리 구성, 표준 섹션 대응, 두 보고서 형식 모두 지원, 스트리밍 조각 처리, 신호 추출
+"""
+
+from api.reports import ReportOutline, StreamingReportParser, extract_signals, split_report
+
+
+GEMINI_REPORT = """보고서 서문
+
+# I. Executive Summary
+핵심 투자 논지입니다. 투자 매력도: 8.2/10
+- 투자 추천: **Buy**
+
+# II. 투자 개요
+## 1. 기업 개요
+농촌 청년 일자리 플랫폼
+## 2. 투자 조건
+시리즈 A 20억원
+
+# III. 기업 현황
+창업팀은 10년 경력
+
+# IV. 시장 분석
+TAM 5조원
+
+# V. 사업 분석
+구독 모델
+
+# VI. 투자 적합성과 임팩트
+ESG 부합
+
+# VII. 손익 추정 및 수익성
+2027년 손익분기
+
+# VIII. 종합 결론
+Buy
+"""
+
+LONG_REPORT = """# Executive Summary
+요약 본문
+
+## I. 투자 개요
+### 1. 기업 개요
+기업 설명
+### 3. 손익 추정 및 수익성
+투자 개요 안의 하위 항목
+
+## II. 기업 현황
+현황
+## III. 시장 분석
+시장
+## IV. 사업(Business Model) 분석
+사업
+## V. 투자 적합성과 임팩트
+임팩트
+## VI. 손익 추정 및 수익성 분석
+손익
+## VII. 종합 결론
+결론
+"""
+
+
+class TestReportOutline:
+    """목차 트리 테스트"""
+
+    def test_builds_tree_with_offsets(self):
+        """하위 제목은 상위 섹션의 자식, 본문은 오프셋으로 조회"""
+        outline = ReportOutline(GEMINI_REPORT)
+        assert len(outline.roots) == 8
+        overview = outline.roots[1]
+        assert overview.number == 2 and [c.title for c in overview.children] == ["1. 기업 개요", "2. 투자 조건"]
+        assert overview.children[1].content(GEMINI_REPORT) == "시리즈 A 20억원"
+        assert outline.preamble == "보고서 서문"
+
+    def test_bold_and_bare_roman_headings(self):
+        """# 없이 굵은 글씨나 로마 숫자만 쓴 제목도 인식"""
+        outline = ReportOutline("**I. 요약**\n본문\nII. 시장 분석\n시장 본문\n**핵심 포인트**\n- 항목")
+        assert [(s.title, s.level) for s in outline.headings] == [
+            ("I. 요약", 1), ("II. 시장 분석", 1), ("핵심 포인트", 3)
+        ]
+
+    def test_ignores_headings_in_code_blocks(self):
+        """코드 블록 안의 # 줄은 제목이 아님"""
+        outline = ReportOutline("# 요약\n```\n# 주석\n```\n본문")
+        assert [s.title for s in outline.headings] == ["요약"]
+
+
+class TestSplitReport:
+    """표준 섹션 대응 테스트"""
+
+    def test_gemini_report_fills_all_sections(self):
+        """로마 숫자 # 목차 보고서의 8개 섹션 모두 채움"""
+        sections = split_report(GEMINI_REPORT)
+        assert all(sections.values())
+        assert sections["investment_overview"].startswith("## 1. 기업 개요")
+        assert sections["conclusion"] == "Buy"
+
+    def test_long_report_fills_all_sections(self):
+        """Executive Summary(#)와 로마 숫자(##) 목차가 섞인 장문 보고서"""
+        sections = split_report(LONG_REPORT)
+        assert all(sections.values())
+        assert sections["executive_summary"] == "요약 본문"
+        # 하위 항목의 '손익 추정' 제목은 대목차로 오인하지 않음
+        assert "하위 항목" in sections["investment_overview"]
+        assert sections["financial_analysis"] == "손익"
+
+    def test_missing_sections_are_empty(self):
+        """제목이 없으면 빈 문자열"""
+        sections = split_report("목차 없는 응답")
+        assert set(sections.values()) == {""}
+
+
+def stream(text, size):
+    """텍스트를 size 글자 조각으로 나눠 파서에 입력"""
+    parser = StreamingReportParser()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    events.extend(parser.close())
+    return parser, events
+
+
+class TestStreamingReportParser:
+    """스트리밍 조각 파서 테스트"""
+
+    def test_matches_batch_parser_for_any_chunk_size(self):
+        """조각 크기와 무관하게 일괄 파서와 같은 섹션"""
+        for report in (GEMINI_REPORT, LONG_REPORT):
+            for size in (1, 7, 64, len(report)):
+                parser, _ = stream(report, size)
+                assert parser.sections == split_report(report)
+                assert parser.text == report
+
+    def test_section_emitted_when_next_heading_arrives(self):
+        """다음 대목차가 도착하는 시점에 이전 섹션 완료 이벤트"""
+        parser = StreamingReportParser()
+        started = parser.feed("# I. Executive Summary\n요약 ")
+        assert [(e.type, e.key) for e in started] == [("section_start", "executive_summary")]
+        events = parser.feed("본문\n# II. 투자 개요\n")
+        section = next(e for e in events if e.type == "section")
+        assert (section.key, section.content) == ("executive_summary", "요약 본문")
+        assert parser.snapshot()["current_section"] == "investment_overview"
+
+    def test_score_and_recommendation_events(self):
+        """투자 점수와 추천 등급은 해당 줄이 완성되는 즉시 이벤트"""
+        parser, events = stream(GEMINI_REPORT, 16)
+        signals = [(e.type, e.value) for e in events if e.type in ("score", "recommendation")]
+        assert signals == [("score", 8.2), ("recommendation", "Buy")]
+        assert parser.progress == 1.0
+
+    def test_score_matches_batch_extraction(self):
+        """스트리밍과 일괄 추출이 같은 점수 규칙을 따름 ('X/10' 우선, 없으면 'X점', 날짜는 제외)"""
+        for text in (
+            "2024/10 기준 평점 7점\n",
+            "예비 평가 6점\n최종 매력도 8.5/10\n",
+            "투자 매력도 9 / 10\n",
+        ):
+            parser, events = stream(text, 5)
+            scores = [e.value for e in events if e.type == "score"]
+            assert scores == [extract_signals(text).score]
+            assert parser.investment_score == extract_signals(text).score
+
+
+class TestReportSignals:
+    """점수/추천/리스크 신호 추출 테스트"""
+
+    def test_all_signals_in_one_pass(self):
+        """대소문자 무시, Strong Buy는 Buy와 구분"""
+        signals = extract_signals("투자 매력도: 8.5/10\n투자 의견 STRONG BUY\nHigh Risk 요인은 제한적")
+        assert signals.score == 8.5
+        assert signals.recommendation() == "Strong Buy"
+        assert signals.recommendation(strong=False) == "Buy"
+        assert signals.risk_level() == "High"
+
+    def test_ignores_dates_and_partial_words(self):
+        """'2024/10' 같은 날짜와 buyer 같은 단어는 신호가 아님"""
+        signals = extract_signals("2024/10 기준 buyer 인터뷰 결과 평점 7점")
+        assert signals.score == 7.0
+        assert signals.recommendation() == "Hold"
+        assert signals.risk_level() == "Medium"
+
+    def test_labeled_recommendation_wins(self):
+        """프롬프트의 '투자 추천:' 라벨은 Buy가 아니라 뒤따르는 값으로 판정"""
+        assert extract_signals("- 투자 추천: Hold\n매수 시점은 하반기").recommendation() == "Hold"
+        assert extract_signals("투자 추천 의견: 매도 (Sell)").recommendation() == "Sell"
+        assert extract_signals("**투자 추천**: **Strong Buy**").recommendation(strong=False) == "Buy"
+        # 값이 없는 라벨만으로는 추천 등급이 생기지 않음
+        assert extract_signals("- 투자 추천: 추후 결정").recommendation() == "Hold"
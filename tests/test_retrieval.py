@@ -0,0 +1,117 @@
+"""
+BM25 검색 테스트 - 한국어 토큰화, 청크 분할, 프로젝트별 인덱스, 근접 중복 제거
+"""
+
+from api.retrieval import BM25Index, ChunkIndexStore, NearDuplicateFilter, chunk_pages, format_chunks, tokenize
+
+
+PAGES = [
+    "회사 소개\n\n우리 회사는 농촌 지역 청년 일자리를 만드는 소셜벤처입니다.",
+    "재무 현황\n\n2024년 매출액은 15억원이며 매출총이익률은 42%입니다. 월 burn rate는 8천만원입니다.",
+    "팀 구성\n\n대표이사는 10년 경력의 농업 전문가이며 CTO는 데이터 엔지니어 출신입니다.",
+]
+
+
+class TestTokenizer:
+    """한국어 인식 토크나이저 테스트"""
+
+    def test_strips_josa(self):
+        """조사가 붙은 어절에서 어간 추출"""
+        assert "회사" in tokenize("회사는")
+        assert "시장" in tokenize("시장에서")
+
+    def test_compound_bigrams(self):
+        """붙여 쓴 복합어도 부분 질의에 걸림"""
+        tokens = tokenize("매출총이익률은")
+        assert "매출" in tokens and "이익" in tokens
+
+    def test_english_lowercase(self):
+        """영문은 소문자 단어로, 불용어는 제외"""
+        assert tokenize("Burn Rate and Runway") == ["burn", "rate", "runway"]
+
+
+class TestBM25Index:
+    """청크 분할 및 검색 테스트"""
+
+    def test_chunk_pages_keeps_page_numbers(self):
+        """청크에 원본 페이지 번호 보존"""
+        chunks = chunk_pages("deck.pdf", PAGES)
+        assert [page for _, page, _ in chunks] == [1, 2, 3]
+
+    def test_long_paragraph_is_split(self):
+        """청크 크기를 넘는 문단은 여러 청크로 분할"""
+        chunks = chunk_pages("deck.pdf", ["매출이 증가했습니다. " * 100], chunk_size=200)
+        assert len(chunks) > 1
+        assert all(len(text) <= 200 for _, _, text in chunks)
+
+    def test_search_ranks_relevant_chunk_first(self):
+        """질의와 관련된 페이지가 최상위"""
+        index = BM25Index.from_documents([("deck.pdf", PAGES)])
+        results = index.search("매출 이익률 burn rate", top_k=2)
+        assert results[0][0].page == 2
+        assert index.search("창업자 경력")[0][0].page == 3
+
+    def test_unrelated_query_returns_nothing(self):
+        """일치하는 토큰이 없으면 빈 결과"""
+        index = BM25Index.from_documents([("deck.pdf", PAGES)])
+        assert index.search("블록체인") == []
+
+
+class TestChunkIndexStore:
+    """프로젝트별 인덱스 저장소 테스트"""
+
+    def test_owner_isolation(self):
+        """다른 사용자는 프로젝트 인덱스를 조회할 수 없음"""
+        store = ChunkIndexStore(maxsize=4)
+        store.build("p1", [("deck.pdf", PAGES)], owner="alice")
+        assert store.search("p1", "매출", owner="alice")
+        assert store.search("p1", "매출", owner="bob") == []
+
+    def test_lru_eviction(self):
+        """최대 개수를 넘으면 가장 오래된 프로젝트부터 제거"""
+        store = ChunkIndexStore(maxsize=1)
+        store.build("p1", [("a.pdf", PAGES)])
+        store.build("p2", [("b.pdf", PAGES)])
+        assert store.get("p1") is None
+        assert store.get("p2") is not None
+
+    def test_format_chunks_includes_source(self):
+        """프롬프트 발췌에 파일명과 페이지 표시"""
+        index = BM25Index.from_documents([("deck.pdf", PAGES)])
+        context = format_chunks(index.search("매출"))
+        assert context.startswith("[deck.pdf p.2]")
+
+
+class TestNearDuplicateFilter:
+    """근접 중복 제거 테스트"""
+
+    COVER = "임팩트 스타트업 IR 자료 2024 | 문의: ir@example.com | 본 자료는 투자 검토 목적으로만 사용됩니다."
+
+    def test_repeated_cover_removed_across_files(self):
+        """여러 파일의 동일 표지는 첫 파일에만 남김"""
+        documents = [
+            ("deck.pdf", [self.COVER, PAGES[1]]),
+            ("appendix.pdf", [self.COVER + " ", PAGES[2]]),
+        ]
+        deduped, stats = NearDuplicateFilter().dedupe_documents(documents)
+        assert stats.chunks_removed == 1
+        assert stats.tokens_saved > 0
+        assert stats.duplicates[0]["duplicate_of"] == {"file": "deck.pdf", "page": 1}
+        assert len(deduped[1][1]) == 1 and "CTO" in deduped[1][1][0]
+
+    def test_distinct_content_kept(self):
+        """내용이 다른 청크는 모두 유지"""
+        deduped, stats = NearDuplicateFilter().dedupe_documents([("deck.pdf", PAGES)])
+        assert stats.chunks_removed == 0
+        assert len(deduped[0][1]) == len(PAGES)
+
+    def test_near_duplicate_with_small_edit(self):
+        """숫자 하나만 바뀐 반복 문단도 중복으로 판단"""
+        base = (
+            "본 자료에 포함된 예측 정보는 2024년 3월 기준 가정에 기반하며 실제 결과와 다를 수 있습니다. "
+            "회사는 본 자료의 정확성이나 완전성에 대해 어떠한 보증도 하지 않으며, 투자 판단의 책임은 "
+            "투자자 본인에게 있습니다. 본 자료는 회사의 사전 동의 없이 외부에 배포할 수 없습니다."
+        )
+        keep, duplicates = NearDuplicateFilter().filter_texts([base, base.replace("3월", "6월")])
+        assert keep == [True, False]
+        assert duplicates[0][2] >= 0.85
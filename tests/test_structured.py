@@ -0,0 +1,183 @@
+"""
+구조화 출력 테스트 - 스키마 생성/검증, 증분 JSON 추출, 실패 필드 repair, 지표 집계
+"""
+
+import json
+
+import pytest
+
+from api.structured import (
+    JSONStreamExtractor, ResultModel, StructuredGenerator, extract_json, generation_schema, parse_json, validate
+)
+
+
+PROMPT = """분석 결과를 JSON으로 반환:
+```json
+{
+  "headline": "헤드라인",
+  "metrics": [{"label": "도달", "value": "목표"}],
+  "next_steps": ["단계"]
+}
+```
+"""
+
+
+class FakeModel:
+    """호출마다 준비된 응답을 순서대로 반환(예외면 발생)하고 프롬프트/설정을 기록"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        self.calls.append((prompt, generation_config))
+        text = self.responses.pop(0)
+        if isinstance(text, Exception):
+            raise text
+        return [Chunk(text[start:start + 5]) for start in range(0, len(text), 5)]
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class TestSchema:
+    """스키마 생성 및 검증 테스트"""
+
+    def test_model_from_prompt_example(self):
+        """프롬프트의 JSON 예시 구조가 결과 스키마"""
+        model = ResultModel.from_prompt("test_schema", PROMPT)
+        assert model.fields == ["headline", "metrics", "next_steps"]
+        assert model.schema["properties"]["metrics"]["items"]["type"] == "object"
+
+    def test_validate_coerces_minor_differences(self):
+        """단일 문자열→배열, 숫자→문자열은 교정"""
+        model = ResultModel.from_prompt("test_schema", PROMPT)
+        data, errors = model.validate({"headline": 3, "metrics": [], "next_steps": "하나"})
+        assert errors == []
+        assert data["headline"] == "3" and data["next_steps"] == ["하나"]
+
+    def test_validate_reports_paths(self):
+        """누락/타입 오류는 필드 경로와 함께 반환"""
+        schema = {"type": "object", "properties": {"a": {"type": "array", "items": {"type": "object",
+                  "properties": {"b": {"type": "string"}}, "required": ["b"]}}}, "required": ["a"]}
+        _, errors = validate({"a": [{"b": "x"}, {}]}, schema)
+        assert errors == [("a[1].b", "필수 필드 누락")]
+
+    def test_generation_schema_drops_untyped_arrays(self):
+        """항목 타입을 알 수 없는 배열은 제약 스키마에서 제외"""
+        schema = {"type": "object", "properties": {"a": {"type": "array"}, "b": {"type": "string"}},
+                  "required": ["a", "b"]}
+        assert generation_schema(schema) == {"type": "object", "properties": {"b": {"type": "string"}},
+                                             "required": ["b"]}
+
+    def test_parse_json_tolerates_fences_and_trailing_commas(self):
+        """코드 펜스, 설명 문장, 끝 쉼표가 있어도 파싱"""
+        assert parse_json('```json\n{"a": 1}\n```') == {"a": 1}
+        assert parse_json('결과입니다: {"a": [1, 2,],}') == {"a": [1, 2]}
+        assert parse_json("JSON 없음") is None
+
+
+class TestJSONStreamExtractor:
+    """증분 JSON 추출 테스트"""
+
+    def test_skips_commentary_braces_and_fences(self):
+        """앞 설명의 중괄호와 뒤 설명은 무시하고 펜스 안 객체 추출"""
+        text = '형식은 {이렇게} 입니다.\n```json\n{"a": [1, 2], "b": "x}y"}\n```\n참고 {메모}'
+        assert extract_json(text) == {"a": [1, 2], "b": "x}y"}
+
+    def test_completes_as_soon_as_object_closes(self):
+        """한 글자씩 넣어도 최상위 객체가 닫히는 순간 완료"""
+        text = '{"a": "따옴표 \\" 와 역슬래시 \\\\", "b": [{"c": 1}]} 이후 설명'
+        extractor = JSONStreamExtractor()
+        done_at = next(i for i, char in enumerate(text) if extractor.feed(char))
+        assert text[done_at] == "}" and text[done_at + 1:] == " 이후 설명"
+        assert extractor.value == {"a": '따옴표 " 와 역슬래시 \\', "b": [{"c": 1}]}
+
+    def test_recovers_largest_valid_prefix(self):
+        """잘린 출력은 마지막 완성 원소까지 복구"""
+        extractor = JSONStreamExtractor()
+        extractor.feed('{"headline": "청년", "metrics": [{"label": "도달"}, {"label": "변')
+        assert extractor.result() == {"headline": "청년", "metrics": [{"label": "도달"}, {"label": "변"}]}
+        assert extractor.truncated
+        # 끝의 숫자는 잘렸을 수 있으므로 버림
+        assert extract_json('{"a": 1, "b": 12') == {"a": 1}
+
+
+class TestStructuredGenerator:
+    """스키마 제약 생성과 repair 테스트"""
+
+    VALID = {"headline": "청년 일자리", "metrics": [{"label": "도달", "value": "1,000명"}], "next_steps": ["파일럿"]}
+
+    def test_valid_response_single_call(self):
+        """유효한 응답은 한 번의 호출로 끝나고 JSON 스키마 모드 사용"""
+        model = FakeModel(json.dumps(self.VALID))
+        generator = StructuredGenerator()
+        result = generator.generate(model, PROMPT, ResultModel.from_prompt("test_valid", PROMPT))
+        assert result == self.VALID
+        assert len(model.calls) == 1
+        assert model.calls[0][1]["response_mime_type"] == "application/json"
+        assert generator.metrics.snapshot()["test_valid"]["parse_failure_rate"] == 0
+
+    def test_repairs_only_failing_fields(self):
+        """누락된 필드만 다시 요청해 병합"""
+        broken = dict(self.VALID)
+        del broken["metrics"]
+        model = FakeModel(json.dumps(broken), json.dumps({"metrics": self.VALID["metrics"]}))
+        generator = StructuredGenerator()
+        result = generator.generate(model, PROMPT, ResultModel.from_prompt("test_repair", PROMPT))
+        assert result == self.VALID
+        repair_prompt, repair_config = model.calls[1]
+        assert "metrics 필드만" in repair_prompt
+        assert list(repair_config["response_schema"]["properties"]) == ["metrics"]
+        stats = generator.metrics.snapshot()["test_repair"]
+        assert stats["repair_calls"] == 1 and stats["repaired_fields"] == 1
+
+    def test_repair_prompt_keeps_tail_example(self):
+        """긴 원래 요청을 줄여도 끝의 JSON 예시와 실패 필드 스키마는 repair 프롬프트에 남음"""
+        prompt = "IR 자료:\n" + "매출과 고객 지표를 정리한 문단입니다. " * 400 + "\n" + PROMPT
+        broken = dict(self.VALID)
+        del broken["metrics"]
+        model = FakeModel(json.dumps(broken), json.dumps({"metrics": self.VALID["metrics"]}))
+        StructuredGenerator().generate(model, prompt, ResultModel.from_prompt("test_repair_tail", prompt))
+        repair_prompt = model.calls[1][0]
+        assert "IR 자료:" in repair_prompt and "```json" in repair_prompt
+        assert '"required": ["metrics"]' in repair_prompt
+
+    def test_unparseable_response_falls_back_per_field(self):
+        """repair도 실패하면 필드별 기본값 사용"""
+        model = FakeModel("응답 생성 실패", "여전히 실패")
+        generator = StructuredGenerator()
+        default = {"headline": "기본 헤드라인", "metrics": [], "next_steps": []}
+        result = generator.generate(model, PROMPT, ResultModel.from_prompt("test_fail", PROMPT, default))
+        assert result == default
+        stats = generator.metrics.snapshot()["test_fail"]
+        assert stats["parse_failures"] == 1 and stats["defaulted_fields"] == 3
+
+    def test_transient_error_keeps_schema_mode(self):
+        """5xx/네트워크 오류는 호출자에게 전달하고 다음 호출도 스키마 모드 유지"""
+        model = FakeModel(RuntimeError("503 Service Unavailable"), json.dumps(self.VALID))
+        model.model_name = "gemini-test"
+        generator = StructuredGenerator()
+        result_model = ResultModel.from_prompt("test_transient", PROMPT)
+        with pytest.raises(RuntimeError, match="503"):
+            generator.generate(model, PROMPT, result_model)
+        assert generator.generate(model, PROMPT, result_model) == self.VALID
+        assert model.calls[1][1]["response_schema"]
+        assert generator.metrics.snapshot()["test_transient"]["schema_fallbacks"] == 0
+
+    def test_schema_rejection_switches_to_plain_mode(self):
+        """스키마를 거부한 400 오류만 일반 모드로 전환하고 기억"""
+        model = FakeModel(
+            ValueError("400 Invalid JSON payload: response_schema is not supported"),
+            json.dumps(self.VALID),
+            json.dumps(self.VALID),
+        )
+        model.model_name = "gemini-legacy"
+        generator = StructuredGenerator()
+        result_model = ResultModel.from_prompt("test_rejected", PROMPT)
+        assert generator.generate(model, PROMPT, result_model) == self.VALID
+        assert generator.generate(model, PROMPT, result_model) == self.VALID
+        assert [config for _, config in model.calls[1:]] == [None, None]
+        assert generator.metrics.snapshot()["test_rejected"]["schema_fallbacks"] == 1
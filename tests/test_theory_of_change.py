@@ -0,0 +1,476 @@
+"""
+변화이론 파이프라인 테스트 - DAG 실행 순서/동시성, 단계별 타임아웃과 폴백, 오케스트레이터 부분 실패
+"""
+
+import asyncio
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from api.theory_of_change import AgentOutputCache, PortfolioBatchRunner, TheoryOfChangeOrchestrator, layout_theory
+from api.theory_of_change.batch import KeyRateLimiter, normalize_organization
+from api.theory_of_change.dag import DAGExecutor, Node, topological_order
+from api.theory_of_change.layout import _build_graph, count_crossings
+from api.theory_of_change.memo import input_hash
+from api.routing import model_router
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestDAGExecutor:
+    """DAG 실행기 테스트"""
+
+    def test_independent_nodes_run_concurrently(self):
+        """같은 의존을 가진 두 단계는 동시에 실행"""
+        running, peak = [], []
+
+        def step(name, value):
+            async def _run(inputs):
+                running.append(name)
+                peak.append(len(running))
+                await asyncio.sleep(0.05)
+                running.remove(name)
+                return value + sum(inputs.values())
+            return _run
+
+        nodes = [
+            Node("a", step("a", 1)),
+            Node("b", step("b", 10), deps=("a",)),
+            Node("c", step("c", 100), deps=("a",)),
+        ]
+        result = run(DAGExecutor(nodes).run())
+        assert result.results == {"a": 1, "b": 11, "c": 101}
+        assert max(peak) == 2
+
+    def test_timeout_uses_fallback_and_keeps_completed(self):
+        """시간 초과 단계만 폴백, 완료된 단계와 후속 단계는 유지"""
+        async def fast(inputs):
+            return "context"
+
+        async def slow(inputs):
+            await asyncio.sleep(1)
+
+        async def after(inputs):
+            return inputs["slow"] + "+after"
+
+        nodes = [
+            Node("fast", fast),
+            Node("slow", slow, deps=("fast",), fallback=lambda inputs: "default", timeout=0.01),
+            Node("after", after, deps=("slow",)),
+        ]
+        result = run(DAGExecutor(nodes).run())
+        assert result.results == {"fast": "context", "slow": "default", "after": "default+after"}
+        assert result.statuses["slow"]["status"] == "timeout" and result.statuses["slow"]["fallback"]
+        assert result.failed == ["slow"]
+
+    def test_timed_out_call_holds_gate_slot(self):
+        """시간 초과된 단계의 스레드 호출이 끝날 때까지 gate 슬롯을 반납하지 않음"""
+        semaphore, events = None, []
+
+        def gate(name):
+            @asynccontextmanager
+            async def slot():
+                async with semaphore:
+                    events.append(("acquire", name))
+                    yield
+                    events.append(("release", name))
+            return slot()
+
+        def blocking_call():
+            time.sleep(0.2)
+            events.append(("thread_done", "slow"))
+
+        async def slow(inputs):
+            await asyncio.to_thread(blocking_call)
+
+        async def quick(inputs):
+            return "quick"
+
+        async def main():
+            nonlocal semaphore
+            semaphore = asyncio.Semaphore(1)
+            nodes = [
+                Node("slow", slow, fallback=lambda inputs: "default", timeout=0.05),
+                Node("quick", quick, deps=("slow",)),
+            ]
+            return await DAGExecutor(nodes, gate=gate).run()
+
+        result = run(main())
+        assert result.results == {"slow": "default", "quick": "quick"}
+        assert result.statuses["slow"]["status"] == "timeout"
+        assert events.index(("thread_done", "slow")) < events.index(("acquire", "quick"))
+        assert events.index(("release", "slow")) < events.index(("acquire", "quick"))
+
+    def test_swallowed_error_marked_degraded(self):
+        """예외 없이 폴백과 같은 기본값을 돌려준 단계는 degraded로 실패 처리하고 캐시하지 않음"""
+        async def default_only(inputs):
+            return "default"
+
+        cache = AgentOutputCache(disk_dir="off")
+        nodes = [Node("a", default_only, fallback=lambda inputs: "default", key=lambda inputs: 1)]
+        result = run(DAGExecutor(nodes, cache=cache).run())
+        assert result.results == {"a": "default"}
+        assert result.statuses["a"]["status"] == "degraded"
+        assert result.failed == ["a"]
+        assert result.cache_summary()["reused"] == []
+        assert run(DAGExecutor(nodes, cache=cache).run()).cache_summary()["hits"] == 0
+
+    def test_missing_dependency_skips_node(self):
+        """폴백 없이 실패한 단계의 후속 단계는 건너뜀"""
+        async def boom(inputs):
+            raise RuntimeError("실패")
+
+        async def child(inputs):
+            return "never"
+
+        result = run(DAGExecutor([Node("a", boom), Node("b", child, deps=("a",))]).run())
+        assert result.results == {}
+        assert [result.statuses[n]["status"] for n in ("a", "b")] == ["error", "skipped"]
+
+    def test_cycle_rejected(self):
+        """순환 의존은 실행 전에 거부"""
+        async def noop(inputs):
+            return None
+
+        with pytest.raises(ValueError):
+            topological_order([Node("a", noop, deps=("b",)), Node("b", noop, deps=("a",))])
+
+
+class TestOrchestratorPipeline:
+    """오케스트레이터 부분 실패 테스트"""
+
+    def test_concurrent_pipelines_keep_their_keys(self, monkeypatch):
+        """동시에 실행되는 두 요청의 에이전트 호출은 각자의 API 키로만 나감"""
+        calls = []
+
+        class KeyedModel:
+            def __init__(self, api_key):
+                self.api_key = api_key
+                self.model_name = "fake"
+
+            def generate_content(self, prompt, stream=False, generation_config=None):
+                time.sleep(0.01)  # 스레드 호출 사이에 다른 파이프라인이 끼어들도록
+                calls.append((self.api_key, prompt))
+                return [SimpleNamespace(text="{}")]
+
+        monkeypatch.setattr(model_router, "model", lambda name, api_key=None: KeyedModel(api_key))
+
+        async def both():
+            cache = AgentOutputCache(disk_dir="off")
+            return await asyncio.gather(
+                TheoryOfChangeOrchestrator("AIzaKEYA", cache=cache).generate_theory_of_change("알파 재단", "교육"),
+                TheoryOfChangeOrchestrator("AIzaKEYB", cache=cache).generate_theory_of_change("베타 협동조합", "환경"),
+            )
+
+        run(both())
+        keys = Counter(api_key for api_key, _ in calls)
+        assert set(keys) == {"AIzaKEYA", "AIzaKEYB"} and keys["AIzaKEYA"] == keys["AIzaKEYB"]
+        assert all(api_key == "AIzaKEYA" for api_key, prompt in calls if "알파 재단" in prompt)
+        assert all(api_key == "AIzaKEYB" for api_key, prompt in calls if "베타 협동조합" in prompt)
+
+    def test_failed_phase_keeps_other_phases(self):
+        """검증 단계가 실패해도 다른 단계의 AI 결과는 유지"""
+        orchestrator = TheoryOfChangeOrchestrator("AIzaTEST", cache=AgentOutputCache(disk_dir="off"))
+        calls = []
+
+        async def context(org_data):
+            calls.append("context")
+            return {"current_state": {"mission": "AI 미션"}}
+
+        async def insights(context_data):
+            return {"key_insights": {"primary_needs": ["AI 니즈"]}}
+
+        async def strategy(context_data, user_insights):
+            return {"intervention_logic": {"target_outcome": "AI 성과"}}
+
+        async def validation(strategy_data):
+            raise RuntimeError("Gemini 오류")
+
+        async def visualization(theory):
+            assert "validation" not in theory
+            return {"theory_structure": {"structure": {"layers": [], "connections": []}}}
+
+        orchestrator.context_analyzer.analyze_organization_context = context
+        orchestrator.user_insight.synthesize_user_needs = insights
+        orchestrator.strategy_designer.design_intervention_logic = strategy
+        orchestrator.validator.design_validation_framework = validation
+        orchestrator.storyteller.create_theory_visualization = visualization
+
+        theory = run(orchestrator.generate_theory_of_change("테스트 조직", "교육"))
+        pipeline = theory["reportInfo"]["pipeline"]
+        assert theory["reportInfo"]["generated_by"] == "multi-agent-system"
+        assert pipeline["validation"]["status"] == "error" and pipeline["validation"]["fallback"]
+        assert pipeline["visualization"]["status"] == "ok"
+        assert theory["theoryOfChange"] == {"structure": {"layers": [], "connections": []}}
+        assert "keyMetrics" in theory  # 검증 단계 기본값의 성공 지표
+
+
+def stub_agents(orchestrator, calls):
+    """입력에 따라 결과가 달라지는 가짜 에이전트 (호출된 단계를 calls에 기록)"""
+    async def context(org_data):
+        calls.append("context")
+        return {"current_state": {"mission": f"{org_data['focus']} 미션"}}
+
+    async def insights(context_data):
+        calls.append("user_insights")
+        return {"key_insights": {"primary_needs": [context_data["current_state"]["mission"]]}}
+
+    async def strategy(context_data, user_insights):
+        calls.append("strategy")
+        return {"intervention_logic": {"target_outcome": user_insights["key_insights"]["primary_needs"][0]}}
+
+    async def validation(strategy_data):
+        calls.append("validation")
+        return {"success_metrics": [{"name": strategy_data["intervention_logic"]["target_outcome"]}]}
+
+    async def visualization(theory):
+        calls.append("visualization")
+        return {"theory_structure": {"structure": {"layers": [], "connections": []}}}
+
+    orchestrator.context_analyzer.analyze_organization_context = context
+    orchestrator.user_insight.synthesize_user_needs = insights
+    orchestrator.strategy_designer.design_intervention_logic = strategy
+    orchestrator.validator.design_validation_framework = validation
+    orchestrator.storyteller.create_theory_visualization = visualization
+
+
+class TestAgentOutputCache:
+    """에이전트 결과 캐시와 증분 재계산 테스트"""
+
+    def test_input_hash_ignores_key_order(self):
+        """dict 키 순서가 달라도 같은 입력이면 같은 키, 단계 이름이 다르면 다른 키"""
+        assert input_hash("context", {"a": 1, "b": [1, 2]}) == input_hash("context", {"b": [1, 2], "a": 1})
+        assert input_hash("context", {"a": 1}) != input_hash("strategy", {"a": 1})
+        assert input_hash("context", {"files": [b"x"]}) != input_hash("context", {"files": [b"y"]})
+
+    def test_rerun_reuses_every_phase(self):
+        """입력이 같으면 두 번째 실행은 에이전트를 호출하지 않음"""
+        orchestrator = TheoryOfChangeOrchestrator("AIzaTEST", cache=AgentOutputCache(disk_dir="off"))
+        calls = []
+        stub_agents(orchestrator, calls)
+        first = run(orchestrator.generate_theory_of_change("테스트 조직", "교육"))
+        assert first["reportInfo"]["cache"]["misses"] == 5
+        calls.clear()
+        second = run(orchestrator.generate_theory_of_change("테스트 조직", "교육"))
+        assert calls == []
+        assert second["reportInfo"]["cache"]["hits"] == 5
+        assert second["keyMetrics"] == first["keyMetrics"]
+
+    def test_changed_input_recomputes_only_dependents(self):
+        """입력이 바뀐 단계만 재계산 - 선행 단계 결과가 같으면 후속 단계는 재사용"""
+        cache = AgentOutputCache(disk_dir="off")
+        orchestrator = TheoryOfChangeOrchestrator("AIzaTEST", cache=cache)
+        calls = []
+        stub_agents(orchestrator, calls)
+        run(orchestrator.generate_theory_of_change("테스트 조직", "교육"))
+
+        # 임팩트 영역이 바뀌면 현황 분석 결과가 달라져 모든 후속 단계 재계산
+        calls.clear()
+        theory = run(orchestrator.generate_theory_of_change("테스트 조직", "환경"))
+        assert sorted(calls) == sorted(orchestrator.NODE_TIMEOUTS)
+        assert theory["reportInfo"]["cache"]["recomputed"] == list(orchestrator.NODE_TIMEOUTS)
+
+        # 현황 분석 결과가 같게 나오면 이후 단계는 재사용
+        async def same_context(org_data):
+            calls.append("context")
+            return {"current_state": {"mission": "교육 미션"}}
+
+        orchestrator.context_analyzer.analyze_organization_context = same_context
+        calls.clear()
+        theory = run(orchestrator.generate_theory_of_change("테스트 조직", "교육", files=[{"name": "추가.pdf"}]))
+        assert calls == ["context"]
+        assert theory["reportInfo"]["cache"]["reused"] == ["user_insights", "strategy", "validation", "visualization"]
+
+    def test_failed_phase_not_cached(self):
+        """기본값으로 대체된 단계는 저장하지 않고 다음 실행에서 다시 시도"""
+        orchestrator = TheoryOfChangeOrchestrator("AIzaTEST", cache=AgentOutputCache(disk_dir="off"))
+        calls = []
+        stub_agents(orchestrator, calls)
+
+        async def broken(strategy_data):
+            calls.append("validation")
+            raise RuntimeError("Gemini 오류")
+
+        orchestrator.validator.design_validation_framework = broken
+        run(orchestrator.generate_theory_of_change("테스트 조직", "교육"))
+        calls.clear()
+        theory = run(orchestrator.generate_theory_of_change("테스트 조직", "교육"))
+        assert calls == ["validation"]
+        assert theory["reportInfo"]["cache"]["recomputed"] == ["validation"]
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        """디스크 캐시는 새 인스턴스(프로세스 재시작)에서도 재사용"""
+        AgentOutputCache(disk_dir=str(tmp_path)).put("a" * 64, {"mission": "미션"})
+        fresh = AgentOutputCache(disk_dir=str(tmp_path))
+        assert fresh.get("a" * 64) == {"mission": "미션"}
+        assert fresh.stats()["hits"]["disk"] == 1
+
+
+def items(*ids):
+    return [{"id": item_id, "title": item_id} for item_id in ids]
+
+
+def crossings(theory):
+    ranks, edges = _build_graph(theory["structure"]["layers"], theory["structure"]["connections"])
+    return count_crossings(ranks, edges)
+
+
+class TestLayoutEngine:
+    """변화이론 다이어그램 레이아웃 테스트"""
+
+    def test_removes_crossings_and_aligns_chains(self):
+        """교차하는 입력 순서를 정리하고 연결된 항목은 같은 열에 배치"""
+        layers = [
+            {"id": "inputs", "items": items("a", "b", "c")},
+            {"id": "activities", "items": items("z", "y", "x")},
+        ]
+        connections = [{"from": "a", "to": "x"}, {"from": "b", "to": "y"}, {"from": "c", "to": "z"}]
+        theory = layout_theory(layers, connections)
+        assert crossings(theory) == 0
+        top, bottom = (layer["items"] for layer in theory["structure"]["layers"])
+        assert [i["id"] for i in bottom] == ["x", "y", "z"]
+        assert [i["position"]["x"] for i in top] == [i["position"]["x"] for i in bottom]
+
+    def test_fills_layer_styles_and_no_overlap(self):
+        """층 좌표/색상을 채우고, 항목 수가 늘어도 같은 층 항목은 겹치지 않음"""
+        theory = layout_theory([
+            {"id": "outputs", "layer": 3, "items": items(*"pqrstuv")},
+            {"id": "inputs", "layer": 1, "items": items("a")},
+        ])
+        inputs, outputs = theory["structure"]["layers"]
+        assert (inputs["id"], inputs["yPosition"], outputs["yPosition"]) == ("inputs", 100, 280)
+        assert outputs["backgroundColor"] == "#E8F5E8" and outputs["name"] == "산출(Outputs)"
+        xs = [i["position"]["x"] for i in outputs["items"]]
+        assert all(b - a >= 200 for a, b in zip(xs, xs[1:]))
+        width = int(theory["designSpecs"]["container"]["width"][:-2])
+        assert xs[0] >= 0 and xs[-1] + 180 <= width
+
+    def test_long_edges_and_missing_ids(self):
+        """층을 건너뛰는 연결은 더미 노드로 처리, id 없는 항목은 층 id로 부여"""
+        layers = [
+            {"id": "inputs", "items": items("a", "b")},
+            {"id": "activities", "items": [{"title": "무명"}, {"title": "무명2"}]},
+            {"id": "outcomes", "items": items("o1", "o2")},
+        ]
+        theory = layout_theory(layers, [{"from": "a", "to": "o2"}, {"from": "b", "to": "o1"}, {"from": "x", "to": "a"}])
+        assert [i["id"] for i in theory["structure"]["layers"][1]["items"]] == ["activities_1", "activities_2"]
+        assert crossings(theory) == 0
+        assert len(theory["structure"]["connections"]) == 3  # 알 수 없는 연결도 보존
+
+    def test_default_structure_uses_layout(self):
+        """기본 변화이론 구조도 항목 좌표를 계산해 교차 없이 배치"""
+        orchestrator = TheoryOfChangeOrchestrator("AIzaTEST", cache=AgentOutputCache(disk_dir="off"))
+        theory = orchestrator._create_default_theory_structure({})
+        assert crossings(theory) == 0
+        assert all("position" in item for layer in theory["structure"]["layers"] for item in layer["items"])
+        assert theory["designSpecs"]["container"]["height"] == "1000px"
+
+
+class TestPortfolioBatch:
+    """포트폴리오 일괄 생성 테스트"""
+
+    def make_runner(self, calls, cache, fail=(), delay=None, degrade=(), **kwargs):
+        """조직 이름별 지연/실패/기본값 반환을 주입한 가짜 에이전트 오케스트레이터로 러너 구성"""
+        def factory(api_key):
+            orchestrator = TheoryOfChangeOrchestrator(api_key, cache=cache)
+            stub_agents(orchestrator, [])
+
+            async def context(org_data):
+                calls.append((org_data["name"], "context"))
+                await asyncio.sleep((delay or {}).get(org_data["name"], 0.01))
+                return {"current_state": {"mission": f"{org_data['name']} 미션"}}
+
+            async def strategy(context_data, user_insights):
+                mission = context_data["current_state"]["mission"]
+                calls.append((mission, "strategy"))
+                if any(mission.startswith(name) for name in fail):
+                    raise RuntimeError("Gemini 오류")
+                if any(mission.startswith(name) for name in degrade):
+                    # 실제 에이전트처럼 Gemini 오류를 삼키고 기본값 반환
+                    return orchestrator.strategy_designer._get_default_strategy(context_data, user_insights)
+                return {"intervention_logic": {"target_outcome": mission}}
+
+            orchestrator.context_analyzer.analyze_organization_context = context
+            orchestrator.strategy_designer.design_intervention_logic = strategy
+            return orchestrator
+
+        return PortfolioBatchRunner("AIzaTEST", orchestrator_factory=factory, **kwargs)
+
+    def collect(self, runner, organizations):
+        async def _collect():
+            return [record async for record in runner.run(organizations)]
+        return run(_collect())
+
+    def test_shared_pool_and_completion_order(self):
+        """모든 조직의 단계가 하나의 동시성 풀을 공유하고, 결과는 완료 순서대로"""
+        calls = []
+        runner = self.make_runner(
+            calls, AgentOutputCache(disk_dir="off"), delay={"느린 조직": 0.2}, concurrency=2, calls_per_minute=1000
+        )
+        organizations = [{"name": "느린 조직"}] + [{"name": f"조직{i}", "impact_focus": "교육"} for i in range(3)]
+        records = self.collect(runner, organizations)
+        assert [r["organization"] for r in records][-1] == "느린 조직"
+        assert all(r["status"] == "ok" for r in records)
+        assert runner.stats()["peak_concurrency"] == 2
+        assert runner.stats()["agent_calls"] == 4 * 5
+
+    def test_rate_limit_per_key(self):
+        """같은 키는 창 안에서 max_calls회 이후 대기, 다른 키는 독립"""
+        limiter = KeyRateLimiter(2, period=0.2)
+
+        async def acquire_all():
+            started = time.perf_counter()
+            await asyncio.gather(*(limiter.acquire("a") for _ in range(2)), limiter.acquire("b"))
+            fast = time.perf_counter() - started
+            await limiter.acquire("a")
+            return fast, time.perf_counter() - started
+
+        fast, slow = run(acquire_all())
+        assert fast < 0.1 and slow >= 0.15
+
+    def test_resume_after_crash(self, tmp_path):
+        """완료된 조직은 저널에서 바로, 실패 조직은 실패한 단계부터 다시 실행"""
+        cache, journal = AgentOutputCache(disk_dir="off"), str(tmp_path / "results.ndjson")
+        organizations = [{"name": "A"}, {"name": "B"}]
+        calls = []
+        first = self.collect(self.make_runner(calls, cache, fail=("B",), journal_path=journal), organizations)
+        assert {r["organization"]: r["status"] for r in first} == {"A": "ok", "B": "partial"}
+        assert next(r for r in first if r["organization"] == "B")["failed_phases"] == ["strategy"]
+
+        # 마지막 줄이 쓰다 끊긴 상태로 재시작
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write('{"key": "잘린')
+        calls.clear()
+        second = self.collect(self.make_runner(calls, cache, journal_path=journal), organizations)
+        assert [(r["organization"], r.get("resumed", False)) for r in second] == [("A", True), ("B", False)]
+        assert second[1]["status"] == "ok"
+        assert calls == [("B 미션", "strategy")]  # 현황 분석은 캐시에서 재사용
+
+    def test_degraded_organization_not_journaled_ok(self, tmp_path):
+        """에이전트가 기본값만 돌려준 조직은 partial로 기록되어 다음 실행에서 다시 시도"""
+        cache, journal = AgentOutputCache(disk_dir="off"), str(tmp_path / "results.ndjson")
+        calls = []
+        first = self.collect(self.make_runner(calls, cache, degrade=("A",), journal_path=journal), [{"name": "A"}])
+        assert first[0]["status"] == "partial"
+        assert first[0]["failed_phases"] == ["strategy"]
+        assert first[0]["theory"]["reportInfo"]["pipeline"]["strategy"]["status"] == "degraded"
+
+        calls.clear()
+        second = self.collect(self.make_runner(calls, cache, journal_path=journal), [{"name": "A"}])
+        assert not second[0].get("resumed") and second[0]["status"] == "ok"
+        assert calls == [("A 미션", "strategy")]
+
+    def test_per_organization_keys_ignored(self):
+        """조직별 api_key는 받지 않고 모든 조직이 실행 키 하나를 공유"""
+        assert "api_key" not in normalize_organization({"name": "A", "api_key": "AIzaOTHER"})
+        keys = []
+        runner = self.make_runner([], AgentOutputCache(disk_dir="off"), calls_per_minute=1000)
+        factory = runner.orchestrator_factory
+        runner.orchestrator_factory = lambda api_key: keys.append(api_key) or factory(api_key)
+        self.collect(runner, [{"name": "A", "api_key": "AIzaA"}, {"name": "B", "api_key": "AIzaB"}])
+        assert keys == ["AIzaTEST"]